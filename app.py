@@ -1,12 +1,24 @@
-from flask import Flask, render_template, request, jsonify, send_file, url_for
+from flask import Flask, render_template, request, jsonify, send_file, url_for, g, Response
 import os
 import pandas as pd
 import json
 from datetime import datetime
 import pytz
 import logging
+import sys
+import contextlib
+import functools
+import time
 # Import edilecek modüller çalışma zamanında import edilecek
-import glob
+
+HRN_SCRAPER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hrn_scraper')
+if HRN_SCRAPER_PATH not in sys.path:
+    sys.path.insert(0, HRN_SCRAPER_PATH)
+from track_registry import get_track_registry
+from data_store import get_default_data_store
+from request_profiler import PROFILE_HEADER, profile_request, requested_mode, stage, tag
+import metrics
+import tracing
 
 # Flask uygulamasını oluştur
 app = Flask(__name__)
@@ -16,6 +28,21 @@ app.config['SECRET_KEY'] = 'horse_racing_analysis_2025'
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# HTTP cache - scraper'lar HRN_HTTP_CACHE_DIR altındaki paylaşılan disk cache'ini kullanır
+os.environ.setdefault('HRN_HTTP_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'http_cache'))
+# Resmi sonuçlardan gelen son yarış kayıtları - aynı gün tekrar koşan atlar için profil çekilmez
+os.environ.setdefault('HRN_RESULTS_DB', os.path.join(os.environ['HRN_HTTP_CACHE_DIR'], 'results.sqlite3'))
+# Çıktılar data/<tarih>/<pist>/ altına yazılır, günün manifest.json'u ile bulunur (glob taraması yok)
+os.environ.setdefault('HRN_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+# Entries, profiller ve skorlar SQLite'a da yazılır (WAL - scraper yazarken API okuyabilir)
+os.environ.setdefault('HRN_STORAGE_DB', os.path.join(os.environ['HRN_DATA_DIR'], 'hrn.sqlite3'))
+# Eski günler archive/ altında Parquet; /api/query hazır sorguları DuckDB ile bunun üzerinde çalıştırır
+os.environ.setdefault('HRN_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive'))
+# Skorlama sabitleri bu dosyadan okunur (yoksa yerleşik değerler); değişince yeniden başlatmadan yüklenir
+os.environ.setdefault('HRN_SCORING_CONFIG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_config.json'))
+# HRN_PROFILING=1 iken 'X-HRN-Profile: 1' (ya da ?profile=1) ile gelen istekler buraya profil yazar
+os.environ.setdefault('HRN_PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+
 # America Eastern Time Zone ayarı
 def get_american_time():
     """Get current time in American Eastern Time (EST/EDT)"""
@@ -26,47 +53,86 @@ def get_american_date_string():
     """Get current date string in American Eastern Time"""
     return get_american_time().strftime('%Y-%m-%d')
 
+def track_base_name(track_code, date_str):
+    """Pistin o günkü dosya adı kökü: data/<tarih>/<pist>/<pist>_<YYYY_MM_DD>_<pist>"""
+    return get_default_data_store().base_name(track_code, date_str)
+
 def get_american_timestamp():
     """Get timestamp string in American Eastern Time"""
     return get_american_time().strftime('%Y%m%d_%H%M%S')
 
-# Mevcut track kodları - Güncel aktif pistler
-TRACK_MAPPING = {
-    'aqueduct': 'Aqueduct',
-    'belmont-park': 'Belmont Park', 
-    'churchill-downs': 'Churchill Downs',
-    'del-mar': 'Del Mar',
-    'delaware-park': 'Delaware Park',
-    'gulfstream-park': 'Gulfstream Park',
-    'keeneland': 'Keeneland',
-    'laurel-park': 'Laurel Park',
-    'oaklawn-park': 'Oaklawn Park',
-    'pimlico': 'Pimlico',
-    'remington-park': 'Remington Park',
-    'santa-anita': 'Santa Anita',
-    'saratoga': 'Saratoga',
-    'woodbine': 'Woodbine',
-    'will-rogers-downs': 'Will Rogers Downs',
-    'camarero-race-track': 'Camarero Race Track',
-    'lethbridge-rmtc': 'Lethbridge RMTC',
-    'albuquerque-downs': 'Albuquerque Downs',
-    'hawthorne-race-course': 'Hawthorne Race Course',
-    'grants-pass-downs': 'Grants Pass Downs',
-    'mountaineer': 'Mountaineer Casino Racetrack',
-    'los-alamitos': 'Los Alamitos Race Course',
-    'horseshoe-indianapolis': 'Horseshoe Indianapolis',
-    'finger-lakes': 'Finger Lakes',
-    'tampa-bay-downs': 'Tampa Bay Downs',
-    'parx-racing': 'Parx Racing',
-    'thistledown': 'Thistledown',
-    'fort-erie': 'Fort Erie',
-    'presque-isle-downs': 'Presque Isle Downs'
-}
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Endpoint bazında istek sayısı ve süresi (/metrics) - etiket route kalıbıdır, ham yol değil"""
+    started = g.pop('request_started', None)
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics.API_REQUESTS.inc(endpoint=endpoint, method=request.method, status=str(response.status_code))
+    if started is not None:
+        metrics.API_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+    return response
+
+def profiled(view):
+    """
+    Aşama sürelerini Server-Timing başlığıyla döndürür; istenirse isteği profiller
+    HRN_TRACE_FILE tanımlıysa istek bir trace olarak (fetch / parse / score / serialise span'leri) dosyaya eklenir
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        mode = requested_mode(request.headers.get(PROFILE_HEADER) or request.args.get('profile'))
+        trace_path = tracing.trace_file()
+        request_trace = (tracing.trace(view.__name__, trace_path, endpoint=request.path)
+                         if trace_path else contextlib.nullcontext())
+        with profile_request(view.__name__, mode) as profile, request_trace:
+            response = app.make_response(view(*args, **kwargs))
+        response.headers['Server-Timing'] = profile.server_timing()
+        return response
+    return wrapper
+
+# Pist listesi track_registry'de: bilinen pistler + get_daily_tracks ile günlük aktif liste
+track_registry = get_track_registry()
+
+# HRN_PREFETCH_AT=06:00 tanımlıysa her sabah günün kartları çekilir, yarış verileri
+# post time'dan HRN_PREFETCH_LEAD_MINUTES (varsayılan 30) dakika önce hazır olur
+prefetch_scheduler = None
+
+def start_prefetch_scheduler():
+    """Env ayarlıysa prefetch zamanlayıcısını arka planda başlatır"""
+    global prefetch_scheduler
+    prefetch_at = os.environ.get('HRN_PREFETCH_AT')
+    if not prefetch_at or prefetch_scheduler is not None:
+        return prefetch_scheduler
+    from prefetch_scheduler import PrefetchScheduler
+    lead = int(os.environ.get('HRN_PREFETCH_LEAD_MINUTES', '30'))
+    prefetch_scheduler = PrefetchScheduler(lead_minutes=lead, registry=track_registry)
+    prefetch_scheduler.start_background(prefetch_at)
+    logger.info(f"Prefetch scheduler started: daily at {prefetch_at}, {lead} min before post")
+    return prefetch_scheduler
 
 @app.route('/')
 def index():
     """Ana sayfa"""
-    return render_template('index.html')
+    track_groups = track_registry.tracks_for_display(get_american_date_string())
+    return render_template('index.html', track_groups=track_groups)
+
+@app.route('/api/tracks')
+def list_tracks():
+    """Bilinen pistler ve bugün (veya ?date=YYYY-MM-DD) yarışı olanlar"""
+    try:
+        date_str = request.args.get('date') or get_american_date_string()
+        active = track_registry.active_tracks(date_str)
+        return jsonify({
+            'success': True,
+            'date': date_str,
+            'daily_list_available': active is not None,
+            'groups': track_registry.tracks_for_display(date_str)
+        })
+    except Exception as e:
+        logger.error(f"Pist listesi hatası: {e}")
+        return jsonify({'success': False, 'message': str(e)})
 
 @app.route('/api/check_saved_data', methods=['POST'])
 def check_saved_data():
@@ -78,49 +144,32 @@ def check_saved_data():
         if not track_code:
             return jsonify({'has_data': False, 'message': 'Track seçilmedi'})
         
-        # Bugünün tarihini al (Amerika saat dilimi)
-        today = get_american_time().strftime('%Y_%m_%d')
-        
-        # Essential dosya pattern
-        essential_pattern = f"{track_code}_{today}_*_essential.csv"
-        essential_files = glob.glob(essential_pattern)
+        # Bugünün essential kaydı manifest'ten gelir - CSV açılmaz
+        entry = get_default_data_store().lookup(track_code, get_american_date_string(), 'essential')
         
-        if not essential_files:
+        if not entry:
             return jsonify({
                 'has_data': False, 
-                'message': f'{TRACK_MAPPING.get(track_code, track_code)} için bugünkü veri bulunamadı'
+                'message': f'{track_registry.name_for(track_code)} için bugünkü veri bulunamadı'
             })
         
-        # En son dosyayı al
-        essential_file = sorted(essential_files)[-1]
-        
-        # Dosyayı analiz et
-        try:
-            df = pd.read_csv(essential_file)
-            total_horses = len(df)
-            valid_horses = len(df[df['latest_time'].notna() & df['latest_distance'].notna()])
-            success_rate = round((valid_horses / total_horses * 100), 1) if total_horses > 0 else 0
-            
-            return jsonify({
-                'has_data': True,
-                'data': {
-                    'city': TRACK_MAPPING.get(track_code, track_code),
-                    'total_horses': total_horses,
-                    'successful_horses': valid_horses,
-                    'success_rate': success_rate,
-                    'file_path': essential_file
-                }
-            })
-            
-        except Exception as e:
-            logger.error(f"Dosya analiz hatası: {e}")
-            return jsonify({'has_data': False, 'message': 'Veri dosyası okunamadı'})
+        return jsonify({
+            'has_data': True,
+            'data': {
+                'city': track_registry.name_for(track_code),
+                'total_horses': entry['rows'],
+                'successful_horses': entry['successful'],
+                'success_rate': entry['success_rate'],
+                'file_path': entry['path']
+            }
+        })
             
     except Exception as e:
         logger.error(f"Veri kontrol hatası: {e}")
         return jsonify({'has_data': False, 'message': 'Veri kontrolü sırasında hata oluştu'})
 
 @app.route('/api/scrape_and_save', methods=['POST'])
+@profiled
 def scrape_and_save():
     """Veri çekme ve kaydetme - Essential dosyası da güncellenir"""
     try:
@@ -130,17 +179,17 @@ def scrape_and_save():
         if not track_code:
             return jsonify({'success': False, 'message': 'Track seçilmedi'})
         
-        track_name = TRACK_MAPPING.get(track_code)
-        if not track_name:
-            return jsonify({'success': False, 'message': 'Geçersiz track kodu'})
-        
         # Bugünün tarihini al (Amerika saat dilimi)
         today = get_american_date_string()
-        today_formatted = today.replace('-', '_')
+        tag(track=track_code, date=today)
+        
+        if not track_registry.is_known(track_code, today):
+            return jsonify({'success': False, 'message': 'Geçersiz track kodu'})
+        track_name = track_registry.name_for(track_code, today)
         
         # Dosya adlarını belirle
-        entries_file = f"{track_code}_{today_formatted}_{track_code}_entries.csv"
-        essential_file = f"{track_code}_{today_formatted}_{track_code}_essential.csv"
+        base_name = track_base_name(track_code, today)
+        entries_file = f"{base_name}_entries.csv"
         
         logger.info(f"Veri çekme işlemi başlatılıyor: {track_name}")
         
@@ -162,7 +211,8 @@ def scrape_and_save():
                     logger.info(f"Entries scraping başlatılıyor: {track_code}")
                     
                     # Tek track için scraping yap
-                    success = scrape_single_track_data(track_code, today)
+                    with stage('scrape'):
+                        success = scrape_single_track_data(track_code, today)
                     
                     if not success:
                         return jsonify({
@@ -206,27 +256,21 @@ def scrape_and_save():
         
         # Essential dosyasını güncelle/oluştur
         logger.info("Essential dosyası güncelleniyor...")
-        success = regenerate_essential_file(entries_file)
+        with stage('essential'):
+            success = regenerate_essential_file(entries_file)
         
         if not success:
             return jsonify({'success': False, 'message': 'Essential dosyası güncellenemedi'})
         
-        # Sonuçları analiz et
-        if not os.path.exists(essential_file):
+        # Sonuçlar essential yazılırken manifest'e işlendi (time, distance ve finish position dolu atlar)
+        entry = get_default_data_store().lookup(track_code, today, 'essential')
+        if not entry:
             return jsonify({'success': False, 'message': 'Essential dosyası oluşturulamadı'})
         
-        df = pd.read_csv(essential_file)
-        total_horses = len(df)
-        
-        # latest_finish_position kontrolü yap
-        valid_horses = len(df[
-            df['latest_time'].notna() & 
-            df['latest_distance'].notna() & 
-            df['latest_finish_position'].notna() &
-            (df['latest_finish_position'] != '')
-        ])
-        
-        success_rate = round((valid_horses / total_horses * 100), 1) if total_horses > 0 else 0
+        essential_file = os.path.basename(entry['path'])
+        total_horses = entry['rows']
+        valid_horses = entry['successful']
+        success_rate = entry['success_rate']
         
         logger.info(f"Essential dosyası hazır: {valid_horses}/{total_horses} at için tam veri mevcut (%{success_rate})")
         
@@ -250,59 +294,35 @@ def scrape_and_save():
 def scrape_single_track_data(track_code, date_str):
     """Tek track için entries verilerini çek"""
     try:
-        import requests
+        import sys
         from bs4 import BeautifulSoup
-        import csv
         
-        session = requests.Session()
+        hrn_scraper_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hrn_scraper')
+        if hrn_scraper_path not in sys.path:
+            sys.path.insert(0, hrn_scraper_path)
+        from http_cache import build_session
+        
+        # Aynı URL scraper tarafından tekrar çekildiğinde cache'ten gelir
+        session = build_session()
         session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
-        # Track-specific URL mapping - Gerçek aktif URLler
-        track_url_mapping = {
-            'belmont-park': 'https://entries.horseracingnation.com/entries-results/belmont-at-aqueduct',
-            'aqueduct': 'https://entries.horseracingnation.com/entries-results/belmont-at-aqueduct',
-            'laurel-park': 'https://entries.horseracingnation.com/entries-results/laurel-park',
-            'churchill-downs': 'https://entries.horseracingnation.com/entries-results/churchill-downs',
-            'gulfstream-park': 'https://entries.horseracingnation.com/entries-results/gulfstream-park',
-            'delaware-park': 'https://entries.horseracingnation.com/entries-results/delaware-park',
-            'woodbine': 'https://entries.horseracingnation.com/entries-results/woodbine',
-            'will-rogers-downs': 'https://entries.horseracingnation.com/entries-results/will-rogers-downs',
-            'camarero-race-track': 'https://entries.horseracingnation.com/entries-results/camarero-race-track',
-            'lethbridge-rmtc': 'https://entries.horseracingnation.com/entries-results/lethbridge-rmtc',
-            'albuquerque-downs': 'https://entries.horseracingnation.com/entries-results/albuquerque-downs',
-            'hawthorne-race-course': 'https://entries.horseracingnation.com/entries-results/hawthorne-race-course',
-            'grants-pass-downs': 'https://entries.horseracingnation.com/entries-results/grants-pass-downs',
-            'santa-anita': 'https://entries.horseracingnation.com/entries-results/santa-anita',
-            'remington-park': 'https://entries.horseracingnation.com/entries-results/remington-park',
-            'mountaineer': 'https://entries.horseracingnation.com/entries-results/mountaineer',
-            'los-alamitos': 'https://entries.horseracingnation.com/entries-results/los-alamitos',
-            'finger-lakes': 'https://entries.horseracingnation.com/entries-results/finger-lakes',
-            'tampa-bay-downs': 'https://entries.horseracingnation.com/entries-results/tampa-bay-downs',
-            'parx-racing': 'https://entries.horseracingnation.com/entries-results/parx-racing',
-            'thistledown': 'https://entries.horseracingnation.com/entries-results/thistledown',
-            'fort-erie': 'https://entries.horseracingnation.com/entries-results/fort-erie',
-            'presque-isle-downs': 'https://entries.horseracingnation.com/entries-results/presque-isle-downs',
-            'horseshoe-indianapolis': 'https://entries.horseracingnation.com/entries-results/horseshoe-indianapolis',
-            # Diğer trackler için fallback
-            'del-mar': 'https://entries.horseracingnation.com/entries-results/del-mar',
-            'keeneland': 'https://entries.horseracingnation.com/entries-results/keeneland',
-            'oaklawn-park': 'https://entries.horseracingnation.com/entries-results/oaklawn-park',
-            'pimlico': 'https://entries.horseracingnation.com/entries-results/pimlico',
-            'saratoga': 'https://entries.horseracingnation.com/entries-results/saratoga'
-        }
+        # Base URL - HRN_ENTRIES_BASE_URL ile yerel stand-in sunucusuna yönlendirilebilir
+        entries_base_url = (os.environ.get('HRN_ENTRIES_BASE_URL') or 'https://entries.horseracingnation.com/').rstrip('/')
         
-        # URL'yi oluştur
-        if track_code in track_url_mapping:
-            url = f"{track_url_mapping[track_code]}/{date_str}"
-        else:
-            # Fallback - eski method
-            url = f"https://www.horseracingnation.com/tracks/{track_code}/{date_str}"
+        # Günlük listede olmayan pist için istek atma (liste alınamadıysa None -> eski yöntemle dene)
+        if track_registry.is_active(track_code, date_str) is False:
+            logger.info(f"Bu piste bugün yarış yok (günlük liste): {track_code}")
+            return False
+        
+        url = track_registry.entries_url(track_code, date_str)
         
         logger.info(f"Scraping URL: {url}")
         
-        response = session.get(url, timeout=15)
+        with tracing.fetch_span(url, track=track_code) as fetch:
+            response = session.get(url, timeout=15)
+            fetch.set_response(response)
         
         if response.status_code != 200:
             logger.error(f"HTTP {response.status_code} hatası: {url}")
@@ -346,9 +366,9 @@ def scrape_single_track_data(track_code, date_str):
                 sys.path.insert(0, hrn_scraper_path)
             
             from hrn_scraper import HorseRacingNationScraper
-            scraper = HorseRacingNationScraper()
+            scraper = HorseRacingNationScraper(base_url=f"{entries_base_url}/")
             
-            track_name = track_url_mapping.get(track_code, track_code)
+            track_name = track_registry.name_for(track_code, date_str)
             track_data = scraper.scrape_track_data(url, track_name)
             
             if not track_data or not track_data.get('races'):
@@ -360,7 +380,6 @@ def scrape_single_track_data(track_code, date_str):
             
             # Entries verilerini topla
             entries_data = []
-            today_formatted = date_str.replace('-', '_')
             
             for race in races:
                 race_number = race.get('race_number', 0)
@@ -386,7 +405,8 @@ def scrape_single_track_data(track_code, date_str):
                             'speed_figure': str(speed_figure),
                             'sire': sire,
                             'trainer_jockey': trainer_jockey_raw,
-                            'morning_line': entry.get('morning_line', '')
+                            'morning_line': entry.get('morning_line', ''),
+                            'last_start': horse_info.get('last_start', '')
                         }
                         entries_data.append(entry_row)
                         
@@ -402,14 +422,13 @@ def scrape_single_track_data(track_code, date_str):
             logger.error("Hiç at verisi çekilemedi")
             return False
         
-        # CSV dosyasını kaydet
-        filename = f"{track_code}_{today_formatted}_{track_code}_entries.csv"
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['track_name', 'race_number', 'post_position', 'program_number',
-                        'horse_name', 'speed_figure', 'sire', 'trainer_jockey', 'morning_line']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(entries_data)
+        # CSV dosyasını pistin bölümüne kaydet ve manifest'e işle
+        from data_store import record_output
+        from pipeline import ENTRIES_FIELDS
+        from utils import write_csv_atomic
+        filename = f"{track_base_name(track_code, date_str)}_entries.csv"
+        write_csv_atomic(filename, ENTRIES_FIELDS, entries_data)
+        record_output(filename, entries_data)
         
         logger.info(f"✅ {len(entries_data)} at verisi çekildi: {filename}")
         return True
@@ -422,9 +441,9 @@ def ensure_essential_file_updated(track_code, today):
     """Essential dosyasının güncel olduğundan emin ol"""
     try:
         # Dosya yollarını oluştur
-        today_formatted = today.replace('-', '_')
-        entries_file = f"{track_code}_{today_formatted}_{track_code}_entries.csv"
-        essential_file = f"{track_code}_{today_formatted}_{track_code}_essential.csv"
+        base_name = track_base_name(track_code, today)
+        entries_file = f"{base_name}_entries.csv"
+        essential_file = f"{base_name}_essential.csv"
         
         logger.info(f"Kontrol ediliyor - Entries: {entries_file}, Essential: {essential_file}")
         
@@ -468,8 +487,6 @@ def regenerate_essential_file(entries_file):
         # Mevcut essential dosyasını kopyalayalım ve sadece eksik kolonları ekleyelim
         base_name = entries_file.replace('_entries.csv', '')
         old_essential_file = f"{base_name}_essential.csv"
-        new_essential_file = f"{base_name}_essential_new.csv"
-        output_json = f"{base_name}_essential.json"
         
         # CSV modülünü import et
         import csv
@@ -488,6 +505,11 @@ def regenerate_essential_file(entries_file):
             except Exception as e:
                 logger.warning(f"Eski essential dosyası okunamadı: {e}")
         
+        # Yarıda kalmış bir önceki çalıştırmanın tamamladığı atlar tekrar çekilmez
+        from essential_journal import EssentialJournal
+        journal = EssentialJournal(base_name)
+        journaled = journal.load()
+        
         # Entries dosyasını oku
         horses = []
         with open(entries_file, 'r', encoding='utf-8') as f:
@@ -525,6 +547,13 @@ def regenerate_essential_file(entries_file):
                     results.append(result)
                     continue
             
+            if horse_name.lower() in journaled:
+                result = dict(journaled[horse_name.lower()],
+                              race_number=horse_data.get('race_number', ''),
+                              program_number=horse_data.get('program_number', ''))
+                results.append(result)
+                continue
+            
             # Scraping gerekiyor
             need_scraping.append(horse_data)
         
@@ -548,12 +577,12 @@ def regenerate_essential_file(entries_file):
                 logger.info(f"[{i}/{len(need_scraping)}] Scraping: {horse_name}")
                 
                 try:
-                    horse_info = scraper.scrape_horse_profile(horse_name)
+                    # Bugün başka yarışta koşmuş atlar resmi sonuçtan gelir, profil çekilmez
+                    with tracing.span('profile', track=horse_data.get('track_name'), race=horse_data.get('race_number'),
+                                      horse=horse_name):
+                        latest_race = scraper.latest_race(horse_name, last_start=horse_data.get('last_start'))
                     
-                    if horse_info and horse_info.get('race_history'):
-                        # En son yarış verilerini al
-                        latest_race = horse_info['race_history'][0]
-                        
+                    if latest_race:
                         latest_surface = latest_race.get('surface', '')
                         latest_distance = latest_race.get('distance', '')  
                         latest_time = latest_race.get('time', '')
@@ -571,6 +600,8 @@ def regenerate_essential_file(entries_file):
                             'latest_finish_position': latest_finish_position
                         }
                         results.append(result)
+                        if latest_time:
+                            journal.append(result)
                         
                         if latest_time and latest_finish_position:
                             logger.info(f"  ✅ {latest_surface} | {latest_distance} | {latest_time} | {latest_finish_position}. sıra")
@@ -611,15 +642,8 @@ def regenerate_essential_file(entries_file):
             'latest_finish_position'
         ]
         
-        # CSV'ye kaydet
-        with open(old_essential_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(results)
-        
-        # JSON'a kaydet
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        # CSV ve JSON atomik yazılır, ardından günlük silinir
+        journal.finalize(results, fieldnames)
         
         successful_count = len([r for r in results if r['latest_time']])
         logger.info(f"Essential file güncellendi: {successful_count}/{len(results)} başarılı")
@@ -631,6 +655,7 @@ def regenerate_essential_file(entries_file):
         return False
 
 @app.route('/api/calculate_from_saved', methods=['POST'])
+@profiled
 def calculate_from_saved():
     """Kaydedilmiş verilerden hesaplama yap"""
     try:
@@ -640,17 +665,16 @@ def calculate_from_saved():
         if not track_code:
             return jsonify({'success': False, 'message': 'Track seçilmedi'})
         
-        # Bugünün tarihini al (Amerika saat dilimi)
-        today = get_american_time().strftime('%Y_%m_%d')
-        
-        # Essential dosyayı bul
-        essential_pattern = f"{track_code}_{today}_*_essential.csv"
-        essential_files = glob.glob(essential_pattern)
+        # Essential dosyayı manifest'ten bul (Amerika saat dilimine göre bugün)
+        today = get_american_date_string()
+        tag(track=track_code, date=today)
+        with stage('lookup'):
+            entry = get_default_data_store().lookup(track_code, today, 'essential')
         
-        if not essential_files:
+        if not entry:
             return jsonify({'success': False, 'message': 'Essential dosyası bulunamadı. Önce "Veri Çek" butonunu kullanarak verileri güncelleyin.'})
         
-        essential_file = sorted(essential_files)[-1]
+        essential_file = entry['path']
         
         # Essential file'da latest_finish_position kontrolü
         try:
@@ -667,9 +691,10 @@ def calculate_from_saved():
         sys.path.insert(0, hrn_scraper_path)
         
         # TURKISH STYLE CALCULATOR KULLAN - Sadece bu yöntem aktif!
-        from american_horse_calculator_turkish_style import load_horses_from_csv, process_horses_data_turkish_style, group_by_race_and_sort
+        from american_horse_calculator_turkish_style import load_horses_from_csv
         
-        horses_list = load_horses_from_csv(essential_file)
+        with stage('load'):
+            horses_list = load_horses_from_csv(essential_file)
         logger.info(f"Loaded {len(horses_list) if horses_list else 0} horses from CSV - TURKISH STYLE CALCULATION")
         
         if not horses_list:
@@ -685,26 +710,68 @@ def calculate_from_saved():
                 horse['profile_surface'] = horse['latest_surface']
             # latest_finish_position zaten doğru isimde, mapping gerekmez
         
-        # TURKISH STYLE ile hesaplama yap
+        # TURKISH STYLE ile hesaplama yap - değişmemiş yarışlar skor cache'inden gelir
         logger.info("Starting Turkish Style horse data processing...")
-        results = process_horses_data_turkish_style(horses_list)
-        logger.info(f"Turkish Style processed {len(results)} horses")
-        
-        logger.info("Starting race grouping...")
-        grouped_results = group_by_race_and_sort(results)
-        logger.info(f"Grouped into {len(grouped_results)} races")
+        from race_score_cache import score_races, get_race_score_cache
+        with stage('score'):
+            grouped_results, results, recomputed = score_races(track_code, today, horses_list, get_race_score_cache())
+        logger.info(f"Turkish Style processed {len(results)} horses in {len(grouped_results)} races "
+                    f"(recomputed: {recomputed or 'none'})")
+        
+        # Skorlar depoya yazılır (günler arası sorgular için)
+        from storage import get_default_storage
+        from pipeline import flatten_scored_result
+        storage = get_default_storage()
+        if storage is not None:
+            with stage('store'):
+                storage.ingest(track_code, today, 'scores', [flatten_scored_result(result) for result in results])
         
         # Web formatına çevir
         logger.info("Converting to web format...")
-        web_data = convert_to_web_format(grouped_results, results)
+        with stage('web'), tracing.span('serialise', track=track_code):
+            web_data = convert_to_web_format(grouped_results, results)
+            response = jsonify(web_data)
         logger.info(f"Web data created with {len(web_data.get('races', []))} races")
         
-        return jsonify(web_data)
+        return response
         
     except Exception as e:
         logger.error(f"Hesaplama hatası: {e}")
         return jsonify({'success': False, 'message': f'Hesaplama hatası: {str(e)}'})
 
+@app.route('/api/refresh_entries', methods=['POST'])
+def refresh_entries():
+    """Entries sayfasını tekrar çek; scratch / program değişikliklerini uygula, yalnızca yeni atları çek"""
+    try:
+        data = request.get_json()
+        track_code = data.get('city')
+        
+        if not track_code:
+            return jsonify({'success': False, 'message': 'Track seçilmedi'})
+        
+        today = get_american_date_string()
+        if not track_registry.is_known(track_code, today):
+            return jsonify({'success': False, 'message': 'Geçersiz track kodu'})
+        
+        from entries_diff import refresh_track_entries
+        result = refresh_track_entries(track_code, today, registry=track_registry)
+        diff = result.get('diff') or {}
+        return jsonify({
+            'success': result['success'],
+            'message': result['message'],
+            'data': {
+                'added': [row.get('horse_name') for row in diff.get('added', [])],
+                'scratched': [row.get('horse_name') for row in diff.get('scratched', [])],
+                'changed': diff.get('changed', []),
+                'affected_races': diff.get('affected_races', []),
+                'profiles_scraped': result.get('profiles_scraped', 0)
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Entries yenileme hatası: {e}")
+        return jsonify({'success': False, 'message': f'Entries yenileme hatası: {str(e)}'})
+
 @app.route('/api/scrape_and_calculate', methods=['POST'])
 def scrape_and_calculate():
     """Veri çek ve hesapla"""
@@ -717,7 +784,7 @@ def scrape_and_calculate():
         
         # Bugünün tarihini al (Amerika saat dilimi)
         today = get_american_date_string()
-        track_name = TRACK_MAPPING.get(track_code, track_code)
+        track_name = track_registry.name_for(track_code, today)
         
         # Scraping ve hesaplama yap
         import sys
@@ -734,6 +801,14 @@ def scrape_and_calculate():
         if not output_file:
             return jsonify({'success': False, 'message': 'İşlem başarısız'})
         
+        # Interactive calculator çalışma dizinine yazar - çıktılar pistin bölümüne taşınır
+        store = get_default_data_store()
+        legacy_base = f"{track_code}_{today.replace('-', '_')}_{track_code}"
+        for suffix in ('_entries.csv', '_essential.csv', '_essential.json'):
+            if os.path.exists(f"{legacy_base}{suffix}"):
+                store.adopt(f"{legacy_base}{suffix}", track_code, today)
+        output_file = store.adopt(output_file, track_code, today)
+        
         # Sonuçları oku ve web formatına çevir
         df = pd.read_csv(output_file)
         results = df.to_dict('records')
@@ -843,20 +918,112 @@ def convert_to_web_format(grouped_results, all_results):
         }
     }
 
+@app.route('/api/cache_stats')
+def cache_stats():
+    """HTTP ve parse cache sayaçları (hit / miss / revalidated)"""
+    try:
+        import sys
+        hrn_scraper_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hrn_scraper')
+        if hrn_scraper_path not in sys.path:
+            sys.path.insert(0, hrn_scraper_path)
+        from http_cache import get_default_cache
+        from parse_cache import get_parse_cache
+        from race_score_cache import get_race_score_cache
+        from results_store import get_default_results_store
+        from scoring_config import get_scoring_config
+        from storage import get_default_storage
+        
+        cache = get_default_cache()
+        results_store = get_default_results_store()
+        storage = get_default_storage()
+        return jsonify({
+            'enabled': cache is not None,
+            'stats': cache.stats() if cache is not None else {},
+            'parse_cache': get_parse_cache().stats(),
+            'race_score_cache': dict(get_race_score_cache().stats(), scoring_version=get_scoring_config().version),
+            'results_store': results_store.stats() if results_store is not None else {},
+            'storage': storage.counts() if storage is not None else {}
+        })
+    except Exception as e:
+        logger.error(f"Cache istatistik hatası: {e}")
+        return jsonify({'enabled': False, 'message': str(e)})
+
+@app.route('/api/horse_history/<path:horse_name>')
+def horse_history(horse_name):
+    """Atın depodaki tüm kartları (profil + skor) ve resmi sonuçları"""
+    try:
+        from storage import get_default_storage
+        storage = get_default_storage()
+        if storage is None:
+            return jsonify({'success': False, 'message': 'Depo kapalı (HRN_STORAGE_DB)'})
+        return jsonify(dict(storage.horse_history(horse_name), success=True))
+    except Exception as e:
+        logger.error(f"At geçmişi hatası: {e}")
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/query')
+def run_query():
+    """Arşiv üzerinde hazır parametreli sorgu (salt okunur); name verilmezse sorgu listesi"""
+    try:
+        from query_engine import CANNED_QUERIES, get_default_query_engine
+        name = request.args.get('name')
+        if not name:
+            return jsonify({'success': True, 'queries': {key: {'params': sorted(defaults) + ['until'],
+                                                              'description': description}
+                                                        for key, (_, defaults, description) in CANNED_QUERIES.items()}})
+        engine = get_default_query_engine()
+        if engine is None:
+            return jsonify({'success': False, 'message': 'Sorgu motoru kapalı (HRN_ARCHIVE_DIR / duckdb)'})
+        params = {key: value for key, value in request.args.items() if key != 'name'}
+        return jsonify(dict(engine.query(name, **params), success=True))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Sorgu hatası: {e}")
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/scoring_config')
+def scoring_config_status():
+    """Geçerli skorlama parametreleri ve sürümü (dosya değiştiyse önce yeniden yüklenir)"""
+    try:
+        from scoring_config import get_scoring_config
+        config = get_scoring_config()
+        config.refresh(force=True)
+        return jsonify(dict(config.status(), success=True))
+    except Exception as e:
+        logger.error(f"Skorlama config hatası: {e}")
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text formatında metrikler"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/prefetch_status')
+def prefetch_status():
+    """Post time'a göre önceden veri çekme zamanlayıcısının durumu"""
+    if prefetch_scheduler is None:
+        return jsonify({'enabled': False})
+    return jsonify({
+        'enabled': True,
+        'lead_minutes': int(prefetch_scheduler.lead.total_seconds() // 60),
+        'pending_races': prefetch_scheduler.pending(),
+        'stats': prefetch_scheduler.stats
+    })
+
 @app.route('/download_csv/<track_code>')
 def download_csv(track_code):
     """CSV dosyası indir"""
     try:
-        # En son hesaplanan dosyayı bul (Amerika saat dilimi)
-        today = get_american_time().strftime('%Y_%m_%d')
-        pattern = f"american_{track_code}_{today}_*.csv"
-        files = glob.glob(pattern)
+        # En son hesaplanan dosya manifest'ten (Amerika saat dilimine göre bugün); pipeline çıktısı yedek
+        store = get_default_data_store()
+        today = get_american_date_string()
+        entry = store.lookup(track_code, today, 'american') or store.lookup(track_code, today, 'turkish_style')
         
-        if not files:
+        if not entry:
             return "Dosya bulunamadı", 404
         
-        latest_file = sorted(files)[-1]
-        return send_file(latest_file, as_attachment=True, download_name=f"{track_code}_analiz_sonuclari.csv")
+        return send_file(entry['path'], as_attachment=True, download_name=f"{track_code}_analiz_sonuclari.csv")
         
     except Exception as e:
         logger.error(f"CSV download hatası: {e}")
@@ -866,6 +1033,11 @@ def download_csv(track_code):
 def download_raw(filename):
     """Ham veri dosyası indir"""
     try:
+        # Dosya adından pistin bölümü bulunur; eski düzendeki dosyalar çalışma dizininde kalmış olabilir
+        filename = os.path.basename(filename)
+        path = get_default_data_store().locate(filename)
+        if path and os.path.exists(path):
+            return send_file(path, as_attachment=True)
         if os.path.exists(filename):
             return send_file(filename, as_attachment=True)
         else:
@@ -936,5 +1108,8 @@ def test_calculate():
         return f"❌ Error: {str(e)}"
 
 if __name__ == '__main__':
+    # Debug reloader'da zamanlayıcı yalnızca çalışan alt süreçte başlatılır
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_prefetch_scheduler()
     # Flask uygulamasını çalıştır - Stream için port 5010
     app.run(debug=True, host='0.0.0.0', port=5010)
\ No newline at end of file
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ARCHIVE BENCHMARK
+Günlük CSV düzeni ile Parquet arşivini karşılaştırır:
+- disk kullanımı
+- tam tarama (tüm essential satırları)
+- seçici sorgu (tek pist, son 30 gün, iki kolon) - CSV tarafında dosya adına göre eleme yapılır
+Sentetik CSV'ler gerçek çıktılarla aynı kolon ve adlarda üretilir, ağ kullanılmaz.
+
+Kullanım (repo kökünden):
+    python benchmarks/bench_archive.py --days 90 --tracks 12
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hrn_scraper'))
+
+from archive import compact, disk_usage, read
+from data_store import DataStore
+from pipeline import ENTRIES_FIELDS, ESSENTIAL_FIELDS, SCORED_FIELDS
+from utils import write_csv_atomic
+
+SURFACES = ['Dirt', 'Turf-Firm', 'Synthetic']
+DISTANCES = ['5 f', '6 f', '6 1/2 f', '7 f', '1 m', '1 1/16 m']
+
+
+def generate_days(root, days, tracks, races, horses, seed=7):
+    """data/<tarih>/<pist>/ altında entries, essential ve american CSV'leri"""
+    rng = random.Random(seed)
+    store = DataStore(root)
+    start = date(2025, 9, 28) - timedelta(days=days - 1)
+    for day in range(days):
+        date_str = (start + timedelta(days=day)).isoformat()
+        for t in range(tracks):
+            track_code = f"track-{t}"
+            base = store.base_name(track_code, date_str)
+            entries, essential, scores = [], [], []
+            for race in range(1, races + 1):
+                for program in range(1, horses + 1):
+                    name = f"Horse {rng.randrange(5000)}"
+                    seconds = rng.uniform(58, 110)
+                    entries.append({'track_name': track_code, 'race_number': race, 'post_position': program,
+                                    'program_number': program, 'horse_name': name,
+                                    'speed_figure': rng.randrange(40, 110), 'sire': f"Sire {rng.randrange(300)}",
+                                    'trainer_jockey': f"Trainer {rng.randrange(200)}Jockey {rng.randrange(150)}",
+                                    'morning_line': f"{rng.randrange(1, 30)}/1"})
+                    essential.append({'race_number': race, 'program_number': program, 'horse_name': name,
+                                      'latest_surface': rng.choice(SURFACES),
+                                      'latest_distance': rng.choice(DISTANCES),
+                                      'latest_time': f"{int(seconds // 60)}:{seconds % 60:05.2f}",
+                                      'latest_finish_position': rng.randrange(1, 12)})
+                    scores.append({'track': track_code, 'date': date_str, 'race_number': race,
+                                   'program_number': program, 'horse_name': name,
+                                   'performance_score': round(rng.uniform(50, 120), 2),
+                                   'calculation_status': 'Success'})
+            write_csv_atomic(f"{base}_entries.csv", ENTRIES_FIELDS, entries)
+            write_csv_atomic(f"{base}_essential.csv", ESSENTIAL_FIELDS, essential)
+            write_csv_atomic(os.path.join(os.path.dirname(base),
+                                          f"american_{track_code}_{date_str.replace('-', '_')}_20250928_120000.csv"),
+                             [name for name in SCORED_FIELDS if not name.startswith('calc_')], scores)
+    return start
+
+
+def csv_paths(root, kind):
+    return sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(root)
+                  for name in names if name.endswith(f"_{kind}.csv"))
+
+
+def timed(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Daily CSV layout vs Parquet archive benchmark')
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--tracks', type=int, default=10)
+    parser.add_argument('--races', type=int, default=9)
+    parser.add_argument('--horses', type=int, default=9)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    print("📦 ARCHIVE BENCHMARK")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = os.path.join(work_dir, 'data')
+        archive_dir = os.path.join(work_dir, 'archive')
+        start = generate_days(data_dir, args.days, args.tracks, args.races, args.horses)
+        since = (date(2025, 9, 28) - timedelta(days=29)).isoformat()
+
+        started = time.perf_counter()
+        summary = compact(data_dir, archive_dir)
+        compact_seconds = time.perf_counter() - started
+
+        csv_bytes = sum(os.path.getsize(path) for kind in ('entries', 'essential') for path in csv_paths(data_dir, kind))
+        csv_bytes += sum(os.path.getsize(os.path.join(dirpath, name)) for dirpath, _, names in os.walk(data_dir)
+                         for name in names if name.startswith('american_'))
+        print(f"{args.days} days x {args.tracks} tracks: {summary['files']} CSV files, {summary['rows']} rows "
+              f"(start {start}), compacted in {compact_seconds:.2f}s")
+
+        def csv_full_scan():
+            return pd.concat([pd.read_csv(path) for path in csv_paths(data_dir, 'essential')], ignore_index=True)
+
+        def csv_selective():
+            # Dosya adından pist/tarih elemesi (bugünkü düzenin yapabileceği en iyisi)
+            paths = [path for path in csv_paths(data_dir, 'essential')
+                     if os.path.basename(path).startswith('track-3_')
+                     and os.path.basename(path)[len('track-3_'):len('track-3_') + 10].replace('_', '-') >= since]
+            frame = pd.concat([pd.read_csv(path, usecols=['horse_name', 'latest_time']) for path in paths])
+            return frame
+
+        def parquet_full_scan():
+            return read('essential', archive_dir=archive_dir)
+
+        def parquet_selective():
+            return read('essential', ['horse_name', 'latest_time_seconds'],
+                        [('track', '==', 'track-3'), ('date', '>=', since)], archive_dir)
+
+        results = []
+        for label, func in [('csv full scan', csv_full_scan), ('parquet full scan', parquet_full_scan),
+                            ('csv track+30d', csv_selective), ('parquet track+30d', parquet_selective)]:
+            seconds, frame = timed(func, args.repeat)
+            results.append({'case': label, 'seconds': round(seconds, 4), 'rows': len(frame)})
+            print(f"{label:<20} {seconds:>8.4f}s {len(frame):>8} rows")
+
+        parquet_bytes = disk_usage(archive_dir)
+        print(f"disk: CSV {csv_bytes / 1024:.0f} KiB, Parquet {parquet_bytes / 1024:.0f} KiB "
+              f"(x{csv_bytes / parquet_bytes:.1f} smaller)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'cases': results, 'csv_bytes': csv_bytes, 'parquet_bytes': parquet_bytes,
+                       'compact_seconds': round(compact_seconds, 3)}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
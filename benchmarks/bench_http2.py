@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP/2 BENCHMARK
+Aynı profil listesini HTTP/1.1 (requests bağlantı havuzu) ve HTTP/2 (h2c, tek bağlantı
+üzerinde çoklanmış) ile çeker; sunucu tarafında açılan bağlantı sayısını ve throughput'u raporlar
+
+Kullanım (repo kökünden):
+    python benchmarks/bench_http2.py --horses 300 --workers 32 --latency-ms 50
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer, StandInH2Server, NAME_WORDS_A, NAME_WORDS_B
+from horse_profile_scraper import HorseProfileScraper
+from parse_cache import ParsedDocumentCache
+
+
+def horse_names(count):
+    """Stand-in sunucusundaki isimlere benzeyen, tekrarsız at isimleri"""
+    names = []
+    for i in range(count):
+        a = NAME_WORDS_A[i % len(NAME_WORDS_A)]
+        b = NAME_WORDS_B[(i // len(NAME_WORDS_A)) % len(NAME_WORDS_B)]
+        names.append(f"{a} {b} {i}")
+    return names
+
+
+def run_case(label, server_class, http2, config, names, workers):
+    """Tek bir transport senaryosunu çalıştırır ve sonucu döndürür"""
+    server = server_class(config).start()
+    try:
+        # Her senaryo boş parse cache ile başlar; HTTP cache kapalı
+        scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False, http2=http2,
+                                      parse_cache=ParsedDocumentCache())
+        started = time.time()
+        results = scraper.scrape_multiple_horses_concurrent(names, max_workers=workers)
+        elapsed = time.time() - started
+        stats = dict(server.stats)
+    finally:
+        server.stop()
+
+    adapter = scraper.session.get_adapter(server.base_url)
+    return {
+        'transport': label,
+        'horses': len(names),
+        'profiles_found': len(results),
+        'requests': stats['requests'],
+        'connections': stats['connections'],
+        'seconds': round(elapsed, 2),
+        'requests_per_second': round(stats['requests'] / elapsed, 1) if elapsed > 0 else 0,
+        'adapter_counters': getattr(adapter, 'counters', None)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP/1.1 vs HTTP/2 profile fetch benchmark')
+    parser.add_argument('--horses', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--latency-ms', type=int, default=50)
+    parser.add_argument('--variant-miss-rate', type=float, default=0.1)
+    parser.add_argument('--output', default=None, help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    # Scraper'ların her 404'ü loglaması benchmark çıktısını boğmasın
+    logging.disable(logging.ERROR)
+
+    config = StandInConfig(latency_ms=args.latency_ms, variant_miss_rate=args.variant_miss_rate)
+    names = horse_names(args.horses)
+
+    print("⚡ HTTP/2 BENCHMARK")
+    print("=" * 50)
+    print(f"{args.horses} horses, {args.workers} workers, {args.latency_ms} ms server latency")
+
+    results = [
+        run_case('http/1.1', StandInServer, False, config, names, args.workers),
+        run_case('http/2 (h2c)', StandInH2Server, 'h2c', config, names, args.workers),
+    ]
+
+    for result in results:
+        print(f"{result['transport']:<14} connections={result['connections']:<4} "
+              f"requests={result['requests']:<5} {result['seconds']:>6.2f}s "
+              f"{result['requests_per_second']:>7.1f} req/s  found={result['profiles_found']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PARSE POOL BENCHMARK
+Kaydedilmiş (replay) profil ve entries sayfalarını fetch thread'leri üzerinden parse eder:
+- threads: parse, fetch eden thread'in içinde (GIL üzerinde sıraya girer)
+- processes: thread'ler ham byte'ları ParsePool süreçlerine verir
+Sayfalar stand-in sunucusunun render fonksiyonlarıyla üretilir, ağ kullanılmaz;
+--latency-ms ile her sayfa için ağ bekleme süresi taklit edilebilir.
+Çok çekirdekli bir makinede --processes değerlerini artırarak ölçeklenme ölçülür.
+
+Kullanım (repo kökünden):
+    python benchmarks/bench_parse_pool.py --profiles 400 --threads 16 --processes 1,2,4,8
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, generate_card, render_entries_page, render_profile_page
+from parse_workers import ParsePool, parse_entries_page, parse_profile_page
+
+TEST_DATE = '2025-09-28'
+
+
+def replay_pages(profiles, tracks):
+    """Parse edilecek (tür, gövde, bağlam) listesi - her sayfa farklı içerikte"""
+    config = StandInConfig(races=10, horses=10)
+    pages = []
+    for i in range(tracks):
+        slug = f"track-{i}"
+        card = generate_card(config, TEST_DATE, slug, f"Track {i}")
+        url = f"http://127.0.0.1/entries-results/{slug}/{TEST_DATE}"
+        pages.append(('entries', render_entries_page(card).encode('utf-8'), (url, card['name'])))
+    for i in range(profiles):
+        slug = f"Replay_Horse_{i}"
+        pages.append(('profile', render_profile_page(config, slug).encode('utf-8'), (slug.replace('_', ' '),)))
+    return pages
+
+
+def run_case(label, pages, threads, pool, latency_ms):
+    """pool=None: parse thread içinde; aksi halde süreç havuzunda"""
+    def handle(page):
+        kind, body, context = page
+        if latency_ms:
+            time.sleep(latency_ms / 1000.0)  # ağ bekleme taklidi
+        if pool is None:
+            func = parse_entries_page if kind == 'entries' else parse_profile_page
+            return func(body, *context)
+        if kind == 'entries':
+            return pool.parse_entries(body, *context)
+        return pool.parse_profile(body, *context)
+
+    if pool is not None:
+        # Süreç başlatma maliyeti ölçüme karışmasın
+        list(map(handle, pages[:1]))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(handle, pages))
+    elapsed = time.perf_counter() - started
+
+    races = sum(len(r['races']) for r in results if 'races' in r)
+    history = sum(len(r['race_history']) for r in results if 'race_history' in r)
+    return {
+        'mode': label,
+        'pages': len(pages),
+        'seconds': round(elapsed, 3),
+        'pages_per_second': round(len(pages) / elapsed, 1) if elapsed > 0 else 0,
+        'races_parsed': races,
+        'history_rows_parsed': history
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Thread vs process pool HTML parse benchmark')
+    parser.add_argument('--profiles', type=int, default=300)
+    parser.add_argument('--tracks', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=16, help='Fetch thread sayısı')
+    parser.add_argument('--processes', default='1,2,4', help='Virgülle ayrılmış süreç sayıları')
+    parser.add_argument('--latency-ms', type=int, default=0)
+    parser.add_argument('--output', default=None, help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    # Parse sırasında her satırın INFO loglanması ölçümü boğmasın
+    logging.disable(logging.ERROR)
+
+    pages = replay_pages(args.profiles, args.tracks)
+    print("🧩 PARSE POOL BENCHMARK")
+    print("=" * 50)
+    print(f"{len(pages)} pages, {args.threads} fetch threads, {os.cpu_count()} CPU cores, "
+          f"{args.latency_ms} ms simulated latency")
+
+    results = [run_case('threads', pages, args.threads, None, args.latency_ms)]
+    for processes in [int(p) for p in args.processes.split(',') if p.strip()]:
+        pool = ParsePool(max_workers=processes)
+        try:
+            results.append(run_case(f'processes={processes}', pages, args.threads, pool, args.latency_ms))
+        finally:
+            pool.shutdown()
+
+    baseline = results[0]['seconds']
+    for result in results:
+        result['speedup'] = round(baseline / result['seconds'], 2) if result['seconds'] else 0
+        print(f"{result['mode']:<14} {result['seconds']:>7.2f}s {result['pages_per_second']:>8.1f} pages/s "
+              f"x{result['speedup']:<5} races={result['races_parsed']} history={result['history_rows_parsed']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BENCHMARK SUITE
+Parse, skorlama ve API sıcak yollarının süreleri; sonuçlar JSON olarak saklanır ve önceki
+bir çalıştırmayla karşılaştırılabilir.
+
+Gruplar:
+- parse:   _extract_races / _extract_race_entries (entries sayfaları),
+           _extract_race_history / _parse_race_row (profil sayfaları)
+           Sayfalar --pages-dir'deki (alt dizinler dahil) kaydedilmiş HTML'lerden, yoksa stand-in render'ından gelir
+- units:   time_to_seconds / distance_to_meters (örnek essential CSV'lerindeki değerler)
+- scoring: process_horses_data_turkish_style, group_by_race_and_sort, convert_to_web_format ve
+           vector_scorer (--sizes at sayıları; atlar repo kökündeki ya da --samples-dir altındaki
+           essential satırlarından)
+- api:     Flask test client ile /api/* endpoint'leri (geçici veri dizini + stand-in sunucusu,
+           ağ kullanılmaz)
+
+Kullanım (repo kökünden):
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --groups scoring --sizes 10,1000 --compare benchmarks/results/<önceki>.json
+    # synthetic_cards.py çıktısıyla (üretim boyutunun katları)
+    python benchmarks/run_benchmarks.py --pages-dir synthetic/html --samples-dir synthetic/data
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(REPO_DIR, 'hrn_scraper'))
+# app.py (sonda: hrn_scraper paketi hrn_scraper.py modülünü gölgelemesin)
+sys.path.append(REPO_DIR)
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from american_horse_calculator_turkish_style import (
+    distance_to_meters, group_by_race_and_sort, process_horses_data_turkish_style, time_to_seconds
+)
+from hrn_standin_server import StandInConfig, StandInServer, generate_card, render_entries_page, render_profile_page
+import vector_scorer
+
+GROUPS = ('parse', 'units', 'scoring', 'api')
+DEFAULT_SIZES = '10,1000,100000'
+DEFAULT_RESULTS_DIR = os.path.join(REPO_DIR, 'benchmarks', 'results')
+SAMPLE_PATTERN = os.path.join(REPO_DIR, '*_essential.csv')
+TEST_DATE = '2025-09-28'
+
+
+def measure(func, repeat, items=None):
+    """func'ı repeat kez çalıştırır; süreler milisaniye, items verilirse öğe başına mikrosaniye"""
+    func()  # ısınma (import, lazy cache, ilk bağlantı)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000.0)
+    stats = {'repeat': repeat, 'min_ms': round(min(timings), 3), 'median_ms': round(statistics.median(timings), 3),
+             'mean_ms': round(statistics.mean(timings), 3)}
+    if items:
+        stats['items'] = items
+        stats['per_item_us'] = round(stats['median_ms'] * 1000.0 / items, 3)
+    return stats
+
+
+def _record(results, name, stats):
+    results[name] = stats
+    per_item = f" ({stats['per_item_us']} µs/item, {stats['items']} items)" if 'items' in stats else ''
+    print(f"{name:<48} {stats['median_ms']:>11.3f} ms{per_item}")
+
+
+# --- Girdi verisi ---
+
+def load_pages(pages_dir, tracks, profiles):
+    """[(tür, html, bağlam)] - kaydedilmiş sayfalar ya da stand-in render'ı"""
+    if pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(pages_dir, '**', '*.htm*'), recursive=True)):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                body = f.read()
+            kind = 'profile' if 'horse-table' in body else 'entries'
+            pages.append((kind, body, os.path.basename(path)))
+        return pages
+    config = StandInConfig(races=10, horses=10)
+    pages = [('entries', render_entries_page(generate_card(config, TEST_DATE, f"track-{i}", f"Track {i}")),
+              f"http://127.0.0.1/entries-results/track-{i}/{TEST_DATE}") for i in range(tracks)]
+    pages += [('profile', render_profile_page(config, f"Bench_Horse_{i}"), f"Bench Horse {i}")
+              for i in range(profiles)]
+    return pages
+
+
+def sample_rows(samples_dir=None):
+    """Repo kökündeki örnek essential satırları (gerçek kartlar) ya da samples_dir altındakiler"""
+    pattern = os.path.join(samples_dir, '**', '*_essential.csv') if samples_dir else SAMPLE_PATTERN
+    frames = [pd.read_csv(path) for path in sorted(glob.glob(pattern, recursive=True))]
+    if not frames:
+        raise RuntimeError(f"Örnek essential CSV bulunamadı: {pattern}")
+    return pd.concat(frames, ignore_index=True).to_dict('records')
+
+
+def sample_horses(rows, count, horses_per_race=9, seed=7):
+    """Örnek satırlardan count atlık, yarışlara bölünmüş skorlama girdisi"""
+    rng = random.Random(seed)
+    races = [(row['latest_distance'], row['latest_surface']) for row in rows]
+    horses = []
+    for i in range(count):
+        race_index = i // horses_per_race
+        if i % horses_per_race == 0:
+            entry_distance, entry_surface = rng.choice(races)
+        row = rng.choice(rows)
+        horses.append({
+            'track': f"track-{race_index // 10}", 'date': TEST_DATE, 'race_number': race_index % 10 + 1,
+            'program_number': i % horses_per_race + 1, 'horse_name': f"{row['horse_name']} {i}",
+            'profile_time': row['latest_time'], 'profile_distance': row['latest_distance'],
+            'profile_surface': row['latest_surface'], 'latest_finish_position': row['latest_finish_position'],
+            'entry_distance': entry_distance, 'entry_surface': entry_surface
+        })
+    return horses
+
+
+# --- Gruplar ---
+
+def bench_parse(args, results):
+    from horse_profile_scraper import HorseProfileScraper
+    from hrn_scraper import HorseRacingNationScraper
+
+    pages = load_pages(args.pages_dir, args.tracks, args.profiles)
+    entries_pages = [(body, context) for kind, body, context in pages if kind == 'entries']
+    profile_pages = [body for kind, body, _ in pages if kind == 'profile']
+    scraper = HorseRacingNationScraper(http_cache=False, http2=False)
+    profile_scraper = HorseProfileScraper(http_cache=False, http2=False)
+
+    if entries_pages:
+        _record(results, 'parse.entries.soup', measure(
+            lambda: [BeautifulSoup(body, 'html.parser') for body, _ in entries_pages], args.repeat,
+            len(entries_pages)))
+        soups = [(BeautifulSoup(body, 'html.parser'), context) for body, context in entries_pages]
+        _record(results, 'parse.entries._extract_races', measure(
+            lambda: [scraper._extract_races(soup, url) for soup, url in soups], args.repeat, len(soups)))
+        tables = [table for soup, _ in soups for table in soup.find_all('table') if scraper._is_entries_table(table)]
+        _record(results, 'parse.entries._extract_race_entries', measure(
+            lambda: [scraper._extract_race_entries(table) for table in tables], args.repeat, len(tables)))
+
+    if profile_pages:
+        _record(results, 'parse.profile.soup', measure(
+            lambda: [BeautifulSoup(body, 'html.parser') for body in profile_pages], args.repeat, len(profile_pages)))
+        soups = [BeautifulSoup(body, 'html.parser') for body in profile_pages]
+        _record(results, 'parse.profile._extract_race_history', measure(
+            lambda: [profile_scraper._extract_race_history(soup) for soup in soups], args.repeat, len(soups)))
+        rows = [cells for soup in soups for table in soup.find_all('table', class_='horse-table')
+                for row in table.find_all('tr') for cells in [row.find_all('td')] if len(cells) >= 6]
+        _record(results, 'parse.profile._parse_race_row', measure(
+            lambda: [profile_scraper._parse_race_row(cells) for cells in rows], args.repeat, len(rows)))
+
+
+def bench_units(args, results):
+    rows = sample_rows(args.samples_dir)
+    times = [str(row['latest_time']) for row in rows] * (10000 // len(rows) + 1)
+    distances = [str(row['latest_distance']) for row in rows] * (10000 // len(rows) + 1)
+    _record(results, 'units.time_to_seconds', measure(
+        lambda: [time_to_seconds(value) for value in times], args.repeat, len(times)))
+    _record(results, 'units.distance_to_meters', measure(
+        lambda: [distance_to_meters(value) for value in distances], args.repeat, len(distances)))
+
+
+def bench_scoring(args, results):
+    from app import convert_to_web_format
+
+    rows = sample_rows(args.samples_dir)
+    for size in args.sizes:
+        horses = sample_horses(rows, size)
+        repeat = args.repeat if size < 100000 else 1
+        scored = process_horses_data_turkish_style(horses)
+        grouped = group_by_race_and_sort(scored)
+        _record(results, f'scoring.process[{size}]', measure(
+            lambda: process_horses_data_turkish_style(horses), repeat, size))
+        _record(results, f'scoring.group_by_race_and_sort[{size}]', measure(
+            lambda: group_by_race_and_sort(scored), repeat, size))
+        _record(results, f'scoring.convert_to_web_format[{size}]', measure(
+            lambda: convert_to_web_format(grouped, scored), repeat, size))
+        _record(results, f'scoring.web_json[{size}]', measure(
+            lambda: json.dumps(convert_to_web_format(grouped, scored)), repeat, size))
+        prepared = vector_scorer.prepare(horses)
+        _record(results, f'scoring.vector_score[{size}]', measure(
+            lambda: vector_scorer.score(prepared), repeat, size))
+
+
+def bench_api(args, results):
+    import app as web_app
+    from data_store import get_default_data_store
+    from race_score_cache import get_race_score_cache
+
+    track = 'santa-anita'
+    today = web_app.get_american_date_string()
+    store = get_default_data_store()
+    sample = sorted(glob.glob(os.path.join(REPO_DIR, f'{track}_*_essential.csv')))[0]
+    path = f"{store.base_name(track, today)}_essential.csv"
+    shutil.copyfile(sample, path)
+    store.record(track, today, 'essential', path)
+    horse = pd.read_csv(sample)['horse_name'][0]
+
+    client = web_app.app.test_client()
+
+    def call(method, url, payload=None):
+        def run():
+            response = client.open(url, method=method, json=payload)
+            assert response.status_code == 200, f"{url}: {response.status_code}"
+            return response
+        return run
+
+    def calculate_cold():
+        get_race_score_cache().invalidate(track, today)
+        call('POST', '/api/calculate_from_saved', {'city': track})()
+
+    cases = [
+        ('GET /api/tracks', call('GET', '/api/tracks')),
+        ('POST /api/check_saved_data', call('POST', '/api/check_saved_data', {'city': track})),
+        ('POST /api/calculate_from_saved[cold]', calculate_cold),
+        ('POST /api/calculate_from_saved[warm]', call('POST', '/api/calculate_from_saved', {'city': track})),
+        ('GET /api/cache_stats', call('GET', '/api/cache_stats')),
+        ('GET /api/horse_history', call('GET', f'/api/horse_history/{horse}')),
+        ('GET /api/query', call('GET', '/api/query')),
+        ('GET /api/scoring_config', call('GET', '/api/scoring_config')),
+        ('GET /api/prefetch_status', call('GET', '/api/prefetch_status')),
+    ]
+    for name, func in cases:
+        # load_horses_from_csv her çağrıda örnek satırı stdout'a basar
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = measure(func, args.repeat)
+        _record(results, f'api.{name}', stats)
+
+
+# --- Karşılaştırma ---
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(previous_path, results):
+    """Önceki çalıştırmaya göre medyan değişimi (%); pozitif = yavaşladı"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous_path} ({previous['meta'].get('git_revision')}, {previous['meta']['timestamp']})")
+    changes = {}
+    for name, stats in results.items():
+        old = previous['results'].get(name)
+        if not old or not old['median_ms']:
+            continue
+        change = round(100.0 * (stats['median_ms'] - old['median_ms']) / old['median_ms'], 1)
+        changes[name] = change
+        print(f"{name:<48} {old['median_ms']:>11.3f} -> {stats['median_ms']:>11.3f} ms  {change:+.1f}%")
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parsing, scoring and API hot paths')
+    parser.add_argument('--groups', default=','.join(GROUPS), help=f"Virgülle ayrılmış: {','.join(GROUPS)}")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Skorlama için at sayıları')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--pages-dir', help='Kaydedilmiş entries/profil HTML sayfaları (varsayılan: stand-in)')
+    parser.add_argument('--tracks', type=int, default=5, help='Stand-in entries sayfası sayısı')
+    parser.add_argument('--profiles', type=int, default=100, help='Stand-in profil sayfası sayısı')
+    parser.add_argument('--samples-dir', help='Essential CSV dizini, örn. synthetic_cards.py çıktısı (varsayılan: repo kökü)')
+    parser.add_argument('--output', help=f'Sonuç JSON dosyası (varsayılan: {DEFAULT_RESULTS_DIR}/bench_<zaman>.json)')
+    parser.add_argument('--compare', help='Karşılaştırılacak önceki sonuç dosyası')
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(',') if size]
+    groups = [group for group in args.groups.split(',') if group]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"Bilinmeyen grup: {', '.join(sorted(unknown))}")
+
+    # Parse / skorlama her satırı INFO logluyor; ölçümü boğmasın
+    logging.disable(logging.ERROR)
+    print("⏱️ BENCHMARK SUITE")
+    print("=" * 50)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        # API grubu geçici dizinler ve stand-in sunucusu ile çalışır (app import edilmeden önce)
+        server = StandInServer(StandInConfig(races=8, horses=8)).start()
+        os.environ['HRN_ENTRIES_BASE_URL'] = f"{server.base_url}/"
+        os.environ['HRN_PROFILE_BASE_URL'] = server.base_url
+        for name, value in (('HRN_HTTP_CACHE_DIR', 'http_cache'), ('HRN_DATA_DIR', 'data'),
+                            ('HRN_ARCHIVE_DIR', 'archive'), ('HRN_SCORING_CONFIG', 'scoring_config.json')):
+            os.environ[name] = os.path.join(work_dir, value)
+        os.environ['HRN_RESULTS_DB'] = os.path.join(work_dir, 'results.sqlite3')
+        os.environ['HRN_STORAGE_DB'] = os.path.join(work_dir, 'hrn.sqlite3')
+        try:
+            for group in groups:
+                globals()[f'bench_{group}'](args, results)
+        finally:
+            server.stop()
+
+    report = {
+        'meta': {'timestamp': datetime.now().isoformat(timespec='seconds'), 'git_revision': git_revision(),
+                 'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+                 'groups': groups, 'sizes': args.sizes, 'repeat': args.repeat,
+                 'pages': args.pages_dir or f"stand-in ({args.tracks} entries, {args.profiles} profiles)",
+                 'samples': args.samples_dir or 'repo'},
+        'results': results
+    }
+    if args.compare:
+        report['changes'] = compare(args.compare, results)
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,11 @@
 # HRN Scraper Package
 
+import os
+import sys
+
+# Modüller birbirini düz isimle import eder (örn. `from http_cache import ...`)
+_package_dir = os.path.dirname(os.path.abspath(__file__))
+if _package_dir not in sys.path:
+    sys.path.append(_package_dir)
+
 from .hrn_scraper import HorseRacingNationScraper, get_american_date_string, get_american_time
\ No newline at end of file
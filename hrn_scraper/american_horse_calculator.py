@@ -11,6 +11,7 @@ import csv
 # Mevcut scraper'ları import et
 from single_track_scraper import scrape_single_track
 from horse_profile_scraper import HorseProfileScraper
+from track_registry import get_track_registry
 
 app = Flask(__name__)
 
@@ -205,6 +206,10 @@ def process_american_race_data(track_slug, race_date):
     try:
         logger.info(f"İşleniyor: {track_slug} - {race_date}")
         
+        # Günlük listede olmayan pist için istek atma
+        if track_registry.is_active(track_slug, race_date) is False:
+            return None, "Bu tarihte yarış yok"
+        
         # İlk önce yarış verilerini çek (entries CSV)
         success = scrape_single_track(track_slug, race_date)
         
@@ -345,23 +350,9 @@ def process_american_race_data(track_slug, race_date):
         return None, str(e)
 
 # Amerika hipodromları
-AMERICAN_TRACKS = {
-    'aqueduct': 'Aqueduct',
-    'belmont-park': 'Belmont Park',
-    'churchill-downs': 'Churchill Downs',
-    'del-mar': 'Del Mar',
-    'gulfstream-park': 'Gulfstream Park',
-    'keeneland': 'Keeneland',
-    'laurel-park': 'Laurel Park',
-    'oaklawn-park': 'Oaklawn Park',
-    'pimlico': 'Pimlico',
-    'santa-anita': 'Santa Anita',
-    'saratoga': 'Saratoga',
-    'woodbine': 'Woodbine',
-    'remington-park': 'Remington Park',
-    'fair-grounds': 'Fair Grounds',
-    'tampa-bay-downs': 'Tampa Bay Downs'
-}
+# {slug: isim} - pist listesi track_registry'den gelir (aynı slug'a giden kodlar tek kayıt)
+track_registry = get_track_registry()
+AMERICAN_TRACKS = {track['slug']: track['name'] for track in track_registry.unique_tracks()}
 
 @app.route('/')
 def index():
@@ -20,6 +20,9 @@ import logging
 import pytz
 from datetime import datetime
 
+# Skorlama sabitleri scoring_config.py'de (HRN_SCORING_CONFIG dosyası, yoksa yerleşik değerler)
+from scoring_config import DEFAULT_SCORING_PARAMS, get_scoring_params, load_scoring_params
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -120,46 +123,37 @@ def distance_to_meters(distance_str):
     
     return 0
 
-def calculate_surface_adaptation(previous_surface, current_surface):
+def calculate_surface_adaptation(previous_surface, current_surface, params=None):
     """Calculate surface adaptation factor"""
-    # Surface adaptation factors
-    surface_factors = {
-        ('Dirt', 'Dirt'): 1.0,
-        ('Dirt', 'Turf'): 1.02,     # Dirt'ten Turf'e geçiş
-        ('Dirt', 'Synthetic'): 1.01,
-        ('Turf', 'Dirt'): 0.98,     # Turf'ten Dirt'e geçiş
-        ('Turf', 'Turf'): 1.0,
-        ('Turf', 'Synthetic'): 1.01,
-        ('Synthetic', 'Dirt'): 0.99,
-        ('Synthetic', 'Turf'): 1.03,
-        ('Synthetic', 'Synthetic'): 1.0
-    }
+    # Surface adaptation factors (Dirt'ten Turf'e 1.02, Turf'ten Dirt'e 0.98, ...)
+    surface_factors = (params or get_scoring_params())['surface_factors']
     
-    return surface_factors.get((previous_surface, current_surface), 1.0)
+    return surface_factors.get(previous_surface, {}).get(current_surface, 1.0)
 
-def calculate_distance_adaptation(profile_distance, target_distance):
+def calculate_distance_adaptation(profile_distance, target_distance, params=None):
     """Calculate distance adaptation factor - like Turkish system"""
+    params = params or get_scoring_params()
     try:
         distance_diff = target_distance - profile_distance
         
-        if abs(distance_diff) < 100:  # Less than 100m difference
+        if abs(distance_diff) < params['distance_threshold']:  # Less than 100m difference
             return 1.0
         
         # Turkish style distance adaptation
         if distance_diff > 0:  # Longer distance
             # For every 100m longer: +0.04 seconds per 100m
-            factor = 1 + (distance_diff / 100) * 0.04 / 6.0  # Normalize to ~6 second base
+            factor = 1 + (distance_diff / 100) * params['distance_longer_slope'] / params['distance_base']
         else:  # Shorter distance
             # For every 100m shorter: -0.03 seconds per 100m
-            factor = 1 + (abs(distance_diff) / 100) * (-0.03) / 6.0
+            factor = 1 + (abs(distance_diff) / 100) * (-params['distance_shorter_slope']) / params['distance_base']
         
         # Limit factor between 0.8 and 1.2
-        return max(0.8, min(1.2, factor))
+        return max(params['distance_factor_min'], min(params['distance_factor_max'], factor))
         
     except:
         return 1.0
 
-def calculate_position_penalty(finish_position, winner_time_per_100m, distance_meters):
+def calculate_position_penalty(finish_position, winner_time_per_100m, distance_meters, params=None):
     """
     Calculate penalty based on finish position - Turkish style
     
@@ -196,7 +190,8 @@ def calculate_position_penalty(finish_position, winner_time_per_100m, distance_m
         # 1st vs 2nd: 0.30 seconds per full race (3x penalty)
         # 1st vs 3rd: 0.60 seconds per full race, etc.
         
-        position_penalty_per_race = (pos - 1) * 0.30  # 0.30s per position (3x optimized)
+        penalty = (params or get_scoring_params())['position_penalty']
+        position_penalty_per_race = (pos - 1) * penalty  # 0.30s per position (3x optimized)
         
         # Convert to per 100m penalty
         # If race is 1200m, penalty should be distributed over 12 x 100m segments
@@ -215,7 +210,7 @@ def calculate_position_penalty(finish_position, winner_time_per_100m, distance_m
         logger.error(f"Position penalty calculation error: {e}")
         return winner_time_per_100m
 
-def calculate_american_horse_performance_turkish_style(horse_data, race_data, winner_data=None):
+def calculate_american_horse_performance_turkish_style(horse_data, race_data, winner_data=None, params=None):
     """
     Calculate American horse performance using Turkish methodology
     
@@ -223,7 +218,9 @@ def calculate_american_horse_performance_turkish_style(horse_data, race_data, wi
         horse_data: Individual horse's profile data
         race_data: Today's race information  
         winner_data: Winner's performance data (optional, for reference)
+        params: Scoring constants (default: active scoring config)
     """
+    params = params or get_scoring_params()
     try:
         # Get basic data
         profile_time = horse_data.get('profile_time', '') or horse_data.get('time', '')
@@ -253,11 +250,11 @@ def calculate_american_horse_performance_turkish_style(horse_data, race_data, wi
         base_time_per_100m = time_seconds / (distance_meters / 100)
         
         # Step 2: Apply surface adaptation
-        surface_factor = calculate_surface_adaptation(profile_surface, target_surface)
+        surface_factor = calculate_surface_adaptation(profile_surface, target_surface, params)
         surface_adjusted = base_time_per_100m * surface_factor
         
         # Step 3: Apply distance adaptation (Turkish style)
-        distance_factor = calculate_distance_adaptation(distance_meters, target_distance)
+        distance_factor = calculate_distance_adaptation(distance_meters, target_distance, params)
         distance_adjusted = surface_adjusted * distance_factor
         
         # Step 4: Apply position penalty (Turkish style)
@@ -272,7 +269,7 @@ def calculate_american_horse_performance_turkish_style(horse_data, race_data, wi
                     # Use the winner's theoretical time as reference
                     winner_reference_time = distance_adjusted  # Assume this would be winner time
                     final_time_per_100m = calculate_position_penalty(
-                        pos, winner_reference_time, target_distance
+                        pos, winner_reference_time, target_distance, params
                     )
             except:
                 pass
@@ -298,8 +295,9 @@ def calculate_american_horse_performance_turkish_style(horse_data, race_data, wi
         logger.error(f"Turkish style performance calculation error: {e}")
         return None
 
-def process_horses_data_turkish_style(horses_list):
+def process_horses_data_turkish_style(horses_list, params=None):
     """Process list of horses using Turkish calculation methodology"""
+    params = params or get_scoring_params()
     results = []
     
     for horse in horses_list:
@@ -316,7 +314,7 @@ def process_horses_data_turkish_style(horses_list):
         }
         
         # Calculate performance score using Turkish methodology
-        performance = calculate_american_horse_performance_turkish_style(horse, race_data)
+        performance = calculate_american_horse_performance_turkish_style(horse, race_data, params=params)
         
         # Prepare result
         result = {
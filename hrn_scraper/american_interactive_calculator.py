@@ -36,6 +36,7 @@ except ImportError as e:
 try:
     from multi_track_scraper import scrape_track_data, scrape_horse_profiles_for_track
     from single_track_scraper import scrape_single_track
+    from track_registry import get_track_registry
 except ImportError as e:
     print(f"Error importing scraper modules: {e}")
     print("Make sure multi_track_scraper.py and single_track_scraper.py are in the same directory")
@@ -326,19 +327,10 @@ def print_race_summary(grouped_results):
                 print(f"  ... and {len(invalid_horses) - 3} more")
 
 # Available tracks and their codes
+# Menü track_registry'den üretilir; code = HRN slug'ı (dosya adları da buna göre)
 AVAILABLE_TRACKS = {
-    "1": {"name": "Aqueduct", "code": "aqueduct"},
-    "2": {"name": "Belmont Park", "code": "belmont-park"},
-    "3": {"name": "Churchill Downs", "code": "churchill-downs"},
-    "4": {"name": "Del Mar", "code": "del-mar"},
-    "5": {"name": "Gulfstream Park", "code": "gulfstream-park"},
-    "6": {"name": "Keeneland", "code": "keeneland"},
-    "7": {"name": "Laurel Park", "code": "laurel-park"},
-    "8": {"name": "Oaklawn Park", "code": "oaklawn-park"},
-    "9": {"name": "Pimlico", "code": "pimlico"},
-    "10": {"name": "Santa Anita", "code": "santa-anita"},
-    "11": {"name": "Saratoga", "code": "saratoga"},
-    "12": {"name": "Woodbine", "code": "woodbine"}
+    str(i): {"name": track['name'], "code": track['slug']}
+    for i, track in enumerate(get_track_registry().unique_tracks(), 1)
 }
 
 def display_track_menu():
@@ -387,6 +379,11 @@ def scrape_and_calculate_track(track_code, track_name, target_date):
     print("="*60)
     
     try:
+        # Günlük listede olmayan pist için istek atma
+        if get_track_registry().is_active(track_code, target_date) is False:
+            print(f"❌ {track_name} is not racing on {target_date}")
+            return None
+        
         # Step 1: Scrape entries using single track scraper
         print("📋 Step 1: Scraping race entries...")
         success = scrape_single_track(track_code, target_date)
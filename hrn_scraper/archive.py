@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Günlük CSV çıktılarının Parquet arşivi (tarih/pist bölümlü)
+
+Aylarca geriye giden analizler için binlerce küçük CSV yerine tür başına bir Parquet veri seti:
+
+    archive/<tür>/date=YYYY-MM-DD/part-0.parquet      (her pist ayrı row group, track kolonu)
+
+Pist başına ayrı dosya yazılmaz; tek günlük bir pistin birkaç yüz satırı için Parquet
+footer'ı veriden büyük olur ve küçük dosya sorunu geri gelir.
+
+- Türler: entries, essential, results, scores (american_* ve turkish_style çıktıları)
+- Kolonlar tiplidir (race_number int16, performance_score float64, ...); essential ve
+  results için süre/mesafe sayısal kolonları (latest_time_seconds, latest_distance_meters) eklenir;
+  horse_key (normalize_horse_name) veri setleri arası join için yazılır
+- Aynı gün tekrar sıkıştırılırsa gün dosyası atomik olarak yenilenir (diğer pistler korunur)
+- read() kolon seçimi ve filtreleri pyarrow.dataset'e iletir: date filtresi bölüm dizinlerini,
+  track ve diğer kolonlar Parquet row group istatistiklerini kullanarak okunmadan eler
+- pyarrow gerekir (pip install pyarrow); yoksa ARCHIVE_AVAILABLE False olur
+
+Kullanım:
+    python archive.py compact data --archive archive --until 2025-09-27 --remove-sources
+    python archive.py read essential --columns horse_name,latest_time_seconds --where track=belmont-park
+"""
+
+import argparse
+import logging
+import os
+from collections import defaultdict
+
+import pandas as pd
+
+from american_horse_calculator_turkish_style import distance_to_meters, time_to_seconds
+from data_store import _LEGACY_PATTERN, file_kind
+from results_store import normalize_horse_name
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    ARCHIVE_AVAILABLE = True
+except ImportError:
+    pa = pc = ds = pq = None
+    ARCHIVE_AVAILABLE = False
+
+DEFAULT_ARCHIVE_DIR = 'archive'
+
+# Dosya türü -> arşiv veri seti (american ve turkish_style aynı skor şemasını paylaşır)
+DATASETS = {'entries': 'entries', 'essential': 'essential', 'results': 'results',
+            'american': 'scores', 'turkish_style': 'scores'}
+
+# Kolon tipleri; listede olmayan kolonlar string olarak saklanır ('calc_*' ve '*_payout' float64)
+_INT_COLUMNS = {'race_number', 'post_position', 'speed_figure', 'latest_finish_position', 'finish_position'}
+_FLOAT_COLUMNS = {'performance_score', 'latest_time_seconds', 'latest_distance_meters',
+                  'time_seconds', 'distance_meters'}
+
+# Dosyadaki bu kolonlar yerine bölüm (date) ve dosya adındaki pist (track) kullanılır
+_PARTITION_COLUMNS = ('date', 'track')
+
+
+def _require_pyarrow():
+    if not ARCHIVE_AVAILABLE:
+        raise RuntimeError('Parquet archive requires: pip install pyarrow')
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+
+
+def _positive_or_none(value):
+    return value if value else None
+
+
+def _add_numeric_columns(df, dataset):
+    """Süre ve mesafe string'lerinden sayısal kolonlar (hesaplayıcının dönüşümleriyle)"""
+    if dataset == 'essential':
+        df['latest_time_seconds'] = df['latest_time'].map(lambda v: _positive_or_none(time_to_seconds(v)))
+        df['latest_distance_meters'] = df['latest_distance'].map(lambda v: _positive_or_none(distance_to_meters(v)))
+    elif dataset == 'results':
+        df['time_seconds'] = df['time'].map(lambda v: _positive_or_none(time_to_seconds(v)))
+        df['distance_meters'] = df['distance'].map(lambda v: _positive_or_none(distance_to_meters(v)))
+    return df
+
+
+def _column_type(name):
+    if name in _INT_COLUMNS:
+        return pa.int16()
+    if name in _FLOAT_COLUMNS or name.startswith('calc_') or name.endswith('_payout'):
+        return pa.float64()
+    return pa.string()
+
+
+def _to_table(df):
+    """String DataFrame -> tipli Arrow tablosu (sayıya çevrilemeyen değerler null)"""
+    arrays, fields = [], []
+    for name in df.columns:
+        arrow_type = _column_type(name)
+        if pa.types.is_string(arrow_type):
+            array = pa.array(df[name].fillna('').astype(str), type=pa.string())
+        else:
+            values = pd.to_numeric(df[name], errors='coerce')
+            if pa.types.is_integer(arrow_type):
+                values = values.where(values == values.round())
+            array = pa.array(values.astype('float64'), from_pandas=True).cast(arrow_type)
+        arrays.append(array)
+        fields.append(pa.field(name, arrow_type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def discover(source_dir):
+    """
+    source_dir altındaki (alt dizinler dahil) günlük CSV'ler
+    Dönüş: {(veri seti, tarih, pist): [dosya yolları]} - american dosyaları zaman damgasına göre sıralı
+    """
+    found = defaultdict(list)
+    for dirpath, _, filenames in os.walk(source_dir):
+        for name in filenames:
+            match = _LEGACY_PATTERN.match(name)
+            kind = file_kind(name)
+            if not match or kind not in DATASETS:
+                continue
+            track_code = match.group('track') or match.group('a_track')
+            date_str = (match.group('date') or match.group('a_date')).replace('_', '-')
+            found[(DATASETS[kind], date_str, track_code)].append(os.path.join(dirpath, name))
+    return {key: sorted(paths, key=os.path.basename) for key, paths in found.items()}
+
+
+def _load_track(dataset, track_code, paths):
+    """Bir gün/pistin tipli tablosu; skorlar için en son hesaplanan dosya kullanılır"""
+    if dataset == 'scores':
+        paths = paths[-1:]
+    frames = [pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths]
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    df = df.drop(columns=[name for name in _PARTITION_COLUMNS if name in df.columns])
+    df.insert(0, 'track', track_code)
+    if 'horse_name' in df.columns:
+        df['horse_key'] = df['horse_name'].map(normalize_horse_name)
+    return _to_table(_add_numeric_columns(df, dataset))
+
+
+def _write_day(target, tables):
+    """Pist başına bir row group - track filtresi row group istatistikleriyle elenir"""
+    table = pa.concat_tables(tables, promote_options='permissive')
+    tracks = table.column('track')
+    with pq.ParquetWriter(f"{target}.tmp", table.schema, compression='zstd') as writer:
+        for track_code in sorted(set(tracks.to_pylist())):
+            writer.write_table(table.filter(pc.equal(tracks, track_code)))
+    os.replace(f"{target}.tmp", target)
+    return table.num_rows
+
+
+def compact(source_dir, archive_dir=DEFAULT_ARCHIVE_DIR, until=None, remove_sources=False, since=None):
+    """
+    source_dir'deki günlük CSV'leri Parquet bölümlerine yazar
+    Gün dosyası zaten varsa yeniden yazılan pistler değiştirilir, diğer pistler korunur
+    until: yalnızca bu tarih (YYYY-MM-DD, dahil) ve öncesi - henüz güncellenen günler atlanır
+    since: yalnızca bu tarih (dahil) ve sonrası - son günleri yenilemek için
+    remove_sources: arşivlenen CSV'ler (ve aynı adlı JSON'lar) silinir
+    Dönüş: {'partitions' (gün dosyası), 'tracks', 'files', 'rows', 'removed'}
+    """
+    _require_pyarrow()
+    days = defaultdict(dict)
+    for (dataset, date_str, track_code), paths in discover(source_dir).items():
+        if (not until or date_str <= until) and (not since or date_str >= since):
+            days[(dataset, date_str)][track_code] = paths
+
+    summary = {'partitions': 0, 'tracks': 0, 'files': 0, 'rows': 0, 'removed': 0}
+    for (dataset, date_str), tracks in sorted(days.items()):
+        partition_dir = os.path.join(archive_dir, dataset, f"date={date_str}")
+        target = os.path.join(partition_dir, 'part-0.parquet')
+        try:
+            tables = [_load_track(dataset, track_code, paths) for track_code, paths in sorted(tracks.items())]
+            if os.path.exists(target):
+                existing = pq.read_table(target)
+                tables.insert(0, existing.filter(pc.invert(pc.is_in(existing.column('track'),
+                                                                    pa.array(sorted(tracks), pa.string())))))
+            os.makedirs(partition_dir, exist_ok=True)
+            rows = _write_day(target, tables)
+        except Exception as e:
+            logger.error(f"Arşivlenemedi ({dataset} {date_str}): {e}")
+            continue
+
+        summary['partitions'] += 1
+        summary['tracks'] += len(tracks)
+        summary['rows'] += rows
+        for paths in tracks.values():
+            summary['files'] += len(paths)
+            if not remove_sources:
+                continue
+            for path in paths:
+                for candidate in (path, f"{os.path.splitext(path)[0]}.json"):
+                    if os.path.exists(candidate):
+                        os.remove(candidate)
+                        summary['removed'] += 1
+    logger.info(f"Archive compaction: {summary['tracks']} track-days in {summary['partitions']} partitions, "
+                f"{summary['rows']} rows from {summary['files']} files into {archive_dir}")
+    return summary
+
+
+def _filter_expression(filters):
+    """[(kolon, op, değer), ...] (AND) -> pyarrow expression"""
+    operators = {
+        '==': lambda field, value: field == value,
+        '!=': lambda field, value: field != value,
+        '<': lambda field, value: field < value,
+        '<=': lambda field, value: field <= value,
+        '>': lambda field, value: field > value,
+        '>=': lambda field, value: field >= value,
+        'in': lambda field, value: field.isin(list(value)),
+    }
+    expression = None
+    for column, op, value in filters or []:
+        if op not in operators:
+            raise ValueError(f"Desteklenmeyen filtre operatörü: {op}")
+        condition = operators[op](pc.field(column), value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def open_dataset(dataset, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """Arşivdeki veri seti (pyarrow.dataset.Dataset); date bölüm kolonudur"""
+    _require_pyarrow()
+    return ds.dataset(os.path.join(archive_dir, dataset), format='parquet', partitioning=_partitioning())
+
+
+def read_table(dataset, columns=None, filters=None, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """Kolon seçimi ve filtreler tarama sırasında uygulanır; Arrow tablosu döndürür"""
+    return open_dataset(dataset, archive_dir).to_table(columns=columns, filter=_filter_expression(filters))
+
+
+def read(dataset, columns=None, filters=None, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """
+    read_table'ın pandas karşılığı
+    Örnek: read('essential', ['horse_name', 'latest_time_seconds'],
+                [('track', '==', 'belmont-park'), ('date', '>=', '2025-08-01')])
+    """
+    return read_table(dataset, columns, filters, archive_dir).to_pandas()
+
+
+def disk_usage(path):
+    """Dizin (veya dosya) altındaki toplam byte"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(dirpath, name))
+               for dirpath, _, filenames in os.walk(path) for name in filenames)
+
+
+def _parse_where(values):
+    """'kolon=değer' / 'kolon>=değer' -> filtre listesi"""
+    filters = []
+    for value in values or []:
+        for op in ('>=', '<=', '!=', '==', '=', '>', '<'):
+            if op in value:
+                column, operand = (part.strip() for part in value.split(op, 1))
+                if column not in _PARTITION_COLUMNS and not pa.types.is_string(_column_type(column)):
+                    operand = float(operand)
+                filters.append((column, '==' if op == '=' else op, operand))
+                break
+        else:
+            raise ValueError(f"Filtre anlaşılamadı: {value}")
+    return filters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact daily CSV outputs into a Parquet archive')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_DIR, help='Arşiv dizini')
+    sub = parser.add_subparsers(dest='command', required=True)
+    compact_cmd = sub.add_parser('compact', help='Günlük CSV\'leri arşive yaz')
+    compact_cmd.add_argument('source', help='Kaynak dizin (örn. data veya .)')
+    compact_cmd.add_argument('--until', help='Bu tarih (dahil) ve öncesi, YYYY-MM-DD')
+    compact_cmd.add_argument('--since', help='Bu tarih (dahil) ve sonrası, YYYY-MM-DD')
+    compact_cmd.add_argument('--remove-sources', action='store_true', help='Arşivlenen CSV/JSON\'ları sil')
+    read_cmd = sub.add_parser('read', help='Arşivden oku')
+    read_cmd.add_argument('dataset', choices=sorted(set(DATASETS.values())))
+    read_cmd.add_argument('--columns', help='Virgülle ayrılmış kolonlar')
+    read_cmd.add_argument('--where', action='append', help='kolon=değer, kolon>=değer, ... (tekrarlanabilir)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == 'compact':
+        summary = compact(args.source, args.archive, args.until, args.remove_sources, args.since)
+        print(f"{summary['partitions']} partitions, {summary['rows']} rows, {summary['removed']} files removed")
+        return
+    columns = args.columns.split(',') if args.columns else None
+    frame = read(args.dataset, columns, _parse_where(args.where), args.archive)
+    print(frame.to_string(index=False, max_rows=50))
+    print(f"{len(frame)} rows")
+
+
+if __name__ == '__main__':
+    main()
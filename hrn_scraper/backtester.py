@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Geçmiş kartları resmi sonuçlara karşı skorlayan backtest
+
+Her gün için arşivdeki (archive.py) o günün essential satırları (= o gün bilinen son yarış
+verisi) process_horses_data_turkish_style ile skorlanır, sıralama resmi bitiş sırası ve
+ödemelerle karşılaştırılır. Aynı yarışlar morning line sıralamasıyla da değerlendirilir
+(referans model).
+
+Rapor (model başına):
+- hit_rate: 1. sıradaki atın kazanma oranı, top3_rate: ilk 3'e girme oranı
+- roi: win / place / show / exacta / trifecta için $2'lık sabit bahis getirisi (%)
+  (egzotik bahisler yalnızca ödemesi bilinen yarışlarda sayılır)
+- calibration: tahmini kazanma olasılığı dilimleri (tahmin ortalaması - gerçekleşen oran), brier
+
+- Yalnızca sonuç tablosu olan yarışlar sayılır; HRN ilk 3'ü listelediği için diğer atların
+  bitiş sırası bilinmez ("ilk 3 dışı" kabul edilir)
+- Günler ProcessPoolExecutor ile süreçlere dağıtılır (workers=1: aynı süreçte)
+
+Kullanım:
+    python backtester.py --since 2025-04-01 --until 2025-09-28 --workers 8
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from american_horse_calculator_turkish_style import process_horses_data_turkish_style
+from archive import DEFAULT_ARCHIVE_DIR, read
+from scoring_config import load_scoring_params
+from utils import parse_odds
+
+logger = logging.getLogger(__name__)
+
+BET_TYPES = ('win', 'place', 'show', 'exacta', 'trifecta')
+BASE_STAKE = 2.0
+CALIBRATION_BUCKETS = 10
+# Skor (saniye / 100 m) farkını olasılığa çeviren softmax sıcaklığı
+DEFAULT_TEMPERATURE = 0.1
+
+MODELS = ('turkish_style', 'morning_line')
+
+
+def available_days(archive_dir, since=None, until=None):
+    """Arşivde sonuç verisi olan günler"""
+    results_dir = os.path.join(archive_dir, 'results')
+    if not os.path.isdir(results_dir):
+        return []
+    days = sorted(name.split('=', 1)[1] for name in os.listdir(results_dir) if name.startswith('date='))
+    return [day for day in days if (not since or day >= since) and (not until or day <= until)]
+
+
+def _empty_model():
+    return {
+        'races': 0, 'wins': 0, 'top3': 0, 'brier': 0.0, 'brier_n': 0,
+        'bets': {bet: {'bets': 0, 'stake': 0.0, 'return': 0.0} for bet in BET_TYPES},
+        'calibration': [[0.0, 0, 0] for _ in range(CALIBRATION_BUCKETS)]  # [olasılık toplamı, kazanan, at]
+    }
+
+
+def _softmax(values, temperature):
+    """Düşük değer daha iyi; [(anahtar, değer)] -> {anahtar: olasılık}"""
+    if not values:
+        return {}
+    best = min(value for _, value in values)
+    weights = {key: math.exp(-(value - best) / temperature) for key, value in values}
+    total = sum(weights.values())
+    return {key: weight / total for key, weight in weights.items()}
+
+
+def _odds_probabilities(odds):
+    """Morning line -> normalize edilmiş ima edilen olasılıklar"""
+    implied = {key: 1.0 / (value + 1.0) for key, value in odds}
+    total = sum(implied.values())
+    return {key: value / total for key, value in implied.items()} if total else {}
+
+
+def _score_races(races, temperature, params=None):
+    """Turkish style skorları: {(pist, yarış): (sıralı at anahtarları, olasılıklar)}"""
+    rankings = {}
+    for key, race in races.items():
+        distance, surface = race['info']
+        horses = race['horses']
+        scored = process_horses_data_turkish_style([dict(horse, entry_distance=distance, entry_surface=surface)
+                                                    for horse in horses], params)
+        # Sonuçlar girişle aynı sırada döner
+        valid = [(horse['horse_key'], float(result['performance_score'])) for horse, result in zip(horses, scored)
+                 if result['performance_score'] != 'Invalid']
+        valid.sort(key=lambda item: item[1])
+        rankings[key] = ([horse_key for horse_key, _ in valid], _softmax(valid, temperature))
+    return rankings
+
+
+def _settle(model, ranking, probabilities, finishers, payouts):
+    """Bir yarışın tahminini sonuçla karşılaştırıp model sayaçlarına ekler"""
+    if not ranking:
+        return
+    model['races'] += 1
+    pick = ranking[0]
+    position = finishers.get(pick)
+    model['wins'] += position == 1
+    model['top3'] += position is not None and position <= 3
+
+    # Sabit bahisler: 1. sıradaki at (win/place/show), ilk 2 / ilk 3 sırası (exacta/trifecta)
+    order = sorted(finishers, key=finishers.get)
+    outcomes = {
+        'win': (position == 1, payouts.get('win')),
+        'place': (position is not None and position <= 2, payouts.get(('place', pick))),
+        'show': (position is not None and position <= 3, payouts.get(('show', pick))),
+        'exacta': (ranking[:2] == order[:2] and len(order) >= 2, payouts.get('exacta')),
+        'trifecta': (ranking[:3] == order[:3] and len(order) >= 3, payouts.get('trifecta')),
+    }
+    for bet, (hit, payout) in outcomes.items():
+        # Egzotik ödemesi olmayan yarışta bahis sayılmaz (kaybetti mi kazandı mı bilinmez)
+        if bet in ('exacta', 'trifecta') and payouts.get(bet) is None:
+            continue
+        if bet == 'exacta' and len(ranking) < 2 or bet == 'trifecta' and len(ranking) < 3:
+            continue
+        counters = model['bets'][bet]
+        counters['bets'] += 1
+        counters['stake'] += BASE_STAKE
+        if hit and payout:
+            counters['return'] += payout
+
+    for key, probability in probabilities.items():
+        won = finishers.get(key) == 1
+        bucket = model['calibration'][min(int(probability * CALIBRATION_BUCKETS), CALIBRATION_BUCKETS - 1)]
+        bucket[0] += probability
+        bucket[1] += won
+        bucket[2] += 1
+        model['brier'] += (probability - won) ** 2
+        model['brier_n'] += 1
+
+
+def _none_if_nan(value):
+    return None if value is None or value != value else value
+
+
+def load_day(archive_dir, date_str, track=None):
+    """
+    Günün sonucu olan yarışları arşivden okur
+    Dönüş: {(pist, yarış): {'finishers': {at: sıra}, 'payouts', 'info': (mesafe, zemin),
+                            'horses': [skorlama girdisi], 'odds': [(at, morning line)]}}
+    """
+    filters = [('date', '==', date_str)] + ([('track', '==', track)] if track else [])
+    results = read('results', filters=filters, archive_dir=archive_dir).to_dict('records')
+    if not results:
+        return {}
+    essential = read('essential', filters=filters, archive_dir=archive_dir).to_dict('records')
+    try:
+        entries = read('entries', ['track', 'race_number', 'horse_key', 'morning_line'], filters,
+                       archive_dir).to_dict('records')
+    except Exception:
+        entries = []
+
+    # (pist, yarış) bazında sonuç, ödeme ve yarış bilgisi
+    races = {}
+    for row in results:
+        race = races.setdefault((row['track'], row['race_number']),
+                                {'finishers': {}, 'payouts': {}, 'info': (row['distance'], row['surface']),
+                                 'horses': [], 'odds': []})
+        position = _none_if_nan(row['finish_position'])
+        if position is None:
+            continue
+        race['finishers'][row['horse_key']] = int(position)
+        payouts = race['payouts']
+        if position == 1 and _none_if_nan(row.get('win_payout')):
+            payouts['win'] = row['win_payout']
+        for bet in ('place', 'show'):
+            if _none_if_nan(row.get(f'{bet}_payout')):
+                payouts[(bet, row['horse_key'])] = row[f'{bet}_payout']
+        for bet in ('exacta', 'trifecta'):
+            if _none_if_nan(row.get(f'{bet}_payout')):
+                payouts[bet] = row[f'{bet}_payout']
+
+    for row in essential:
+        race = races.get((row['track'], row['race_number']))
+        if race is None:
+            continue
+        race['horses'].append({
+            'horse_key': row['horse_key'], 'horse_name': row['horse_name'], 'track': row['track'],
+            'date': date_str, 'race_number': row['race_number'], 'program_number': row['program_number'],
+            'profile_distance': row['latest_distance'], 'profile_time': row['latest_time'],
+            'profile_surface': row['latest_surface'],
+            'latest_finish_position': _none_if_nan(row['latest_finish_position']) or ''
+        })
+    for row in entries:
+        odds = parse_odds(row.get('morning_line') or '')
+        race = races.get((row['track'], row['race_number']))
+        if odds is not None and race is not None:
+            race['odds'].append((row['horse_key'], odds))
+    # Essential satırı olmayan (skorlanamayan) yarışlar sayılmaz
+    return {key: race for key, race in races.items() if race['horses']}
+
+
+def backtest_day(archive_dir, date_str, track=None, temperature=DEFAULT_TEMPERATURE, params=None):
+    """
+    Tek günün backtest sayaçları (worker'da çalışır)
+    Dönüş: {'date', 'races', 'models': {model: sayaçlar}}
+    """
+    day = {'date': date_str, 'races': 0, 'models': {name: _empty_model() for name in MODELS}}
+    races = load_day(archive_dir, date_str, track)
+    for key, (ranking, probabilities) in _score_races(races, temperature, params).items():
+        race = races[key]
+        day['races'] += 1
+        _settle(day['models']['turkish_style'], ranking, probabilities, race['finishers'], race['payouts'])
+        odds = sorted(race['odds'], key=lambda item: item[1])
+        _settle(day['models']['morning_line'], [horse for horse, _ in odds], _odds_probabilities(odds),
+                race['finishers'], race['payouts'])
+    return day
+
+
+def _merge(total, day):
+    total['days'] += 1
+    total['races'] += day['races']
+    for name, model in day['models'].items():
+        target = total['models'][name]
+        for key in ('races', 'wins', 'top3', 'brier', 'brier_n'):
+            target[key] += model[key]
+        for bet, counters in model['bets'].items():
+            for key, value in counters.items():
+                target['bets'][bet][key] += value
+        for bucket, values in zip(target['calibration'], model['calibration']):
+            for i, value in enumerate(values):
+                bucket[i] += value
+
+
+def summarize(total):
+    """Sayaçlardan oranlar: hit_rate, top3_rate, roi (%), calibration, brier"""
+    report = {'days': total['days'], 'races': total['races'], 'models': {}}
+    for name, model in total['models'].items():
+        races = model['races']
+        report['models'][name] = {
+            'races': races,
+            'hit_rate': round(100.0 * model['wins'] / races, 1) if races else None,
+            'top3_rate': round(100.0 * model['top3'] / races, 1) if races else None,
+            'roi': {bet: {'bets': counters['bets'],
+                          'roi': round(100.0 * (counters['return'] - counters['stake']) / counters['stake'], 1)
+                          if counters['stake'] else None}
+                    for bet, counters in model['bets'].items()},
+            'brier': round(model['brier'] / model['brier_n'], 4) if model['brier_n'] else None,
+            'calibration': [{'bucket': f"{i / CALIBRATION_BUCKETS:.1f}-{(i + 1) / CALIBRATION_BUCKETS:.1f}",
+                             'horses': n, 'predicted': round(prob_sum / n, 3), 'observed': round(wins / n, 3)}
+                            for i, (prob_sum, wins, n) in enumerate(model['calibration']) if n]
+        }
+    return report
+
+
+def _init_worker():
+    # Hesaplayıcı her at için INFO loglar; worker'larda backtest süresini yer
+    logging.getLogger('american_horse_calculator_turkish_style').setLevel(logging.WARNING)
+
+
+def backtest(archive_dir=DEFAULT_ARCHIVE_DIR, since=None, until=None, track=None, workers=None,
+             temperature=DEFAULT_TEMPERATURE, params=None):
+    """Aralıktaki günleri süreçlere dağıtıp raporu döndürür (workers=1: aynı süreçte)"""
+    days = available_days(archive_dir, since, until)
+    total = {'days': 0, 'races': 0, 'models': {name: _empty_model() for name in MODELS}}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(days) <= 1:
+        for date_str in days:
+            _merge(total, backtest_day(archive_dir, date_str, track, temperature, params))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(days)), initializer=_init_worker) as executor:
+            futures = [executor.submit(backtest_day, archive_dir, date_str, track, temperature, params)
+                       for date_str in days]
+            for future in futures:
+                try:
+                    _merge(total, future.result())
+                except Exception as e:
+                    logger.error(f"Backtest günü başarısız: {e}")
+    return summarize(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest Turkish-style rankings against official results')
+    parser.add_argument('--archive', default=os.environ.get('HRN_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR))
+    parser.add_argument('--since', help='YYYY-MM-DD')
+    parser.add_argument('--until', help='YYYY-MM-DD')
+    parser.add_argument('--track', help='Tek pist')
+    parser.add_argument('--workers', type=int, default=None, help='Süreç sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--temperature', type=float, default=DEFAULT_TEMPERATURE)
+    parser.add_argument('--params', help='Skorlama parametre dosyası (param_sweep.py çıktısı)')
+    parser.add_argument('--output', help='Raporu JSON olarak yaz')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    params = load_scoring_params(args.params) if args.params else None
+    report = backtest(args.archive, args.since, args.until, args.track, args.workers, args.temperature, params)
+    print(f"{report['days']} days, {report['races']} races")
+    for name, model in report['models'].items():
+        roi = ' '.join(f"{bet}={values['roi']}%" for bet, values in model['roi'].items() if values['bets'])
+        print(f"{name:<14} hit={model['hit_rate']}% top3={model['top3_rate']}% brier={model['brier']} {roi}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Tarih bölümlü veri dizini ve manifest indeksi
+
+Çıktılar çalışma dizini yerine data/<YYYY-MM-DD>/<pist>/ altına yazılır; dosya adları aynı kalır
+(<pist>_<YYYY_MM_DD>_<pist>_entries.csv vb.). Her günün manifest.json dosyası yazma anında
+güncellenir: pist ve tür (entries, essential, results, turkish_style, american) başına dosya
+yolu, satır sayısı ve başarı oranı. Böylece "bugünkü essential dosyası hangisi" sorusu dizin
+taramadan, "kaç atın verisi var" sorusu CSV açılmadan cevaplanır.
+
+- HRN_DATA_DIR tanımlıysa output_base_name ve app.py bu dizini kullanır
+- Eski (çalışma dizinindeki) dosyalar migrate ile taşınıp indekslenebilir
+- record_output yazılan satırları storage.Storage'a (HRN_STORAGE_DB) da işler
+
+Kullanım:
+    python data_store.py migrate .          # CWD'deki eski çıktıları data/ altına taşı
+    python data_store.py show 2025-09-28    # günün manifest'i
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from storage import get_default_storage
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+# Dosya adından tür: <kök>_entries.csv, <kök>_essential.csv, ... ve american_<pist>_<tarih>_<zaman>.csv
+_KIND_PATTERN = re.compile(r'_(entries|essential|results|turkish_style)\.csv$')
+_LEGACY_PATTERN = re.compile(
+    r'^(?:american_(?P<a_track>.+?)_(?P<a_date>\d{4}_\d{2}_\d{2})_\d{8}_\d{6}'
+    r'|(?P<track>.+?)_(?P<date>\d{4}_\d{2}_\d{2})_.+?_(?:entries|essential|results|turkish_style))\.(csv|json)$')
+
+
+def file_kind(filename):
+    """Dosya adından manifest türü; tanınmıyorsa None"""
+    name = os.path.basename(filename)
+    if name.startswith('american_') and name.endswith('.csv'):
+        return 'american'
+    match = _KIND_PATTERN.search(name)
+    return match.group(1) if match else None
+
+
+@contextmanager
+def _file_lock(path):
+    """Süreçler arası özel kilit (path + '.lock'); CLI, pipeline ve Flask aynı manifest'e yazar"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _file_stamp(path):
+    """Dosya değişti mi karşılaştırması için (mtime, boyut, inode); dosya yoksa None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _count_rows(path, rows=None):
+    """(satır sayısı, başarılı satır sayısı) - başarılı: son yarış süresi, mesafesi (ve bitiş sırası) olan at"""
+    if rows is None:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+    successful = sum(1 for row in rows if row.get('latest_time') and row.get('latest_distance')
+                     and row.get('latest_finish_position', True))
+    return len(rows), successful
+
+
+class DataStore:
+    """
+    data/<tarih>/<pist>/ düzeni ve günlük manifest.json (thread-safe)
+    Aynı kökü paylaşan süreçler de güvenlidir: manifest dosyası değiştiyse yeniden okunur,
+    record() dosya kilidi altında okuyup tek kaydı birleştirerek yazar
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._manifests = {}
+        self._stamps = {}
+
+    # --- Yollar ---
+    def date_dir(self, date_str):
+        return os.path.join(self.root, date_str.replace('_', '-'))
+
+    def track_dir(self, track_code, date_str):
+        path = os.path.join(self.date_dir(date_str), track_code)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def base_name(self, track_code, date_str):
+        """multi_track_scraper ile aynı dosya adı kökü, pistin bölüm dizininde"""
+        return os.path.join(self.track_dir(track_code, date_str),
+                            f"{track_code}_{date_str.replace('-', '_')}_{track_code}")
+
+    def locate(self, filename):
+        """Eski düzendeki dosya adından bölümdeki yolu bulur; tanınmıyorsa None"""
+        match = _LEGACY_PATTERN.match(os.path.basename(filename))
+        if not match:
+            return None
+        track_code = match.group('track') or match.group('a_track')
+        date_str = (match.group('date') or match.group('a_date')).replace('_', '-')
+        return os.path.join(self.date_dir(date_str), track_code, os.path.basename(filename))
+
+    def contains(self, path):
+        return os.path.abspath(path).startswith(self.root + os.sep)
+
+    # --- Manifest ---
+    def _manifest_path(self, date_str):
+        return os.path.join(self.date_dir(date_str), MANIFEST_NAME)
+
+    def _load_locked(self, date_str):
+        """Önbellekteki manifest; dosya başka bir süreç tarafından değiştirildiyse yeniden okunur"""
+        date_str = date_str.replace('_', '-')
+        path = self._manifest_path(date_str)
+        stamp = _file_stamp(path)
+        if date_str not in self._manifests or stamp != self._stamps.get(date_str):
+            manifest = {'date': date_str, 'tracks': {}}
+            if stamp is not None:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Manifest okunamadı, yeniden oluşturulacak: {path} ({e})")
+            self._manifests[date_str] = manifest
+            self._stamps[date_str] = stamp
+        return self._manifests[date_str]
+
+    def _save_locked(self, date_str):
+        date_str = date_str.replace('_', '-')
+        path = self._manifest_path(date_str)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifests[date_str], f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._stamps[date_str] = _file_stamp(path)
+
+    def record(self, track_code, date_str, kind, path, rows=None):
+        """Yazılan dosyayı manifest'e işler; rows verilmezse CSV bir kez sayılır"""
+        total, successful = _count_rows(path, rows)
+        entry = {
+            'path': os.path.relpath(os.path.abspath(path), self.date_dir(date_str)),
+            'rows': total,
+            'updated_at': time.time()
+        }
+        if kind == 'essential':
+            entry['successful'] = successful
+            entry['success_rate'] = round(successful / total * 100, 1) if total else 0
+        with self._lock, _file_lock(self._manifest_path(date_str)):
+            # Kilit altında güncel dosya okunur; yalnızca bu kayıt eklenip yazılır
+            manifest = self._load_locked(date_str)
+            manifest['tracks'].setdefault(track_code, {})[kind] = entry
+            self._save_locked(date_str)
+        return entry
+
+    def partition(self, path):
+        """data/<tarih>/<pist>/<dosya> yolundan (tarih, pist, tür); tanınmıyorsa None"""
+        kind = file_kind(path)
+        parts = os.path.relpath(os.path.abspath(path), self.root).split(os.sep)
+        if kind is None or len(parts) != 3:
+            return None
+        return parts[0], parts[1], kind
+
+    def record_file(self, path, rows=None):
+        """data/<tarih>/<pist>/<dosya> yolundan tarih, pist ve türü çıkarıp kaydeder"""
+        found = self.partition(path)
+        if found is None:
+            return None
+        date_str, track_code, kind = found
+        return self.record(track_code, date_str, kind, path, rows)
+
+    def lookup(self, track_code, date_str, kind):
+        """Manifest kaydı (mutlak 'path' ile) veya None - dizin taranmaz"""
+        with self._lock:
+            entry = self._load_locked(date_str)['tracks'].get(track_code, {}).get(kind)
+        if not entry:
+            return None
+        path = os.path.join(self.date_dir(date_str), entry['path'])
+        if not os.path.exists(path):
+            return None
+        return dict(entry, path=path)
+
+    def tracks(self, date_str):
+        """Günün manifest'indeki pistler ve tür kayıtları"""
+        with self._lock:
+            return json.loads(json.dumps(self._load_locked(date_str)['tracks']))
+
+    # --- Eski düzenden taşıma ---
+    def adopt(self, path, track_code, date_str):
+        """Çalışma dizinindeki bir çıktıyı bölümüne taşır ve indeksler; yeni yolu döndürür"""
+        target = os.path.join(self.track_dir(track_code, date_str), os.path.basename(path))
+        os.replace(path, target)
+        if file_kind(target):
+            self.record(track_code, date_str, file_kind(target), target)
+        return target
+
+    def migrate(self, source_dir='.'):
+        """source_dir'deki eski adlı çıktıları taşır; taşınan dosya sayısını döndürür"""
+        moved = 0
+        for name in sorted(os.listdir(source_dir)):
+            target = self.locate(name)
+            if target is None:
+                continue
+            track_dir = os.path.dirname(target)
+            self.adopt(os.path.join(source_dir, name), os.path.basename(track_dir),
+                       os.path.basename(os.path.dirname(track_dir)))
+            moved += 1
+        logger.info(f"Migrated {moved} files from {source_dir} into {self.root}")
+        return moved
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_data_store():
+    """HRN_DATA_DIR tanımlıysa paylaşılan DataStore'u döndürür, değilse None"""
+    global _default_store
+    root = os.environ.get('HRN_DATA_DIR')
+    if not root:
+        return None
+    with _default_store_lock:
+        if _default_store is None or _default_store.root != os.path.abspath(root):
+            _default_store = DataStore(root)
+            logger.info(f"Data store enabled: {_default_store.root}")
+        return _default_store
+
+
+def record_output(path, rows=None):
+    """
+    Dosya paylaşılan veri dizini altındaysa manifest'i günceller (değilse hiçbir şey yapmaz)
+    HRN_STORAGE_DB tanımlıysa aynı satırlar SQLite deposuna da yazılır
+    """
+    store = get_default_data_store()
+    if store is None or not store.contains(path):
+        return None
+    try:
+        entry = store.record_file(path, rows)
+    except Exception as e:
+        logger.error(f"Manifest güncellenemedi ({path}): {e}")
+        return None
+
+    storage = get_default_storage()
+    if entry is not None and storage is not None:
+        date_str, track_code, kind = store.partition(path)
+        try:
+            if rows is None:
+                with open(path, 'r', encoding='utf-8-sig') as f:
+                    rows = list(csv.DictReader(f))
+            storage.ingest(track_code, date_str, kind, rows)
+        except Exception as e:
+            logger.error(f"Depoya yazılamadı ({path}): {e}")
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Date-partitioned data directory tools')
+    parser.add_argument('command', choices=['migrate', 'show'])
+    parser.add_argument('target', help='migrate: kaynak dizin, show: YYYY-MM-DD')
+    parser.add_argument('--root', default=os.environ.get('HRN_DATA_DIR', 'data'))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = DataStore(args.root)
+    if args.command == 'migrate':
+        print(f"{store.migrate(args.target)} files moved into {store.root}")
+        return
+    for track_code, kinds in sorted(store.tracks(args.target).items()):
+        for kind, entry in sorted(kinds.items()):
+            rate = f" ({entry['success_rate']}%)" if 'success_rate' in entry else ''
+            print(f"{track_code:<28} {kind:<14} {entry['rows']:>4} rows{rate}  {entry['path']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Entries diff - gün içindeki scratch ve program değişiklikleri için artımlı yenileme
+
+Entries sayfası tekrar çekilir ve kayıtlı entries CSV'si ile (yarış, program numarası,
+at ismi) üzerinden karşılaştırılır:
+- added: yeni gelen atlar -> yalnızca bunların profilleri çekilir
+- scratched: listeden çıkan atlar -> essential dosyasından silinir
+- changed: aynı yarışta program numarası değişen atlar
+Sayfadaki resmi sonuçlar da results_ingest ile son yarış deposuna yazılır.
+Yalnızca etkilenen yarışların skorları geçersiz kılınır, diğer yarışlar cache'te kalır.
+
+Kullanım:
+    python entries_diff.py santa-anita 2025-09-28
+"""
+
+import argparse
+import csv
+import logging
+import os
+
+from data_store import record_output
+from horse_profile_scraper import HorseProfileScraper
+from hrn_scraper import HorseRacingNationScraper, get_american_date_string
+from pipeline import ENTRIES_FIELDS, ESSENTIAL_FIELDS, output_base_name
+from race_score_cache import get_race_score_cache
+from results_ingest import ingest_track_results
+from storage import record_card
+from track_registry import get_track_registry
+from utils import write_csv_atomic, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def _norm_race(value):
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return str(value or '').strip()
+
+
+def entry_key(row):
+    """Yarış + at ismi (program numarası değişse de aynı at)"""
+    return (_norm_race(row.get('race_number')), str(row.get('horse_name', '')).strip().lower())
+
+
+def load_entries(entries_file):
+    """Kayıtlı entries CSV satırları; dosya yoksa None"""
+    if not os.path.exists(entries_file):
+        return None
+    with open(entries_file, 'r', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def entries_rows_from_races(track_code, races):
+    """Parse edilmiş yarışlardan app.py formatında entries satırları"""
+    rows = []
+    for race in races:
+        for entry in race.get('entries', []):
+            horse_info = entry.get('horse_info', {})
+            rows.append({
+                'track_name': track_code,
+                'race_number': str(race.get('race_number', '')),
+                'post_position': str(entry.get('post_position', '')),
+                'program_number': str(entry.get('program_number', '')),
+                'horse_name': horse_info.get('horse_name', ''),
+                'speed_figure': str(horse_info.get('speed_figure', '')),
+                'sire': horse_info.get('sire', ''),
+                'trainer_jockey': entry.get('trainer_jockey', ''),
+                'morning_line': entry.get('morning_line', ''),
+                'last_start': horse_info.get('last_start', '')
+            })
+    return rows
+
+
+def diff_entries(old_rows, new_rows):
+    """
+    İki entries listesini karşılaştırır
+    Dönüş: {'added', 'scratched', 'changed', 'unchanged', 'affected_races'}
+    """
+    old = {entry_key(row): row for row in old_rows if str(row.get('horse_name', '')).strip()}
+    new = {entry_key(row): row for row in new_rows if str(row.get('horse_name', '')).strip()}
+
+    added = [new[key] for key in new if key not in old]
+    scratched = [old[key] for key in old if key not in new]
+    changed = []
+    unchanged = 0
+    for key in new:
+        if key not in old:
+            continue
+        old_program = str(old[key].get('program_number', '')).strip()
+        new_program = str(new[key].get('program_number', '')).strip()
+        if old_program != new_program:
+            changed.append({'race_number': key[0], 'horse_name': new[key].get('horse_name'),
+                            'old_program_number': old_program, 'new_program_number': new_program})
+        else:
+            unchanged += 1
+
+    affected = {_norm_race(row.get('race_number')) for row in added + scratched}
+    affected.update(change['race_number'] for change in changed)
+    return {
+        'added': added,
+        'scratched': scratched,
+        'changed': changed,
+        'unchanged': unchanged,
+        'affected_races': sorted(affected, key=lambda r: int(r) if r.isdigit() else 0)
+    }
+
+
+def _load_essential(essential_file):
+    """Essential satırları at ismine göre; dosya yoksa boş"""
+    if not os.path.exists(essential_file):
+        return {}
+    with open(essential_file, 'r', encoding='utf-8') as f:
+        return {row.get('horse_name', '').strip().lower(): row for row in csv.DictReader(f)}
+
+
+def _essential_row(entry, latest):
+    return {
+        'race_number': entry.get('race_number', ''),
+        'program_number': entry.get('program_number', ''),
+        'horse_name': entry.get('horse_name', '').strip(),
+        'latest_surface': latest.get('latest_surface', latest.get('surface', '')),
+        'latest_distance': latest.get('latest_distance', latest.get('distance', '')),
+        'latest_time': latest.get('latest_time', latest.get('time', '')),
+        'latest_finish_position': latest.get('latest_finish_position', latest.get('finish_position', ''))
+    }
+
+
+def refresh_track_entries(track_code, date_str=None, output_dir=None, registry=None,
+                          entries_scraper=None, profile_scraper=None, score_cache=None):
+    """
+    Entries sayfasını tekrar çeker, kayıtlı entries ile karşılaştırır ve yalnızca değişen
+    kısmı günceller. Dönüş: {'success', 'message', 'diff', 'profiles_scraped'}
+    """
+    date_str = date_str or get_american_date_string()
+    registry = registry or get_track_registry()
+    score_cache = score_cache if score_cache is not None else get_race_score_cache()
+    base_name = output_base_name(track_code, date_str, output_dir)
+    entries_file = f"{base_name}_entries.csv"
+    essential_file = f"{base_name}_essential.csv"
+
+    old_rows = load_entries(entries_file)
+    if old_rows is None:
+        return {'success': False, 'message': f'Kayıtlı entries dosyası yok: {entries_file}'}
+
+    entries_scraper = entries_scraper or HorseRacingNationScraper()
+    url = registry.entries_url(track_code, date_str)
+    # HTTP cache'teki kayıt post time'a kadar taze sayılır; yenilemede koşullu GET zorlanır
+    cache = getattr(entries_scraper.session, 'cache', None)
+    if cache is not None:
+        cache.set_expiry(url, 0)
+
+    track_data = entries_scraper.scrape_track_data(url, registry.name_for(track_code, date_str))
+    if not track_data or not track_data.get('races'):
+        return {'success': False, 'message': 'Entries sayfası çekilemedi'}
+
+    # Biten yarışların sonuçları aynı sayfada - kartta tekrar koşan atlar profil çekmeden güncellenir
+    ingest_track_results(track_code, date_str, track_data, output_dir=output_dir)
+    record_card(track_code, date_str, track_data)
+
+    new_rows = entries_rows_from_races(track_code, track_data['races'])
+    diff = diff_entries(old_rows, new_rows)
+    if not diff['affected_races']:
+        return {'success': True, 'message': 'Değişiklik yok', 'diff': diff, 'profiles_scraped': 0}
+
+    # Essential: mevcut satırlar korunur, yalnızca yeni atlar için profil çekilir
+    existing = _load_essential(essential_file)
+    profile_scraper = profile_scraper or HorseProfileScraper()
+    essential_rows, scraped = [], 0
+    for entry in new_rows:
+        horse_name = entry.get('horse_name', '').strip()
+        if not horse_name:
+            continue
+        latest = existing.get(horse_name.lower())
+        if latest is None:
+            latest = {}
+            try:
+                latest = profile_scraper.latest_race(horse_name, last_start=entry.get('last_start'))
+            except Exception as e:
+                logger.error(f"Error scraping profile for {horse_name}: {e}")
+            scraped += 1
+        essential_rows.append(_essential_row(entry, latest))
+
+    write_csv_atomic(entries_file, ENTRIES_FIELDS, new_rows)
+    write_csv_atomic(essential_file, ESSENTIAL_FIELDS, essential_rows)
+    write_json_atomic(f"{base_name}_essential.json", essential_rows)
+    record_output(entries_file, new_rows)
+    record_output(essential_file, essential_rows)
+
+    score_cache.invalidate(track_code, date_str, diff['affected_races'])
+    logger.info(f"Entries refreshed for {track_code}: +{len(diff['added'])} -{len(diff['scratched'])} "
+                f"~{len(diff['changed'])}, races {diff['affected_races']}")
+    return {
+        'success': True,
+        'message': (f"{len(diff['added'])} yeni, {len(diff['scratched'])} scratch, "
+                    f"{len(diff['changed'])} program değişikliği"),
+        'diff': diff,
+        'profiles_scraped': scraped
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh stored entries and diff scratches / late changes')
+    parser.add_argument('track', help='Pist kodu, örn. santa-anita')
+    parser.add_argument('date', nargs='?', help='YYYY-MM-DD (varsayılan: bugün, Eastern)')
+    parser.add_argument('--output-dir', help='Varsayılan: HRN_DATA_DIR bölümü veya çalışma dizini')
+    args = parser.parse_args()
+
+    result = refresh_track_entries(args.track, args.date, output_dir=args.output_dir)
+    print(result['message'])
+    diff = result.get('diff')
+    if diff:
+        for row in diff['added']:
+            print(f"  + R{row['race_number']} #{row['program_number']} {row['horse_name']}")
+        for row in diff['scratched']:
+            print(f"  - R{row['race_number']} #{row['program_number']} {row['horse_name']}")
+        for change in diff['changed']:
+            print(f"  ~ R{change['race_number']} {change['horse_name']}: "
+                  f"#{change['old_program_number']} -> #{change['new_program_number']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Essential dosyası için kaldığı yerden devam eden (resumable) kayıt günlüğü
+
+Profil çekme döngüsü her atı tamamladığında satırı {base}_essential.journal.jsonl
+dosyasına ekler (flush + fsync). Süreç yarıda kesilirse (crash, timeout, worker yenilenmesi)
+bir sonraki çalıştırma günlükteki atları tekrar çekmez. Tüm atlar bitince essential
+CSV/JSON atomik olarak yazılır ve günlük silinir.
+
+Kullanım:
+    journal = EssentialJournal(base_name)
+    done = journal.load()                 # {at ismi (küçük harf): satır}
+    journal.append(row)                   # her at tamamlanınca
+    journal.finalize(rows, fieldnames)    # essential CSV + JSON, günlük silinir
+"""
+
+import json
+import logging
+import os
+import threading
+
+from data_store import record_output
+from utils import fsync_dir, write_csv_atomic, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def _horse_key(row):
+    return str(row.get('horse_name', '')).strip().lower()
+
+
+class EssentialJournal:
+    """Bir pistin essential satırları için append-only JSONL günlüğü"""
+
+    def __init__(self, base_name):
+        self.base_name = base_name
+        self.path = f"{base_name}_essential.journal.jsonl"
+        self.csv_path = f"{base_name}_essential.csv"
+        self.json_path = f"{base_name}_essential.json"
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Günlükteki satırlar {at ismi: satır}
+        Yarım kalmış son satır dosyadan da kesilir; yoksa sonraki append ona yapışıp kaybolur
+        """
+        rows = {}
+        if not os.path.exists(self.path):
+            return rows
+        with self._lock:
+            self._truncate_torn_tail()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable journal line in {self.path}")
+                    continue
+                if _horse_key(row):
+                    rows[_horse_key(row)] = row
+        if rows:
+            logger.info(f"Resuming from journal: {len(rows)} horses already done ({self.path})")
+        return rows
+
+    def _truncate_torn_tail(self):
+        """Son tam satırdan (newline) sonrasını siler"""
+        with open(self.path, 'r+b') as f:
+            data = f.read()
+            if not data or data.endswith(b'\n'):
+                return
+            end = data.rfind(b'\n') + 1
+            logger.warning(f"Truncating torn journal tail ({len(data) - end} bytes) in {self.path}")
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, row):
+        """Tamamlanan atın satırını diske yazar (süreç ölse de kaybolmaz)"""
+        line = json.dumps(row, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def finalize(self, rows, fieldnames):
+        """Essential CSV ve JSON'u atomik ve kalıcı (fsync) yazar, ardından günlüğü siler"""
+        with self._lock:
+            write_csv_atomic(self.csv_path, fieldnames, rows)
+            write_json_atomic(self.json_path, rows)
+            self.discard()
+        record_output(self.csv_path, rows)
+
+    def discard(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+            fsync_dir(self.path)
@@ -8,10 +8,19 @@ from bs4 import BeautifulSoup
 import csv
 import json
 import logging
+import os
 import pytz
 from datetime import datetime
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+from http_cache import build_session
+from metrics import PARSE_SECONDS, PROFILE_VARIANT_DEPTH
+from tracing import fetch_span, span
+from parse_cache import get_parse_cache
+from parse_workers import get_default_parse_pool
+from results_store import DEFAULT_MAX_AGE_DAYS, covers_last_start, get_default_results_store, is_recent
 
 # America Eastern Time Zone
 def get_american_time():
@@ -30,14 +39,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Varsayılan profil adresi - HRN_PROFILE_BASE_URL ile (örn. yerel stand-in sunucusu) değiştirilebilir
+DEFAULT_PROFILE_BASE_URL = "https://www.horseracingnation.com"
+
+
+def get_profile_base_url():
+    """Profil sitesinin base URL'sini döndürür (sonunda '/' olmadan)"""
+    base_url = os.environ.get('HRN_PROFILE_BASE_URL') or DEFAULT_PROFILE_BASE_URL
+    return base_url.rstrip('/')
+
 
 class HorseProfileScraper:
-    def __init__(self):
-        self.base_url = "https://www.horseracingnation.com"
-        self.session = requests.Session()
+    def __init__(self, base_url=None, http_cache=None, parse_cache=None, http2=None, parse_pool=None,
+                 results_store=None):
+        self.base_url = base_url.rstrip('/') if base_url else get_profile_base_url()
+        # http_cache verilmezse HRN_HTTP_CACHE_DIR'deki paylaşılan cache kullanılır (tanımlıysa)
+        # http2 verilmezse HRN_HTTP2'ye bakılır; httpx[http2] yoksa HTTP/1.1 ile devam eder
+        self.session = build_session(http_cache, http2=http2)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Aynı içerikli profil sayfaları tekrar parse edilmez (gövde hash'i ile anahtarlanır)
+        self.parse_cache = parse_cache if parse_cache is not None else get_parse_cache()
+        # parse_pool verilirse (veya HRN_PARSE_WORKERS tanımlıysa) HTML ayrı süreçlerde parse edilir
+        self.parse_pool = parse_pool if parse_pool is not None else get_default_parse_pool()
+        # results_store verilirse (veya HRN_RESULTS_DB tanımlıysa) resmi sonuçlardan gelen kayıtlar kullanılır
+        self.results_store = results_store if results_store is not None else get_default_results_store()
     
     def _format_horse_name_for_url(self, horse_name):
         """At ismini URL formatına çevirir - özel karakterleri doğru handle eder"""
@@ -79,23 +106,47 @@ class HorseProfileScraper:
             f"{self.base_url}/horse/{base_horse_slug}_5"
         ]
         
-        for variant_url in url_variants:
+        for depth, variant_url in enumerate(url_variants):
             try:
                 logger.info(f"Trying URL for {horse_name}: {variant_url}")
-                response = self.session.get(variant_url, timeout=30)
+                with fetch_span(variant_url, horse=horse_name) as fetch:
+                    response = self.session.get(variant_url, timeout=30)
+                    fetch.set_response(response)
                 response.raise_for_status()
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # At bilgilerini çek
-                horse_info = self._extract_horse_info(soup, horse_name)
+                # Sayfa içeriği daha önce parse edildiyse soup kurmadan sonucu kullan
+                doc_key = self.parse_cache.make_key('profile', response.content, horse_name)
+                parsed = self.parse_cache.get(doc_key)
                 
-                # Yarış geçmişini çek
-                race_history = self._extract_race_history(soup)
+                if parsed is not None:
+                    horse_info = parsed['horse_info']
+                    race_history = parsed['race_history']
+                elif self.parse_pool is not None:
+                    # Ham byte'lar parser worker'ına gider, geriye yalnızca kayıtlar döner
+                    with PARSE_SECONDS.time(page_type='profile'), span('parse', page_type='profile', horse=horse_name):
+                        parsed = self.parse_pool.parse_profile(response.content, horse_name, response.encoding)
+                    horse_info = parsed['horse_info']
+                    race_history = parsed['race_history']
+                    self.parse_cache.put(doc_key, parsed)
+                else:
+                    with PARSE_SECONDS.time(page_type='profile'), span('parse', page_type='profile', horse=horse_name):
+                        soup = BeautifulSoup(response.text, 'html.parser')
+                        
+                        # At bilgilerini çek
+                        horse_info = self._extract_horse_info(soup, horse_name)
+                        
+                        # Yarış geçmişini çek
+                        race_history = self._extract_race_history(soup)
+                        
+                        # Kayıtlar düz str/dict; ağaç GC'yi beklemeden hemen bırakılır
+                        soup.decompose()
+                    
+                    self.parse_cache.put(doc_key, {'horse_info': horse_info, 'race_history': race_history})
                 
                 # Eğer yarış geçmişi varsa ve son 2 yıl içinde yarış varsa, bu doğru attır
                 if race_history and self._has_recent_races(race_history):
                     logger.info(f"Found valid horse profile at: {variant_url}")
+                    PROFILE_VARIANT_DEPTH.inc(depth=str(depth))
                     
                     return {
                         'horse_info': horse_info,
@@ -110,9 +161,26 @@ class HorseProfileScraper:
                 continue
         
         # Hiçbir URL'de güncel yarış bulunamadı
+        PROFILE_VARIANT_DEPTH.inc(depth='none')
         logger.error(f"No valid horse profile found for {horse_name} after trying all variants")
         return None
     
+    def latest_race(self, horse_name, max_age_days=DEFAULT_MAX_AGE_DAYS, last_start=None):
+        """
+        Atın en son yarışı (race_history[0] biçiminde); bulunamazsa boş dict
+        Resmi sonuç tablosundaki kayıt son max_age_days gün içindeyse ve entries sayfasındaki
+        son koşu tarihinden (last_start) eski değilse profil çekilmez
+        """
+        if self.results_store is not None and last_start:
+            record = self.results_store.get(horse_name)
+            if record and is_recent(record, max_age_days) and covers_last_start(record, last_start):
+                return record
+
+        profile = self.scrape_horse_profile(horse_name)
+        if profile and profile.get('race_history'):
+            return profile['race_history'][0]  # İlk eleman en son yarış
+        return {}
+
     def _extract_horse_info(self, soup, horse_name):
         """At bilgilerini çıkarır"""
         info = {
@@ -321,6 +389,23 @@ class HorseProfileScraper:
         
         return all_results
     
+    def scrape_multiple_horses_concurrent(self, horse_names, max_workers=8):
+        """
+        Profilleri eşzamanlı çeker - HTTP/2 açıksa tüm istekler host başına tek
+        bağlantı üzerinde çoklanır, değilse HTTP/1.1 bağlantı havuzu kullanılır
+        """
+        all_results = {}
+        if not horse_names:
+            return all_results
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for horse_name, result in zip(horse_names, executor.map(self.scrape_horse_profile, horse_names)):
+                if result:
+                    all_results[horse_name] = result
+
+        logger.info(f"Concurrent profile scrape: {len(all_results)}/{len(horse_names)} horses")
+        return all_results
+
     def scrape_multiple_horses_with_data(self, horse_names, horses_data, delay=1):
         """Birden fazla atın profilini ekstra verilerle çeker"""
         all_results = {}
@@ -7,12 +7,23 @@ Bu script https://entries.horseracingnation.com/ sitesinden at yarışı veriler
 import requests
 from bs4 import BeautifulSoup
 import json
+import os
 import time
 import re
 import pytz
 from datetime import datetime, timedelta
 from urllib.parse import urljoin, urlparse
+import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from http_cache import build_session, parse_cache_control
+from memory_snapshots import memory_profile, memory_profile_path
+from metrics import PARSE_SECONDS
+from tracing import fetch_span, span
+from parse_cache import get_parse_cache
+from parse_workers import get_default_parse_pool
+from utils import JsonObjectStream, calculate_race_start_datetime, is_valid_date
 
 # America Eastern Time Zone
 def get_american_time():
@@ -35,14 +46,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Varsayılan entries adresi - HRN_ENTRIES_BASE_URL ile (örn. yerel stand-in sunucusu) değiştirilebilir
+DEFAULT_ENTRIES_BASE_URL = "https://entries.horseracingnation.com/"
+
+
+def get_entries_base_url():
+    """Entries sitesinin base URL'sini döndürür (her zaman '/' ile biter)"""
+    base_url = os.environ.get('HRN_ENTRIES_BASE_URL') or DEFAULT_ENTRIES_BASE_URL
+    return base_url.rstrip('/') + '/'
+
 
 class HorseRacingNationScraper:
-    def __init__(self):
-        self.base_url = "https://entries.horseracingnation.com/"
-        self.session = requests.Session()
+    def __init__(self, base_url=None, http_cache=None, parse_cache=None, http2=None, parse_pool=None):
+        self.base_url = base_url.rstrip('/') + '/' if base_url else get_entries_base_url()
+        # http_cache verilmezse HRN_HTTP_CACHE_DIR'deki paylaşılan cache kullanılır (tanımlıysa)
+        # http2 verilmezse HRN_HTTP2'ye bakılır; httpx[http2] yoksa HTTP/1.1 ile devam eder
+        self.session = build_session(http_cache, http2=http2)
+        # Paralel modda her pist için aynı ayarlarla ayrı session kurulur
+        self._session_options = {'http_cache': http_cache, 'http2': http2, 'parse_pool': parse_pool}
+        self.last_run_summary = []
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Aynı içerikli sayfalar tekrar parse edilmez (gövde hash'i ile anahtarlanır)
+        self.parse_cache = parse_cache if parse_cache is not None else get_parse_cache()
+        # parse_pool verilirse (veya HRN_PARSE_WORKERS tanımlıysa) HTML ayrı süreçlerde parse edilir
+        self.parse_pool = parse_pool if parse_pool is not None else get_default_parse_pool()
         
     def get_daily_tracks(self, date_str=None):
         """
@@ -55,9 +84,12 @@ class HorseRacingNationScraper:
         url = f"{self.base_url}entries-results/{date_str}"
         
         try:
-            response = self.session.get(url, timeout=30)
+            with fetch_span(url) as fetch:
+                response = self.session.get(url, timeout=30)
+                fetch.set_response(response)
             response.raise_for_status()
             
+            parse_started = time.perf_counter()
             soup = BeautifulSoup(response.text, 'html.parser')
             tracks = []
             
@@ -65,6 +97,7 @@ class HorseRacingNationScraper:
             tracks_table = soup.find('table')
             if not tracks_table:
                 logger.warning(f"No tracks table found for date {date_str}")
+                soup.decompose()
                 return tracks
                 
             # Tablo satırlarını işle
@@ -97,7 +130,10 @@ class HorseRacingNationScraper:
                                 track_info['avg_field_size'] = cells[3].get_text(strip=True)
                             
                             tracks.append(track_info)
-                            
+            
+            # Ağaç döngüsel referanslı; GC'yi beklemeden hemen bırakılır
+            soup.decompose()
+            PARSE_SECONDS.observe(time.perf_counter() - parse_started, page_type='daily_tracks')
             logger.info(f"Found {len(tracks)} tracks for {date_str}")
             return tracks
             
@@ -118,28 +154,98 @@ class HorseRacingNationScraper:
         Belirli bir pist sayfasından yarış verilerini çeker
         """
         try:
-            response = self.session.get(track_url, timeout=30)
+            with fetch_span(track_url, track=track_name) as fetch:
+                response = self.session.get(track_url, timeout=30)
+                fetch.set_response(response)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Pist bilgilerini al
-            track_info = self._extract_track_info(soup, track_name)
-            
-            # Yarışları al
-            races = self._extract_races(soup, track_url)
-            
-            return {
-                'track_info': track_info,
-                'races': races,
-                'total_races': len(races),
-                'scraped_at': get_american_time().isoformat()  # Amerika saat dilimi
-            }
+            return self.parse_track_response(response, track_url, track_name)
             
         except requests.RequestException as e:
             logger.error(f"Error scraping {track_url}: {e}")
             return None
     
+    def parse_track_response(self, response, track_url, track_name):
+        """
+        Çekilmiş entries sayfasını parse eder (ağ isteği yapmaz)
+        Streaming pipeline'da fetch ve parse ayrı aşamalarda çalışır
+        """
+        # Sayfa içeriği daha önce parse edildiyse soup kurmadan sonucu kullan
+        doc_key = self.parse_cache.make_key('entries', response.content, track_url, track_name)
+        parsed = self.parse_cache.get(doc_key)
+        
+        if parsed is not None:
+            logger.info(f"Entries page unchanged, using cached parse: {track_url}")
+            track_info = parsed['track_info']
+            races = parsed['races']
+        elif self.parse_pool is not None:
+            # Ham byte'lar parser worker'ına gider, geriye yalnızca kayıtlar döner
+            with PARSE_SECONDS.time(page_type='entries'), span('parse', page_type='entries', track=track_name):
+                parsed = self.parse_pool.parse_entries(response.content, track_url, track_name, response.encoding)
+            track_info = parsed['track_info']
+            races = parsed['races']
+            self.parse_cache.put(doc_key, parsed)
+        else:
+            with PARSE_SECONDS.time(page_type='entries'), span('parse', page_type='entries', track=track_name):
+                soup = BeautifulSoup(response.text, 'html.parser')
+                
+                # Pist bilgilerini al
+                track_info = self._extract_track_info(soup, track_name)
+                
+                # Yarışları al
+                races = self._extract_races(soup, track_url)
+                
+                # Kayıtlar düz str/dict; ağaç GC'yi beklemeden hemen bırakılır
+                soup.decompose()
+            
+            self.parse_cache.put(doc_key, {'track_info': track_info, 'races': races})
+        
+        # Entries sayfası bir sonraki post time'a kadar cache'te kalabilir
+        self._extend_entries_cache(track_url, response, track_info, races)
+        
+        return {
+            'track_info': track_info,
+            'races': races,
+            'total_races': len(races),
+            'scraped_at': get_american_time().isoformat()  # Amerika saat dilimi
+        }
+    
+    def _extend_entries_cache(self, track_url, response, track_info, races):
+        """Cache'teki entries sayfasının süresini sıradaki yarışın post time'ına ayarlar"""
+        cache = getattr(self.session, 'cache', None)
+        if cache is None:
+            return
+        
+        # Sunucu no-cache / no-store dediyse ona uyulur
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        if 'no-cache' in directives or 'no-store' in directives:
+            return
+        
+        next_post = self._next_post_time(track_url, track_info, races)
+        if next_post:
+            cache.set_expiry(track_url, next_post.timestamp())
+    
+    def _next_post_time(self, track_url, track_info, races):
+        """Henüz koşulmamış ilk yarışın post time'ını (Eastern, tz-aware) döndürür"""
+        # Tarih URL'nin sonunda (YYYY-MM-DD), yoksa sayfadaki race_date kullanılır
+        date_match = re.search(r'(\d{4}-\d{2}-\d{2})/?$', track_url)
+        race_date = date_match.group(1) if date_match else track_info.get('race_date')
+        if not race_date:
+            return None
+        
+        # Post time'lar pistin yerel saati; Eastern kabul etmek batı pistlerinde
+        # cache'in erken dolmasına yol açar, bu da güvenli taraftır
+        eastern = pytz.timezone('US/Eastern')
+        now = get_american_time()
+        upcoming = []
+        for race in races:
+            start = calculate_race_start_datetime(race_date, race.get('post_time'))
+            if start:
+                start = eastern.localize(start)
+                if start > now:
+                    upcoming.append(start)
+        
+        return min(upcoming) if upcoming else None
+    
     def _extract_track_info(self, soup, track_name):
         """Pist temel bilgilerini çıkarır"""
         track_info = {'name': track_name}
@@ -356,6 +462,9 @@ class HorseRacingNationScraper:
                         if i + 1 < len(cells):
                             horse_cell = cells[i + 1].get_text(strip=True)
                             entry['horse_info'] = self._parse_horse_info(horse_cell)
+                            last_start = self._parse_last_start(row)
+                            if last_start:
+                                entry['horse_info']['last_start'] = last_start
                         
                         # Trainer/Jockey (bir sonraki hücre)
                         if i + 2 < len(cells):
@@ -378,6 +487,14 @@ class HorseRacingNationScraper:
         logger.info(f"Total entries extracted: {len(entries)}")
         return entries
     
+    def _parse_last_start(self, row):
+        """Satırdaki <time datetime="YYYY-MM-DD..."> etiketinden atın son koşu tarihi (yoksa None)"""
+        time_tag = row.find('time', attrs={'datetime': True})
+        if time_tag is None:
+            return None
+        date_str = time_tag['datetime'][:10]
+        return date_str if is_valid_date(date_str) else None
+
     def _parse_horse_info(self, horse_text):
         """At bilgisini parse eder (isim, speed figure, sire)"""
         info = {'raw_text': horse_text}
@@ -433,6 +550,13 @@ class HorseRacingNationScraper:
         for row in rows:
             cells = row.find_all(['td', 'th'])
             
+            # Final time satırı ("Final Time | 1:10.45")
+            if cells and re.match(r'^(final\s*)?time', cells[0].get_text(strip=True).lower()):
+                time_match = re.search(r'(\d+:\d{2}\.\d{1,2}|\d{2}\.\d{1,2})', row.get_text(' ', strip=True))
+                if time_match:
+                    results['final_time'] = time_match.group(1)
+                continue
+            
             # Finishing order (at ismi, finish position, payoff)
             if len(cells) >= 3:
                 cell_texts = [cell.get_text(strip=True) for cell in cells]
@@ -443,6 +567,7 @@ class HorseRacingNationScraper:
                     if horse_name and not horse_name.lower() in ['exacta', 'trifecta', 'superfecta', 'pick']:
                         payout_info = {
                             'horse': horse_name,
+                            'finish_position': len(results['finishing_order']) + 1,
                             'payouts': {}
                         }
                         
@@ -465,8 +590,16 @@ class HorseRacingNationScraper:
         
         return results
     
-    def scrape_all_tracks_for_date(self, date_str=None):
-        """Belirli bir tarih için tüm pistleri scrape eder"""
+    def scrape_all_tracks_for_date(self, date_str=None, parallel=False, max_workers=4, output_path=None,
+                                   memory_profile_file=None):
+        """
+        Belirli bir tarih için tüm pistleri scrape eder
+        parallel=True: her pist kendi scraper/session'ı ile ayrı bir worker'da işlenir,
+        yavaş veya hatalı bir pist diğerlerini bekletmez. Pist bazlı özet self.last_run_summary'de.
+        output_path: her pist bitince JSON dosyasına yazılır ve bellekten bırakılır; dönüşteki
+        pist kayıtlarında 'races' yoktur (save_data_to_json çıktısıyla aynı dosya)
+        memory_profile_file (ya da HRN_MEMORY_PROFILE): pist başına tracemalloc snapshot raporu
+        """
         if date_str is None:
             date_str = get_american_date_string()  # Amerika saat dilimi
         
@@ -474,31 +607,92 @@ class HorseRacingNationScraper:
         
         # Önce tüm pistleri al
         tracks = self.get_daily_tracks(date_str)
+        self.last_run_summary = []
         
         if not tracks:
             logger.warning(f"No tracks found for {date_str}")
             return {}
         
         all_data = {}
+        stream = JsonObjectStream(output_path) if output_path else None
+        memory_profile_file = memory_profile_file or memory_profile_path()
         
-        for track in tracks:
-            track_name = track['name']
-            track_url = track['url']
-            
-            logger.info(f"Scraping {track_name}...")
-            
-            # Rate limiting
-            time.sleep(2)
-            
-            track_data = self.scrape_track_data(track_url, track_name)
+        def collect(summary, track_data):
+            self.last_run_summary.append(summary)
+            if track_data:
+                if stream is not None:
+                    stream.add(summary['track'], track_data)
+                    track_data = {key: value for key, value in track_data.items() if key != 'races'}
+                all_data[summary['track']] = track_data
+            if profiler:
+                profiler.checkpoint(summary['track'])
+        
+        try:
+            with memory_profile(memory_profile_file, enabled=bool(memory_profile_file)) as profiler:
+                if parallel:
+                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                        futures = [executor.submit(self._scrape_track_isolated, track) for track in tracks]
+                        for future in as_completed(futures):
+                            collect(*future.result())
+                else:
+                    for track in tracks:
+                        # Rate limiting
+                        time.sleep(2)
+                        
+                        collect(*self._scrape_track_isolated(track, scraper=self))
+        except BaseException:
+            if stream is not None:
+                stream.abort()
+            raise
+        if stream is not None:
+            stream.close()
+            logger.info(f"Data streamed to {output_path}")
+        
+        ok = sum(1 for s in self.last_run_summary if s['status'] == 'ok')
+        logger.info(f"Scraped {ok}/{len(tracks)} tracks for {date_str}")
+        return all_data
+    
+    def _scrape_track_isolated(self, track, scraper=None):
+        """
+        Tek pisti scrape eder ve (özet, track_data) döndürür - hiçbir zaman exception fırlatmaz
+        scraper verilmezse pist için ayrı session'lı yeni bir scraper kurulur
+        """
+        track_name = track['name']
+        summary = {
+            'track': track.get('slug') or track_name,
+            'name': track_name,
+            'status': 'failed',
+            'races': 0,
+            'horses': 0,
+            'failures': 0,
+            'seconds': 0.0,
+            'error': None
+        }
+        started = time.time()
+        track_data = None
+        
+        logger.info(f"Scraping {track_name}...")
+        try:
+            if scraper is None:
+                scraper = HorseRacingNationScraper(base_url=self.base_url, parse_cache=self.parse_cache,
+                                                   **self._session_options)
+            track_data = scraper.scrape_track_data(track['url'], track_name)
             
             if track_data:
-                all_data[track['slug'] or track_name] = track_data
+                summary['status'] = 'ok'
+                summary['races'] = track_data['total_races']
+                summary['horses'] = sum(len(race.get('entries', [])) for race in track_data['races'])
                 logger.info(f"Successfully scraped {track_name} - {track_data['total_races']} races")
             else:
+                summary['failures'] = 1
                 logger.error(f"Failed to scrape {track_name}")
+        except Exception as e:
+            summary['failures'] = 1
+            summary['error'] = str(e)
+            logger.error(f"Failed to scrape {track_name}: {e}")
         
-        return all_data
+        summary['seconds'] = round(time.time() - started, 2)
+        return summary, track_data
     
     def save_data_to_json(self, data, filename):
         """Veriyi JSON dosyasına kaydeder"""
@@ -557,7 +751,8 @@ class HorseRacingNationScraper:
                             'speed_figure': entry.get('horse_info', {}).get('speed_figure'),
                             'sire': entry.get('horse_info', {}).get('sire', ''),
                             'trainer_jockey': entry.get('trainer_jockey', ''),
-                            'morning_line': entry.get('morning_line', '')
+                            'morning_line': entry.get('morning_line', ''),
+                            'last_start': entry.get('horse_info', {}).get('last_start', '')
                         }
                         entries_data.append(entry_row)
                 
@@ -565,7 +760,8 @@ class HorseRacingNationScraper:
                     filename = f"{base_filename}_{track_slug}_entries.csv"
                     with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
                         fieldnames = ['track_name', 'race_number', 'post_position', 'program_number',
-                                    'horse_name', 'speed_figure', 'sire', 'trainer_jockey', 'morning_line']
+                                    'horse_name', 'speed_figure', 'sire', 'trainer_jockey', 'morning_line',
+                                    'last_start']
                         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                         writer.writeheader()
                         writer.writerows(entries_data)
@@ -577,22 +773,26 @@ class HorseRacingNationScraper:
 
 def main():
     """Ana fonksiyon - örnek kullanım"""
+    parser = argparse.ArgumentParser(description='Scrape all tracks for a date into hrn_data_<date>.json')
+    parser.add_argument('date', nargs='?', help='YYYY-MM-DD (varsayılan: bugün, Eastern)')
+    parser.add_argument('--parallel', action='store_true', help='Pistleri paralel worker\'larda çek')
+    parser.add_argument('--memory-profile', help='Pist başına tracemalloc raporunu bu JSON dosyasına yaz')
+    args = parser.parse_args()
+    
     scraper = HorseRacingNationScraper()
     
     # Bugünün tarihini al (Amerika saat dilimi)
-    today = get_american_date_string()
+    today = args.date or get_american_date_string()
     
     print(f"Horse Racing Nation Scraper Starting...")
     print(f"Scraping data for {today}")
     
-    # Tüm pistleri scrape et
-    all_data = scraper.scrape_all_tracks_for_date(today)
+    # Tüm pistleri scrape et - her pist bitince JSON'a yazılır, bellekte biriktirilmez
+    json_filename = f"hrn_data_{today}.json"
+    all_data = scraper.scrape_all_tracks_for_date(today, parallel=args.parallel, output_path=json_filename,
+                                                  memory_profile_file=args.memory_profile)
     
     if all_data:
-        # JSON olarak kaydet
-        json_filename = f"hrn_data_{today}.json"
-        scraper.save_data_to_json(all_data, json_filename)
-        
         print(f"Scraping completed! Found {len(all_data)} tracks")
         for track, data in all_data.items():
             print(f"  {track}: {data['total_races']} races")
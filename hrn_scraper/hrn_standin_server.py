@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+"""
+HRN stand-in sunucusu - Yük ve ölçek testleri için yerel sahte Horse Racing Nation
+entries-results/<date>, entries-results/<slug>/<date> ve horse/<slug> sayfalarını taklit eder
+
+Kullanım:
+    python hrn_standin_server.py --tracks 30 --races 10 --horses 10 --port 8765
+    python hrn_standin_server.py --tracks 30 --races 12 --horses 12 --load-test --workers 8
+    python hrn_standin_server.py --http2 --load-test --workers 32   # h2c (HTTP/2 prior knowledge)
+
+Scraper'ları sunucuya yönlendirmek için:
+    HRN_ENTRIES_BASE_URL=http://127.0.0.1:8765/
+    HRN_PROFILE_BASE_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# İlk pistler gerçek slug'larla üretilir, böylece app.py'deki track kodlarıyla çalışır
+REAL_TRACKS = [
+    ('santa-anita', 'Santa Anita'),
+    ('belmont-at-aqueduct', 'Belmont at Aqueduct'),
+    ('laurel-park', 'Laurel Park'),
+    ('churchill-downs', 'Churchill Downs'),
+    ('gulfstream-park', 'Gulfstream Park'),
+    ('woodbine', 'Woodbine'),
+    ('delaware-park', 'Delaware Park'),
+    ('remington-park', 'Remington Park'),
+    ('finger-lakes', 'Finger Lakes'),
+    ('mountaineer', 'Mountaineer'),
+    ('los-alamitos', 'Los Alamitos'),
+    ('horseshoe-indianapolis', 'Horseshoe Indianapolis'),
+    ('parx-racing', 'Parx Racing'),
+    ('thistledown', 'Thistledown'),
+    ('fort-erie', 'Fort Erie'),
+    ('presque-isle-downs', 'Presque Isle Downs'),
+    ('tampa-bay-downs', 'Tampa Bay Downs'),
+    ('hawthorne-race-course', 'Hawthorne Race Course'),
+    ('will-rogers-downs', 'Will Rogers Downs'),
+    ('albuquerque-downs', 'Albuquerque Downs'),
+]
+
+NAME_WORDS_A = ['Tiger', 'Golden', 'Silent', 'Royal', 'Lucky', 'Midnight', 'Storm', 'Silver',
+                'Wild', 'Brave', 'Rapid', 'Hidden', 'Iron', 'Crimson', 'Quiet', 'Desert',
+                'Northern', 'Majestic', 'Blue', 'Velvet', 'Dancing', 'Proud', 'Smoky', 'Lone']
+NAME_WORDS_B = ['Sea', 'Runner', 'Legend', 'Arrow', 'Dream', 'Flight', 'Echo', 'Comet',
+                'Ranger', 'Spirit', 'Promise', 'Thunder', 'Harbor', 'Valley', 'Empire',
+                'Rebel', 'Anthem', 'Whisper', 'Crown', 'Gambit', 'Voyage', 'Jewel', 'Blaze']
+SIRES = ['Into Mischief', 'Tapit', 'Curlin', 'Munnings', 'Uncle Mo', 'Gun Runner',
+         'Quality Road', 'Justify', 'Constitution', 'Not This Time', 'Vino Rosso']
+PEOPLE = ['John Smith', 'Maria Lopez', 'Kevin Navarro', 'Sofia Vives', 'Dalton Brown',
+          'Ruben Silvera', 'Rachel Sells', 'Oscar Gomez', 'Mike Jones', 'Ana Diaz']
+DISTANCES = ['5 f', '5 1/2 f', '6 f', '6 1/2 f', '7 f', '1 m', '1 1/16 m', '1 1/8 m']
+SURFACES = ['Dirt', 'Turf']
+RACE_TYPES = ['Maiden Special Weight', 'Claiming', 'Allowance', 'Maiden Claiming',
+              'Starter Allowance', 'Stakes']
+ODDS = ['2/1', '5/2', '3/1', '7/2', '4/1', '5/1', '6/1', '8/1', '10/1', '12/1', '15/1', '20/1', '30/1']
+
+
+class StandInConfig:
+    """Stand-in sunucusunun kart boyutu ve hata davranışı ayarları"""
+
+    def __init__(self, tracks=5, races=8, horses=8, latency_ms=0, latency_jitter_ms=0,
+                 error_rate=0.0, throttle_rate=0.0, variant_miss_rate=0.1, seed=42,
+                 etags=True, cache_control=None, official_races=0):
+        self.tracks = tracks
+        self.races = races
+        self.horses = horses
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.variant_miss_rate = variant_miss_rate
+        self.seed = seed
+        # ETag gönderilir ve If-None-Match eşleşirse 304 döner
+        self.etags = etags
+        # Örn. 'max-age=60' veya 'no-store'; None ise header gönderilmez
+        self.cache_control = cache_control
+        # İlk N yarış resmileşmiş sayılır; entries sayfasında sonuç tablosu gösterilir
+        self.official_races = official_races
+
+
+def _stable_seed(*parts):
+    """Aynı girdiler için her zaman aynı seed'i üretir (sayfalar tekrar çekilince değişmesin)"""
+    return zlib.crc32('|'.join(str(p) for p in parts).encode('utf-8'))
+
+
+def _track_list(config):
+    """Konfigürasyondaki pist sayısı kadar (slug, isim) döndürür"""
+    tracks = list(REAL_TRACKS[:config.tracks])
+    for i in range(len(tracks), config.tracks):
+        tracks.append((f"synthetic-park-{i + 1}", f"Synthetic Park {i + 1}"))
+    return tracks
+
+
+def _format_post_time(minutes_after_noon):
+    """Öğlen 12'den itibaren dakikayı '1:25 PM' formatına çevirir"""
+    hour = 12 + minutes_after_noon // 60
+    minute = minutes_after_noon % 60
+    suffix = 'PM' if hour < 24 else 'AM'
+    display_hour = hour % 12 or 12
+    return f"{display_hour}:{minute:02d} {suffix}"
+
+
+def generate_card(config, date_str, slug, name):
+    """Bir pist için deterministik sentetik yarış kartı üretir"""
+    rng = random.Random(_stable_seed(config.seed, date_str, slug))
+    # Son koşu tarihleri ayrı rng'den - kartın geri kalanı değişmesin
+    starts = random.Random(_stable_seed(config.seed, date_str, slug, 'last_start'))
+    card_date = datetime.strptime(date_str, '%Y-%m-%d')
+    first_post = rng.randrange(0, 90, 5)
+    used_names = set()
+    races = []
+
+    for race_number in range(1, config.races + 1):
+        post_minutes = first_post + (race_number - 1) * rng.choice([25, 30, 30, 35])
+        entries = []
+        for program_number in range(1, config.horses + 1):
+            horse_name = f"{rng.choice(NAME_WORDS_A)} {rng.choice(NAME_WORDS_B)}"
+            while horse_name in used_names:
+                horse_name = f"{horse_name} {rng.choice(NAME_WORDS_B)}"
+            used_names.add(horse_name)
+            entries.append({
+                'program_number': program_number,
+                'horse_name': horse_name,
+                'speed_figure': rng.randint(20, 105),
+                'sire': rng.choice(SIRES),
+                'trainer': rng.choice(PEOPLE),
+                'jockey': rng.choice(PEOPLE),
+                'morning_line': rng.choice(ODDS),
+                'last_start': (card_date - timedelta(days=starts.randint(7, 45))).strftime('%Y-%m-%d'),
+            })
+        races.append({
+            'race_number': race_number,
+            'post_time': _format_post_time(post_minutes),
+            'distance': rng.choice(DISTANCES),
+            'surface': rng.choice(SURFACES),
+            'race_type': rng.choice(RACE_TYPES),
+            'purse': f"{rng.randrange(15, 250) * 1000:,}",
+            'entries': entries,
+        })
+        if race_number <= config.official_races:
+            races[-1]['results'] = _generate_results(config, date_str, slug, races[-1])
+
+    return {'slug': slug, 'name': name, 'date': date_str, 'races': races}
+
+
+def _generate_results(config, date_str, slug, race):
+    """Resmi yarış için bitiş sırası, final time ve ödemeler (kartın rng'sini etkilemez)"""
+    rng = random.Random(_stable_seed(config.seed, date_str, slug, 'results', race['race_number']))
+    order = [entry['horse_name'] for entry in race['entries']]
+    rng.shuffle(order)
+    base = {'5 f': 58, '5 1/2 f': 64, '6 f': 70, '6 1/2 f': 77, '7 f': 83,
+            '1 m': 96, '1 1/16 m': 103, '1 1/8 m': 110}[race['distance']]
+    seconds = base + rng.uniform(0, 3)
+    return {
+        'order': order,
+        'final_time': f"{int(seconds // 60)}:{seconds % 60:05.2f}",
+        'payouts': [round(rng.uniform(2.2, 30.0), 2) for _ in range(6)]
+    }
+
+
+def render_daily_tracks_page(config, date_str):
+    """entries-results/<date> sayfasını üretir"""
+    rows = []
+    for slug, name in _track_list(config):
+        card = generate_card(config, date_str, slug, name)
+        first_post = card['races'][0]['post_time'] if card['races'] else ''
+        rows.append(
+            f"<tr><td>{first_post}</td>"
+            f"<td><a href=\"/entries-results/{slug}/{date_str}\">{html.escape(name)}</a></td>"
+            f"<td>${len(card['races']) * 50000:,}</td><td>{config.horses}.0</td><td></td></tr>"
+        )
+    return (
+        "<html><head><title>Entries &amp; Results</title></head><body>"
+        f"<h1>Horse Racing Entries &amp; Results for {date_str}</h1>"
+        "<table><tr><th>Time</th><th>Track</th><th>Purse</th><th>Field</th><th></th></tr>"
+        + ''.join(rows) +
+        "</table></body></html>"
+    )
+
+
+def render_entries_page(card):
+    """entries-results/<slug>/<date> sayfasını üretir"""
+    date_obj = datetime.strptime(card['date'], '%Y-%m-%d')
+    long_date = date_obj.strftime('%A, %B %d, %Y').replace(' 0', ' ')
+    parts = [
+        f"<html><head><title>{html.escape(card['name'])} Entries &amp; Results</title></head><body>",
+        f"<h1>{html.escape(card['name'])} Entries &amp; Results for {long_date}</h1>",
+    ]
+    for race in card['races']:
+        parts.append(f"<h2>Race # {race['race_number']}, {race['post_time']}</h2>")
+        parts.append(
+            f"<div class=\"race-info\">{race['distance']} {race['surface']}, {race['race_type']}, "
+            f"Purse: ${race['purse']}</div>"
+        )
+        rows = ["<tr><th></th><th>#</th><th>Horse / Sire</th><th>Trainer / Jockey</th><th>ML</th></tr>"]
+        for entry in race['entries']:
+            # İlk hücre: atın son koşu tarihi (ilk kez koşanlarda boş)
+            last_start = entry.get('last_start')
+            last_cell = (f"<time datetime=\"{last_start}\">{last_start[5:7]}/{last_start[8:10]}/{last_start[2:4]}</time>"
+                         if last_start else '')
+            rows.append(
+                f"<tr><td>{last_cell}</td><td>{entry['program_number']}</td>"
+                f"<td>{html.escape(entry['horse_name'])}({entry['speed_figure']}) {html.escape(entry['sire'])}</td>"
+                f"<td>{html.escape(entry['trainer'])}{html.escape(entry['jockey'])}</td>"
+                f"<td>{entry['morning_line']}</td></tr>"
+            )
+        parts.append("<div class=\"race-entries\"><table>" + ''.join(rows) + "</table></div>")
+        results = race.get('results')
+        if results:
+            win, place_1, show_1, place_2, show_2, show_3 = results['payouts']
+            order = [html.escape(name) for name in results['order']]
+            result_rows = [
+                "<tr><th>Runner</th><th>Win</th><th>Place</th><th>Show</th></tr>",
+                f"<tr><td>{order[0]}</td><td>${win:.2f}</td><td>${place_1:.2f}</td><td>${show_1:.2f}</td></tr>",
+            ]
+            if len(order) > 1:
+                result_rows.append(f"<tr><td>{order[1]}</td><td></td><td>${place_2:.2f}</td><td>${show_2:.2f}</td></tr>")
+            if len(order) > 2:
+                result_rows.append(f"<tr><td>{order[2]}</td><td></td><td></td><td>${show_3:.2f}</td></tr>")
+            result_rows.append(f"<tr><td>Final Time</td><td>{results['final_time']}</td><td></td></tr>")
+            parts.append("<div class=\"race-results\"><table>" + ''.join(result_rows) + "</table></div>")
+    parts.append("</body></html>")
+    return ''.join(parts)
+
+
+def _profile_outcome(config, slug):
+    """
+    Profil slug'ı için sonucu belirler: 'valid', 'stale' (eski yarışlar) veya 'missing' (404)
+    Bazı atlar gerçek siteye benzer şekilde _1, _2 varyantlarında bulunur
+    """
+    match = re.match(r'^(.*?)(?:_(\d))?$', slug)
+    base_slug = match.group(1)
+    variant = int(match.group(2)) if match.group(2) else 0
+
+    h = _stable_seed(config.seed, base_slug)
+    correct_variant = 0
+    if (h % 1000) / 1000.0 < config.variant_miss_rate:
+        correct_variant = 1 + (h // 1000) % 3
+
+    if variant == correct_variant:
+        return 'valid'
+    if variant < correct_variant:
+        return 'stale' if variant % 2 == 0 else 'missing'
+    return 'missing'
+
+
+def render_profile_page(config, slug, stale=False):
+    """horse/<slug> profil sayfasını üretir"""
+    rng = random.Random(_stable_seed(config.seed, 'profile', slug))
+    today = datetime.now()
+    history = []
+    for i in range(rng.randint(3, 8)):
+        if stale:
+            race_day = datetime(2015, 6, 1) - timedelta(days=30 * i)
+        else:
+            race_day = today - timedelta(days=rng.randint(10, 60) + 30 * i)
+        distance = rng.choice(DISTANCES)
+        base = {'5 f': 58, '5 1/2 f': 64, '6 f': 70, '6 1/2 f': 77, '7 f': 83,
+                '1 m': 96, '1 1/16 m': 103, '1 1/8 m': 110}[distance]
+        history.append({
+            'date': race_day,
+            'distance': distance,
+            'seconds': base + rng.uniform(0, 4),
+            'position': rng.randint(1, 10),
+            'speed_figure': rng.randint(30, 100),
+            'track': rng.choice(REAL_TRACKS)[1],
+            'surface': f"{rng.choice(SURFACES)}-{rng.choice(['Fast', 'Firm', 'Good', 'Sloppy'])}",
+            'race_type': rng.choice(RACE_TYPES),
+        })
+    return render_profile_history(slug.replace('_', ' '), history, rng)
+
+
+def render_profile_history(name, history, rng):
+    """
+    Verilen yarış geçmişiyle profil sayfası (en yeni yarış ilk satır)
+    history: [{'date', 'position', 'speed_figure', 'track', 'distance', 'surface', 'race_type', 'seconds'}]
+    """
+    rows = []
+    for race in history:
+        race_day = race['date']
+        minutes = int(race['seconds'] // 60)
+        rest = race['seconds'] - minutes * 60
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(race['position'], 'th')
+        rows.append(
+            f"<tr><td><time datetime=\"{race_day.strftime('%Y-%m-%d')}T00:00:00Z\">"
+            f"{race_day.month}/{race_day.day}/{race_day.strftime('%y')}</time></td>"
+            f"<td>{race['position']}{suffix} ({race['speed_figure']}*)</td>"
+            f"<td><a href=\"#\">{html.escape(race['track'])}</a></td>"
+            f"<td>{race['distance']}</td>"
+            f"<td>{race['surface']}</td>"
+            f"<td>{race['race_type']}</td><td></td><td></td><td></td>"
+            f"<td><time datetime=\"PT{minutes}M{rest:.2f}S\">{minutes}:{rest:05.2f}</time></td></tr>"
+        )
+    return (
+        f"<html><head><title>{html.escape(name)}</title></head><body>"
+        f"<h1>{html.escape(name)}</h1>"
+        "<dl class=\"horse-stats\">"
+        f"<dt>Age:</dt><dd>{rng.randint(2, 7)} years old - {rng.choice(['Colt', 'Filly', 'Gelding', 'Mare'])}</dd>"
+        "<dt>Status:</dt><dd>Active</dd>"
+        f"<dt>Owner:</dt><dd>{rng.choice(PEOPLE)}</dd>"
+        f"<dt>Trainer:</dt><dd>{rng.choice(PEOPLE)}</dd>"
+        f"<dt>Bred:</dt><dd>Kentucky, US by {rng.choice(PEOPLE)}</dd>"
+        f"<dt>Pedigree:</dt><dd><a class=\"horse-name\">{rng.choice(SIRES)}</a> - "
+        f"<a class=\"horse-name\">{rng.choice(NAME_WORDS_A)} Lady</a> by "
+        f"<a class=\"horse-name\">{rng.choice(SIRES)}</a></dd>"
+        "</dl>"
+        "<table class=\"horse-table\"><thead><tr><th>Date</th><th>Finish</th><th>Track</th>"
+        "<th>Distance</th><th>Surface</th><th>Race</th><th></th><th></th><th></th><th>Time</th></tr></thead>"
+        "<tbody>" + ''.join(rows) + "</tbody></table></body></html>"
+    )
+
+
+class StandInServer:
+    """Arka planda çalışan stand-in HTTP/1.1 sunucusu"""
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self._init_state(config)
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    def _init_state(self, config):
+        self.config = config or StandInConfig()
+        self.stats = {'requests': 0, 'connections': 0, 'by_route': {}, 'by_status': {}}
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Sunucuyu arka plan thread'inde başlatır"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stand-in HRN server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        """Sunucuyu durdurur"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _record(self, route, status):
+        with self._stats_lock:
+            self.stats['requests'] += 1
+            self.stats['by_route'][route] = self.stats['by_route'].get(route, 0) + 1
+            self.stats['by_status'][str(status)] = self.stats['by_status'].get(str(status), 0) + 1
+
+    def _record_connection(self):
+        with self._stats_lock:
+            self.stats['connections'] += 1
+
+    def _roll(self, rate):
+        with self._stats_lock:
+            return self._rng.random() < rate
+
+    def _latency_seconds(self):
+        """Konfigürasyondaki gecikme + jitter (saniye)"""
+        config = self.config
+        if not (config.latency_ms or config.latency_jitter_ms):
+            return 0
+        with self._stats_lock:
+            jitter = self._rng.uniform(0, config.latency_jitter_ms) if config.latency_jitter_ms else 0
+        return (config.latency_ms + jitter) / 1000.0
+
+    def route(self, path):
+        """Path'i (route_adı, status, gövde) üçlüsüne çevirir"""
+        config = self.config
+        path = path.split('?', 1)[0].rstrip('/')
+
+        match = re.match(r'^/entries-results/(\d{4}-\d{2}-\d{2})$', path)
+        if match:
+            return 'daily_tracks', 200, render_daily_tracks_page(config, match.group(1))
+
+        match = re.match(r'^/entries-results/([\w-]+)/(\d{4}-\d{2}-\d{2})$', path)
+        if match:
+            slug, date_str = match.groups()
+            names = dict(_track_list(config))
+            if slug not in names:
+                return 'entries', 404, '<html><body>Not found</body></html>'
+            card = generate_card(config, date_str, slug, names[slug])
+            return 'entries', 200, render_entries_page(card)
+
+        match = re.match(r'^/horse/(.+)$', path)
+        if match:
+            slug = match.group(1)
+            outcome = _profile_outcome(config, slug)
+            if outcome == 'missing':
+                return 'profile', 404, '<html><body>Horse not found</body></html>'
+            return 'profile', 200, render_profile_page(config, slug, stale=(outcome == 'stale'))
+
+        if path == '/__stats':
+            with self._stats_lock:
+                return 'stats', 200, json.dumps(self.stats)
+
+        return 'other', 404, '<html><body>Not found</body></html>'
+
+    def respond(self, path, if_none_match=None):
+        """
+        Hata enjeksiyonu, ETag ve Cache-Control dahil tam cevabı üretir
+        Dönen değer: (status, [(header, değer)], payload_bytes)
+        """
+        config = self.config
+        if path != '/__stats' and self._roll(config.throttle_rate):
+            route, status, body = 'throttled', 429, 'Too Many Requests'
+        elif path != '/__stats' and self._roll(config.error_rate):
+            route, status, body = 'error', 500, 'Internal Server Error'
+        else:
+            route, status, body = self.route(path)
+
+        payload = body.encode('utf-8')
+        etag = None
+        if config.etags and status == 200 and route != 'stats':
+            etag = f'"{zlib.crc32(payload):08x}"'
+            if if_none_match == etag:
+                route, status, payload = f"{route}_not_modified", 304, b''
+
+        self._record(route, status)
+        content_type = 'application/json' if route == 'stats' else 'text/html; charset=utf-8'
+        headers = [('Content-Type', content_type), ('Content-Length', str(len(payload)))]
+        if etag:
+            headers.append(('ETag', etag))
+        if config.cache_control and route != 'stats':
+            headers.append(('Cache-Control', config.cache_control))
+        if status == 429:
+            headers.append(('Retry-After', '1'))
+        return status, headers, payload
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                server._record_connection()
+
+            def do_GET(self):
+                delay = server._latency_seconds()
+                if delay:
+                    time.sleep(delay)
+
+                status, headers, payload = server.respond(self.path, self.headers.get('If-None-Match'))
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+class StandInH2Server(StandInServer):
+    """
+    Şifresiz HTTP/2 (h2c, prior knowledge) konuşan stand-in sunucusu - asyncio + h2
+    Aynı bağlantı üzerinden gelen eşzamanlı stream'ler paralel cevaplanır
+    """
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        if not H2_AVAILABLE:
+            raise RuntimeError('HTTP/2 stand-in server requires: pip install h2')
+        self._init_state(config)
+        self._host = host
+        self._port = port
+        self._loop = None
+        self._server = None
+        self._tasks = set()
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self._host}:{self._port}"
+
+    def start(self):
+        """Event loop'u arka plan thread'inde başlatır"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        logger.info(f"Stand-in HRN h2c server listening on {self.base_url}")
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle_connection, self._host, self._port)
+        )
+        self._port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def stop(self):
+        """Açık bağlantıları kapatıp event loop'u durdurur"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+
+    async def _handle_connection(self, reader, writer):
+        self._tasks.add(asyncio.current_task())
+        self._record_connection()
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(
+            client_side=False, header_encoding='utf-8'))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        # Flow control penceresi açılınca bekleyen stream'leri uyandırır
+        window_open = asyncio.Condition()
+        streams = set()
+
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                try:
+                    events = conn.receive_data(data)
+                except h2.exceptions.ProtocolError:
+                    break
+
+                for event in events:
+                    if isinstance(event, h2.events.RequestReceived):
+                        task = asyncio.ensure_future(
+                            self._handle_stream(conn, writer, event.stream_id, dict(event.headers), window_open))
+                        streams.add(task)
+                        task.add_done_callback(streams.discard)
+                    elif isinstance(event, h2.events.WindowUpdated):
+                        async with window_open:
+                            window_open.notify_all()
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        break
+
+                writer.write(conn.data_to_send())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for task in list(streams):
+                task.cancel()
+            writer.close()
+            self._tasks.discard(asyncio.current_task())
+
+    async def _handle_stream(self, conn, writer, stream_id, headers, window_open):
+        delay = self._latency_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+
+        status, response_headers, payload = self.respond(headers.get(':path', '/'), headers.get('if-none-match'))
+        try:
+            conn.send_headers(stream_id, [(':status', str(status))] +
+                              [(name.lower(), value) for name, value in response_headers],
+                              end_stream=not payload)
+            writer.write(conn.data_to_send())
+
+            offset = 0
+            while offset < len(payload):
+                window = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size)
+                if window <= 0:
+                    async with window_open:
+                        await window_open.wait()
+                    continue
+                chunk = payload[offset:offset + window]
+                offset += len(chunk)
+                conn.send_data(stream_id, chunk, end_stream=offset >= len(payload))
+                writer.write(conn.data_to_send())
+            await writer.drain()
+        except (h2.exceptions.StreamClosedError, h2.exceptions.ProtocolError, ConnectionError):
+            # İstemci stream'i veya bağlantıyı kapattı
+            pass
+
+
+def run_load_test(server, date_str, workers=4, http2=None):
+    """
+    Stand-in sunucusuna karşı tam pipeline yük testi:
+    günlük pist listesi -> her pistin entries sayfası -> her atın profili
+    http2 verilirse tüm profil istekleri tek (çoklanmış) session'dan geçer
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from hrn_scraper import HorseRacingNationScraper
+    from horse_profile_scraper import HorseProfileScraper
+
+    track_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http2=http2)
+    started = time.time()
+
+    tracks = track_scraper.get_daily_tracks(date_str)
+    horse_names = []
+    for track in tracks:
+        track_data = track_scraper.scrape_track_data(track['url'], track['name'])
+        if not track_data:
+            continue
+        for race in track_data['races']:
+            for entry in race.get('entries', []):
+                name = entry.get('horse_info', {}).get('horse_name')
+                if name:
+                    horse_names.append(name)
+    entries_elapsed = time.time() - started
+
+    local = threading.local()
+    shared_scraper = HorseProfileScraper(base_url=server.base_url, http2=http2) if http2 else None
+
+    def fetch_profile(horse_name):
+        if shared_scraper is not None:
+            return shared_scraper.scrape_horse_profile(horse_name) is not None
+        if not hasattr(local, 'scraper'):
+            local.scraper = HorseProfileScraper(base_url=server.base_url)
+        return local.scraper.scrape_horse_profile(horse_name) is not None
+
+    profile_started = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        found = sum(1 for ok in executor.map(fetch_profile, horse_names) if ok)
+    profile_elapsed = time.time() - profile_started
+
+    total_elapsed = time.time() - started
+    return {
+        'tracks': len(tracks),
+        'horses': len(horse_names),
+        'profiles_found': found,
+        'entries_seconds': round(entries_elapsed, 2),
+        'profiles_seconds': round(profile_elapsed, 2),
+        'total_seconds': round(total_elapsed, 2),
+        'horses_per_second': round(len(horse_names) / profile_elapsed, 1) if profile_elapsed > 0 else 0,
+        'server_requests': server.stats['requests'],
+        'server_connections': server.stats['connections'],
+        'server_status': dict(server.stats['by_status']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in Horse Racing Nation server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--tracks', type=int, default=5)
+    parser.add_argument('--races', type=int, default=8)
+    parser.add_argument('--horses', type=int, default=8)
+    parser.add_argument('--latency-ms', type=int, default=0)
+    parser.add_argument('--latency-jitter-ms', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--variant-miss-rate', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-etags', action='store_true', help='Do not send ETag / answer 304')
+    parser.add_argument('--cache-control', default=None, help="Cache-Control header, e.g. 'max-age=60'")
+    parser.add_argument('--official-races', type=int, default=0, help='Show results tables for the first N races')
+    parser.add_argument('--http2', action='store_true', help='Serve cleartext HTTP/2 (h2c, prior knowledge)')
+    parser.add_argument('--load-test', action='store_true', help='Run the scrapers against the server and exit')
+    parser.add_argument('--workers', type=int, default=4, help='Profile fetch threads for --load-test')
+    parser.add_argument('--date', default=datetime.now().strftime('%Y-%m-%d'))
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        tracks=args.tracks, races=args.races, horses=args.horses,
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        variant_miss_rate=args.variant_miss_rate, seed=args.seed,
+        etags=not args.no_etags, cache_control=args.cache_control,
+        official_races=args.official_races
+    )
+    server_class = StandInH2Server if args.http2 else StandInServer
+    server = server_class(config, host=args.host, port=0 if args.load_test else args.port)
+
+    if args.load_test:
+        server.start()
+        try:
+            summary = run_load_test(server, args.date, workers=args.workers,
+                                    http2='h2c' if args.http2 else None)
+        finally:
+            server.stop()
+        print(json.dumps(summary, indent=2))
+        return
+
+    server.start()
+    print(f"Stand-in HRN server: {server.base_url}")
+    print(f"  HRN_ENTRIES_BASE_URL={server.base_url}/")
+    print(f"  HRN_PROFILE_BASE_URL={server.base_url}")
+    print(f"  {config.tracks} tracks x {config.races} races x {config.horses} horses")
+    if args.http2:
+        print("  HRN_HTTP2=h2c")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nStopping stand-in server...")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
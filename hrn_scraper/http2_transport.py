@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+HTTP/2 transport - requests.Session için isteğe bağlı, çoklanmış (multiplexed) adapter
+
+requests yalnızca HTTP/1.1 konuşur; her bağlantıda aynı anda tek istek olabilir.
+Bu adapter istekleri httpx (http2=True) üzerinden gönderir, böylece aynı host'a giden
+eşzamanlı profil istekleri tek bir bağlantı üzerinde akar.
+
+- httpx / h2 kurulu değilse adapter bağlanmaz, session düz HTTP/1.1 ile devam eder
+- TLS üzerinde ALPN ile sunucu HTTP/2 desteklemiyorsa httpx kendiliğinden HTTP/1.1'e düşer
+- prior_knowledge=True iken (şifresiz h2c, örn. yerel stand-in) protokol hatası alınan
+  host'lar hatırlanır ve HTTP/1.1 ile tekrar denenir
+
+Kurulum: pip install "httpx[http2]"
+"""
+
+import logging
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    import h2  # noqa: F401 - httpx'in http2 desteği için gerekli
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+
+class Http2Adapter(BaseAdapter):
+    """requests isteklerini paylaşılan bir httpx.Client üzerinden gönderen adapter"""
+
+    def __init__(self, prior_knowledge=False, max_connections=10, timeout=30):
+        super().__init__()
+        if not HTTP2_AVAILABLE:
+            raise RuntimeError('HTTP/2 transport requires: pip install "httpx[http2]"')
+
+        self.prior_knowledge = prior_knowledge
+        # HTTP/2'de host başına tek bağlantı yeterli; limit yalnızca HTTP/1.1'e düşen host'lar için
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        # prior_knowledge: şifresiz bağlantıda doğrudan HTTP/2 (h2c) konuş
+        self._h2_client = httpx.Client(http1=not prior_knowledge, http2=True,
+                                       limits=limits, timeout=timeout)
+        self._h1_client = None
+        self._h1_hosts = set()
+        self._h2_hosts = set()
+        self._lock = threading.Lock()
+        self.counters = {'http2': 0, 'http1': 0, 'fallbacks': 0}
+
+    def _fallback_client(self):
+        with self._lock:
+            if self._h1_client is None:
+                self._h1_client = httpx.Client(http1=True, http2=False)
+            return self._h1_client
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        host = urlparse(request.url).netloc
+        kwargs = {
+            'method': request.method,
+            'url': request.url,
+            'headers': dict(request.headers),
+            'content': request.body,
+        }
+        if timeout is not None:
+            if isinstance(timeout, tuple):
+                kwargs['timeout'] = httpx.Timeout(timeout[1], connect=timeout[0])
+            else:
+                kwargs['timeout'] = timeout
+
+        try:
+            if host in self._h1_hosts:
+                result = self._fallback_client().request(**kwargs)
+            else:
+                try:
+                    result = self._h2_client.request(**kwargs)
+                except (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError) as e:
+                    # Daha önce HTTP/2 cevabı alınmış host'ta bu gerçek bir bağlantı hatasıdır
+                    if not self.prior_knowledge or host in self._h2_hosts:
+                        raise
+                    # Sunucu h2c konuşmuyor - bu host için HTTP/1.1'e düş
+                    with self._lock:
+                        first_fallback = host not in self._h1_hosts
+                        self._h1_hosts.add(host)
+                    if first_fallback:
+                        logger.warning(f"HTTP/2 not supported by {host}, falling back to HTTP/1.1: {e}")
+                    self._count('fallbacks')
+                    result = self._fallback_client().request(**kwargs)
+                else:
+                    if result.http_version == 'HTTP/2' and host not in self._h2_hosts:
+                        with self._lock:
+                            self._h2_hosts.add(host)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e), request=request)
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e), request=request)
+
+        self._count('http2' if result.http_version == 'HTTP/2' else 'http1')
+        return self._build_response(request, result)
+
+    def _build_response(self, request, result):
+        """httpx cevabını requests.Response'a çevirir"""
+        response = requests.Response()
+        response.status_code = result.status_code
+        response._content = result.content
+        response.headers = CaseInsensitiveDict(result.headers.items())
+        response.url = str(result.url)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = result.reason_phrase
+        response.request = request
+        response.elapsed = result.elapsed
+        response.connection = self
+        response.http_version = result.http_version
+        return response
+
+    def close(self):
+        self._h2_client.close()
+        if self._h1_client is not None:
+            self._h1_client.close()
+
+
+def enable_http2(session, prior_knowledge=False):
+    """
+    Session'a HTTP/2 adapter'ını bağlar. httpx/h2 yoksa False döner ve
+    session HTTP/1.1 ile çalışmaya devam eder.
+    """
+    if not HTTP2_AVAILABLE:
+        logger.warning('HTTP/2 requested but httpx[http2] is not installed - using HTTP/1.1')
+        return False
+
+    adapter = Http2Adapter(prior_knowledge=prior_knowledge)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return True
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Disk tabanlı HTTP cache - entries ve profil sayfaları için koşullu GET desteği
+
+- Cache-Control (no-store, no-cache, max-age) dikkate alınır
+- ETag / Last-Modified saklanır, bayat kayıtlar If-None-Match / If-Modified-Since ile doğrulanır
+- URL sınıfına göre TTL: günlük pist listesi dakikalar, entries sayfası post time'a kadar,
+  profil sayfaları çok daha uzun
+- Boyut limiti aşılınca LRU sırasıyla silinir
+- hit / miss / revalidated sayaçları tutulur
+
+Kullanım:
+    cache = HttpCache('http_cache')
+    session = CachedSession(cache)
+    response = session.get(url, timeout=30)
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# URL sınıfı başına varsayılan TTL (saniye)
+DEFAULT_TTLS = {
+    'daily_tracks': 10 * 60,       # Günlük pist listesi - dakikalar
+    'entries': 15 * 60,            # Entries sayfası - scraper post time'a göre uzatır/kısaltır
+    'profile': 24 * 60 * 60,       # Profil sayfaları (geçmiş yarışlar) - çok daha uzun
+    'other': 5 * 60
+}
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Saklanabilir status kodları - 404'ler profil slug varyantları için de işe yarar
+CACHEABLE_STATUSES = (200, 404)
+
+
+def classify_url(url):
+    """URL'yi cache sınıfına ayırır: daily_tracks, entries, profile veya other"""
+    path = urlparse(url).path.rstrip('/')
+    if re.match(r'^/entries-results/\d{4}-\d{2}-\d{2}$', path):
+        return 'daily_tracks'
+    if re.match(r'^/entries-results/[^/]+/\d{4}-\d{2}-\d{2}$', path):
+        return 'entries'
+    if path.startswith('/horse/'):
+        return 'profile'
+    return 'other'
+
+
+def parse_cache_control(header_value):
+    """Cache-Control header'ını {directive: value} sözlüğüne çevirir"""
+    directives = {}
+    if not header_value:
+        return directives
+    for part in header_value.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if '=' in part:
+            key, value = part.split('=', 1)
+            directives[key.strip()] = value.strip().strip('"')
+        else:
+            directives[part] = True
+    return directives
+
+
+class HttpCache:
+    """SQLite dosyasında saklanan, thread-safe HTTP response cache'i"""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'http_cache.sqlite3'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                url_class TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                expires_at REAL,
+                last_access REAL,
+                size INTEGER
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)')
+        self._conn.commit()
+
+        row = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+        self._total_bytes = row[0]
+        self.counters = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0,
+                         'evictions': 0, 'uncacheable': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def lookup(self, url):
+        """Kayıt varsa dict döndürür ve LRU zamanını günceller"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, url_class, status, headers, body, etag, last_modified, stored_at, expires_at '
+                'FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE url = ?', (time.time(), url))
+            self._conn.commit()
+
+        return {
+            'url': row[0],
+            'url_class': row[1],
+            'status': row[2],
+            'headers': json.loads(row[3]),
+            'body': row[4],
+            'etag': row[5],
+            'last_modified': row[6],
+            'stored_at': row[7],
+            'expires_at': row[8]
+        }
+
+    def _ttl_for(self, url_class, headers):
+        """Cache-Control'e göre TTL döndürür; None = saklanmamalı"""
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+        for key in ('s-maxage', 'max-age'):
+            if key in directives:
+                try:
+                    return max(0, int(directives[key]))
+                except (TypeError, ValueError):
+                    pass
+        return self.ttls.get(url_class, self.ttls['other'])
+
+    def store(self, url, response):
+        """Response'u saklar (saklanabilir değilse hiçbir şey yapmaz)"""
+        if response.status_code not in CACHEABLE_STATUSES:
+            return False
+
+        url_class = classify_url(url)
+        ttl = self._ttl_for(url_class, response.headers)
+        if ttl is None:
+            self._count('uncacheable')
+            return False
+
+        body = response.content
+        now = time.time()
+        headers = dict(response.headers)
+        size = len(body)
+
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(url, url_class, status, headers, body, etag, last_modified, stored_at, expires_at, last_access, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, url_class, response.status_code, json.dumps(headers), sqlite3.Binary(body),
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 now, now + ttl, now, size)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self.counters['stores'] += 1
+            self._evict_locked()
+            self._conn.commit()
+        return True
+
+    def freshen(self, url, response_headers):
+        """304 cevabından sonra kaydın süresini yeniler"""
+        entry_class = classify_url(url)
+        ttl = self._ttl_for(entry_class, response_headers)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET stored_at = ?, expires_at = ?, last_access = ?, '
+                'etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?',
+                (now, now + (ttl or 0), now, response_headers.get('ETag'),
+                 response_headers.get('Last-Modified'), url)
+            )
+            self._conn.commit()
+
+    def set_expiry(self, url, expires_at):
+        """Kaydın son geçerlilik zamanını (epoch saniye) değiştirir - örn. entries sayfası için post time"""
+        with self._lock:
+            self._conn.execute('UPDATE responses SET expires_at = ? WHERE url = ?', (expires_at, url))
+            self._conn.commit()
+
+    def _evict_locked(self):
+        """Boyut limiti aşıldıysa en az kullanılan kayıtları siler (lock alınmış olmalı)"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT url, size FROM responses ORDER BY last_access ASC LIMIT 32'
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for url, size in rows:
+                self._conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+                self._total_bytes -= size
+                self.counters['evictions'] += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def clear(self):
+        """Tüm cache'i temizler"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def stats(self):
+        """Sayaçlar ve doluluk bilgisi"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            stats = dict(self.counters)
+        lookups = stats['hits'] + stats['misses'] + stats['revalidated']
+        stats.update({
+            'entries': entries,
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hit_rate': round((stats['hits'] + stats['revalidated']) / lookups * 100, 1) if lookups else 0
+        })
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _build_response(entry, request):
+    """Cache kaydından requests.Response oluşturur"""
+    response = requests.Response()
+    response.status_code = entry['status']
+    response._content = entry['body']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.url = entry['url']
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.reason = 'OK' if entry['status'] == 200 else 'Not Found'
+    response.request = request
+    response.from_cache = True
+    return response
+
+
+class CachedSession(requests.Session):
+    """GET isteklerini HttpCache üzerinden geçiren requests.Session"""
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET' or self.cache is None:
+            return super().request(method, url, *args, **kwargs)
+
+        entry = self.cache.lookup(url)
+        if entry and entry['expires_at'] > time.time():
+            self.cache._count('hits')
+            return _build_response(entry, requests.Request('GET', url).prepare())
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = super().request(method, url, *args, headers=headers, **kwargs)
+
+        if entry and response.status_code == 304:
+            self.cache._count('revalidated')
+            self.cache.freshen(url, response.headers)
+            cached = _build_response(entry, response.request)
+            cached.elapsed = response.elapsed
+            return cached
+
+        self.cache._count('misses')
+        self.cache.store(url, response)
+        response.from_cache = False
+        return response
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """HRN_HTTP_CACHE_DIR tanımlıysa paylaşılan cache'i döndürür, değilse None"""
+    global _default_cache
+    cache_dir = os.environ.get('HRN_HTTP_CACHE_DIR')
+    if not cache_dir:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.cache_dir != cache_dir:
+            max_mb = os.environ.get('HRN_HTTP_CACHE_MAX_MB')
+            max_bytes = int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES
+            _default_cache = HttpCache(cache_dir, max_bytes=max_bytes)
+            logger.info(f"HTTP cache enabled: {cache_dir}")
+        return _default_cache
+
+
+def get_http2_mode():
+    """HRN_HTTP2 env değişkeni: '1' = HTTP/2 (ALPN), 'h2c' = şifresiz prior knowledge, boş = kapalı"""
+    value = os.environ.get('HRN_HTTP2', '').strip().lower()
+    if value in ('', '0', 'false', 'no'):
+        return None
+    return 'h2c' if value == 'h2c' else 'h2'
+
+
+def build_session(http_cache=None, http2=None):
+    """
+    Cache varsa CachedSession, yoksa düz requests.Session döndürür
+    http_cache: None = HRN_HTTP_CACHE_DIR'e göre, False = kapalı
+    http2: None = HRN_HTTP2'ye göre, False = kapalı, True/'h2' = HTTP/2, 'h2c' = prior knowledge
+    """
+    cache = http_cache if http_cache is not None else get_default_cache()
+    session = CachedSession(cache) if cache else requests.Session()
+
+    mode = get_http2_mode() if http2 is None else http2
+    if mode:
+        from http2_transport import enable_http2
+        enable_http2(session, prior_knowledge=(mode == 'h2c'))
+    # Ağdan dönen her yanıt host / URL sınıfı / status metriklerine yazılır (/metrics)
+    from metrics import instrument_session
+    return instrument_session(session)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Toplu çalıştırmalar için tracemalloc bellek profili (tüm pistlerin çekildiği günlerdeki bellek artışı için)
+
+- Her pist bitince checkpoint(pist) bir snapshot alır: o anki / tepe bellek, en çok bellek
+  tutan satırlar ve bir önceki checkpoint'e göre en çok büyüyen satırlar
+- Çalıştırma sonunda rapor loglanır ve (yol verildiyse) JSON olarak yazılır
+- scrape_all_tracks_for_date, multi_track_scraper.scrape_all_tracks ve pipeline:
+  HRN_MEMORY_PROFILE=FILE ya da --memory-profile FILE
+
+Kullanım:
+    with memory_profile('memory.json') as profiler:
+        for track in tracks:
+            ...
+            profiler.checkpoint(track['slug'])
+"""
+
+import json
+import logging
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP = 10
+DEFAULT_FRAMES = 1
+# tracemalloc'un kendi ve import sisteminin ayırdıkları rapora girmez
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def memory_profile_path():
+    """HRN_MEMORY_PROFILE (tanımlı değilse None)"""
+    return os.environ.get('HRN_MEMORY_PROFILE') or None
+
+
+def _site(traceback):
+    frame = traceback[0]
+    parts = frame.filename.replace('\\', '/').split('/')
+    return f"{'/'.join(parts[-2:])}:{frame.lineno}"
+
+
+class MemoryProfiler:
+    """Checkpoint'ler arasında tracemalloc snapshot'larını karşılaştırır"""
+
+    def __init__(self, top=DEFAULT_TOP, frames=DEFAULT_FRAMES):
+        self.top = top
+        self.frames = frames
+        self.checkpoints = []
+        self._owns_tracing = False
+        self._baseline = None
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        tracemalloc.reset_peak()
+        self._baseline = self._previous = self._snapshot()
+        return self
+
+    def checkpoint(self, label):
+        """Snapshot alır; dönüş: {'label', 'current', 'peak', 'growth', 'top_sites', 'top_growth'}"""
+        with self._lock:
+            if self._previous is None:
+                return None
+            snapshot = self._snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            previous_size = sum(stat.size for stat in self._previous.statistics('filename'))
+            size = sum(stat.size for stat in snapshot.statistics('filename'))
+            growth = [stat for stat in snapshot.compare_to(self._previous, 'lineno') if stat.size_diff > 0]
+            record = {
+                'label': str(label),
+                'current': current,
+                'peak': peak,
+                'traced': size,
+                'growth': size - previous_size,
+                'top_sites': [{'site': _site(stat.traceback), 'size': stat.size, 'count': stat.count}
+                              for stat in snapshot.statistics('lineno')[:self.top]],
+                'top_growth': [{'site': _site(stat.traceback), 'size_diff': stat.size_diff,
+                                'count_diff': stat.count_diff} for stat in growth[:self.top]],
+            }
+            self._previous = snapshot
+            self.checkpoints.append(record)
+        logger.info(f"Memory after {label}: {current / 1e6:.1f} MB (peak {peak / 1e6:.1f} MB, "
+                    f"{record['growth'] / 1e6:+.2f} MB)")
+        return record
+
+    def stop(self):
+        """Son checkpoint'i ('total', başlangıca göre) ekler, kendi başlattığı tracemalloc'u durdurur"""
+        if self._baseline is not None:
+            self._previous = self._baseline
+            self.checkpoint('total')
+            self._baseline = self._previous = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        return self.checkpoints
+
+    def report(self):
+        """İnsan okuyabilir özet: checkpoint başına bellek ve en çok büyüyen satırlar"""
+        lines = [f"{'Checkpoint':<28} {'Current MB':>11} {'Peak MB':>9} {'Growth MB':>10}"]
+        for record in self.checkpoints:
+            lines.append(f"{record['label'][:28]:<28} {record['current'] / 1e6:>11.2f} "
+                         f"{record['peak'] / 1e6:>9.2f} {record['growth'] / 1e6:>+10.2f}")
+        if self.checkpoints:
+            final = self.checkpoints[-1]
+            lines.append(f"En çok büyüyen satırlar / top growth ({final['label']}):")
+            lines.extend(f"  {item['size_diff'] / 1024:>10.1f} KiB {item['count_diff']:>+8} blocks  {item['site']}"
+                         for item in final['top_growth'])
+        return '\n'.join(lines)
+
+    def write(self, path):
+        try:
+            from utils import write_json_atomic
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            write_json_atomic(path, {'top': self.top, 'checkpoints': self.checkpoints})
+            logger.info(f"Memory profile written: {path}")
+            return True
+        except OSError as e:
+            logger.error(f"Bellek profili yazılamadı ({path}): {e}")
+            return False
+
+
+@contextmanager
+def memory_profile(path=None, top=DEFAULT_TOP, enabled=True):
+    """
+    Profili başlatır ve yield eder; çıkışta rapor loglanır, path verildiyse JSON yazılır
+    enabled=False: None yield eder (çağıran taraf `if profiler:` ile checkpoint atlar)
+    """
+    if not enabled:
+        yield None
+        return
+    profiler = MemoryProfiler(top=top).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        logger.info(f"Memory profile:\n{profiler.report()}")
+        if path:
+            profiler.write(path)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Süreç içi metrikler - Prometheus text formatında /metrics (harici servis gerekmez)
+
+- Counter / Gauge / Histogram: isim + sabit etiket isimleri, thread-safe
+- Collector'lar: okuma anında değer üreten fonksiyonlar (cache sayaçları, kuyruk doluluğu);
+  aynı isimle yeniden kaydedilen collector öncekinin yerine geçer
+
+Kullanım:
+    FETCHES.inc(host='...', url_class='entries', variant='', status='200')
+    register_collector('pipeline', queue_depth_collector({'pages': pages_queue}))
+    with PARSE_SECONDS.time(page_type='profile'):
+        ...
+    text = render()
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# scrape_horse_profile'ın denediği slug varyantları: Ad, Ad_1 ... Ad_5
+PROFILE_VARIANT_PATTERN = re.compile(r'^/horse/[^/]+?(?:_(\d))?/?$')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} etiketleri {self.labelnames} olmalı, verilen: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """[(son ek, etiket değerleri, ek etiketler, değer)]"""
+        with self._lock:
+            return [('', key, None, value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state['count'] if state else 0
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state['counts']):
+                    cumulative += count
+                    samples.append(('_bucket', key, {'le': _format_value(bound)}, cumulative))
+                samples.append(('_sum', key, None, state['sum']))
+                samples.append(('_count', key, None, state['count']))
+        return samples
+
+
+class Registry:
+    """Metrikler ve collector'lar; render() Prometheus text formatı"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, key, func):
+        """func() -> [(metrik adı, tür, açıklama, etiket isimleri, [(etiket değerleri, değer)])]"""
+        with self._lock:
+            self._collectors[key] = func
+
+    def unregister_collector(self, key):
+        with self._lock:
+            self._collectors.pop(key, None)
+
+    def _collected(self):
+        """Collector çıktıları isimle birleştirilmiş: {ad: (tür, açıklama, etiket isimleri, örnekler)}"""
+        with self._lock:
+            collectors = list(self._collectors.items())
+        families = {}
+        for key, func in collectors:
+            try:
+                for name, kind, documentation, labelnames, samples in func():
+                    families.setdefault(name, (kind, documentation, tuple(labelnames), []))[3].extend(samples)
+            except Exception as e:
+                logger.error(f"Metrik collector hatası ({key}): {e}")
+        return families
+
+    def render(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, (kind, documentation, labelnames, samples) in sorted(self._collected().items()):
+            lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"])
+            for values, value in samples:
+                lines.append(f"{name}{_format_labels(labelnames, values)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+API_REQUESTS = REGISTRY.counter('hrn_api_requests_total', 'Flask requests by endpoint, method and status',
+                                ('endpoint', 'method', 'status'))
+API_SECONDS = REGISTRY.histogram('hrn_api_request_duration_seconds', 'Flask request latency', ('endpoint',))
+FETCHES = REGISTRY.counter('hrn_http_fetches_total', 'Network HTTP responses by host, URL class and status',
+                           ('host', 'url_class', 'variant', 'status'))
+FETCH_SECONDS = REGISTRY.histogram('hrn_http_fetch_duration_seconds', 'Network HTTP latency until headers',
+                                   ('host', 'url_class', 'variant'))
+PROFILE_VARIANT_DEPTH = REGISTRY.counter('hrn_profile_variant_depth_total',
+                                         'Profile lookups by matching slug variant (0 = base slug, none = not found)',
+                                         ('depth',))
+PARSE_SECONDS = REGISTRY.histogram('hrn_parse_duration_seconds', 'HTML parse time per page type', ('page_type',))
+SCORE_SECONDS = REGISTRY.histogram('hrn_score_duration_seconds', 'Turkish style scoring time per call', ('source',))
+SCORED_HORSES = REGISTRY.counter('hrn_scored_horses_total', 'Horses scored', ('source',))
+
+
+def url_labels(url):
+    """URL -> (host, url_class, variant); variant yalnızca profil sayfalarında ('0' = temel slug)"""
+    from http_cache import classify_url
+
+    parsed = urlparse(url)
+    url_class = classify_url(url)
+    variant = ''
+    if url_class == 'profile':
+        match = PROFILE_VARIANT_PATTERN.match(parsed.path)
+        variant = (match.group(1) or '0') if match else ''
+    return parsed.netloc or 'unknown', url_class, variant
+
+
+def observe_response(response, *args, **kwargs):
+    """requests 'response' hook'u: ağdan gelen her yanıt (cache hit'leri ağa çıkmaz)"""
+    try:
+        host, url_class, variant = url_labels(response.url)
+        FETCHES.inc(host=host, url_class=url_class, variant=variant, status=str(response.status_code))
+        if response.elapsed is not None:
+            FETCH_SECONDS.observe(response.elapsed.total_seconds(), host=host, url_class=url_class, variant=variant)
+    except Exception as e:
+        logger.error(f"Fetch metriği kaydedilemedi: {e}")
+    return response
+
+
+def instrument_session(session):
+    """Session'ın tüm ağ yanıtlarını fetch metriklerine yazar"""
+    if observe_response not in session.hooks['response']:
+        session.hooks['response'].append(observe_response)
+    return session
+
+
+def _cache_samples():
+    """Paylaşılan cache'lerin sayaçları (okuma anında)"""
+    from http_cache import get_default_cache
+    from parse_cache import get_parse_cache
+    from race_score_cache import get_race_score_cache
+
+    caches = [('parse', get_parse_cache().stats()), ('race_score', get_race_score_cache().stats())]
+    http_cache = get_default_cache()
+    if http_cache is not None:
+        stats = http_cache.stats()
+        # Doğrulanan (304) kayıt da ağdan gövde indirmeden cache'ten döner
+        caches.append(('http', dict(stats, hits=stats['hits'] + stats['revalidated'])))
+    return [
+        ('hrn_cache_hits_total', 'counter', 'Cache hits', ('cache',),
+         [((name, ), stats['hits']) for name, stats in caches]),
+        ('hrn_cache_misses_total', 'counter', 'Cache misses', ('cache',),
+         [((name, ), stats['misses']) for name, stats in caches]),
+        ('hrn_cache_hit_ratio', 'gauge', 'Cache hit ratio (0-1)', ('cache',),
+         [((name, ), round(stats['hit_rate'] / 100, 4)) for name, stats in caches]),
+    ]
+
+
+REGISTRY.register_collector('caches', _cache_samples)
+
+
+def register_collector(key, func):
+    REGISTRY.register_collector(key, func)
+
+
+def unregister_collector(key):
+    REGISTRY.unregister_collector(key)
+
+
+def queue_depth_collector(queues):
+    """{kuyruk adı: queue.Queue benzeri (qsize) ya da len() veren fonksiyon} -> hrn_queue_depth collector'ı"""
+    def collect():
+        samples = [((name, ), source() if callable(source) else source.qsize()) for name, source in queues.items()]
+        return [('hrn_queue_depth', 'gauge', 'Jobs waiting in work queues', ('queue',), samples)]
+    return collect
+
+
+def render():
+    return REGISTRY.render()
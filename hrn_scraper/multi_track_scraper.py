@@ -11,95 +11,25 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from datetime import datetime, timedelta
 from single_track_scraper import scrape_single_track
 from scrape_all_horse_profiles import read_horses_from_csv
-from horse_profile_scraper import HorseProfileScraper
+from horse_profile_scraper import HorseProfileScraper, get_profile_base_url
+from essential_journal import EssentialJournal
+from memory_snapshots import memory_profile, memory_profile_path
+from hrn_scraper import get_entries_base_url
+from track_registry import get_track_registry
 import requests
 from bs4 import BeautifulSoup
 import logging
 import csv
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Logging ayarları
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Tüm pistlerin bilgileri
-TRACKS = {
-    1: {
-        'name': 'Santa Anita',
-        'slug': 'santa-anita',
-        'description': 'Santa Anita Park, California'
-    },
-    2: {
-        'name': 'Woodbine',
-        'slug': 'woodbine', 
-        'description': 'Woodbine Racetrack, Ontario'
-    },
-    3: {
-        'name': 'Laurel Park',
-        'slug': 'laurel-park',
-        'description': 'Laurel Park, Maryland'
-    },
-    4: {
-        'name': 'Belmont at Aqueduct',
-        'slug': 'belmont-at-aqueduct',
-        'description': 'Belmont at Aqueduct, New York'
-    },
-    5: {
-        'name': 'Belterra Park',
-        'slug': 'belterra-park',
-        'description': 'Belterra Park Gaming, Ohio'
-    },
-    6: {
-        'name': 'Churchill Downs',
-        'slug': 'churchill-downs',
-        'description': 'Churchill Downs, Kentucky'
-    },
-    7: {
-        'name': 'Gulfstream Park',
-        'slug': 'gulfstream-park',
-        'description': 'Gulfstream Park, Florida'
-    },
-    8: {
-        'name': 'Delaware Park',
-        'slug': 'delaware-park',
-        'description': 'Delaware Park, Delaware'
-    },
-    9: {
-        'name': 'Lethbridge - Rmtc',
-        'slug': 'lethbridge-rmtc',
-        'description': 'Lethbridge Racing, Alberta'
-    },
-    10: {
-        'name': 'Fairmount Park',
-        'slug': 'fairmount-park',
-        'description': 'Fairmount Park, Illinois'
-    },
-    11: {
-        'name': 'Hastings Park',
-        'slug': 'hastings-park',
-        'description': 'Hastings Racecourse, British Columbia'
-    },
-    12: {
-        'name': 'Charles Town',
-        'slug': 'charles-town',
-        'description': 'Charles Town Races, West Virginia'
-    },
-    13: {
-        'name': 'Remington Park',
-        'slug': 'remington-park',
-        'description': 'Remington Park, Oklahoma'
-    },
-    14: {
-        'name': 'Albuquerque Downs',
-        'slug': 'albuquerque-downs',
-        'description': 'Albuquerque Downs, New Mexico'
-    },
-    15: {
-        'name': 'Los Alamitos',
-        'slug': 'los-alamitos',
-        'description': 'Los Alamitos Race Course, California'
-    }
-}
+# Tüm pistlerin bilgileri - track_registry'den numaralı menü
+track_registry = get_track_registry()
+TRACKS = {i: track for i, track in enumerate(track_registry.unique_tracks(), 1)}
 
 def show_menu():
     """Pist seçim menüsünü gösterir"""
@@ -146,36 +76,63 @@ def get_date_input():
         print("❌ Geçersiz seçim! Varsayılan olarak bugün kullanılacak.")
         return datetime.now().strftime("%Y-%m-%d")
 
-def scrape_track_data(track_info, date_str):
-    """Tek bir pist için veri çeker"""
-    print(f"\n🔄 {track_info['name']} verisi çekiliyor...")
-    print(f"   Tarih: {date_str}")
+def scrape_track_data(track_info, date_str, verbose=True):
+    """
+    Tek bir pist için veri çeker ve pist özetini döndürür:
+    {'track', 'name', 'status', 'races', 'horses', 'failures', 'seconds', 'error'}
+    status: ok / no_races / failed
+    """
+    say = print if verbose else (lambda *args, **kwargs: None)
+    say(f"\n🔄 {track_info['name']} verisi çekiliyor...")
+    say(f"   Tarih: {date_str}")
+    
+    summary = {'track': track_info['slug'], 'name': track_info['name'], 'status': 'failed',
+               'races': 0, 'horses': 0, 'failures': 0, 'seconds': 0.0, 'error': None}
+    started = time.time()
     
     try:
-        # Önce yarış olup olmadığını kontrol et
-        if not check_if_races_exist(track_info['slug'], date_str):
-            print(f"⚠️  {track_info['name']} - Bu tarihte yarış yok")
-            return
+        # Önce yarış olup olmadığını kontrol et - günlük liste varsa istek atılmaz,
+        # liste alınamadıysa eski yöntemle pist sayfası yoklanır
+        active = track_registry.is_active(track_info['slug'], date_str)
+        if active is None:
+            active = check_if_races_exist(track_info['slug'], date_str)
+        if not active:
+            say(f"⚠️  {track_info['name']} - Bu tarihte yarış yok")
+            summary['status'] = 'no_races'
+            return summary
         
         # Entries ve results çek
         success = scrape_single_track(track_info['slug'], date_str)
         
         if success:
-            print(f"✅ {track_info['name']} - Yarış verileri başarıyla çekildi")
+            say(f"✅ {track_info['name']} - Yarış verileri başarıyla çekildi")
             
             # At profil verilerini çek
             entries_file = f"{track_info['slug']}_{date_str.replace('-', '_')}_{track_info['slug']}_entries.csv"
             if os.path.exists(entries_file):
-                print(f"🐎 At profil verileri çekiliyor...")
-                scrape_horse_profiles_for_track(entries_file)
+                with open(entries_file, 'r', encoding='utf-8') as f:
+                    rows = list(csv.DictReader(f))
+                summary['horses'] = len(rows)
+                summary['races'] = len({row.get('race_number') for row in rows})
+                
+                say(f"🐎 At profil verileri çekiliyor...")
+                successful = scrape_horse_profiles_for_track(entries_file, verbose=verbose) or 0
+                summary['failures'] = summary['horses'] - successful
+                summary['status'] = 'ok'
             else:
-                print(f"⚠️  Entries dosyası bulunamadı: {entries_file}")
+                say(f"⚠️  Entries dosyası bulunamadı: {entries_file}")
+                summary['error'] = 'entries file missing'
         else:
-            print(f"❌ {track_info['name']} - Veri çekilemedi")
+            say(f"❌ {track_info['name']} - Veri çekilemedi")
             
     except Exception as e:
         logger.error(f"Error scraping {track_info['name']}: {e}")
-        print(f"❌ {track_info['name']} - Hata: {str(e)}")
+        say(f"❌ {track_info['name']} - Hata: {str(e)}")
+        summary['error'] = str(e)
+    finally:
+        summary['seconds'] = round(time.time() - started, 2)
+    
+    return summary
 
 def check_if_races_exist(track_slug, date_str):
     """Belirli bir pistte belirli bir tarihte yarış olup olmadığını kontrol et"""
@@ -189,7 +146,7 @@ def check_if_races_exist(track_slug, date_str):
         })
         
         # İlk entries sayfasını dene (daha güvenilir)
-        entries_url = f"https://entries.horseracingnation.com/entries-results/{track_slug}/{date_str}"
+        entries_url = f"{get_entries_base_url()}entries-results/{track_slug}/{date_str}"
         
         try:
             response = session.get(entries_url, timeout=15)
@@ -204,7 +161,7 @@ def check_if_races_exist(track_slug, date_str):
             pass
         
         # Eğer entries sayfası çalışmazsa normal track sayfasını dene
-        track_url = f"https://www.horseracingnation.com/tracks/{track_slug}/{date_str}"
+        track_url = f"{get_profile_base_url()}/tracks/{track_slug}/{date_str}"
         response = session.get(track_url, timeout=10)
         
         if response.status_code == 200:
@@ -218,15 +175,21 @@ def check_if_races_exist(track_slug, date_str):
         logger.warning(f"Error checking races for {track_slug}: {e}")
         return True  # Hata durumunda çekmeyi dene
 
-def scrape_horse_profiles_for_track(entries_file):
-    """Belirli bir pist için essential at profil verilerini çeker"""
+def scrape_horse_profiles_for_track(entries_file, verbose=True):
+    """Belirli bir pist için essential at profil verilerini çeker (verbose=False: paralel modda sessiz)"""
+    say = print if verbose else (lambda *args, **kwargs: None)
     try:
         # Çıktı dosya adlarını hazırla
         base_name = entries_file.replace('_entries.csv', '')
         output_csv = f"{base_name}_essential.csv"
-        output_json = f"{base_name}_essential.json"
         
-        print(f"   📝 Essential çıktı: {output_csv}")
+        say(f"   📝 Essential çıktı: {output_csv}")
+        
+        # Yarıda kalmış önceki çalıştırmada tamamlanan atlar günlükten gelir
+        journal = EssentialJournal(base_name)
+        journaled = journal.load()
+        if journaled:
+            say(f"   ↩️ Günlükten devam: {len(journaled)} at zaten tamamlanmış")
         
         # At profil scraper'ı başlat
         scraper = HorseProfileScraper()
@@ -241,7 +204,7 @@ def scrape_horse_profiles_for_track(entries_file):
             horses = list(reader)
         
         total_horses = len(horses)
-        print(f"   🏇 {total_horses} at bulundu, essential veriler çekiliyor...")
+        say(f"   🏇 {total_horses} at bulundu, essential veriler çekiliyor...")
         
         for i, row in enumerate(horses, 1):
             horse_name = row.get('horse_name', '').strip()
@@ -249,19 +212,23 @@ def scrape_horse_profiles_for_track(entries_file):
             program_number = row.get('program_number', '').strip()
             
             if not horse_name:
-                print(f"   [{i:3d}/{total_horses}] ⚠️ Boş at ismi atlanıyor")
+                say(f"   [{i:3d}/{total_horses}] ⚠️ Boş at ismi atlanıyor")
                 continue
                 
-            print(f"   [{i:3d}/{total_horses}] {horse_name[:20]:<20}", end=" ... ")
+            say(f"   [{i:3d}/{total_horses}] {horse_name[:20]:<20}", end=" ... ")
+            
+            if horse_name.lower() in journaled:
+                results.append(dict(journaled[horse_name.lower()],
+                                    race_number=race_number, program_number=program_number))
+                successful += 1
+                say("↩️")
+                continue
             
             try:
-                # At profil verisini çek
-                horse_data = scraper.scrape_horse_profile(horse_name)
+                # En son yarış verilerini al (resmi sonuç kaydı varsa profil çekilmez)
+                latest_race = scraper.latest_race(horse_name, last_start=row.get('last_start'))
                 
-                if horse_data and horse_data.get('race_history') and len(horse_data['race_history']) > 0:
-                    # En son yarış verilerini al
-                    latest_race = horse_data['race_history'][0]  # İlk eleman en son yarış
-                    
+                if latest_race:
                     # Sonucu hazırla
                     result = {
                         'race_number': race_number,
@@ -273,12 +240,13 @@ def scrape_horse_profiles_for_track(entries_file):
                     }
                     
                     results.append(result)
+                    journal.append(result)
                     successful += 1
-                    print("✅")
+                    say("✅")
                     
                 else:
                     failed += 1
-                    print("❌")
+                    say("❌")
                     
                     # Başarısız durumda da temel bilgileri ekle
                     result = {
@@ -293,7 +261,7 @@ def scrape_horse_profiles_for_track(entries_file):
                     
             except Exception as e:
                 failed += 1
-                print(f"❌")
+                say(f"❌")
                 
                 # Hata durumunda da temel bilgileri ekle
                 result = {
@@ -306,10 +274,9 @@ def scrape_horse_profiles_for_track(entries_file):
                 }
                 results.append(result)
         
-        print(f"   📊 Sonuç: ✅{successful} / ❌{failed} / 📋{len(results)}")
+        say(f"   📊 Sonuç: ✅{successful} / ❌{failed} / 📋{len(results)}")
         
         if results:
-            # CSV dosyasına kaydet
             fieldnames = [
                 'race_number',
                 'program_number', 
@@ -319,28 +286,22 @@ def scrape_horse_profiles_for_track(entries_file):
                 'latest_time'
             ]
             
-            with open(output_csv, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(results)
-            
-            # JSON dosyasına kaydet
-            with open(output_json, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            # CSV ve JSON atomik yazılır, ardından günlük silinir
+            journal.finalize(results, fieldnames)
             
             # Başarılı örnekleri göster
             successful_examples = [r for r in results if r['latest_time']]
             if successful_examples:
-                print(f"   🎯 {len(successful_examples)}/{len(results)} kayıtta tam veri mevcut")
+                say(f"   🎯 {len(successful_examples)}/{len(results)} kayıtta tam veri mevcut")
                 
                 # İlk 2 örneği göster
                 for i, result in enumerate(successful_examples[:2], 1):
-                    print(f"      {i}. {result['horse_name']}: "
+                    say(f"      {i}. {result['horse_name']}: "
                           f"{result['latest_surface']}, "
                           f"{result['latest_distance']}, "
                           f"{result['latest_time']}")
             
-            print(f"   💾 Essential veriler kaydedildi: {output_csv}")
+            say(f"   💾 Essential veriler kaydedildi: {output_csv}")
             
         return successful
         
@@ -348,28 +309,83 @@ def scrape_horse_profiles_for_track(entries_file):
         output_csv = entries_file.replace('_entries.csv', '_entries_horse_profiles.csv')
         scraper.save_profiles_to_csv(output_csv, horses_data)
         
-        print(f"   ✅ {successful_scrapes}/{len(horse_names)} at profili başarıyla çekildi")
-        print(f"   💾 Sonuçlar kaydedildi: {output_csv}")
+        say(f"   ✅ {successful_scrapes}/{len(horse_names)} at profili başarıyla çekildi")
+        say(f"   💾 Sonuçlar kaydedildi: {output_csv}")
         
     except Exception as e:
         logger.error(f"Error processing horse profiles: {e}")
-        print(f"   ❌ At profilleri çekilirken hata: {str(e)}")
+        say(f"   ❌ At profilleri çekilirken hata: {str(e)}")
 
-def scrape_all_tracks(date_str):
-    """Tüm pistlerin verilerini çeker"""
+def scrape_all_tracks(date_str, parallel=False, max_workers=4, streaming=False, memory_profile_file=None):
+    """
+    Tüm pistlerin verilerini çeker
+    parallel=True: her pist ayrı bir worker'da (kendi scraper/session'ları ile) işlenir;
+    yavaş veya hatalı bir pist diğerlerini bekletmez. Pist bazlı özet listesi döner.
+    streaming=True: pipeline.StreamingPipeline ile atlar hazır oldukça skorlanıp yazılır
+    (essential dosyasına ek olarak _turkish_style.csv üretilir)
+    memory_profile_file (ya da HRN_MEMORY_PROFILE): pist başına tracemalloc snapshot raporu
+    """
     print(f"\n🚀 TÜM PİSTLERİN VERİSİ ÇEKİLİYOR - {date_str}")
     print("="*50)
     
-    total_tracks = len(TRACKS)
-    successful_tracks = 0
+    # Günlük liste varsa yalnızca o gün yarışan pistler (menüde olmayanlar dahil) işlenir
+    active = track_registry.active_tracks(date_str)
+    if active is not None:
+        tracks = [{'name': track['name'], 'slug': slug} for slug, track in active.items()]
+        print(f"   Günlük listede {len(tracks)} aktif pist var")
+    else:
+        tracks = list(TRACKS.values())
     
-    for track_id, track_info in TRACKS.items():
-        print(f"\n📍 {track_id}/{total_tracks}: {track_info['name']}")
-        scrape_track_data(track_info, date_str)
-        successful_tracks += 1
+    total_tracks = len(tracks)
+    started = time.time()
+    summaries = []
+    memory_profile_file = memory_profile_file or memory_profile_path()
     
+    if streaming:
+        from pipeline import StreamingPipeline
+        print(f"   Akış modu / streaming mode: {max_workers * 2} profil worker")
+        # Pipeline pist başına checkpoint'i kendi alır
+        pipeline = StreamingPipeline(date_str, profile_workers=max_workers * 2,
+                                     memory_profile_file=memory_profile_file)
+        summaries = pipeline.run(tracks)
+        print(f"   İlk yarış yazıldı / first race written: {pipeline.stats['first_race_seconds']}s")
+    else:
+        with memory_profile(memory_profile_file, enabled=bool(memory_profile_file)) as profiler:
+            if parallel:
+                print(f"   Paralel mod: {max_workers} worker")
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {executor.submit(scrape_track_data, track_info, date_str, False): track_info
+                               for track_info in tracks}
+                    for done, future in enumerate(as_completed(futures), 1):
+                        summary = future.result()
+                        summaries.append(summary)
+                        print(f"📍 {done}/{total_tracks}: {summary['name']} - {summary['status']} "
+                              f"({summary['seconds']:.1f}s)")
+                        if profiler:
+                            profiler.checkpoint(summary['track'])
+            else:
+                for track_id, track_info in enumerate(tracks, 1):
+                    print(f"\n📍 {track_id}/{total_tracks}: {track_info['name']}")
+                    summaries.append(scrape_track_data(track_info, date_str))
+                    if profiler:
+                        profiler.checkpoint(track_info['slug'])
+        if profiler:
+            print(f"\n🧠 Bellek profili / memory profile:\n{profiler.report()}")
+    
+    print_track_summary(summaries, time.time() - started)
+    return summaries
+
+def print_track_summary(summaries, elapsed):
+    """Pist bazlı özet tablosu"""
     print(f"\n🎯 ÖZET / SUMMARY:")
-    print(f"   İşlenen pistler / Processed tracks: {successful_tracks}/{total_tracks}")
+    print(f"   {'Pist':<28} {'Durum':<9} {'Yarış':>5} {'At':>5} {'Hata':>5} {'Süre':>8}")
+    for summary in sorted(summaries, key=lambda s: s['name']):
+        print(f"   {summary['name'][:28]:<28} {summary['status']:<9} {summary['races']:>5} "
+              f"{summary['horses']:>5} {summary['failures']:>5} {summary['seconds']:>7.1f}s")
+    
+    ok_tracks = sum(1 for s in summaries if s['status'] == 'ok')
+    print(f"   İşlenen pistler / Processed tracks: {ok_tracks}/{len(summaries)}")
+    print(f"   Toplam süre / Total time: {elapsed:.1f}s")
     print("   Tüm veriler ilgili CSV dosyalarına kaydedildi")
 
 def main():
@@ -395,7 +411,8 @@ def main():
             
             # Tüm pistler
             if choice == len(TRACKS) + 1:
-                scrape_all_tracks(date_str)
+                mode_choice = input("Mod / Mode (1: sıralı, 2: paralel, 3: akış/streaming) [1]: ").strip()
+                scrape_all_tracks(date_str, parallel=mode_choice == '2', streaming=mode_choice == '3')
             
             # Tek pist
             elif choice in TRACKS:
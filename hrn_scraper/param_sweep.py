@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Turkish style skorlama sabitleri için paralel parametre taraması
+
+Arşivdeki (archive.py) sonuçlu yarışlar backtester.load_day ile bir kez okunur ve
+vector_scorer.prepare ile dizilere çevrilir. Her aday parametre seti vector_scorer.score ile
+skorlanır, 1. sıradaki atlar resmi sonuçla karşılaştırılır (hit_rate, top3_rate, win/place/show ROI).
+Adaylar ProcessPoolExecutor ile süreçlere dağıtılır; geçmiş veri her worker'a bir kez gönderilir.
+
+- Grid: {parametre: [değerler]} kartezyen çarpımı (varsayılan DEFAULT_GRID, --grid dosyası)
+- Random: SEARCH_SPACE aralıklarından düzgün örnekleme (--random N --seed)
+- Zemin çarpanları 'surface_factors.<önceki>.<bugünkü>' isimleriyle taranır
+- Adaylar geçerli config'in (scoring_config.py) üzerine uygulanır; config'in kendisi her zaman
+  aday listesinde ('baseline')
+- En iyi set, HRN_SCORING_CONFIG olarak kullanılabilen sürümlü JSON olarak yazılır
+
+Kullanım:
+    python param_sweep.py --since 2025-04-01 --until 2025-09-28 --random 500 --output best_params.json
+    python backtester.py --params best_params.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from archive import DEFAULT_ARCHIVE_DIR
+from backtester import BASE_STAKE, available_days, load_day
+from scoring_config import get_scoring_config, get_scoring_params
+from utils import write_json_atomic
+import vector_scorer
+
+logger = logging.getLogger(__name__)
+
+OBJECTIVES = ('hit_rate', 'top3_rate', 'win_roi', 'place_roi', 'show_roi')
+DEFAULT_OBJECTIVE = 'hit_rate'
+
+DEFAULT_GRID = {
+    'position_penalty': [0.1, 0.2, 0.3, 0.4, 0.5],
+    'distance_longer_slope': [0.02, 0.04, 0.06],
+    'distance_shorter_slope': [0.015, 0.03, 0.045]
+}
+
+# Random search aralıkları (alt, üst)
+SEARCH_SPACE = {
+    'position_penalty': (0.0, 0.6),
+    'distance_longer_slope': (0.0, 0.08),
+    'distance_shorter_slope': (0.0, 0.06),
+    'distance_factor_min': (0.7, 1.0),
+    'distance_factor_max': (1.0, 1.3),
+    'surface_factors.Dirt.Turf': (0.98, 1.06),
+    'surface_factors.Dirt.Synthetic': (0.97, 1.05),
+    'surface_factors.Turf.Dirt': (0.94, 1.02),
+    'surface_factors.Turf.Synthetic': (0.97, 1.05),
+    'surface_factors.Synthetic.Dirt': (0.95, 1.03),
+    'surface_factors.Synthetic.Turf': (0.99, 1.07)
+}
+
+
+def apply_overrides(overrides, base=None):
+    """{'position_penalty': 0.2, 'surface_factors.Dirt.Turf': 1.03} -> tam parametre seti (taban: geçerli config)"""
+    params = json.loads(json.dumps(base or get_scoring_params()))
+    for name, value in overrides.items():
+        if name.startswith('surface_factors.'):
+            _, previous, current = name.split('.', 2)
+            params['surface_factors'].setdefault(previous, {})[current] = float(value)
+        elif name in params and name != 'surface_factors':
+            params[name] = float(value)
+        else:
+            raise ValueError(f"Bilinmeyen parametre: {name}")
+    return params
+
+
+def grid_candidates(grid):
+    """Grid'in kartezyen çarpımı: [{parametre: değer}]"""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_candidates(count, space=None, seed=None):
+    """Aralıklardan düzgün örneklenmiş count aday (4 ondalık)"""
+    space = space or SEARCH_SPACE
+    rng = random.Random(seed)
+    return [{name: round(rng.uniform(low, high), 4) for name, (low, high) in sorted(space.items())}
+            for _ in range(count)]
+
+
+def _history_day(archive_dir, date_str, track):
+    """Bir günün yarışları -> düz at listesi + yarış/sonuç dizileri için satırlar"""
+    horses, outcomes = [], []
+    for (track_code, race_number), race in sorted(load_day(archive_dir, date_str, track).items()):
+        distance, surface = race['info']
+        for horse in race['horses']:
+            key = horse['horse_key']
+            position = race['finishers'].get(key, 0)
+            payouts = race['payouts']
+            horses.append(dict(horse, entry_distance=distance, entry_surface=surface))
+            outcomes.append((f"{date_str}/{track_code}/{race_number}", position,
+                             payouts.get('win', 0.0) if position == 1 else 0.0,
+                             payouts.get(('place', key), 0.0), payouts.get(('show', key), 0.0)))
+    return horses, outcomes
+
+
+def load_history(archive_dir=DEFAULT_ARCHIVE_DIR, since=None, until=None, track=None, workers=None):
+    """
+    Aralıktaki sonuçlu yarışları tek seferde skorlamaya hazır hale getirir
+    Dönüş: vector_scorer.prepare çıktısı + 'race', 'finish', 'win_payout', 'place_payout',
+           'show_payout' dizileri ve 'days', 'races' sayıları
+    """
+    days = available_days(archive_dir, since, until)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(days) <= 1:
+        loaded = [_history_day(archive_dir, date_str, track) for date_str in days]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(days))) as executor:
+            loaded = list(executor.map(_history_day, [archive_dir] * len(days), days, [track] * len(days)))
+
+    horses = [horse for day_horses, _ in loaded for horse in day_horses]
+    outcomes = [outcome for _, day_outcomes in loaded for outcome in day_outcomes]
+    history = vector_scorer.prepare(horses)
+    race_ids = {}
+    history['race'] = np.array([race_ids.setdefault(outcome[0], len(race_ids)) for outcome in outcomes],
+                               dtype=np.int64)
+    for i, name in enumerate(('finish', 'win_payout', 'place_payout', 'show_payout'), 1):
+        history[name] = np.array([outcome[i] for outcome in outcomes],
+                                 dtype=np.int64 if name == 'finish' else np.float64)
+    history['days'] = len(days)
+    history['races'] = len(race_ids)
+    return history
+
+
+def _roi(returns, bets):
+    stake = BASE_STAKE * bets
+    return round(100.0 * (returns - stake) / stake, 2) if stake else None
+
+
+def evaluate(history, params=None):
+    """Bir parametre setinin geçmiş yarışlardaki başarısı (backtester turkish_style ile aynı tanımlar)"""
+    scores = vector_scorer.score(history, params)
+    scores = np.where(np.isnan(scores), np.inf, scores)
+    race = history['race']
+    # Yarış içinde skora göre sırala (eşitlikte giriş sırası korunur), her yarışın ilk atı
+    order = np.lexsort((scores, race))
+    first = np.flatnonzero(np.r_[True, race[order][1:] != race[order][:-1]]) if len(order) else order
+    picks = order[first]
+    picks = picks[np.isfinite(scores[picks])]
+
+    races = len(picks)
+    finish = history['finish'][picks]
+    placed = (finish >= 1) & (finish <= 2)
+    shown = (finish >= 1) & (finish <= 3)
+    return {
+        'races': races,
+        'hit_rate': round(100.0 * np.count_nonzero(finish == 1) / races, 2) if races else None,
+        'top3_rate': round(100.0 * np.count_nonzero(shown) / races, 2) if races else None,
+        'win_roi': _roi(float(history['win_payout'][picks].sum()), races),
+        'place_roi': _roi(float(history['place_payout'][picks][placed].sum()), races),
+        'show_roi': _roi(float(history['show_payout'][picks][shown].sum()), races)
+    }
+
+
+_worker_history = None
+
+
+def _init_worker(history):
+    global _worker_history
+    _worker_history = history
+
+
+def _evaluate_chunk(candidates):
+    return [evaluate(_worker_history, apply_overrides(overrides)) for overrides in candidates]
+
+
+def _sort_key(objective):
+    # Hedef metrik, eşitlikte hit_rate ve top3_rate; None en sona
+    def key(entry):
+        metrics = entry['metrics']
+        return tuple(-(metrics[name] if metrics[name] is not None else float('-inf'))
+                     for name in (objective, 'hit_rate', 'top3_rate'))
+    return key
+
+
+def sweep(history, candidates, objective=DEFAULT_OBJECTIVE, workers=None):
+    """
+    Adayları değerlendirip sıralı leaderboard döndürür
+    Dönüş: [{'rank', 'params': {override}, 'metrics', 'baseline'}]; ilk aday olarak varsayılanlar eklenir
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Bilinmeyen hedef: {objective} (seçenekler: {', '.join(OBJECTIVES)})")
+    candidates = [{}] + [overrides for overrides in candidates if overrides]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(candidates) <= 1:
+        metrics = [evaluate(history, apply_overrides(overrides)) for overrides in candidates]
+    else:
+        chunk_size = max(1, len(candidates) // (workers * 4))
+        chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(history,)) as executor:
+            metrics = [result for chunk in executor.map(_evaluate_chunk, chunks) for result in chunk]
+
+    leaderboard = [{'params': overrides, 'metrics': result, 'baseline': not overrides}
+                   for overrides, result in zip(candidates, metrics)]
+    leaderboard.sort(key=_sort_key(objective))
+    for rank, entry in enumerate(leaderboard, 1):
+        entry['rank'] = rank
+    return leaderboard
+
+
+def write_best(path, leaderboard, objective, history, since=None, until=None, track=None):
+    """En iyi seti sürümlü config olarak yazar (HRN_SCORING_CONFIG / load_scoring_params ile okunur)"""
+    best = leaderboard[0]
+    baseline = next(entry for entry in leaderboard if entry['baseline'])
+    write_json_atomic(path, {
+        'version': f"sweep-{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        'params': apply_overrides(best['params']),
+        'baseline_version': get_scoring_config().version,
+        'objective': objective,
+        'metrics': best['metrics'],
+        'baseline_metrics': baseline['metrics'],
+        'candidates': len(leaderboard),
+        'history': {'days': history['days'], 'races': history['races'], 'since': since, 'until': until,
+                    'track': track},
+        'generated_at': datetime.now().isoformat(timespec='seconds')
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep Turkish-style scoring constants against official results')
+    parser.add_argument('--archive', default=os.environ.get('HRN_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR))
+    parser.add_argument('--since', help='YYYY-MM-DD')
+    parser.add_argument('--until', help='YYYY-MM-DD')
+    parser.add_argument('--track', help='Tek pist')
+    parser.add_argument('--grid', help='Grid JSON dosyası: {parametre: [değerler]} (varsayılan: DEFAULT_GRID)')
+    parser.add_argument('--random', type=int, default=0, help='Grid yerine N rastgele aday')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--objective', choices=OBJECTIVES, default=DEFAULT_OBJECTIVE)
+    parser.add_argument('--workers', type=int, default=None, help='Süreç sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--top', type=int, default=20, help='Gösterilecek leaderboard satırı')
+    parser.add_argument('--output', default='best_params.json', help='En iyi parametre dosyası')
+    parser.add_argument('--leaderboard', help='Tüm leaderboard\'u JSON olarak yaz')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.random:
+        candidates = random_candidates(args.random, seed=args.seed)
+    elif args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            candidates = grid_candidates(json.load(f))
+    else:
+        candidates = grid_candidates(DEFAULT_GRID)
+
+    history = load_history(args.archive, args.since, args.until, args.track, args.workers)
+    if not history['races']:
+        print("No archived races with results in range")
+        return
+    print(f"{history['days']} days, {history['races']} races, {len(history['race'])} horses, "
+          f"{len(candidates)} candidates")
+    leaderboard = sweep(history, candidates, args.objective, args.workers)
+
+    print(f"{'#':>4} {'hit%':>7} {'top3%':>7} {'win':>8} {'place':>8} {'show':>8}  params")
+    for entry in leaderboard[:args.top]:
+        metrics = entry['metrics']
+        params = 'baseline' if entry['baseline'] else ' '.join(f"{k}={v}" for k, v in entry['params'].items())
+        print(f"{entry['rank']:>4} {metrics['hit_rate']:>7} {metrics['top3_rate']:>7} {metrics['win_roi']!s:>8} "
+              f"{metrics['place_roi']!s:>8} {metrics['show_roi']!s:>8}  {params}")
+    baseline = next(entry for entry in leaderboard if entry['baseline'])
+    print(f"Baseline rank: {baseline['rank']}/{len(leaderboard)}")
+
+    if args.output:
+        write_best(args.output, leaderboard, args.objective, history, args.since, args.until, args.track)
+        print(f"Best parameters written to {args.output}")
+    if args.leaderboard:
+        write_json_atomic(args.leaderboard, leaderboard)
+        print(f"Leaderboard written to {args.leaderboard}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Parse edilmiş doküman cache'i - sayfa içeriğinin hash'i ile anahtarlanır
+
+Entries sayfaları gün içinde defalarca çekilir ve çoğu zaman HTML değişmez.
+Gövdenin hash'i daha önce parse edilmiş bir sayfayla aynıysa yapılandırılmış sonuç
+(races/track_info veya horse_info/race_history) doğrudan döner, BeautifulSoup ağacı hiç kurulmaz.
+Sunucu koşullu GET'i desteklemese bile çalışır.
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class ParsedDocumentCache:
+    """Thread-safe, boyutu sınırlı (LRU) bellek içi parse sonucu cache'i"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(kind, body, *context):
+        """
+        Sayfa türü + gövde hash'i + parse bağlamından (örn. at ismi) anahtar üretir
+        body: bytes veya str
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return (kind, digest) + tuple(str(c) for c in context)
+
+    def get(self, key):
+        """Kayıt varsa kopyasını döndürür (çağıran değiştirse de cache bozulmaz)"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        """Sonucun kopyasını saklar, limit aşılırsa en eski kaydı siler"""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0
+        return stats
+
+
+_default_cache = ParsedDocumentCache()
+
+
+def get_parse_cache():
+    """Süreç genelinde paylaşılan parse cache'i"""
+    return _default_cache
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Process pool HTML parse - ağ I/O'sundan ayrılmış parser worker'ları
+
+BeautifulSoup ile parse (_extract_races, _extract_horse_info, _extract_race_history) CPU'ya
+bağlıdır; fetch için thread sayısı artırıldığında parse GIL üzerinde sıraya girer.
+Bu modda fetch eden thread'ler ham HTML byte'larını bir ProcessPoolExecutor'a verir;
+worker'lar soup nesnesi değil, küçük ve pickle edilebilir kayıtlar (dict/list) döndürür.
+
+- HRN_PARSE_WORKERS=<n> tanımlıysa scraper'lar paylaşılan havuzu kendiliğinden kullanır
+- parse_cache kontrolü ana süreçte kalır; aynı gövde worker'a hiç gönderilmez
+
+Kullanım:
+    pool = ParsePool(max_workers=4)
+    scraper = HorseProfileScraper(parse_pool=pool)
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Worker süreci başına bir kez kurulan scraper örnekleri (yalnızca _extract_* metodları kullanılır)
+_worker_scrapers = {}
+
+
+def _scraper(kind):
+    if kind not in _worker_scrapers:
+        if kind == 'entries':
+            from hrn_scraper import HorseRacingNationScraper
+            _worker_scrapers[kind] = HorseRacingNationScraper(http_cache=False, http2=False)
+        else:
+            from horse_profile_scraper import HorseProfileScraper
+            _worker_scrapers[kind] = HorseProfileScraper(http_cache=False, http2=False)
+        # Worker içinde tekrar havuza gönderilmez
+        _worker_scrapers[kind].parse_pool = None
+    return _worker_scrapers[kind]
+
+
+def _decode(body, encoding):
+    if isinstance(body, str):
+        return body
+    return body.decode(encoding or 'utf-8', errors='replace')
+
+
+def parse_entries_page(body, track_url, track_name, encoding=None):
+    """Entries sayfası gövdesini {'track_info', 'races'} kaydına çevirir (worker'da çalışır)"""
+    scraper = _scraper('entries')
+    soup = BeautifulSoup(_decode(body, encoding), 'html.parser')
+    parsed = {
+        'track_info': scraper._extract_track_info(soup, track_name),
+        'races': scraper._extract_races(soup, track_url)
+    }
+    soup.decompose()
+    return parsed
+
+
+def parse_profile_page(body, horse_name, encoding=None):
+    """Profil sayfası gövdesini {'horse_info', 'race_history'} kaydına çevirir (worker'da çalışır)"""
+    scraper = _scraper('profile')
+    soup = BeautifulSoup(_decode(body, encoding), 'html.parser')
+    parsed = {
+        'horse_info': scraper._extract_horse_info(soup, horse_name),
+        'race_history': scraper._extract_race_history(soup)
+    }
+    # Worker uzun yaşar; döngüsel ağaç bir sonraki GC'yi beklemeden bırakılır
+    soup.decompose()
+    return parsed
+
+
+def _init_worker():
+    # Worker'larda her satır için INFO log yazmak parse süresinin büyük kısmını yer
+    logging.getLogger('hrn_scraper').setLevel(logging.WARNING)
+    logging.getLogger('horse_profile_scraper').setLevel(logging.WARNING)
+
+
+class ParsePool:
+    """
+    Parse işlerini süreç havuzuna dağıtır
+    max_workers=0: havuz kurulmaz, parse çağıran thread'de yapılır (karşılaştırma için)
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.counters = {'entries': 0, 'profiles': 0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and self.max_workers:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     initializer=_init_worker)
+            return self._executor
+
+    def _run(self, func, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return func(*args)
+        return executor.submit(func, *args).result()
+
+    def parse_entries(self, body, track_url, track_name, encoding=None):
+        with self._lock:
+            self.counters['entries'] += 1
+        return self._run(parse_entries_page, body, track_url, track_name, encoding)
+
+    def parse_profile(self, body, horse_name, encoding=None):
+        with self._lock:
+            self.counters['profiles'] += 1
+        return self._run(parse_profile_page, body, horse_name, encoding)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_parse_pool():
+    """HRN_PARSE_WORKERS tanımlıysa paylaşılan havuzu döndürür, değilse None"""
+    global _default_pool
+    value = os.environ.get('HRN_PARSE_WORKERS', '').strip()
+    if not value or value == '0':
+        return None
+    with _default_pool_lock:
+        if _default_pool is None:
+            try:
+                workers = int(value)
+            except ValueError:
+                workers = None  # 'auto' vb. - çekirdek sayısı kadar
+            _default_pool = ParsePool(max_workers=workers)
+            logger.info(f"Process pool parsing enabled: {_default_pool.max_workers} workers")
+        return _default_pool
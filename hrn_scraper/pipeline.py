@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Akışlı (streaming) pipeline - fetch → parse → score → write
+
+Eski akış kart bazlıdır: entries CSV yazılır, profiller için geri okunur, essential CSV
+pd.read_csv ile tekrar yüklenir ve hesaplama en sonda yapılır. Burada aşamalar sınırlı
+(bounded) kuyruklarla birbirine bağlanır ve her at hazır olur olmaz bir sonraki aşamaya geçer:
+
+    entries fetch ─▶ entries parse ─▶ profil worker'ları ─▶ Turkish style skor ─▶ writer
+      (1 thread)      (1 thread)        (N thread)             (1 thread)       (1 thread)
+
+- Kuyruklar dolunca üreten aşama bekler; bellekte yalnızca yoldaki sayfalar/atlar ve
+  tamamlanmamış yarışlar tutulur, pist sayısı ne olursa olsun bellek sınırlı kalır
+- Bir yarışın tüm atları skorlandığında yarış sıralanıp essential ve _turkish_style
+  CSV'lerine eklenir; entries CSV pist parse edilir edilmez yazılır
+- Hatalı pist/at diğerlerini durdurmaz, pist bazlı özet multi_track_scraper ile aynı formattadır
+- Bir aşamanın kendisi çökerse (ör. config yüklenemedi) tüm aşamalar durur, kuyruklar boşaltılır
+  ve ilk hata run()'dan yeniden fırlatılır; bekleyen üretici/tüketici kalmaz
+
+Kullanım:
+    python pipeline.py 2025-09-28 --tracks santa-anita,laurel-park --workers 8
+"""
+
+import argparse
+import contextlib
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+
+import requests
+
+from american_horse_calculator_turkish_style import process_horses_data_turkish_style, group_by_race_and_sort
+from data_store import get_default_data_store, record_output
+from memory_snapshots import memory_profile, memory_profile_path
+from metrics import SCORE_SECONDS, SCORED_HORSES, queue_depth_collector, register_collector, unregister_collector
+from scoring_config import get_scoring_params
+from horse_profile_scraper import HorseProfileScraper
+from hrn_scraper import HorseRacingNationScraper, get_american_date_string
+from parse_workers import ParsePool
+from storage import record_card
+import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_PROFILE_WORKERS = 8
+# Entries sayfaları büyüktür; parse'ı bekleyen en fazla bu kadar sayfa tutulur
+DEFAULT_PAGE_QUEUE_SIZE = 2
+
+# Aşamalar arası kuyruk sonu işareti
+_DONE = object()
+# Dolu/boş kuyrukta durdurma işaretine bakma aralığı
+_POLL_SECONDS = 0.1
+
+ENTRIES_FIELDS = ['track_name', 'race_number', 'post_position', 'program_number',
+                  'horse_name', 'speed_figure', 'sire', 'trainer_jockey', 'morning_line', 'last_start']
+
+ESSENTIAL_FIELDS = ['race_number', 'program_number', 'horse_name', 'latest_surface',
+                    'latest_distance', 'latest_time', 'latest_finish_position']
+
+SCORED_FIELDS = ['track', 'date', 'race_number', 'program_number', 'horse_name',
+                 'entry_distance', 'entry_surface', 'profile_distance', 'profile_time',
+                 'profile_surface', 'latest_finish_position', 'performance_score',
+                 'calculation_status', 'calc_raw_time_per_100m', 'calc_surface_factor',
+                 'calc_distance_factor', 'calc_position_penalty_applied', 'calc_total_race_time']
+
+
+def output_base_name(slug, date_str, output_dir=None):
+    """
+    multi_track_scraper ile aynı dosya adı kökü: <slug>_<YYYY_MM_DD>_<slug>
+    output_dir=None: HRN_DATA_DIR tanımlıysa data/<tarih>/<slug>/ bölümü, değilse çalışma dizini
+    """
+    if output_dir is None:
+        store = get_default_data_store()
+        if store is not None:
+            return store.base_name(slug, date_str)
+        output_dir = '.'
+    return os.path.join(output_dir, f"{slug}_{date_str.replace('-', '_')}_{slug}")
+
+
+def flatten_scored_result(result):
+    """process_horses_data_turkish_style sonucunu CSV satırına çevirir (calc_* kolonları)"""
+    row = {key: result.get(key, '') for key in SCORED_FIELDS if not key.startswith('calc_')}
+    details = result.get('calculation_details') or {}
+    for key, value in details.items():
+        row[f'calc_{key}'] = value
+    return row
+
+
+class _TrackWriter:
+    """Tek pistin çıktı dosyaları ve tamamlanmamış yarışları (yalnızca writer thread'i kullanır)"""
+
+    def __init__(self, summary, base_name, race_sizes):
+        self.summary = summary
+        self.base_name = base_name
+        self.pending = {race_number: [] for race_number in race_sizes}
+        self.race_sizes = race_sizes
+        self.started = time.time()
+        self._files = {}
+
+    def _writer(self, suffix, fieldnames):
+        if suffix not in self._files:
+            handle = open(f"{self.base_name}{suffix}", 'w', newline='', encoding='utf-8')
+            writer = csv.DictWriter(handle, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            self._files[suffix] = (handle, writer)
+        return self._files[suffix][1]
+
+    def write_entries(self, rows):
+        self._writer('_entries.csv', ENTRIES_FIELDS).writerows(rows)
+        self._files['_entries.csv'][0].flush()
+
+    def add(self, horse, result):
+        """Atı yarışına ekler; yarış tamamlandıysa sıralayıp yazar ve True döner"""
+        race_number = horse['race_number']
+        self.pending[race_number].append((horse, result))
+        if len(self.pending[race_number]) < self.race_sizes[race_number]:
+            return False
+
+        race = self.pending.pop(race_number)
+        essential = self._writer('_essential.csv', ESSENTIAL_FIELDS)
+        for horse_row, _ in sorted(race, key=lambda item: _program_sort_key(item[0])):
+            essential.writerow(horse_row)
+
+        scored = self._writer('_turkish_style.csv', SCORED_FIELDS)
+        for ordered in group_by_race_and_sort([result for _, result in race]).values():
+            scored.writerows(flatten_scored_result(r) for r in ordered)
+
+        for handle, _ in self._files.values():
+            handle.flush()
+        return True
+
+    @property
+    def finished(self):
+        return not self.pending
+
+    def close(self):
+        for suffix, (handle, _) in self._files.items():
+            handle.close()
+            record_output(f"{self.base_name}{suffix}")
+        self._files = {}
+
+
+class _Stopped(Exception):
+    """Başka bir aşama çöktü; bu aşama beklemeyi bırakıp çıkar"""
+
+
+def _program_sort_key(horse):
+    try:
+        return (0, int(horse.get('program_number')))
+    except (TypeError, ValueError):
+        return (1, str(horse.get('program_number')))
+
+
+class StreamingPipeline:
+    """
+    Pist listesini aşamalı ve sınırlı kuyruklu bir pipeline ile işler
+    run() pist bazlı özet listesi döndürür; self.stats sayaçları ve kuyruk doluluklarını tutar
+    """
+
+    def __init__(self, date_str=None, output_dir=None, profile_workers=DEFAULT_PROFILE_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE, page_queue_size=DEFAULT_PAGE_QUEUE_SIZE,
+                 entries_scraper=None, profile_scraper=None, http_cache=None, http2=None,
+                 parse_workers=None, trace_file=None, memory_profile_file=None):
+        self.date_str = date_str or get_american_date_string()
+        # Her run bir trace olarak bu dosyaya eklenir (verilmezse HRN_TRACE_FILE)
+        self.trace_file = trace_file or tracing.trace_file()
+        # Pist başına tracemalloc snapshot raporu (verilmezse HRN_MEMORY_PROFILE)
+        self.memory_profile_file = memory_profile_file or memory_profile_path()
+        self._memory = None
+        self.output_dir = output_dir
+        self.profile_workers = max(1, profile_workers)
+        self.entries_scraper = entries_scraper or HorseRacingNationScraper(http_cache=http_cache, http2=http2)
+        # Profil worker'ları tek scraper'ı (ve session'ı) paylaşır; HTTP/2'de tek bağlantı üzerinden akar
+        self.profile_scraper = profile_scraper or HorseProfileScraper(http_cache=http_cache, http2=http2)
+        # parse_workers > 0: profil/entries HTML'i süreç havuzunda parse edilir, thread'ler yalnızca ağ bekler
+        self.parse_pool = None
+        if parse_workers:
+            self.parse_pool = ParsePool(max_workers=parse_workers)
+            self.entries_scraper.parse_pool = self.parse_pool
+            self.profile_scraper.parse_pool = self.parse_pool
+
+        self._pages = queue.Queue(maxsize=page_queue_size)
+        self._horses = queue.Queue(maxsize=queue_size)
+        self._profiled = queue.Queue(maxsize=queue_size)
+        self._writes = queue.Queue(maxsize=queue_size)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._error = None
+        self.summaries = {}
+        self.stats = {}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _put(self, target, item, name=None):
+        """Kuyruğa ekler ve en yüksek doluluğu kaydeder; pipeline durdurulduysa _Stopped"""
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        if name is None:
+            return
+        depth = target.qsize()
+        with self._lock:
+            if depth > self.stats['max_queue_depth'][name]:
+                self.stats['max_queue_depth'][name] = depth
+
+    def _get(self, source):
+        """Kuyruktan alır; pipeline durdurulduysa _Stopped"""
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _fail(self, stage, error):
+        """İlk hatayı saklar ve tüm aşamalara durma işareti verir"""
+        logger.error(f"Pipeline stage {stage} failed, stopping pipeline: {error!r}")
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _guard(self, stage, func, output=None, consumers=1):
+        """Aşamayı çalıştırır; çökerse pipeline'ı durdurur, her durumda çıkış kuyruğunu kapatır"""
+        try:
+            func()
+        except _Stopped:
+            pass
+        except Exception as e:
+            self._fail(stage, e)
+        finally:
+            if output is not None:
+                try:
+                    for _ in range(consumers):
+                        self._put(output, _DONE)
+                except _Stopped:
+                    pass
+
+    def _drain(self):
+        """Durdurulan çalıştırmada kuyruklarda kalan sayfa/atları bırakır"""
+        for source in (self._pages, self._horses, self._profiled, self._writes):
+            while True:
+                try:
+                    source.get_nowait()
+                except queue.Empty:
+                    break
+
+    def _entries_url(self, track):
+        return track.get('url') or f"{self.entries_scraper.base_url}entries-results/{track['slug']}/{self.date_str}"
+
+    # --- Aşama 1: entries sayfalarını çek ---
+    def _fetch_stage(self, tracks):
+        for track in tracks:
+            url = self._entries_url(track)
+            started = time.time()
+            try:
+                with tracing.fetch_span(url, track=track['slug']) as fetch:
+                    response = self.entries_scraper.session.get(url, timeout=30)
+                    fetch.set_response(response)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                logger.error(f"Error fetching entries for {track['slug']}: {e}")
+                self._put(self._writes, ('failed', track, str(e), started), 'writes')
+                continue
+            self._count('pages_fetched')
+            self._put(self._pages, (track, url, response, started), 'pages')
+
+    # --- Aşama 2: entries parse, atları profil kuyruğuna dağıt ---
+    def _parse_stage(self):
+        while True:
+            item = self._get(self._pages)
+            if item is _DONE:
+                break
+            track, url, response, started = item
+            try:
+                track_data = self.entries_scraper.parse_track_response(response, url, track['name'])
+                record_card(track['slug'], self.date_str, track_data)
+                horses, entries_rows, race_sizes = self._horses_from_card(track, track_data)
+            except Exception as e:
+                logger.error(f"Error parsing entries for {track['slug']}: {e}")
+                self._put(self._writes, ('failed', track, str(e), started), 'writes')
+                continue
+
+            # Writer pist kaydını atlardan önce alır (aynı kuyruk, FIFO)
+            self._put(self._writes, ('track', track, (entries_rows, race_sizes), started), 'writes')
+            for horse in horses:
+                self._put(self._horses, horse, 'horses')
+
+    def _horses_from_card(self, track, track_data):
+        """Parse edilmiş karttan at işlerini, entries satırlarını ve yarış boyutlarını çıkarır"""
+        horses, entries_rows, race_sizes = [], [], {}
+        track_name = track_data['track_info'].get('name', track['name'])
+        for race in track_data['races']:
+            race_number = race.get('race_number')
+            race_info = race.get('race_info', {})
+            for entry in race.get('entries', []):
+                horse_info = entry.get('horse_info', {})
+                entries_rows.append({
+                    'track_name': track_name,
+                    'race_number': race_number,
+                    'post_position': entry.get('post_position'),
+                    'program_number': entry.get('program_number'),
+                    'horse_name': horse_info.get('horse_name', ''),
+                    'speed_figure': horse_info.get('speed_figure'),
+                    'sire': horse_info.get('sire', ''),
+                    'trainer_jockey': entry.get('trainer_jockey', ''),
+                    'morning_line': entry.get('morning_line', ''),
+                    'last_start': horse_info.get('last_start', '')
+                })
+                horse_name = horse_info.get('horse_name', '').strip()
+                if not horse_name:
+                    continue
+                race_sizes[race_number] = race_sizes.get(race_number, 0) + 1
+                horses.append({
+                    'track': track['slug'],
+                    'date': self.date_str,
+                    'race_number': race_number,
+                    'program_number': entry.get('program_number'),
+                    'horse_name': horse_name,
+                    'last_start': horse_info.get('last_start', ''),
+                    'entry_distance': race_info.get('distance', ''),
+                    'entry_surface': race_info.get('surface', '')
+                })
+        return horses, entries_rows, race_sizes
+
+    # --- Aşama 3: profil çek + parse (URL varyantı seçimi parse sonucuna bağlı) ---
+    def _profile_stage(self):
+        while True:
+            horse = self._get(self._horses)
+            if horse is _DONE:
+                break
+            latest = {}
+            with tracing.span('profile', track=horse['track'], race=horse['race_number'],
+                              horse=horse['horse_name']) as profile_span:
+                try:
+                    latest = self.profile_scraper.latest_race(horse['horse_name'], last_start=horse.get('last_start'))
+                except Exception as e:
+                    logger.error(f"Error scraping profile for {horse['horse_name']}: {e}")
+                    profile_span.fail(e)
+
+            horse.update({
+                'latest_surface': latest.get('surface', ''),
+                'latest_distance': latest.get('distance', ''),
+                'latest_time': latest.get('time', ''),
+                'latest_finish_position': latest.get('finish_position', ''),
+                'profile_ok': bool(latest.get('time'))
+            })
+            self._count('profiles_fetched')
+            self._put(self._profiled, horse, 'profiled')
+
+    # --- Aşama 4: Turkish style skor ---
+    def _score_stage(self):
+        remaining = self.profile_workers
+        # Çalıştırma boyunca tek config sürümü (yarış ortasında yeniden yüklenirse karışmasın)
+        params = get_scoring_params()
+        while remaining:
+            horse = self._get(self._profiled)
+            if horse is _DONE:
+                remaining -= 1
+                continue
+            scoring_input = dict(horse, profile_distance=horse['latest_distance'],
+                                 profile_time=horse['latest_time'],
+                                 profile_surface=horse['latest_surface'])
+            with SCORE_SECONDS.time(source='pipeline'), tracing.span(
+                    'score', track=horse['track'], race=horse['race_number'], horse=horse['horse_name']):
+                result = process_horses_data_turkish_style([scoring_input], params)[0]
+            SCORED_HORSES.inc(source='pipeline')
+            self._count('scored')
+            self._put(self._writes, ('horse', horse, result, None), 'writes')
+
+    # --- Aşama 5: writer - dosyaları tek thread yazar ---
+    def _write_stage(self):
+        writers = {}
+        try:
+            while True:
+                item = self._get(self._writes)
+                if item is _DONE:
+                    break
+                kind, subject, payload, started = item
+                try:
+                    if kind == 'failed':
+                        self._finish_track(self._new_summary(subject), started, 'failed', error=payload)
+                    elif kind == 'track':
+                        entries_rows, race_sizes = payload
+                        summary = self._new_summary(subject)
+                        summary['races'] = len(race_sizes)
+                        summary['horses'] = sum(race_sizes.values())
+                        if not race_sizes:
+                            self._finish_track(summary, started, 'no_races')
+                            continue
+                        base_name = output_base_name(subject['slug'], self.date_str, self.output_dir)
+                        track_writer = _TrackWriter(summary, base_name, race_sizes)
+                        track_writer.started = started
+                        track_writer.write_entries(entries_rows)
+                        writers[subject['slug']] = track_writer
+                    else:
+                        horse, result = subject, payload
+                        track_writer = writers[horse['track']]
+                        if not horse['profile_ok']:
+                            track_writer.summary['failures'] += 1
+                        with tracing.span('serialise', track=horse['track'], race=horse['race_number'],
+                                          horse=horse['horse_name']):
+                            race_written = track_writer.add(horse, result)
+                        if race_written:
+                            self._count('races_written')
+                            with self._lock:
+                                if self.stats['first_race_seconds'] is None:
+                                    self.stats['first_race_seconds'] = round(time.time() - self._started, 2)
+                        if track_writer.finished:
+                            track_writer.close()
+                            del writers[horse['track']]
+                            self._finish_track(track_writer.summary, track_writer.started, 'ok')
+                except Exception as e:
+                    logger.error(f"Pipeline writer error: {e}")
+        finally:
+            # Kuyruk kapandığında ya da pipeline durdurulduğunda yarım kalan pistler yine de kapatılır
+            for track_writer in writers.values():
+                track_writer.close()
+                self._finish_track(track_writer.summary, track_writer.started, 'failed', error='incomplete')
+
+    def _new_summary(self, track):
+        return {'track': track['slug'], 'name': track.get('name', track['slug']), 'status': 'failed',
+                'races': 0, 'horses': 0, 'failures': 0, 'seconds': 0.0, 'error': None}
+
+    def _finish_track(self, summary, started, status, error=None):
+        summary.update({'status': status, 'error': error,
+                        'seconds': round(time.time() - started, 2)})
+        with self._lock:
+            self.summaries[summary['track']] = summary
+        if self._memory is not None:
+            self._memory.checkpoint(summary['track'])
+
+    def run(self, tracks):
+        """
+        tracks: [{'slug', 'name', 'url'?}, ...] - url verilmezse entries_scraper.base_url'den kurulur
+        Pist bazlı özet listesi döndürür
+        """
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        self.summaries = {}
+        self._stop.clear()
+        self._error = None
+        self.stats = {'pages_fetched': 0, 'profiles_fetched': 0, 'scored': 0, 'races_written': 0,
+                      'first_race_seconds': None, 'seconds': 0.0,
+                      'max_queue_depth': {'pages': 0, 'horses': 0, 'profiled': 0, 'writes': 0}}
+        self._started = time.time()
+        # /metrics okunurken aşamalar arası kuyruk dolulukları
+        register_collector('pipeline', queue_depth_collector({
+            'pipeline_pages': self._pages, 'pipeline_horses': self._horses,
+            'pipeline_profiled': self._profiled, 'pipeline_writes': self._writes}))
+
+        run_trace = (tracing.trace('pipeline.run', self.trace_file, process_wide=True, date=self.date_str,
+                                   tracks=len(tracks)) if self.trace_file else contextlib.nullcontext())
+        try:
+            with run_trace, memory_profile(self.memory_profile_file, enabled=bool(self.memory_profile_file)) as memory:
+                self._memory = memory
+                try:
+                    self._run_stages(tracks)
+                finally:
+                    self._memory = None
+        finally:
+            unregister_collector('pipeline')
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown()
+            self._drain()
+
+        self.stats['seconds'] = round(time.time() - self._started, 2)
+        if self._error is not None:
+            logger.error(f"Pipeline stopped after {self.stats['seconds']}s: {self._error!r}")
+            raise self._error
+        logger.info(f"Pipeline finished: {self.stats}")
+        return [self.summaries[track['slug']] for track in tracks if track['slug'] in self.summaries]
+
+    def _run_stages(self, tracks):
+        """Aşama thread'lerini başlatır ve hepsi bitene kadar bekler"""
+        stages = [('fetch', lambda: self._fetch_stage(list(tracks)), self._pages, 1),
+                  ('parse', self._parse_stage, self._horses, self.profile_workers),
+                  ('score', self._score_stage, self._writes, 1),
+                  ('write', self._write_stage, None, 1)]
+        stages += [(f'profile-{i}', self._profile_stage, self._profiled, 1) for i in range(self.profile_workers)]
+        threads = [threading.Thread(target=self._guard, args=stage, name=f'pipeline-{stage[0]}') for stage in stages]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+def run_pipeline(tracks, date_str=None, **kwargs):
+    """Kısayol: pipeline'ı kurar, çalıştırır, (özetler, istatistikler) döndürür"""
+    pipeline = StreamingPipeline(date_str=date_str, **kwargs)
+    summaries = pipeline.run(tracks)
+    return summaries, pipeline.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming fetch → parse → score → write pipeline')
+    parser.add_argument('date', nargs='?', help='YYYY-MM-DD (varsayılan: bugün, Eastern)')
+    parser.add_argument('--tracks', help='Virgülle ayrılmış slug listesi (varsayılan: günlük listedeki tüm pistler)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_PROFILE_WORKERS, help='Profil worker sayısı')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help='Aşamalar arası kuyruk boyutu')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='HTML parse için süreç sayısı (0: fetch thread\'lerinde parse)')
+    parser.add_argument('--output-dir', help='Çıktı klasörü (varsayılan: HRN_DATA_DIR bölümü veya çalışma dizini)')
+    parser.add_argument('--trace', help='Span\'leri OTLP JSON olarak bu dosyaya ekle (özet: python tracing.py FILE)')
+    parser.add_argument('--memory-profile', help='Pist başına tracemalloc raporunu bu JSON dosyasına yaz')
+    args = parser.parse_args()
+
+    date_str = args.date or get_american_date_string()
+    if args.tracks:
+        from track_registry import get_track_registry
+        registry = get_track_registry()
+        tracks = [{'slug': slug, 'name': registry.name_for(slug, date_str)}
+                  for slug in args.tracks.split(',') if slug.strip()]
+    else:
+        tracks = HorseRacingNationScraper().get_daily_tracks(date_str)
+
+    summaries, stats = run_pipeline(tracks, date_str, profile_workers=args.workers,
+                                    queue_size=args.queue_size, output_dir=args.output_dir,
+                                    parse_workers=args.parse_workers, trace_file=args.trace,
+                                    memory_profile_file=args.memory_profile)
+    for summary in summaries:
+        print(f"{summary['name'][:28]:<28} {summary['status']:<9} {summary['races']:>4} races "
+              f"{summary['horses']:>4} horses {summary['failures']:>3} failures {summary['seconds']:>7.1f}s")
+    print(f"İlk yarış / first race written: {stats['first_race_seconds']}s, toplam / total: {stats['seconds']}s")
+    print(f"Kuyruk doluluğu / max queue depth: {stats['max_queue_depth']}")
+
+
+if __name__ == '__main__':
+    main()
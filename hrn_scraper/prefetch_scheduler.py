@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Post time'a göre önceden veri çekme (prefetch) zamanlayıcısı
+
+Sabah günün aktif pistlerinin kartları çekilir, her yarış için bir iş oluşturulur ve
+işler "post time - N dakika" (son teslim zamanı) anahtarlı bir heap'e konur. Worker'lar
+heap'ten her zaman en erken post time'lı yarışı alır; böylece hangi pistte olursa olsun
+ilk koşulacak yarışın verisi önce hazır olur.
+
+Her yarış bittiğinde:
+- Atların profilleri çekilir (HRN_HTTP_CACHE_DIR tanımlıysa HTTP cache'e girer)
+- Pistin entries ve essential CSV'leri app.py'nin okuduğu adlarla güncellenir,
+  "Veri Çek" butonu profil isteği atmadan mevcut satırları kullanır
+
+Kullanım:
+    python prefetch_scheduler.py --lead 30 --workers 4            # bugün, bir kez
+    python prefetch_scheduler.py --lead 30 --daily-at 06:00       # her sabah
+"""
+
+import argparse
+import heapq
+import itertools
+import logging
+import os
+import threading
+from datetime import timedelta
+
+import pytz
+
+from data_store import record_output
+from entries_diff import entries_rows_from_races
+from horse_profile_scraper import HorseProfileScraper
+from hrn_scraper import HorseRacingNationScraper, get_american_time
+from metrics import queue_depth_collector, register_collector
+from pipeline import ENTRIES_FIELDS, ESSENTIAL_FIELDS, output_base_name
+from track_registry import get_track_registry
+from utils import calculate_race_start_datetime, write_csv_atomic
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEAD_MINUTES = 30
+DEFAULT_WORKERS = 4
+
+
+class PrefetchScheduler:
+    """
+    Yarış bazlı prefetch işlerini son teslim zamanına göre sıralı yürütür
+    now_fn: Eastern tz-aware şimdiki zaman (test için değiştirilebilir)
+    """
+
+    def __init__(self, lead_minutes=DEFAULT_LEAD_MINUTES, max_workers=DEFAULT_WORKERS, output_dir=None,
+                 registry=None, entries_scraper=None, profile_scraper=None, now_fn=None):
+        self.lead = timedelta(minutes=lead_minutes)
+        self.max_workers = max(1, max_workers)
+        self.output_dir = output_dir
+        self.registry = registry or get_track_registry()
+        self.entries_scraper = entries_scraper or HorseRacingNationScraper()
+        self.profile_scraper = profile_scraper or HorseProfileScraper()
+        self.now_fn = now_fn or get_american_time
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._tracks = {}
+        self._file_lock = threading.Lock()
+        self.completed = []
+        self.stats = {'planned': 0, 'done': 0, 'on_time': 0, 'late': 0, 'missed': 0,
+                      'horses': 0, 'profile_failures': 0}
+        register_collector('prefetch', queue_depth_collector({'prefetch': self.pending}))
+
+    # --- Planlama ---
+    def plan(self, date_str=None):
+        """Aktif pistlerin kartlarını çeker ve yarış işlerini heap'e ekler; eklenen iş sayısını döndürür"""
+        date_str = date_str or self.now_fn().strftime('%Y-%m-%d')
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        active = self.registry.active_tracks(date_str)
+        if active is None:
+            logger.error(f"Prefetch: daily track list unavailable for {date_str}")
+            return 0
+
+        eastern = pytz.timezone('US/Eastern')
+        added = 0
+        for slug, track in active.items():
+            track_data = self.entries_scraper.scrape_track_data(track['url'], track['name'])
+            if not track_data or not track_data.get('races'):
+                logger.warning(f"Prefetch: no card for {slug} on {date_str}")
+                continue
+
+            self._register_track(slug, date_str, track_data['races'])
+            for race in track_data['races']:
+                horses = [{'horse_name': entry.get('horse_info', {}).get('horse_name', '').strip(),
+                           'program_number': entry.get('program_number'),
+                           'last_start': entry.get('horse_info', {}).get('last_start')}
+                          for entry in race.get('entries', [])]
+                horses = [horse for horse in horses if horse['horse_name']]
+                start = calculate_race_start_datetime(date_str, race.get('post_time'))
+                if not horses or not start:
+                    continue
+                post = eastern.localize(start)
+                self.push({'track': slug, 'name': track['name'], 'date': date_str,
+                           'race_number': race.get('race_number'), 'post': post,
+                           'deadline': post - self.lead, 'horses': horses})
+                added += 1
+
+        logger.info(f"Prefetch: {added} races planned for {date_str}")
+        return added
+
+    def push(self, job):
+        """İşi son teslim zamanına göre heap'e ekler"""
+        with self._lock:
+            heapq.heappush(self._heap, (job['deadline'], next(self._seq), job))
+            self.stats['planned'] += 1
+
+    def pending(self):
+        with self._lock:
+            return len(self._heap)
+
+    def _register_track(self, slug, date_str, races):
+        """Pistin entries CSV'sini yazar ve essential satırları için yer açar"""
+        entries_rows = entries_rows_from_races(slug, races)
+        with self._file_lock:
+            self._tracks[slug] = {'date': date_str, 'essential': {}}
+            for code in self.registry.codes_for_slug(slug):
+                path = f"{output_base_name(code, date_str, self.output_dir)}_entries.csv"
+                write_csv_atomic(path, ENTRIES_FIELDS, entries_rows)
+                record_output(path, entries_rows)
+
+    # --- Yürütme ---
+    def _next_job(self):
+        """En erken son teslim zamanlı işi döndürür; heap boşsa None"""
+        with self._lock:
+            if not self._heap:
+                return None
+            return heapq.heappop(self._heap)[2]
+
+    def _worker(self):
+        while not self._stop.is_set():
+            job = self._next_job()
+            if job is None:
+                return
+            self._run_job(job)
+
+    def _run_job(self, job):
+        """Yarışın at profillerini çeker ve pistin essential dosyasını günceller"""
+        if self.now_fn() >= job['post']:
+            # Yarış başlamış - veriyi hazırlamanın anlamı kalmadı
+            self._count('missed')
+            return
+
+        rows = []
+        for horse in job['horses']:
+            latest = {}
+            try:
+                latest = self.profile_scraper.latest_race(horse['horse_name'], last_start=horse.get('last_start'))
+            except Exception as e:
+                logger.error(f"Prefetch profile error for {horse['horse_name']}: {e}")
+            if not latest.get('time'):
+                self._count('profile_failures')
+            rows.append({
+                'race_number': str(job['race_number']),
+                'program_number': str(horse['program_number']),
+                'horse_name': horse['horse_name'],
+                'latest_surface': latest.get('surface', ''),
+                'latest_distance': latest.get('distance', ''),
+                'latest_time': latest.get('time', ''),
+                'latest_finish_position': latest.get('finish_position', '')
+            })
+
+        self._update_essential(job['track'], rows)
+        ready_at = self.now_fn()
+        with self._lock:
+            self.stats['done'] += 1
+            self.stats['horses'] += len(rows)
+            self.stats['on_time' if ready_at <= job['deadline'] else 'late'] += 1
+            self.completed.append({'track': job['track'], 'race_number': job['race_number'],
+                                   'post': job['post'], 'ready_at': ready_at})
+
+    def _update_essential(self, slug, rows):
+        """Yarışın satırlarını pistin essential CSV'sine ekler (dosya her seferinde atomik yazılır)"""
+        with self._file_lock:
+            track = self._tracks[slug]
+            for row in rows:
+                track['essential'][row['horse_name']] = row
+            ordered = sorted(track['essential'].values(),
+                             key=lambda r: (int(r['race_number']), r['program_number'].zfill(3)))
+            for code in self.registry.codes_for_slug(slug):
+                path = f"{output_base_name(code, track['date'], self.output_dir)}_essential.csv"
+                write_csv_atomic(path, ESSENTIAL_FIELDS, ordered)
+                record_output(path, ordered)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def run_pending(self):
+        """Heap'teki tüm işleri bitirir ve döner (bir kerelik prefetch)"""
+        threads = [threading.Thread(target=self._worker, name=f'prefetch-{i}', daemon=True)
+                   for i in range(self.max_workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.stats
+
+    def run_today(self, date_str=None):
+        """Bugünün kartlarını planlar ve tüm yarışları hazırlar"""
+        self.plan(date_str)
+        return self.run_pending()
+
+    def run_daily(self, at='06:00'):
+        """Her sabah (Eastern) günü planlar; stop() çağrılana kadar çalışır"""
+        hour, minute = map(int, at.split(':'))
+        last_planned = None
+        while not self._stop.is_set():
+            now = self.now_fn()
+            today = now.strftime('%Y-%m-%d')
+            if last_planned != today and (now.hour, now.minute) >= (hour, minute):
+                self.run_today(today)
+                logger.info(f"Prefetch finished for {today}: {self.stats}")
+                last_planned = today
+            self._stop.wait(60)
+
+    def start_background(self, at='06:00'):
+        """run_daily'yi daemon thread'de başlatır (örn. app.py içinden)"""
+        thread = threading.Thread(target=self.run_daily, args=(at,), name='prefetch-daily', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Post-time-aware prefetch scheduler')
+    parser.add_argument('date', nargs='?', help='YYYY-MM-DD (varsayılan: bugün, Eastern)')
+    parser.add_argument('--lead', type=int, default=DEFAULT_LEAD_MINUTES,
+                        help='Verinin post time\'dan kaç dakika önce hazır olacağı')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--output-dir', help='Varsayılan: HRN_DATA_DIR bölümü veya çalışma dizini')
+    parser.add_argument('--daily-at', help='HH:MM (Eastern) - her sabah bu saatte çalış')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    scheduler = PrefetchScheduler(lead_minutes=args.lead, max_workers=args.workers, output_dir=args.output_dir)
+    if args.daily_at:
+        try:
+            scheduler.run_daily(args.daily_at)
+        except KeyboardInterrupt:
+            scheduler.stop()
+        return
+
+    stats = scheduler.run_today(args.date)
+    print(f"Prefetch: {stats['done']}/{stats['planned']} races ready "
+          f"({stats['on_time']} on time, {stats['late']} late, {stats['missed']} missed)")
+
+
+if __name__ == '__main__':
+    main()
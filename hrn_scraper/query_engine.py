@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Geçmiş yarış verisi üzerinde gömülü SQL sorgu katmanı (DuckDB)
+
+archive.py'nin Parquet veri setleri (entries, essential, results, scores) süreç içi bir DuckDB
+bağlantısında view olarak açılır; aylarca veriyi pandas script'i yazmadan tek SQL ile sorgulamak için.
+
+- Hazır sorgular (CANNED_QUERIES) parametrelidir; /api/query yalnızca bunları çalıştırır
+- Veri setleri arası at eşleşmesi arşivdeki horse_key kolonuyla yapılır (ülke eki vb. farkları yok sayılır)
+- sql() Python API'si içindir, yalnızca SELECT/WITH kabul eder
+- refresh() veri dizinindeki son günleri arşive sıkıştırıp view'ları yeniler
+- HRN_ARCHIVE_DIR tanımlı değilse (veya duckdb kurulu değilse) motor kullanılmaz
+
+Kullanım:
+    python query_engine.py top_ranked_finish track=belmont-park distance="6 f" surface=dirt days=60
+    python query_engine.py refresh
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from american_horse_calculator_turkish_style import distance_to_meters
+from archive import DEFAULT_ARCHIVE_DIR, compact
+from hrn_scraper import get_american_date_string
+from results_store import normalize_horse_name
+
+logger = logging.getLogger(__name__)
+
+try:
+    import duckdb
+    QUERY_ENGINE_AVAILABLE = True
+except ImportError:
+    duckdb = None
+    QUERY_ENGINE_AVAILABLE = False
+
+# Arşivde henüz veri seti yoksa view bu kolonlarla boş açılır (sorgular yine derlenir)
+EMPTY_SCHEMAS = {
+    'entries': "date VARCHAR, track VARCHAR, race_number SMALLINT, post_position SMALLINT, program_number VARCHAR, "
+               "horse_name VARCHAR, horse_key VARCHAR, speed_figure SMALLINT, morning_line VARCHAR",
+    'essential': "date VARCHAR, track VARCHAR, race_number SMALLINT, program_number VARCHAR, horse_name VARCHAR, "
+                 "horse_key VARCHAR, latest_surface VARCHAR, latest_distance VARCHAR, latest_time VARCHAR, "
+                 "latest_finish_position SMALLINT, latest_time_seconds DOUBLE, latest_distance_meters DOUBLE",
+    'results': "date VARCHAR, track VARCHAR, race_number SMALLINT, program_number VARCHAR, horse_name VARCHAR, "
+               "horse_key VARCHAR, finish_position SMALLINT, surface VARCHAR, distance VARCHAR, time VARCHAR, "
+               "time_seconds DOUBLE, distance_meters DOUBLE, win_payout DOUBLE, place_payout DOUBLE, "
+               "show_payout DOUBLE, exacta_payout DOUBLE, trifecta_payout DOUBLE",
+    'scores': "date VARCHAR, track VARCHAR, race_number SMALLINT, program_number VARCHAR, horse_name VARCHAR, "
+              "horse_key VARCHAR, performance_score DOUBLE, calculation_status VARCHAR"
+}
+
+# Skor sırası (düşük skor daha iyi) ile resmi sonuçtaki bitiş sırası
+_TOP_RANKED_FINISH = """
+WITH ranked AS (
+    SELECT date, track, race_number, horse_key, performance_score,
+           row_number() OVER (PARTITION BY date, track, race_number ORDER BY performance_score) AS score_rank
+    FROM scores
+    WHERE performance_score IS NOT NULL AND date BETWEEN $since AND $until
+      AND ($track IS NULL OR track = $track)
+),
+races AS (
+    SELECT date, track, race_number, any_value(surface) AS surface, any_value(distance_meters) AS distance_meters
+    FROM results
+    WHERE date BETWEEN $since AND $until AND ($track IS NULL OR track = $track)
+    GROUP BY date, track, race_number
+)
+SELECT r.score_rank,
+       count(*) AS horses,
+       count(*) FILTER (WHERE f.finish_position = 1) AS wins,
+       count(*) FILTER (WHERE f.finish_position <= 3) AS top3,
+       round(100.0 * count(*) FILTER (WHERE f.finish_position = 1) / count(*), 1) AS win_rate,
+       round(100.0 * count(*) FILTER (WHERE f.finish_position <= 3) / count(*), 1) AS top3_rate,
+       round(avg(f.finish_position), 2) AS avg_finish_in_top3
+FROM ranked r
+JOIN races USING (date, track, race_number)
+LEFT JOIN results f ON f.date = r.date AND f.track = r.track AND f.race_number = r.race_number
+                   AND f.horse_key = r.horse_key
+WHERE r.score_rank <= $top
+  AND ($surface IS NULL OR races.surface ILIKE $surface || '%')
+  AND ($meters IS NULL OR abs(races.distance_meters - $meters) < 10)
+GROUP BY r.score_rank
+ORDER BY r.score_rank
+"""
+
+_HORSE_FORM = """
+SELECT e.date, e.track, e.race_number, e.program_number, e.latest_surface, e.latest_distance, e.latest_time,
+       e.latest_finish_position, s.performance_score, f.finish_position AS official_finish, f.time AS official_time
+FROM essential e
+LEFT JOIN scores s ON s.date = e.date AND s.track = e.track AND s.race_number = e.race_number
+                  AND s.horse_key = e.horse_key
+LEFT JOIN results f ON f.date = e.date AND f.track = e.track AND f.race_number = e.race_number
+                   AND f.horse_key = e.horse_key
+WHERE e.horse_key = $horse AND e.date BETWEEN $since AND $until
+ORDER BY e.date DESC
+"""
+
+_TRACK_DAYS = """
+SELECT e.date, e.track, count(DISTINCT e.race_number) AS races, count(*) AS horses,
+       count(e.latest_time_seconds) AS with_latest_time,
+       round(100.0 * count(e.latest_time_seconds) / count(*), 1) AS success_rate
+FROM essential e
+WHERE e.date BETWEEN $since AND $until AND ($track IS NULL OR e.track = $track)
+GROUP BY e.date, e.track
+ORDER BY e.date DESC, e.track
+"""
+
+# ad -> (SQL, parametre varsayılanları, açıklama); since/until 'days' ve 'until' parametrelerinden hesaplanır
+CANNED_QUERIES = {
+    'top_ranked_finish': (_TOP_RANKED_FINISH,
+                          {'track': None, 'distance': None, 'surface': None, 'days': 60, 'top': 3},
+                          'Skor sırasına göre ilk N atın resmi sonuçlardaki kazanma / ilk 3 oranı'),
+    'horse_form': (_HORSE_FORM, {'horse': None, 'days': 365},
+                   'Bir atın kartları: son yarış verisi, skor ve resmi sonuç'),
+    'track_days': (_TRACK_DAYS, {'track': None, 'days': 30},
+                   'Gün/pist başına yarış, at sayısı ve son yarış verisi başarı oranı'),
+}
+
+
+def _query_params(name, params):
+    """Hazır sorgu parametrelerini doğrular ve SQL parametrelerine çevirir"""
+    if name not in CANNED_QUERIES:
+        raise ValueError(f"Bilinmeyen sorgu: {name}")
+    sql, defaults, _ = CANNED_QUERIES[name]
+    unknown = set(params) - set(defaults) - {'until'}
+    if unknown:
+        raise ValueError(f"Bilinmeyen parametre: {', '.join(sorted(unknown))}")
+    values = dict(defaults)
+    values.update({key: value for key, value in params.items() if value not in (None, '')})
+    if 'horse' in defaults and not values.get('horse'):
+        raise ValueError('horse parametresi gerekli')
+
+    until = values.pop('until', None) or get_american_date_string()
+    days = int(values.pop('days'))
+    since = (datetime.strptime(until, '%Y-%m-%d') - timedelta(days=days)).strftime('%Y-%m-%d')
+    sql_params = {'since': since, 'until': until}
+    for key, value in values.items():
+        if key == 'distance':
+            meters = distance_to_meters(value) if value else 0
+            sql_params['meters'] = meters or None
+        elif key == 'horse':
+            sql_params['horse'] = normalize_horse_name(value)
+        elif key == 'top':
+            sql_params['top'] = int(value)
+        else:
+            sql_params[key] = value
+    return sql, sql_params
+
+
+class QueryEngine:
+    """Arşiv Parquet dosyaları üzerinde DuckDB view'ları (thread başına cursor)"""
+
+    def __init__(self, archive_dir=DEFAULT_ARCHIVE_DIR, data_dir=None):
+        if not QUERY_ENGINE_AVAILABLE:
+            raise RuntimeError('Query engine requires: pip install duckdb')
+        self.archive_dir = os.path.abspath(archive_dir)
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._conn = duckdb.connect(':memory:')
+        self.load_views()
+
+    def load_views(self):
+        """Her veri seti için view; yeni gün dosyaları bir sonraki sorguda otomatik görünür"""
+        with self._lock:
+            for dataset, columns in EMPTY_SCHEMAS.items():
+                dataset_dir = os.path.join(self.archive_dir, dataset)
+                if os.path.isdir(dataset_dir) and any(os.scandir(dataset_dir)):
+                    pattern = os.path.join(dataset_dir, '*', '*.parquet').replace("'", "''")
+                    # date bölüm kolonu VARCHAR kalır (DATE'e çevrilmez), filtreler string karşılaştırır
+                    self._conn.execute(f"CREATE OR REPLACE VIEW {dataset} AS SELECT * FROM read_parquet("
+                                       f"'{pattern}', hive_partitioning = true, "
+                                       f"hive_types = {{'date': VARCHAR}}, union_by_name = true)")
+                else:
+                    nulls = ', '.join(f"CAST(NULL AS {column_type}) AS {name}"
+                                      for name, column_type in (column.split() for column in columns.split(', ')))
+                    self._conn.execute(f"CREATE OR REPLACE VIEW {dataset} AS SELECT {nulls} WHERE false")
+
+    def refresh(self, since=None):
+        """Veri dizinindeki son günleri (varsayılan: son 2 gün) arşive yazar ve view'ları yeniler"""
+        if self.data_dir and os.path.isdir(self.data_dir):
+            since = since or (datetime.strptime(get_american_date_string(), '%Y-%m-%d')
+                              - timedelta(days=2)).strftime('%Y-%m-%d')
+            compact(self.data_dir, self.archive_dir, since=since)
+        self.load_views()
+
+    def _execute(self, sql, params=None):
+        started = time.perf_counter()
+        with self._lock:
+            cursor = self._conn.cursor()
+        try:
+            result = cursor.execute(sql, params or {})
+            columns = [column[0] for column in result.description]
+            rows = result.fetchall()
+        finally:
+            cursor.close()
+        return columns, rows, round((time.perf_counter() - started) * 1000, 1)
+
+    def query(self, name, **params):
+        """Hazır sorgu: {'query', 'params', 'columns', 'rows' (dict listesi), 'elapsed_ms'}"""
+        sql, sql_params = _query_params(name, params)
+        columns, rows, elapsed_ms = self._execute(sql, sql_params)
+        return {'query': name, 'params': sql_params, 'columns': columns,
+                'rows': [dict(zip(columns, row)) for row in rows], 'elapsed_ms': elapsed_ms}
+
+    def sql(self, text, params=None):
+        """Serbest SELECT sorgusu (Python API); pandas DataFrame döndürür"""
+        if text.lstrip().split(None, 1)[0].upper() not in ('SELECT', 'WITH'):
+            raise ValueError('Yalnızca SELECT / WITH sorguları çalıştırılabilir')
+        with self._lock:
+            cursor = self._conn.cursor()
+        try:
+            return cursor.execute(text, params or {}).df()
+        finally:
+            cursor.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_default_query_engine():
+    """HRN_ARCHIVE_DIR tanımlıysa paylaşılan motoru döndürür, değilse (veya duckdb yoksa) None"""
+    global _default_engine
+    archive_dir = os.environ.get('HRN_ARCHIVE_DIR')
+    if not archive_dir or not QUERY_ENGINE_AVAILABLE:
+        return None
+    with _default_engine_lock:
+        if _default_engine is None or _default_engine.archive_dir != os.path.abspath(archive_dir):
+            _default_engine = QueryEngine(archive_dir, os.environ.get('HRN_DATA_DIR'))
+            logger.info(f"Query engine enabled: {_default_engine.archive_dir}")
+        return _default_engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run canned queries over the Parquet archive')
+    parser.add_argument('query', choices=sorted(CANNED_QUERIES) + ['refresh'])
+    parser.add_argument('params', nargs='*', help='anahtar=değer (örn. track=belmont-park days=60)')
+    parser.add_argument('--archive', default=os.environ.get('HRN_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR))
+    parser.add_argument('--data-dir', default=os.environ.get('HRN_DATA_DIR', 'data'))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    engine = QueryEngine(args.archive, args.data_dir)
+    if args.query == 'refresh':
+        engine.refresh()
+        return
+    result = engine.query(args.query, **dict(param.split('=', 1) for param in args.params))
+    print(' | '.join(result['columns']))
+    for row in result['rows']:
+        print(' | '.join('' if value is None else str(value) for value in row.values()))
+    print(f"{len(result['rows'])} rows in {result['elapsed_ms']} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Yarış bazlı skor cache'i - Turkish style sıralama sonuçları
+
+Kart gün içinde çok kez hesaplanır ama scratch / program değişikliği genelde bir iki yarışı
+etkiler. Her yarışın sonucu, o yarışın at satırlarından üretilen bir parmak izi (fingerprint)
+ile saklanır; satırlar değişmediyse yarış yeniden hesaplanmaz.
+Anahtar skorlama config sürümünü de içerir: parametreler değişince eski sonuçlar kullanılmaz
+(LRU ile düşer), config geri alınırsa aynı sürümün sonuçları yeniden geçerli olur.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+
+from american_horse_calculator_turkish_style import process_horses_data_turkish_style, group_by_race_and_sort
+from metrics import SCORE_SECONDS, SCORED_HORSES
+from scoring_config import get_scoring_config
+from tracing import span
+
+DEFAULT_MAX_RACES = 2048
+
+# Skoru etkileyen alanlar
+FINGERPRINT_FIELDS = ('program_number', 'horse_name', 'profile_time', 'profile_distance',
+                      'profile_surface', 'latest_finish_position', 'entry_distance', 'entry_surface')
+
+
+def race_number_of(horse):
+    """CSV/pandas'tan gelen race_number'ı ('3', 3, 3.0) tek biçime getirir"""
+    value = horse.get('race_number', '')
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+class RaceScoreCache:
+    """Thread-safe, boyutu sınırlı (LRU) yarış sonucu cache'i"""
+
+    def __init__(self, max_races=DEFAULT_MAX_RACES):
+        self.max_races = max_races
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @staticmethod
+    def make_key(track, date_str, race_number, version=''):
+        return (str(track), str(date_str).replace('_', '-'), str(race_number), version)
+
+    @staticmethod
+    def fingerprint(horses):
+        """Yarış satırlarının sıradan bağımsız parmak izi"""
+        return tuple(sorted(tuple(str(horse.get(field, '')) for field in FINGERPRINT_FIELDS)
+                            for horse in horses))
+
+    def get(self, key, fingerprint):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != fingerprint:
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, key, fingerprint, results):
+        results = copy.deepcopy(results)
+        with self._lock:
+            self._entries[key] = (fingerprint, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_races:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, track, date_str, race_numbers=None):
+        """Pistin verilen (None ise tüm) yarışlarını siler"""
+        date_str = str(date_str).replace('_', '-')
+        races = None if race_numbers is None else {str(r) for r in race_numbers}
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == str(track) and key[1] == date_str and (races is None or key[2] in races):
+                    del self._entries[key]
+                    self.counters['invalidations'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['races'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0
+        return stats
+
+
+def score_races(track, date_str, horses, cache=None):
+    """
+    Atları yarış yarış Turkish style ile skorlar; değişmemiş yarışlar cache'ten gelir
+    Dönüş: (grouped_results, all_results, recomputed_race_numbers)
+    grouped_results group_by_race_and_sort ile aynı biçimdedir
+    """
+    races = OrderedDict()
+    for horse in horses:
+        races.setdefault(race_number_of(horse), []).append(horse)
+
+    params, version = get_scoring_config().snapshot()
+    grouped, all_results, recomputed = {}, [], []
+    for race_number, race_horses in races.items():
+        key = RaceScoreCache.make_key(track, date_str, race_number, version)
+        fingerprint = RaceScoreCache.fingerprint(race_horses)
+        race_groups = cache.get(key, fingerprint) if cache is not None else None
+        if race_groups is None:
+            with SCORE_SECONDS.time(source='score_races'), span('score', track=track, race=race_number,
+                                                                 horses=len(race_horses)):
+                race_groups = group_by_race_and_sort(process_horses_data_turkish_style(race_horses, params))
+            SCORED_HORSES.inc(len(race_horses), source='score_races')
+            recomputed.append(race_number)
+            if cache is not None:
+                cache.put(key, fingerprint, race_groups)
+        for group_key, results in race_groups.items():
+            grouped[group_key] = results
+            all_results.extend(results)
+
+    return grouped, all_results, recomputed
+
+
+_default_cache = RaceScoreCache()
+
+
+def get_race_score_cache():
+    """Süreç genelinde paylaşılan skor cache'i"""
+    return _default_cache
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+İstek bazında profil (yavaş /api/calculate_from_saved, /api/scrape_and_save çağrıları için)
+
+- Aşama süreleri her istekte toplanır ve Server-Timing başlığıyla döner:
+      with stage('score'):
+          ...
+- HRN_PROFILING=1 ise istek 'X-HRN-Profile: 1' başlığı ya da '?profile=1' ile profillenir:
+  * sample (varsayılan): istek thread'inin yığını HRN_PROFILE_INTERVAL_MS'de bir örneklenir,
+    collapsed stack (.folded) olarak yazılır - flamegraph.pl, speedscope, inferno okur
+  * cprofile: deterministik cProfile, pstats (.prof) - snakeviz, flameprof okur
+  Dosyalar HRN_PROFILE_DIR altına <endpoint>_<pist>_<tarih>_<zaman>.<uzantı> adıyla yazılır
+"""
+
+import cProfile
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-HRN-Profile'
+PROFILE_MODES = ('sample', 'cprofile')
+DEFAULT_INTERVAL_MS = 5.0
+_ENABLED_VALUES = ('1', 'true', 'yes', 'on')
+
+_local = threading.local()
+
+
+def profiling_enabled():
+    """Profil isteklerine izin veriliyor mu (HRN_PROFILING)"""
+    return os.environ.get('HRN_PROFILING', '').strip().lower() in _ENABLED_VALUES
+
+
+def requested_mode(value):
+    """Başlık / sorgu değeri -> 'sample', 'cprofile' veya None (profil yok)"""
+    value = (value or '').strip().lower()
+    if value in PROFILE_MODES:
+        return value
+    return 'sample' if value in _ENABLED_VALUES else None
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    # Collapsed formatta ';' yığın ayracı, boşluk sayaç ayracı
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+
+class StackSampler:
+    """Bir thread'in yığınını arka planda örnekler; {yığın: örnek sayısı}"""
+
+    def __init__(self, thread_id=None, interval_ms=DEFAULT_INTERVAL_MS):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = max(interval_ms, 0.5) / 1000.0
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='hrn-stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self):
+        """Collapsed stack satırları: 'dış;...;iç sayı'"""
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class RequestProfile:
+    """Tek isteğin aşama süreleri ve (istenirse) profili"""
+
+    def __init__(self, endpoint, mode=None, output_dir=None, interval_ms=DEFAULT_INTERVAL_MS):
+        self.endpoint = endpoint
+        self.mode = mode
+        self.output_dir = output_dir
+        self.interval_ms = interval_ms
+        self.tags = {}
+        self.stages = []
+        self.path = None
+        self._profiler = None
+        self._started = None
+        self.total = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        if self.mode == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.mode == 'sample':
+            self._profiler = StackSampler(interval_ms=self.interval_ms).start()
+        return self
+
+    def stop(self):
+        """Profili durdurur ve dosyaya yazar; dönüş: yazılan yol ya da None"""
+        if self._profiler is not None:
+            if self.mode == 'cprofile':
+                self._profiler.disable()
+            else:
+                self._profiler.stop()
+        self.total = time.perf_counter() - self._started
+        if self._profiler is not None and self.output_dir:
+            try:
+                self.path = self._save()
+                logger.info(f"Profile written: {self.path} ({self.total * 1000:.1f} ms)")
+            except OSError as e:
+                logger.error(f"Profil yazılamadı ({self.output_dir}): {e}")
+        return self.path
+
+    def tag(self, **tags):
+        self.tags.update({key: value for key, value in tags.items() if value})
+
+    def record(self, name, seconds):
+        self.stages.append((name, seconds))
+
+    def file_name(self):
+        parts = [self.endpoint, self.tags.get('track', 'all'), self.tags.get('date', 'nodate'),
+                 datetime.now().strftime('%Y%m%d_%H%M%S_%f')]
+        stem = '_'.join(re.sub(r'[^A-Za-z0-9._-]+', '-', str(part)) for part in parts)
+        return f"{stem}.{'prof' if self.mode == 'cprofile' else 'folded'}"
+
+    def _save(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, self.file_name())
+        if self.mode == 'cprofile':
+            self._profiler.dump_stats(path)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.folded())
+        return path
+
+    def server_timing(self):
+        """Server-Timing başlık değeri (aynı isimli aşamalar toplanır, ms)"""
+        totals = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+        if self.total is not None:
+            parts.append(f"total;dur={self.total * 1000:.1f}")
+        if self.path:
+            parts.append(f'profile;desc="{os.path.basename(self.path)}"')
+        return ', '.join(parts)
+
+
+def current():
+    """Bu thread'de çalışan isteğin profili (yoksa None)"""
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def profile_request(endpoint, mode=None, output_dir=None):
+    """İsteği sarar; mode yalnızca profiling_enabled() ise uygulanır"""
+    if mode and not profiling_enabled():
+        logger.warning(f"Profil istendi ama HRN_PROFILING kapalı ({endpoint})")
+        mode = None
+    interval = float(os.environ.get('HRN_PROFILE_INTERVAL_MS', DEFAULT_INTERVAL_MS))
+    profile = RequestProfile(endpoint, mode, output_dir or os.environ.get('HRN_PROFILE_DIR'), interval)
+    previous = current()
+    _local.profile = profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
+        _local.profile = previous
+
+
+@contextmanager
+def stage(name):
+    """Aşama süresini geçerli isteğe yazar (istek dışında hiçbir şey yapmaz)"""
+    profile = current()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.record(name, time.perf_counter() - started)
+
+
+def tag(**tags):
+    """Geçerli isteğin profil dosyası etiketleri (track, date)"""
+    profile = current()
+    if profile is not None:
+        profile.tag(**tags)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Sonuç tablosundan son yarış kaydı - aynı gün koşan atlar için profil isteği yerine
+
+Entries sayfası yarış resmileşince sonuç tablosunu da içerir (bitiş sırası, final time).
+Bu modül her resmi yarıştan sonra tablodaki atların "son yarış" kaydını (bitiş sırası, süre,
+pist tipi, mesafe) doğrudan yazar; at bir sonraki koşusunda HorseProfileScraper.latest_race
+profil sayfasını çekmeden bu kaydı kullanır.
+
+- Kayıtlar results_store.ResultsStore'da tutulur (HRN_RESULTS_DB, at ismi başına en yeni yarış)
+- Pistin {base}_results.csv dosyası her yenilemede atomik yazılır
+- ResultsWatcher her yarışı post time + gecikme sonrasında kontrol eder, resmileşmediyse tekrar dener
+
+Kullanım:
+    python results_ingest.py santa-anita 2025-09-28            # sayfadaki resmi yarışları bir kez al
+    python results_ingest.py --watch --delay 15                # bugün tüm pistleri izle
+"""
+
+import argparse
+import heapq
+import itertools
+import logging
+import threading
+from datetime import timedelta
+
+import pytz
+
+from data_store import record_output
+from hrn_scraper import HorseRacingNationScraper, get_american_time
+from pipeline import output_base_name
+from results_store import ResultsStore, get_default_results_store, normalize_horse_name
+from track_registry import get_track_registry
+from utils import calculate_race_start_datetime, parse_payout, write_csv_atomic
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FIELDS = ['race_number', 'program_number', 'horse_name', 'finish_position',
+                  'surface', 'distance', 'time', 'win_payout', 'place_payout', 'show_payout',
+                  'exacta_payout', 'trifecta_payout']
+
+DEFAULT_DELAY_MINUTES = 15
+DEFAULT_RETRY_MINUTES = 5
+DEFAULT_MAX_ATTEMPTS = 6
+
+
+def _payout(value):
+    amount = parse_payout(value)
+    return f"{amount:.2f}" if amount is not None else ''
+
+
+def results_rows_from_races(track_code, date_str, races):
+    """
+    Parse edilmiş yarışlardan resmi sonuç satırları
+    Ödeme tablosunda hangi atlar varsa onlar yazılır (HRN genelde ilk 3'ü listeler);
+    win/place/show ödemeleri $2 bahis içindir
+    """
+    rows = []
+    for race in races:
+        results = race.get('results') or {}
+        finishing_order = results.get('finishing_order') or []
+        if not finishing_order:
+            continue
+        programs = {normalize_horse_name(entry.get('horse_info', {}).get('horse_name')): entry
+                    for entry in race.get('entries', [])}
+        race_info = race.get('race_info', {})
+        # Egzotik ödemeler yarış düzeyinde, her satıra aynen yazılır
+        exotic = {f'{bet}_payout': _payout((results.get('payouts') or {}).get(bet, {}).get('payout'))
+                  for bet in ('exacta', 'trifecta')}
+        for position, finisher in enumerate(finishing_order, 1):
+            payouts = finisher.get('payouts') or {}
+            entry = programs.get(normalize_horse_name(finisher.get('horse')))
+            horse_name = entry['horse_info']['horse_name'].strip() if entry else finisher.get('horse', '').strip()
+            rows.append({
+                'race_date': date_str,
+                'track': track_code,
+                'race_number': str(race.get('race_number', '')),
+                'program_number': str(entry.get('program_number', '')) if entry else '',
+                'horse_name': horse_name,
+                'finish_position': str(finisher.get('finish_position', position)),
+                'surface': race_info.get('surface', ''),
+                'distance': race_info.get('distance', ''),
+                'time': results.get('final_time', ''),
+                'win_payout': _payout(payouts.get('win')),
+                'place_payout': _payout(payouts.get('place')),
+                'show_payout': _payout(payouts.get('show')),
+                **exotic
+            })
+    return rows
+
+
+def ingest_track_results(track_code, date_str, track_data, store=None, output_dir=None):
+    """
+    Kartın resmi yarışlarını depoya ve {base}_results.csv'ye yazar
+    Dönüş: {'races': [resmi yarış numaraları], 'horses': yazılan satır sayısı}
+    """
+    store = store if store is not None else get_default_results_store()
+    rows = results_rows_from_races(track_code, date_str, (track_data or {}).get('races', []))
+    official = sorted({int(row['race_number']) for row in rows if row['race_number'].isdigit()})
+    if not rows:
+        return {'races': [], 'horses': 0}
+
+    results_file = f"{output_base_name(track_code, date_str, output_dir)}_results.csv"
+    write_csv_atomic(results_file, RESULTS_FIELDS, rows)
+    record_output(results_file, rows)
+    if store is not None:
+        store.upsert(rows)
+    logger.info(f"Results ingested for {track_code} {date_str}: races {official}, {len(rows)} horses")
+    return {'races': official, 'horses': len(rows)}
+
+
+class ResultsWatcher:
+    """
+    Her yarışı post time + delay sonra kontrol eder, resmi sonuçları depoya alır
+    Yarış henüz resmileşmediyse retry_minutes sonra (en fazla max_attempts kez) tekrar dener
+    now_fn: Eastern tz-aware şimdiki zaman (test için değiştirilebilir)
+    """
+
+    def __init__(self, delay_minutes=DEFAULT_DELAY_MINUTES, retry_minutes=DEFAULT_RETRY_MINUTES,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, output_dir=None, registry=None, entries_scraper=None,
+                 store=None, now_fn=None):
+        self.delay = timedelta(minutes=delay_minutes)
+        self.retry = timedelta(minutes=retry_minutes)
+        self.max_attempts = max(1, max_attempts)
+        self.output_dir = output_dir
+        self.registry = registry or get_track_registry()
+        self.entries_scraper = entries_scraper or HorseRacingNationScraper()
+        self.store = store if store is not None else get_default_results_store()
+        self.now_fn = now_fn or get_american_time
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self.stats = {'planned': 0, 'ingested': 0, 'retries': 0, 'gave_up': 0}
+
+    def plan(self, date_str=None):
+        """Aktif pistlerin kartlarını çeker, her yarış için bir kontrol zamanı ekler"""
+        date_str = date_str or self.now_fn().strftime('%Y-%m-%d')
+        active = self.registry.active_tracks(date_str)
+        if active is None:
+            logger.error(f"Results watcher: daily track list unavailable for {date_str}")
+            return 0
+
+        eastern = pytz.timezone('US/Eastern')
+        added = 0
+        for slug, track in active.items():
+            track_data = self.entries_scraper.scrape_track_data(track['url'], track['name'])
+            for race in (track_data or {}).get('races', []):
+                start = calculate_race_start_datetime(date_str, race.get('post_time'))
+                if not start:
+                    continue
+                self.push({'track': slug, 'url': track['url'], 'name': track['name'], 'date': date_str,
+                           'race_number': race.get('race_number'), 'attempt': 1,
+                           'due': eastern.localize(start) + self.delay})
+                added += 1
+        self.stats['planned'] += added
+        logger.info(f"Results watcher: {added} races planned for {date_str}")
+        return added
+
+    def push(self, job):
+        heapq.heappush(self._heap, (job['due'], next(self._seq), job))
+
+    def pending(self):
+        return len(self._heap)
+
+    def check(self, job):
+        """Pistin sayfasını yeniden çeker ve resmi yarışları alır; iş yarışı resmiyse True"""
+        # Sonuçlar post time'dan sonra gelir, HTTP cache'teki kayıt koşullu GET ile doğrulanır
+        cache = getattr(self.entries_scraper.session, 'cache', None)
+        if cache is not None:
+            cache.set_expiry(job['url'], 0)
+        track_data = self.entries_scraper.scrape_track_data(job['url'], job['name'])
+        if not track_data:
+            return False
+
+        official = []
+        for code in self.registry.codes_for_slug(job['track']):
+            summary = ingest_track_results(code, job['date'], track_data, self.store, self.output_dir)
+            official = summary['races']
+        return int(job['race_number']) in official
+
+    def run_pending(self, wait=True):
+        """
+        Heap boşalana kadar işleri zamanı gelince yürütür
+        wait=False: zamanı gelmemiş işler beklenmeden yürütülür (geçmiş günler için)
+        """
+        while self._heap and not self._stop.is_set():
+            due, _, job = self._heap[0]
+            if wait:
+                remaining = (due - self.now_fn()).total_seconds()
+                if remaining > 0:
+                    self._stop.wait(min(remaining, 60))
+                    continue
+            heapq.heappop(self._heap)
+
+            if self.check(job):
+                self.stats['ingested'] += 1
+            elif job['attempt'] < self.max_attempts:
+                self.stats['retries'] += 1
+                self.push(dict(job, attempt=job['attempt'] + 1, due=max(due, self.now_fn()) + self.retry))
+            else:
+                logger.warning(f"Results watcher: {job['track']} race {job['race_number']} "
+                               f"not official after {job['attempt']} attempts")
+                self.stats['gave_up'] += 1
+        return self.stats
+
+    def run_day(self, date_str=None):
+        """Günün kartlarını planlar ve son yarış resmileşene kadar izler"""
+        self.plan(date_str)
+        return self.run_pending()
+
+    def start_background(self, date_str=None):
+        """run_day'i daemon thread'de başlatır (örn. app.py içinden)"""
+        thread = threading.Thread(target=self.run_day, args=(date_str,), name='results-watcher', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest official results into the latest-race store')
+    parser.add_argument('track', nargs='?', help='Pist kodu, örn. santa-anita (--watch ile gerekmez)')
+    parser.add_argument('date', nargs='?', help='YYYY-MM-DD (varsayılan: bugün, Eastern)')
+    parser.add_argument('--db', help='SQLite dosyası (varsayılan: HRN_RESULTS_DB)')
+    parser.add_argument('--output-dir', help='Varsayılan: HRN_DATA_DIR bölümü veya çalışma dizini')
+    parser.add_argument('--watch', action='store_true', help='Tüm aktif pistleri yarış yarış izle')
+    parser.add_argument('--delay', type=int, default=DEFAULT_DELAY_MINUTES,
+                        help='Post time\'dan kaç dakika sonra sonuçların kontrol edileceği')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = ResultsStore(args.db) if args.db else get_default_results_store()
+    if store is None:
+        parser.error('--db veya HRN_RESULTS_DB gerekli')
+    date_str = args.date or get_american_time().strftime('%Y-%m-%d')
+
+    if args.watch:
+        watcher = ResultsWatcher(delay_minutes=args.delay, output_dir=args.output_dir, store=store)
+        try:
+            stats = watcher.run_day(date_str)
+        except KeyboardInterrupt:
+            watcher.stop()
+            return
+        print(f"Results: {stats['ingested']} races ingested, {stats['gave_up']} not official, "
+              f"{store.count()} horses stored")
+        return
+
+    if not args.track:
+        parser.error('track gerekli (veya --watch)')
+    registry = get_track_registry()
+    scraper = HorseRacingNationScraper()
+    track_data = scraper.scrape_track_data(registry.entries_url(args.track, date_str),
+                                           registry.name_for(args.track, date_str))
+    summary = ingest_track_results(args.track, date_str, track_data, store, args.output_dir)
+    print(f"{args.track}: {len(summary['races'])} official races, {summary['horses']} horses stored")
+
+
+if __name__ == '__main__':
+    main()
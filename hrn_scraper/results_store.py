@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Resmi sonuçlardan gelen "son yarış" kayıtları - SQLite (WAL) deposu
+
+At ismi başına yalnızca en yeni resmi yarış tutulur; results_ingest yazar,
+HorseProfileScraper.latest_race okur. HRN_RESULTS_DB tanımlı değilse depo kullanılmaz.
+Kayıt yalnızca entries sayfasındaki son koşu tarihini (last_start) kapsıyorsa kullanılır;
+at arada başka bir pistte koştuysa profil çekilir.
+
+Kullanım:
+    store = ResultsStore('results.sqlite3')
+    store.get('Storm Arrow')  # {'date', 'track', 'distance', 'surface', 'time', 'finish_position', ...}
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_DAYS = 14
+
+
+def normalize_horse_name(name):
+    """Eşleştirme anahtarı: ülke kodu ve noktalama atılmış küçük harf isim"""
+    name = re.sub(r'\([^)]*\)', '', str(name or ''))
+    name = re.sub(r"[.']", '', name)
+    return ' '.join(name.lower().split())
+
+
+class ResultsStore:
+    """At ismi başına en son resmi yarışı tutan, thread-safe SQLite deposu"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS latest_races (
+                horse_key TEXT PRIMARY KEY,
+                horse_name TEXT,
+                race_date TEXT,
+                track TEXT,
+                race_number TEXT,
+                distance TEXT,
+                surface TEXT,
+                time TEXT,
+                finish_position TEXT,
+                updated_at REAL
+            )
+        """)
+        self._conn.commit()
+        self.counters = {'upserts': 0, 'skipped_older': 0, 'hits': 0, 'misses': 0}
+
+    def upsert(self, rows):
+        """Kayıtları yazar; aynı at için daha yeni tarihli kayıt varsa dokunmaz. Yazılan sayıyı döndürür"""
+        written = 0
+        with self._lock:
+            for row in rows:
+                key = normalize_horse_name(row.get('horse_name'))
+                if not key:
+                    continue
+                existing = self._conn.execute(
+                    'SELECT race_date FROM latest_races WHERE horse_key = ?', (key,)).fetchone()
+                if existing and existing[0] > row['race_date']:
+                    self.counters['skipped_older'] += 1
+                    continue
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO latest_races VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, row.get('horse_name', ''), row['race_date'], row.get('track', ''),
+                     str(row.get('race_number', '')), row.get('distance', ''), row.get('surface', ''),
+                     row.get('time', ''), str(row.get('finish_position', '')), time.time()))
+                written += 1
+            self._conn.commit()
+            self.counters['upserts'] += written
+        return written
+
+    def get(self, horse_name):
+        """Atın son resmi yarışı (race_history satırı biçiminde) veya None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT horse_name, race_date, track, race_number, distance, surface, time, finish_position '
+                'FROM latest_races WHERE horse_key = ?', (normalize_horse_name(horse_name),)).fetchone()
+            self.counters['hits' if row else 'misses'] += 1
+        if not row:
+            return None
+        return {
+            'horse_name': row[0],
+            'date': row[1],
+            'race_date': row[1],
+            'track': row[2],
+            'race_number': row[3],
+            'distance': row[4],
+            'surface': row[5],
+            'time': row[6],
+            'finish_position': row[7],
+            'source': 'results'
+        }
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM latest_races').fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['horses'] = self.count()
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_results_store():
+    """HRN_RESULTS_DB tanımlıysa paylaşılan depoyu döndürür, değilse None"""
+    global _default_store
+    db_path = os.environ.get('HRN_RESULTS_DB')
+    if not db_path:
+        return None
+    with _default_store_lock:
+        if _default_store is None or _default_store.db_path != db_path:
+            _default_store = ResultsStore(db_path)
+            logger.info(f"Results store enabled: {db_path}")
+        return _default_store
+
+
+def is_recent(record, max_age_days=DEFAULT_MAX_AGE_DAYS, today=None):
+    """Kayıt son max_age_days gün içinde mi"""
+    try:
+        race_day = datetime.strptime(record['race_date'][:10], '%Y-%m-%d').date()
+    except (KeyError, TypeError, ValueError):
+        return False
+    today = today or datetime.now(pytz.timezone('US/Eastern')).date()
+    return (today - race_day).days <= max_age_days
+
+
+def covers_last_start(record, last_start):
+    """Kayıt, entries sayfasında görünen son koşu tarihinden (YYYY-MM-DD) eski değil mi; tarih bilinmiyorsa False"""
+    try:
+        return bool(last_start) and record['race_date'][:10] >= str(last_start)[:10]
+    except (KeyError, TypeError):
+        return False
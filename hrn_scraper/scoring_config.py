@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Sürümlü skorlama parametreleri (Turkish style sabitleri)
+
+Ceza, zemin ve mesafe sabitleri kodda yalnızca yerleşik varsayılan olarak durur; çalışan değerler
+HRN_SCORING_CONFIG ile verilen JSON dosyasından bir kez yüklenip saklanır:
+
+    {"version": "2025-10-01", "params": {"position_penalty": 0.25, ...}}
+
+- Eksik parametreler varsayılanlardan gelir (param_sweep.py çıktısı doğrudan kullanılabilir)
+- Dosya en fazla check_interval saniyede bir stat'lanır; değiştiyse yeniden yüklenir
+  (Flask yeniden başlatılmadan yeni değerleri kullanır). Hatalı dosyada önceki sürüm korunur
+- version = "<etiket>+<parametre özeti>": etiket unutulsa da farklı parametreler farklı sürümdür;
+  skor cache'leri bu sürümü anahtara katar
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Yerleşik varsayılanlar - param_sweep.py ile ayarlanır
+DEFAULT_SCORING_PARAMS = {
+    'position_penalty': 0.30,        # Sıra başına yarış süresine eklenen saniye
+    'surface_factors': {             # {önceki zemin: {bugünkü zemin: çarpan}}
+        'Dirt': {'Dirt': 1.0, 'Turf': 1.02, 'Synthetic': 1.01},
+        'Turf': {'Dirt': 0.98, 'Turf': 1.0, 'Synthetic': 1.01},
+        'Synthetic': {'Dirt': 0.99, 'Turf': 1.03, 'Synthetic': 1.0}
+    },
+    'distance_threshold': 100,       # Bu farkın altında mesafe adaptasyonu yok (m)
+    'distance_longer_slope': 0.04,   # Daha uzun mesafede 100 m başına
+    'distance_shorter_slope': 0.03,  # Daha kısa mesafede 100 m başına
+    'distance_base': 6.0,            # ~6 saniyelik 100 m bazına normalize
+    'distance_factor_min': 0.8,
+    'distance_factor_max': 1.2
+}
+
+BUILTIN_VERSION = 'builtin'
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+def _number(name, value):
+    """Sonlu sayı -> float; null, string, bool, liste vb. için ValueError"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name} sayı olmalı, verilen: {value!r}")
+    return float(value)
+
+
+def merge_params(overrides):
+    """Verilen parametreleri varsayılanların kopyasına uygular (bilinmeyen isim / hatalı tür: ValueError)"""
+    if not isinstance(overrides, dict):
+        raise ValueError('params bir JSON nesnesi olmalı')
+    unknown = set(overrides) - set(DEFAULT_SCORING_PARAMS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen skorlama parametreleri: {sorted(unknown)}")
+    params = json.loads(json.dumps(DEFAULT_SCORING_PARAMS))
+    for key, value in overrides.items():
+        if key == 'surface_factors':
+            if not isinstance(value, dict):
+                raise ValueError(f"surface_factors nesne olmalı, verilen: {value!r}")
+            for previous, factors in value.items():
+                if not isinstance(factors, dict):
+                    raise ValueError(f"surface_factors.{previous} nesne olmalı, verilen: {factors!r}")
+                params['surface_factors'].setdefault(previous, {}).update(
+                    {current: _number(f"surface_factors.{previous}.{current}", factor)
+                     for current, factor in factors.items()})
+        else:
+            params[key] = _number(key, value)
+    return params
+
+
+def params_digest(params):
+    """Parametrelerin kısa özeti (anahtar sırasından bağımsız)"""
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:10]
+
+
+def read_config(path):
+    """Config dosyası -> (params, etiket); dosya parametrelerin kendisi ya da {'version', 'params'} olabilir"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError('Config bir JSON nesnesi olmalı')
+    label = str(data.get('version') or 'file') if 'params' in data else 'file'
+    return merge_params(data.get('params', data)), label
+
+
+def load_scoring_params(path):
+    """JSON parametre dosyasını (param_sweep.py çıktısı) varsayılanlarla birleştirir"""
+    return read_config(path)[0]
+
+
+class ScoringConfig:
+    """Dosyadan yüklenen, sürümlü ve değişince yeniden yüklenen skorlama parametreleri"""
+
+    def __init__(self, path=None, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked = 0.0
+        self._set(DEFAULT_SCORING_PARAMS, BUILTIN_VERSION, None)
+        self.refresh(force=True)
+
+    def _set(self, params, label, source):
+        # (params, version) tek atamayla değişir; okuyan taraf hiçbir zaman karışık çift görmez
+        self._current = (params, f"{label}+{params_digest(params)}")
+        self.source = source
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+
+    def refresh(self, force=False):
+        """Dosya değiştiyse yeniden yükler; True: yeni sürüm yüklendi"""
+        if not self.path:
+            return False
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return False
+        with self._lock:
+            self._checked = now
+            try:
+                stat = os.stat(self.path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp = None
+            if stamp == self._stamp:
+                return False
+            self._stamp = stamp
+
+            if stamp is None:
+                if self.source is not None:
+                    logger.warning(f"Skorlama config kaldırıldı ({self.path}) - yerleşik değerler kullanılıyor")
+                    self._set(DEFAULT_SCORING_PARAMS, BUILTIN_VERSION, None)
+                    self.reloads += 1
+                    return True
+                return False
+            try:
+                params, label = read_config(self.path)
+            except Exception as e:
+                # Hatalı dosya: önceki sürüm korunur; dosya düzeltilince stamp değişip yeniden denenir
+                self.errors += 1
+                logger.error(f"Skorlama config okunamadı ({self.path}): {e} - {self.version} kullanılmaya devam ediyor")
+                return False
+            self._set(params, label, self.path)
+            self.reloads += 1
+            logger.info(f"Skorlama config yüklendi: {self.version} ({self.path})")
+            return True
+
+    def snapshot(self):
+        """(params, version) - bir hesaplama boyunca aynı çift kullanılmalı"""
+        self.refresh()
+        return self._current
+
+    @property
+    def params(self):
+        return self._current[0]
+
+    @property
+    def version(self):
+        return self._current[1]
+
+    def status(self):
+        params, version = self._current
+        return {'version': version, 'source': self.source, 'path': self.path, 'loaded_at': self.loaded_at,
+                'reloads': self.reloads, 'errors': self.errors, 'params': params}
+
+
+_default_config = None
+_default_config_lock = threading.Lock()
+
+
+def get_scoring_config():
+    """Süreç genelinde paylaşılan config (HRN_SCORING_CONFIG yoksa yerleşik değerler)"""
+    global _default_config
+    path = os.environ.get('HRN_SCORING_CONFIG') or None
+    with _default_config_lock:
+        if _default_config is None or _default_config.path != path:
+            _default_config = ScoringConfig(path)
+        return _default_config
+
+
+def get_scoring_params():
+    """Geçerli skorlama parametreleri"""
+    return get_scoring_config().snapshot()[0]
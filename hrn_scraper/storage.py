@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+SQLite depolama - pistler, yarışlar, entries, at profilleri, geçmiş yarışlar ve skorlar
+
+Pist/gün başına CSV+JSON çiftleri yerine tek bir veritabanı; günler arası sorular
+(bir atın tüm kartları, bir pistin bir aylık skorları) dosya parse etmeden cevaplanır.
+
+- WAL modu: Flask okurken scraper yazabilir
+- İndeksler: (date, track, race_number) ve horse_name (NOCASE - at sorgusu büyük/küçük harf duyarsız)
+- Bir çıktının satırları (tarih, pist) bölümünün yerine geçer; yeniden çekimde düşen / çekilen
+  atlar tabloda kalmaz, tablo CSV'nin aynısıdır
+- Çıktı yazıldıkça data_store.record_output aynı satırları buraya da işler;
+  CSV/JSON dosyaları export olarak kalır (export_csv ile tablodan da üretilebilir)
+- HRN_STORAGE_DB tanımlı değilse kullanılmaz
+
+Kullanım:
+    python storage.py horse "Storm Arrow"
+    python storage.py export 2025-09-28 santa-anita essential out.csv
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from utils import write_csv_atomic
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    code TEXT PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS races (
+    date TEXT, track TEXT, race_number INTEGER,
+    post_time TEXT, distance TEXT, surface TEXT, purse TEXT, race_type TEXT,
+    PRIMARY KEY (date, track, race_number)
+);
+CREATE TABLE IF NOT EXISTS entries (
+    date TEXT, track TEXT, race_number INTEGER, horse_name TEXT,
+    program_number TEXT, post_position TEXT, speed_figure TEXT, sire TEXT,
+    trainer_jockey TEXT, morning_line TEXT,
+    PRIMARY KEY (date, track, race_number, horse_name)
+);
+DROP INDEX IF EXISTS idx_entries_horse;
+CREATE INDEX IF NOT EXISTS idx_entries_horse_nocase ON entries(horse_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS horse_profiles (
+    date TEXT, track TEXT, race_number INTEGER, horse_name TEXT, program_number TEXT,
+    latest_surface TEXT, latest_distance TEXT, latest_time TEXT, latest_finish_position TEXT,
+    PRIMARY KEY (date, track, race_number, horse_name)
+);
+DROP INDEX IF EXISTS idx_profiles_horse;
+CREATE INDEX IF NOT EXISTS idx_profiles_horse_nocase ON horse_profiles(horse_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS past_races (
+    horse_name TEXT, race_date TEXT, track TEXT, race_number INTEGER,
+    distance TEXT, surface TEXT, time TEXT, finish_position TEXT, source TEXT,
+    PRIMARY KEY (horse_name, race_date, track, race_number)
+);
+CREATE INDEX IF NOT EXISTS idx_past_races_race ON past_races(race_date, track, race_number);
+CREATE INDEX IF NOT EXISTS idx_past_races_horse_nocase ON past_races(horse_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS scores (
+    date TEXT, track TEXT, race_number INTEGER, horse_name TEXT, program_number TEXT,
+    performance_score REAL, calculation_status TEXT, data TEXT, computed_at REAL,
+    PRIMARY KEY (date, track, race_number, horse_name)
+);
+DROP INDEX IF EXISTS idx_scores_horse;
+CREATE INDEX IF NOT EXISTS idx_scores_horse_nocase ON scores(horse_name COLLATE NOCASE);
+"""
+
+# export_csv kolonları - çıktı dosyalarıyla aynı
+EXPORT_COLUMNS = {
+    'entries': ['track_name', 'race_number', 'post_position', 'program_number', 'horse_name',
+                'speed_figure', 'sire', 'trainer_jockey', 'morning_line'],
+    'essential': ['race_number', 'program_number', 'horse_name', 'latest_surface', 'latest_distance',
+                  'latest_time', 'latest_finish_position'],
+    'results': ['race_number', 'horse_name', 'finish_position', 'surface', 'distance', 'time'],
+    'scores': ['race_number', 'program_number', 'horse_name', 'performance_score', 'calculation_status']
+}
+
+
+def _race_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _score_value(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value):
+    """pandas NaN / None -> '' (CSV'deki boş hücre ile aynı)"""
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return str(value)
+
+
+class Storage:
+    """Thread-safe SQLite deposu; tek bağlantı, WAL"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _replace_partition(self, table, date_column, date_str, track_code, sql, rows):
+        """(tarih, pist) bölümünü tek transaction'da silip satırları yazar"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(f'DELETE FROM {table} WHERE {date_column} = ? AND track = ?',
+                                   (date_str, track_code))
+                self._conn.executemany(sql, rows)
+        return len(rows)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    # --- Yazma ---
+    def save_card(self, track_code, date_str, track_data):
+        """Parse edilmiş kartın pist, yarış ve entries satırlarını yazar"""
+        races = (track_data or {}).get('races', [])
+        track_name = (track_data or {}).get('track_info', {}).get('name', track_code)
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO tracks VALUES (?, ?)', (track_code, track_name))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO races VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(date_str, track_code, _race_int(race.get('race_number')), race.get('post_time', ''),
+                  race.get('race_info', {}).get('distance', ''), race.get('race_info', {}).get('surface', ''),
+                  race.get('race_info', {}).get('purse', ''), race.get('race_info', {}).get('race_type', ''))
+                 for race in races])
+            self._conn.commit()
+        from entries_diff import entries_rows_from_races
+        return self.ingest(track_code, date_str, 'entries', entries_rows_from_races(track_code, races))
+
+    def ingest(self, track_code, date_str, kind, rows):
+        """
+        Bir çıktı dosyasının satırlarını ilgili tabloya yazar; yazılan satır sayısını döndürür
+        Satırlar (tarih, pist) için tam listedir: bölümdeki eski satırlar önce silinir
+        """
+        date_str = date_str.replace('_', '-')
+        if kind == 'entries':
+            return self._replace_partition(
+                'entries', 'date', date_str, track_code,
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(date_str, track_code, _race_int(row.get('race_number')), _text(row.get('horse_name')).strip(),
+                  _text(row.get('program_number')), _text(row.get('post_position')),
+                  _text(row.get('speed_figure')), _text(row.get('sire')), _text(row.get('trainer_jockey')),
+                  _text(row.get('morning_line')))
+                 for row in rows if _text(row.get('horse_name')).strip()])
+        if kind == 'essential':
+            return self._replace_partition(
+                'horse_profiles', 'date', date_str, track_code,
+                'INSERT OR REPLACE INTO horse_profiles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(date_str, track_code, _race_int(row.get('race_number')), _text(row.get('horse_name')).strip(),
+                  _text(row.get('program_number')), _text(row.get('latest_surface')),
+                  _text(row.get('latest_distance')), _text(row.get('latest_time')),
+                  _text(row.get('latest_finish_position')))
+                 for row in rows if _text(row.get('horse_name')).strip()])
+        if kind == 'results':
+            return self._replace_partition(
+                'past_races', 'race_date', date_str, track_code,
+                'INSERT OR REPLACE INTO past_races VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(_text(row.get('horse_name')).strip(), date_str, track_code, _race_int(row.get('race_number')),
+                  _text(row.get('distance')), _text(row.get('surface')), _text(row.get('time')),
+                  _text(row.get('finish_position')), 'results')
+                 for row in rows if _text(row.get('horse_name')).strip()])
+        if kind in ('scores', 'turkish_style', 'american'):
+            now = time.time()
+            return self._replace_partition(
+                'scores', 'date', date_str, track_code,
+                'INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(date_str, track_code, _race_int(row.get('race_number')), _text(row.get('horse_name')).strip(),
+                  _text(row.get('program_number')), _score_value(row.get('performance_score')),
+                  _text(row.get('calculation_status')),
+                  json.dumps({key: _text(value) for key, value in row.items()}, ensure_ascii=False), now)
+                 for row in rows if _text(row.get('horse_name')).strip()])
+        return 0
+
+    # --- Okuma ---
+    def entries(self, date_str, track_code=None, race_number=None):
+        sql, params = 'SELECT * FROM entries WHERE date = ?', [date_str]
+        if track_code:
+            sql, params = sql + ' AND track = ?', params + [track_code]
+        if race_number is not None:
+            sql, params = sql + ' AND race_number = ?', params + [_race_int(race_number)]
+        return self._query(sql + ' ORDER BY track, race_number, CAST(program_number AS INTEGER)', params)
+
+    def essential_rows(self, date_str, track_code):
+        """Essential CSV ile aynı kolonlarda satırlar"""
+        return self._query(
+            'SELECT race_number, program_number, horse_name, latest_surface, latest_distance, latest_time, '
+            'latest_finish_position FROM horse_profiles WHERE date = ? AND track = ? '
+            'ORDER BY race_number, CAST(program_number AS INTEGER)', (date_str, track_code))
+
+    def races(self, date_str, track_code):
+        return self._query('SELECT * FROM races WHERE date = ? AND track = ? ORDER BY race_number',
+                           (date_str, track_code))
+
+    def scores(self, date_str, track_code, race_number=None):
+        sql, params = 'SELECT * FROM scores WHERE date = ? AND track = ?', [date_str, track_code]
+        if race_number is not None:
+            sql, params = sql + ' AND race_number = ?', params + [_race_int(race_number)]
+        return self._query(sql + ' ORDER BY race_number, performance_score IS NULL, performance_score', params)
+
+    def horse_history(self, horse_name):
+        """Atın tüm günlerdeki kartları (profil + skor) ve resmi sonuçları"""
+        name = horse_name.strip()
+        cards = self._query(
+            'SELECT e.date, e.track, e.race_number, e.program_number, e.morning_line, '
+            'p.latest_surface, p.latest_distance, p.latest_time, p.latest_finish_position, '
+            's.performance_score, s.calculation_status '
+            'FROM entries e '
+            'LEFT JOIN horse_profiles p ON p.date = e.date AND p.track = e.track '
+            '  AND p.race_number = e.race_number AND p.horse_name = e.horse_name '
+            'LEFT JOIN scores s ON s.date = e.date AND s.track = e.track '
+            '  AND s.race_number = e.race_number AND s.horse_name = e.horse_name '
+            'WHERE e.horse_name = ? COLLATE NOCASE ORDER BY e.date DESC, e.track', (name,))
+        results = self._query('SELECT * FROM past_races WHERE horse_name = ? COLLATE NOCASE '
+                              'ORDER BY race_date DESC', (name,))
+        return {'horse_name': name, 'cards': cards, 'results': results}
+
+    def counts(self):
+        with self._lock:
+            return {table: self._conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                    for table in ('tracks', 'races', 'entries', 'horse_profiles', 'past_races', 'scores')}
+
+    def export_csv(self, date_str, track_code, kind, path):
+        """Tablodan CSV export (entries, essential, results, scores); yazılan satır sayısını döndürür"""
+        if kind == 'entries':
+            rows = [dict(row, track_name=row['track']) for row in self.entries(date_str, track_code)]
+        elif kind == 'essential':
+            rows = self.essential_rows(date_str, track_code)
+        elif kind == 'results':
+            rows = self._query('SELECT * FROM past_races WHERE race_date = ? AND track = ? '
+                               'ORDER BY race_number, CAST(finish_position AS INTEGER)', (date_str, track_code))
+        elif kind == 'scores':
+            rows = self.scores(date_str, track_code)
+        else:
+            raise ValueError(f"Bilinmeyen export türü: {kind}")
+        write_csv_atomic(path, EXPORT_COLUMNS[kind], rows)
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_storage = None
+_default_storage_lock = threading.Lock()
+
+
+def get_default_storage():
+    """HRN_STORAGE_DB tanımlıysa paylaşılan depoyu döndürür, değilse None"""
+    global _default_storage
+    db_path = os.environ.get('HRN_STORAGE_DB')
+    if not db_path:
+        return None
+    with _default_storage_lock:
+        if _default_storage is None or _default_storage.db_path != db_path:
+            _default_storage = Storage(db_path)
+            logger.info(f"Storage enabled: {db_path}")
+        return _default_storage
+
+
+def record_card(track_code, date_str, track_data):
+    """Depo açıksa parse edilmiş kartı yazar (hata scraping'i durdurmaz)"""
+    storage = get_default_storage()
+    if storage is None:
+        return 0
+    try:
+        return storage.save_card(track_code, date_str, track_data)
+    except Exception as e:
+        logger.error(f"Kart depoya yazılamadı ({track_code} {date_str}): {e}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query or export the SQLite storage')
+    parser.add_argument('--db', default=os.environ.get('HRN_STORAGE_DB', os.path.join('data', 'hrn.sqlite3')))
+    sub = parser.add_subparsers(dest='command', required=True)
+    horse = sub.add_parser('horse', help='Bir atın tüm kartları ve sonuçları')
+    horse.add_argument('name')
+    export = sub.add_parser('export', help='Tablodan CSV export')
+    export.add_argument('date')
+    export.add_argument('track')
+    export.add_argument('kind', choices=sorted(EXPORT_COLUMNS))
+    export.add_argument('path')
+    sub.add_parser('counts', help='Tablo satır sayıları')
+    args = parser.parse_args()
+
+    storage = Storage(args.db)
+    if args.command == 'horse':
+        history = storage.horse_history(args.name)
+        for card in history['cards']:
+            print(f"{card['date']} {card['track']:<22} R{card['race_number']:<3} #{card['program_number']:<3} "
+                  f"{card['latest_time'] or '-':>8} score={card['performance_score']}")
+        for result in history['results']:
+            print(f"{result['race_date']} {result['track']:<22} R{result['race_number']:<3} "
+                  f"finished {result['finish_position']} in {result['time']}")
+    elif args.command == 'export':
+        print(f"{storage.export_csv(args.date, args.track, args.kind, args.path)} rows -> {args.path}")
+    else:
+        print(json.dumps(storage.counts(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
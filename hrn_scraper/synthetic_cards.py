@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Ölçek testleri için sentetik yarış kartı üretici
+
+Gerçek örnek kartlardaki (repo kökündeki *_entries.csv / *_essential.csv) dağılımlardan
+istenen sayıda pist, yarış ve at üretir:
+- mesafe, zemin ve son bitiş sırası örneklerdeki ham değerlerden (aynı yazım farklılıklarıyla)
+- süre, aynı mesafedeki gerçek sürelerden biri + küçük sapma
+- alan büyüklüğü ve pist başına yarış sayısı (yarış/at verilmezse), speed figure, morning line,
+  sire, trainer/jockey örneklerden; profil verisi olmayan atların oranı korunur
+- at isimleri gerçek isimlerin kelimelerinden
+
+Çıktı (output_dir altında):
+- data/<tarih>/<pist>/ düzeninde _entries.csv ve _essential.csv (manifest ile, app.py okuyabilir)
+- html/entries-results/<pist>/<tarih>.html ve html/horse/<At_Adı>.html: essential satırlarıyla
+  birebir eşleşen sayfalar (scraper parser'ları aynı kayıtları çıkarır)
+
+Kullanım:
+    python synthetic_cards.py --output synthetic --scale 100               # örneklerin 100 katı
+    python synthetic_cards.py --output synthetic --tracks 40 --races 12 --horses 14 --no-html
+"""
+
+import argparse
+import glob
+import logging
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from american_horse_calculator_turkish_style import distance_to_meters, time_to_seconds
+from data_store import DataStore
+from hrn_standin_server import (REAL_TRACKS, RACE_TYPES, _format_post_time, render_entries_page,
+                                render_profile_history)
+from pipeline import ENTRIES_FIELDS, ESSENTIAL_FIELDS
+from utils import write_csv_atomic
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DEFAULT_DATE = '2025-09-28'
+# Aynı mesafedeki gerçek süreye eklenen sapma (saniye, standart sapma)
+TIME_JITTER = 0.6
+
+
+def _blank(value):
+    return value is None or (isinstance(value, float) and math.isnan(value)) or str(value).strip() == ''
+
+
+def _surface_base(surface):
+    """'Turf-Firm' -> 'Turf' (entries sayfasındaki yarış zemini)"""
+    base = str(surface).split('-')[0].strip() or 'Dirt'
+    return 'Synthetic' if base.startswith('Synth') else base
+
+
+class SampleDistributions:
+    """Örnek kartlardan çıkarılan ampirik dağılımlar (her değer görüldüğü sıklıkta tutulur)"""
+
+    def __init__(self, entries_rows, essential_rows):
+        if not entries_rows or not essential_rows:
+            raise ValueError("Örnek entries ve essential satırları gerekli")
+        profiled = [row for row in essential_rows
+                    if not _blank(row.get('latest_time')) and not _blank(row.get('latest_distance'))
+                    and time_to_seconds(row['latest_time']) > 0 and distance_to_meters(row['latest_distance']) > 0]
+        if not profiled:
+            raise ValueError("Örneklerde geçerli son yarış verisi yok")
+
+        self.missing_rate = 1 - len(profiled) / len(essential_rows)
+        self.distances = [str(row['latest_distance']) for row in profiled]
+        self.surfaces = [str(row['latest_surface']) for row in profiled if not _blank(row.get('latest_surface'))]
+        self.finish_positions = [int(''.join(ch for ch in str(row['latest_finish_position']) if ch.isdigit()))
+                                 for row in profiled
+                                 if any(ch.isdigit() for ch in str(row.get('latest_finish_position', '')))]
+        # Aynı mesafenin farklı yazımları ('6F', '6 f') tek anahtarda: metre
+        self.times_by_meters = {}
+        for row in profiled:
+            meters = round(distance_to_meters(row['latest_distance']))
+            self.times_by_meters.setdefault(meters, []).append(time_to_seconds(row['latest_time']))
+        self.seconds_per_meter = (sum(sum(times) for times in self.times_by_meters.values())
+                                  / sum(meters * len(times) for meters, times in self.times_by_meters.items()))
+
+        def column(name):
+            return [row[name] for row in entries_rows if not _blank(row.get(name))]
+
+        self.speed_figures = [int(float(value)) for value in column('speed_figure')
+                              if str(value).replace('.', '', 1).isdigit()]
+        self.morning_lines = [str(value) for value in column('morning_line')]
+        self.sires = [str(value) for value in column('sire')]
+        self.trainer_jockeys = [str(value) for value in column('trainer_jockey')]
+        field_sizes, races_per_card = {}, {}
+        for row in entries_rows:
+            key = (row['track_name'], row['race_number'])
+            field_sizes[key] = field_sizes.get(key, 0) + 1
+            races_per_card.setdefault(row['track_name'], set()).add(row['race_number'])
+        self.field_sizes = list(field_sizes.values())
+        self.races_per_card = [len(races) for races in races_per_card.values()]
+        words = [str(row['horse_name']).split() for row in entries_rows if not _blank(row.get('horse_name'))]
+        self.first_words = [parts[0] for parts in words if parts]
+        self.last_words = [parts[-1] for parts in words if len(parts) > 1] or self.first_words
+
+    @classmethod
+    def from_samples(cls, sample_dir=SAMPLE_DIR):
+        """sample_dir'deki tüm *_entries.csv / *_essential.csv dosyalarından"""
+        def rows(kind):
+            paths = sorted(glob.glob(os.path.join(sample_dir, f'*_{kind}.csv')))
+            if not paths:
+                raise ValueError(f"Örnek {kind} CSV bulunamadı: {sample_dir}")
+            return pd.concat([pd.read_csv(path) for path in paths], ignore_index=True).to_dict('records')
+        return cls(rows('entries'), rows('essential'))
+
+    def sample_time(self, rng, distance):
+        """Mesafe için gerçekçi süre (saniye); örneklerde olmayan mesafede ortalama hızdan"""
+        meters = distance_to_meters(distance)
+        observed = self.times_by_meters.get(round(meters))
+        seconds = rng.choice(observed) if observed else meters * self.seconds_per_meter
+        return max(seconds + rng.gauss(0, TIME_JITTER), 1.0)
+
+
+def track_list(count):
+    """Gerçek slug'larla başlayan count pist (stand-in sunucusuyla aynı adlar)"""
+    tracks = list(REAL_TRACKS[:count])
+    for i in range(len(tracks), count):
+        tracks.append((f"synthetic-park-{i + 1}", f"Synthetic Park {i + 1}"))
+    return tracks
+
+
+def _unique_name(rng, distributions, used):
+    name = f"{rng.choice(distributions.first_words)} {rng.choice(distributions.last_words)}"
+    while name.lower() in used:
+        name = f"{name} {rng.choice(distributions.last_words)}"
+    used.add(name.lower())
+    return name
+
+
+def _format_time(seconds):
+    """Profil parser'ının ürettiği biçim: PT1M8.61S -> '1:08.61'"""
+    minutes = int(seconds // 60)
+    return f"{minutes}:{f'{seconds - minutes * 60:.2f}'.zfill(5)}"
+
+
+def generate_card(distributions, rng, slug, name, date_str, races=None, horses=None, used_names=None):
+    """
+    Tek pistin kartı: stand-in render_entries_page biçiminde + her at için 'history'
+    (ilk eleman son yarış; profil verisi olmayan atlarda boş)
+    """
+    used_names = used_names if used_names is not None else set()
+    card_date = datetime.strptime(date_str, '%Y-%m-%d')
+    race_count = races or rng.choice(distributions.races_per_card)
+    first_post = rng.randrange(0, 90, 5)
+    card_races = []
+    for race_number in range(1, race_count + 1):
+        post_minutes = first_post + (race_number - 1) * rng.choice([25, 30, 30, 35])
+        entries = []
+        for program_number in range(1, (horses or rng.choice(distributions.field_sizes)) + 1):
+            history = []
+            if rng.random() >= distributions.missing_rate:
+                race_day = card_date - timedelta(days=rng.randint(10, 60))
+                for _ in range(rng.randint(1, 6)):
+                    distance = rng.choice(distributions.distances)
+                    history.append({
+                        'date': race_day, 'distance': distance, 'seconds': distributions.sample_time(rng, distance),
+                        'position': rng.choice(distributions.finish_positions),
+                        'speed_figure': rng.choice(distributions.speed_figures),
+                        'track': rng.choice(REAL_TRACKS)[1], 'surface': rng.choice(distributions.surfaces),
+                        'race_type': rng.choice(RACE_TYPES)
+                    })
+                    race_day -= timedelta(days=rng.randint(14, 45))
+            entries.append({
+                'program_number': program_number,
+                'horse_name': _unique_name(rng, distributions, used_names),
+                'speed_figure': rng.choice(distributions.speed_figures),
+                'sire': rng.choice(distributions.sires),
+                # Gerçek sayfada trainer ve jockey aynı hücrede bitişik
+                'trainer': rng.choice(distributions.trainer_jockeys),
+                'jockey': '',
+                'morning_line': rng.choice(distributions.morning_lines),
+                'last_start': history[0]['date'].strftime('%Y-%m-%d') if history else '',
+                'history': history
+            })
+        card_races.append({
+            'race_number': race_number,
+            'post_time': _format_post_time(post_minutes),
+            'distance': rng.choice(distributions.distances),
+            'surface': _surface_base(rng.choice(distributions.surfaces)),
+            'race_type': rng.choice(RACE_TYPES),
+            'purse': f"{rng.randrange(15, 250) * 1000:,}",
+            'entries': entries
+        })
+    return {'slug': slug, 'name': name, 'date': date_str, 'races': card_races}
+
+
+def card_rows(card):
+    """Kart -> (entries satırları, essential satırları) pipeline kolonlarıyla"""
+    entries, essential = [], []
+    for race in card['races']:
+        for entry in race['entries']:
+            entries.append({
+                'track_name': card['slug'], 'race_number': race['race_number'],
+                'post_position': entry['program_number'], 'program_number': entry['program_number'],
+                'horse_name': entry['horse_name'], 'speed_figure': entry['speed_figure'], 'sire': entry['sire'],
+                'trainer_jockey': entry['trainer'] + entry['jockey'], 'morning_line': entry['morning_line'],
+                'last_start': entry['last_start']
+            })
+            latest = entry['history'][0] if entry['history'] else None
+            essential.append({
+                'race_number': race['race_number'], 'program_number': entry['program_number'],
+                'horse_name': entry['horse_name'],
+                'latest_surface': latest['surface'] if latest else '',
+                'latest_distance': latest['distance'] if latest else '',
+                'latest_time': _format_time(latest['seconds']) if latest else '',
+                'latest_finish_position': latest['position'] if latest else ''
+            })
+    return entries, essential
+
+
+def write_cards(output_dir, tracks=None, races=None, horses=None, date_str=DEFAULT_DATE, seed=42,
+                html=True, distributions=None, scale=None):
+    """
+    Sentetik kartları output_dir altına yazar
+    scale verilirse pist sayısı örnek kart sayısının scale katıdır (yarış/at sayıları örneklerden)
+    Dönüş: {'tracks', 'races', 'horses', 'profiles', 'files', 'seconds', 'data_dir', 'html_dir'}
+    """
+    started = time.time()
+    distributions = distributions or SampleDistributions.from_samples()
+    if tracks is None:
+        tracks = max(1, round(len(distributions.races_per_card) * (scale or 1)))
+    rng = random.Random(seed)
+    store = DataStore(os.path.join(output_dir, 'data'))
+    html_dir = os.path.join(output_dir, 'html')
+    used_names = set()
+    summary = {'tracks': 0, 'races': 0, 'horses': 0, 'profiles': 0, 'files': 0,
+               'data_dir': store.root, 'html_dir': html_dir if html else None}
+
+    for slug, name in track_list(tracks):
+        card = generate_card(distributions, rng, slug, name, date_str, races, horses, used_names)
+        entries, essential = card_rows(card)
+        base = store.base_name(slug, date_str)
+        for kind, fields, rows in (('entries', ENTRIES_FIELDS, entries), ('essential', ESSENTIAL_FIELDS, essential)):
+            path = f"{base}_{kind}.csv"
+            write_csv_atomic(path, fields, rows)
+            store.record(slug, date_str, kind, path, rows)
+            summary['files'] += 1
+
+        if html:
+            entries_dir = os.path.join(html_dir, 'entries-results', slug)
+            os.makedirs(entries_dir, exist_ok=True)
+            with open(os.path.join(entries_dir, f"{date_str}.html"), 'w', encoding='utf-8') as f:
+                f.write(render_entries_page(card))
+            profile_dir = os.path.join(html_dir, 'horse')
+            os.makedirs(profile_dir, exist_ok=True)
+            for race in card['races']:
+                for entry in race['entries']:
+                    if not entry['history']:
+                        continue  # Gerçek sitede profili bulunamayan at
+                    with open(os.path.join(profile_dir, f"{entry['horse_name'].replace(' ', '_')}.html"),
+                              'w', encoding='utf-8') as f:
+                        f.write(render_profile_history(entry['horse_name'], entry['history'], rng))
+                    summary['profiles'] += 1
+            summary['files'] += 1
+
+        summary['tracks'] += 1
+        summary['races'] += len(card['races'])
+        summary['horses'] += len(entries)
+
+    summary['files'] += summary['profiles']
+    summary['seconds'] = round(time.time() - started, 2)
+    logger.info(f"Synthetic cards: {summary['tracks']} tracks, {summary['races']} races, "
+                f"{summary['horses']} horses in {summary['seconds']}s -> {output_dir}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic race cards from real sample distributions')
+    parser.add_argument('--output', required=True, help='Çıktı dizini (data/ ve html/ altına yazılır)')
+    parser.add_argument('--scale', type=float, default=None, help='Örnek kart sayısının katı kadar pist')
+    parser.add_argument('--tracks', type=int, default=None)
+    parser.add_argument('--races', type=int, default=None, help='Pist başına yarış (varsayılan: örneklerden)')
+    parser.add_argument('--horses', type=int, default=None, help='Yarış başına at (varsayılan: örneklerden)')
+    parser.add_argument('--date', default=DEFAULT_DATE, help='YYYY-MM-DD')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--samples', default=SAMPLE_DIR, help='Örnek CSV dizini')
+    parser.add_argument('--no-html', action='store_true', help='HTML sayfalarını üretme')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    summary = write_cards(args.output, args.tracks, args.races, args.horses, args.date, args.seed,
+                          not args.no_html, SampleDistributions.from_samples(args.samples), args.scale)
+    print(f"{summary['tracks']} tracks, {summary['races']} races, {summary['horses']} horses, "
+          f"{summary['profiles']} profile pages, {summary['files']} files in {summary['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
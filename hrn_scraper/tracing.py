@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Süreç içi hafif tracing - fetch, parse, score ve serialise adımları için span'ler
+
+Bir çalıştırma (pipeline run'ı ya da tek API isteği) bir trace'tir. Span'ler track / race /
+horse / url / variant gibi öznitelikler taşır. Trace bitince OTLP JSON biçiminde
+(ExportTraceServiceRequest, satır başına bir trace - OpenTelemetry Collector file exporter ile aynı)
+dosyaya eklenir.
+
+- Tracer yoksa span() hiçbir şey kaydetmez (set / set_response çağrıları da boşa gider)
+- Pipeline: HRN_TRACE_FILE ya da --trace FILE; app: HRN_TRACE_FILE tanımlıysa her profiled istek
+
+Kullanım:
+    with trace('pipeline.run', 'traces.jsonl', process_wide=True):
+        with fetch_span(url, track='santa-anita') as s:
+            response = session.get(url)
+            s.set_response(response)
+
+    python tracing.py traces.jsonl              # son trace: kritik yol, en yavaş atlar ve URL varyantları
+    python tracing.py traces.jsonl --all --top 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'hrn-scraper'
+SCOPE_NAME = 'hrn_scraper.tracing'
+STATUS_OK = 1
+STATUS_ERROR = 2
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+_local = threading.local()
+_process_tracer = None
+
+
+class Span:
+    """Tek adım: başlangıç/bitiş (unix ns), öznitelikler ve durum"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'start_ns', 'end_ns',
+                 'attributes', 'status', 'message')
+
+    def __init__(self, trace_id, parent_id, name, attributes, kind=SPAN_KIND_INTERNAL):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.status = STATUS_OK
+        self.message = ''
+
+    def set(self, **attributes):
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def fail(self, message):
+        self.status = STATUS_ERROR
+        self.message = str(message)
+
+    def set_response(self, response):
+        self.set(status_code=response.status_code, from_cache=bool(getattr(response, 'from_cache', False)),
+                 bytes=len(response.content))
+
+    @property
+    def seconds(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _plain_value(value):
+    if 'intValue' in value:
+        return int(value['intValue'])
+    for key in ('doubleValue', 'boolValue', 'stringValue'):
+        if key in value:
+            return value[key]
+    return None
+
+
+class _NoopSpan:
+    """Tracer yokken span() bunu verir"""
+
+    def set(self, **attributes):
+        pass
+
+    def fail(self, message):
+        pass
+
+    def set_response(self, response):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Bir trace'in span'lerini toplar (thread-safe)"""
+
+    def __init__(self, service_name=SERVICE_NAME):
+        self.service_name = service_name
+        self.trace_id = secrets.token_hex(16)
+        self.root = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name, parent=None, kind=SPAN_KIND_INTERNAL, **attributes):
+        return Span(self.trace_id, parent.span_id if parent is not None else None, name, attributes, kind)
+
+    def finish(self, span):
+        span.end_ns = time.time_ns()
+        with self._lock:
+            self.spans.append(span)
+
+    def to_otlp(self):
+        """ExportTraceServiceRequest JSON'u (OTLP/JSON)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+            'scopeSpans': [{
+                'scope': {'name': SCOPE_NAME},
+                'spans': [{
+                    'traceId': span.trace_id,
+                    'spanId': span.span_id,
+                    'parentSpanId': span.parent_id or '',
+                    'name': span.name,
+                    'kind': span.kind,
+                    'startTimeUnixNano': str(span.start_ns),
+                    'endTimeUnixNano': str(span.end_ns),
+                    'attributes': [{'key': key, 'value': _otlp_value(value)}
+                                   for key, value in sorted(span.attributes.items())],
+                    'status': {'code': span.status, 'message': span.message} if span.message else {'code': span.status}
+                } for span in spans]
+            }]
+        }]}
+
+    def export(self, path):
+        """Trace'i dosyaya tek satır olarak ekler"""
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            line = json.dumps(self.to_otlp(), separators=(',', ':'))
+            with self._lock, open(path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            logger.info(f"Trace {self.trace_id}: {len(self.spans)} spans -> {path}")
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Trace yazılamadı ({path}): {e}")
+            return False
+
+
+def current_tracer():
+    """Bu thread'in tracer'ı, yoksa süreç geneli tracer (yoksa None)"""
+    return getattr(_local, 'tracer', None) or _process_tracer
+
+
+def current_span():
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+def trace_file():
+    """HRN_TRACE_FILE (tanımlı değilse None)"""
+    return os.environ.get('HRN_TRACE_FILE') or None
+
+
+@contextmanager
+def trace(name, path=None, process_wide=False, **attributes):
+    """
+    Yeni trace başlatır, kök span'i döndürür; çıkışta path'e yazılır
+    process_wide=True: diğer thread'lerdeki span'ler de bu trace'e girer (pipeline aşamaları)
+    """
+    global _process_tracer
+    tracer = Tracer()
+    previous_local = getattr(_local, 'tracer', None)
+    previous_process = _process_tracer
+    if process_wide:
+        _process_tracer = tracer
+    _local.tracer = tracer
+    try:
+        with span(name, **attributes) as root:
+            tracer.root = root
+            yield root
+    finally:
+        _local.tracer = previous_local
+        if process_wide:
+            _process_tracer = previous_process
+        if path:
+            tracer.export(path)
+
+
+@contextmanager
+def span(name, parent=None, kind=SPAN_KIND_INTERNAL, **attributes):
+    """
+    Geçerli trace'te span; parent verilmezse bu thread'deki açık span'in, o da yoksa
+    (pipeline worker thread'leri) trace kökünün altına girer. Tracer yoksa NOOP_SPAN verir
+    """
+    tracer = current_tracer()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+    if parent is None:
+        parent = current_span() or tracer.root
+    item = tracer.start_span(name, parent, kind, **attributes)
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(item)
+    try:
+        yield item
+    except BaseException as e:
+        item.fail(e)
+        raise
+    finally:
+        stack.pop()
+        tracer.finish(item)
+
+
+def fetch_span(url, **attributes):
+    """HTTP isteği span'i: url, URL sınıfı ve profil slug varyantı öznitelikleriyle"""
+    from metrics import url_labels
+
+    host, url_class, variant = url_labels(url)
+    return span('fetch', kind=SPAN_KIND_CLIENT, url=url, host=host, url_class=url_class,
+                variant=variant or None, **attributes)
+
+
+# --- Özet (CLI) ---
+
+def load_traces(path):
+    """OTLP JSON satırları -> [[span dict, ...], ...] (trace başına)"""
+    traces = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            spans = []
+            for resource in json.loads(line).get('resourceSpans', []):
+                for scope in resource.get('scopeSpans', []):
+                    for item in scope.get('spans', []):
+                        start, end = int(item['startTimeUnixNano']), int(item['endTimeUnixNano'])
+                        spans.append({
+                            'trace_id': item['traceId'], 'span_id': item['spanId'],
+                            'parent_id': item.get('parentSpanId') or None, 'name': item['name'],
+                            'start': start, 'end': end, 'seconds': (end - start) / 1e9,
+                            'status': item.get('status', {}).get('code', STATUS_OK),
+                            'attributes': {attribute['key']: _plain_value(attribute['value'])
+                                           for attribute in item.get('attributes', [])}
+                        })
+            if spans:
+                traces.append(spans)
+    return traces
+
+
+def critical_path(spans):
+    """Kökten başlayıp her seviyede en son biten çocuğu izler: [(derinlik, span)]"""
+    children = {}
+    ids = {item['span_id'] for item in spans}
+    for item in spans:
+        children.setdefault(item['parent_id'] if item['parent_id'] in ids else None, []).append(item)
+    roots = children.get(None, [])
+    if not roots:
+        return []
+    path, node = [], max(roots, key=lambda item: item['end'] - item['start'])
+    while node is not None:
+        path.append((len(path), node))
+        node = max(children.get(node['span_id'], []), key=lambda item: item['end'], default=None)
+    return path
+
+
+def slowest_horses(spans, top=10):
+    """At bazında duvar saati (ilk span başı - son span sonu) ve adım toplamları"""
+    horses = {}
+    for item in spans:
+        horse = item['attributes'].get('horse')
+        if not horse:
+            continue
+        entry = horses.setdefault(horse, {'horse': horse, 'track': '', 'race': '',
+                                          'start': item['start'], 'end': item['end'], 'steps': {}})
+        entry['track'] = entry['track'] or item['attributes'].get('track', '')
+        entry['race'] = entry['race'] or item['attributes'].get('race', '')
+        entry['start'] = min(entry['start'], item['start'])
+        entry['end'] = max(entry['end'], item['end'])
+        entry['steps'][item['name']] = entry['steps'].get(item['name'], 0.0) + item['seconds']
+    ranked = sorted(horses.values(), key=lambda entry: entry['end'] - entry['start'], reverse=True)
+    return [dict(entry, seconds=(entry['end'] - entry['start']) / 1e9) for entry in ranked[:top]]
+
+
+def url_variant_stats(spans):
+    """fetch span'leri (URL sınıfı, varyant) bazında: sayı, toplam, ortalama, en yüksek, hata"""
+    stats = {}
+    for item in spans:
+        if item['name'] != 'fetch':
+            continue
+        attributes = item['attributes']
+        key = (attributes.get('url_class', 'other'), str(attributes.get('variant', '')))
+        entry = stats.setdefault(key, {'url_class': key[0], 'variant': key[1], 'count': 0, 'total': 0.0,
+                                       'max': 0.0, 'errors': 0, 'slowest_url': ''})
+        entry['count'] += 1
+        entry['total'] += item['seconds']
+        if item['seconds'] >= entry['max']:
+            entry['max'], entry['slowest_url'] = item['seconds'], attributes.get('url', '')
+        if item['status'] == STATUS_ERROR or int(attributes.get('status_code', 200) or 200) >= 400:
+            entry['errors'] += 1
+    for entry in stats.values():
+        entry['mean'] = entry['total'] / entry['count']
+    return sorted(stats.values(), key=lambda entry: entry['total'], reverse=True)
+
+
+def summarize(spans, top=10):
+    return {'trace_id': spans[0]['trace_id'], 'spans': len(spans), 'critical_path': critical_path(spans),
+            'slowest_horses': slowest_horses(spans, top), 'url_variants': url_variant_stats(spans)}
+
+
+def _describe(attributes):
+    keys = ('track', 'race', 'horse', 'url_class', 'variant', 'status_code')
+    return ' '.join(f"{key}={attributes[key]}" for key in keys if attributes.get(key) not in (None, ''))
+
+
+def print_summary(summary):
+    print(f"Trace {summary['trace_id']} ({summary['spans']} spans)")
+    print("Kritik yol / critical path:")
+    for depth, item in summary['critical_path']:
+        print(f"  {'  ' * depth}{item['name']:<24} {item['seconds'] * 1000:>10.1f} ms  {_describe(item['attributes'])}")
+    if summary['slowest_horses']:
+        print("En yavaş atlar / slowest horses:")
+        for entry in summary['slowest_horses']:
+            steps = ', '.join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in sorted(entry['steps'].items()))
+            print(f"  {entry['horse'][:28]:<28} {entry['track']:<20} R{entry['race']:<3} "
+                  f"{entry['seconds'] * 1000:>9.1f} ms  ({steps})")
+    if summary['url_variants']:
+        print("URL varyantları / URL variants:")
+        for entry in summary['url_variants']:
+            label = f"{entry['url_class']}[{entry['variant']}]" if entry['variant'] else entry['url_class']
+            print(f"  {label:<16} {entry['count']:>6} fetches  mean {entry['mean'] * 1000:>8.1f} ms  "
+                  f"max {entry['max'] * 1000:>8.1f} ms  errors {entry['errors']:>4}  {entry['slowest_url']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarise traces: critical path, slowest horses and URL variants')
+    parser.add_argument('path', nargs='?', default=trace_file(), help='OTLP JSON trace dosyası (varsayılan: HRN_TRACE_FILE)')
+    parser.add_argument('--all', action='store_true', help='Tüm trace\'ler (varsayılan: yalnızca sonuncusu)')
+    parser.add_argument('--top', type=int, default=10, help='Listelenecek at sayısı')
+    args = parser.parse_args()
+    if not args.path:
+        parser.error('Trace dosyası verilmedi')
+
+    traces = load_traces(args.path)
+    if not traces:
+        print(f"Trace bulunamadı: {args.path}")
+        return
+    for spans in (traces if args.all else traces[-1:]):
+        print_summary(summarize(spans, args.top))
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Pist kaydı (track registry) - bilinen pistler + günlük aktif pist listesi
+
+Bilinen pistler (kod, isim, HRN slug'ı, grup) tek yerde tutulur. Günün aktif pistleri
+HorseRacingNationScraper.get_daily_tracks ile tarih başına bir kez çekilir ve cache'lenir;
+böylece o gün yarışı olmayan pistler için hiç istek atılmaz.
+
+- Alınamayan liste de NEGATIVE_TTL boyunca hatırlanır; HRN kapalıyken her çağrı 30 sn'lik
+  timeout'u tekrar beklemez
+- tracks_for_display (ana sayfa) ağ isteği yapmaz: cache'teki (ya da statik) listeyi verir,
+  liste eskiyse arka planda yeniler
+
+Kullanım:
+    registry = get_track_registry()
+    registry.is_active('belmont-park', '2025-09-28')   # True / False / None (liste alınamadı)
+    registry.entries_url('belmont-park', '2025-09-28')
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+import pytz
+
+from utils import calculate_race_start_datetime
+
+logger = logging.getLogger(__name__)
+
+# Pist kodu -> bilgiler. slug: entries sayfasındaki HRN slug'ı, label: kısa menü adı
+KNOWN_TRACKS = {
+    # Major
+    'aqueduct': {'name': 'Aqueduct', 'slug': 'belmont-at-aqueduct', 'group': 'major',
+                 'description': 'Aqueduct Racetrack, New York'},
+    'belmont-park': {'name': 'Belmont Park', 'slug': 'belmont-at-aqueduct', 'group': 'major',
+                     'description': 'Belmont at Aqueduct, New York'},
+    'churchill-downs': {'name': 'Churchill Downs', 'slug': 'churchill-downs', 'group': 'major',
+                        'description': 'Churchill Downs, Kentucky'},
+    'gulfstream-park': {'name': 'Gulfstream Park', 'slug': 'gulfstream-park', 'group': 'major',
+                        'description': 'Gulfstream Park, Florida'},
+    'laurel-park': {'name': 'Laurel Park', 'slug': 'laurel-park', 'group': 'major',
+                    'description': 'Laurel Park, Maryland'},
+    'santa-anita': {'name': 'Santa Anita', 'slug': 'santa-anita', 'group': 'major',
+                    'description': 'Santa Anita Park, California'},
+    'woodbine': {'name': 'Woodbine', 'slug': 'woodbine', 'group': 'major',
+                 'description': 'Woodbine Racetrack, Ontario'},
+    'remington-park': {'name': 'Remington Park', 'slug': 'remington-park', 'group': 'major',
+                       'description': 'Remington Park, Oklahoma'},
+    # Regional
+    'delaware-park': {'name': 'Delaware Park', 'slug': 'delaware-park', 'group': 'regional',
+                      'description': 'Delaware Park, Delaware'},
+    'del-mar': {'name': 'Del Mar', 'slug': 'del-mar', 'group': 'regional'},
+    'keeneland': {'name': 'Keeneland', 'slug': 'keeneland', 'group': 'regional'},
+    'oaklawn-park': {'name': 'Oaklawn Park', 'slug': 'oaklawn-park', 'group': 'regional'},
+    'pimlico': {'name': 'Pimlico', 'slug': 'pimlico', 'group': 'regional'},
+    'saratoga': {'name': 'Saratoga', 'slug': 'saratoga', 'group': 'regional'},
+    'mountaineer': {'name': 'Mountaineer Casino Racetrack', 'label': 'Mountaineer',
+                    'slug': 'mountaineer', 'group': 'regional'},
+    'hawthorne-race-course': {'name': 'Hawthorne Race Course', 'label': 'Hawthorne',
+                              'slug': 'hawthorne-race-course', 'group': 'regional'},
+    'los-alamitos': {'name': 'Los Alamitos Race Course', 'label': 'Los Alamitos',
+                     'slug': 'los-alamitos', 'group': 'regional',
+                     'description': 'Los Alamitos Race Course, California'},
+    'fair-grounds': {'name': 'Fair Grounds', 'slug': 'fair-grounds', 'group': 'regional'},
+    'tampa-bay-downs': {'name': 'Tampa Bay Downs', 'slug': 'tampa-bay-downs', 'group': 'regional'},
+    'parx-racing': {'name': 'Parx Racing', 'slug': 'parx-racing', 'group': 'regional'},
+    # International & others
+    'will-rogers-downs': {'name': 'Will Rogers Downs', 'slug': 'will-rogers-downs', 'group': 'other'},
+    'camarero-race-track': {'name': 'Camarero Race Track', 'label': 'Camarero',
+                            'slug': 'camarero-race-track', 'group': 'other'},
+    'lethbridge-rmtc': {'name': 'Lethbridge RMTC', 'label': 'Lethbridge', 'slug': 'lethbridge-rmtc',
+                        'group': 'other', 'description': 'Lethbridge Racing, Alberta'},
+    'albuquerque-downs': {'name': 'Albuquerque Downs', 'label': 'Albuquerque', 'slug': 'albuquerque-downs',
+                          'group': 'other', 'description': 'Albuquerque Downs, New Mexico'},
+    'grants-pass-downs': {'name': 'Grants Pass Downs', 'label': 'Grants Pass',
+                          'slug': 'grants-pass-downs', 'group': 'other'},
+    'horseshoe-indianapolis': {'name': 'Horseshoe Indianapolis', 'slug': 'horseshoe-indianapolis',
+                               'group': 'other'},
+    'finger-lakes': {'name': 'Finger Lakes', 'slug': 'finger-lakes', 'group': 'other'},
+    'thistledown': {'name': 'Thistledown', 'slug': 'thistledown', 'group': 'other'},
+    'fort-erie': {'name': 'Fort Erie', 'slug': 'fort-erie', 'group': 'other'},
+    'presque-isle-downs': {'name': 'Presque Isle Downs', 'slug': 'presque-isle-downs', 'group': 'other'},
+    'belterra-park': {'name': 'Belterra Park', 'slug': 'belterra-park', 'group': 'other',
+                      'description': 'Belterra Park Gaming, Ohio'},
+    'fairmount-park': {'name': 'Fairmount Park', 'slug': 'fairmount-park', 'group': 'other',
+                       'description': 'Fairmount Park, Illinois'},
+    'hastings-park': {'name': 'Hastings Park', 'slug': 'hastings-park', 'group': 'other',
+                      'description': 'Hastings Racecourse, British Columbia'},
+    'charles-town': {'name': 'Charles Town', 'slug': 'charles-town', 'group': 'other',
+                     'description': 'Charles Town Races, West Virginia'},
+    'belmont-at-aqueduct': {'name': 'Belmont at Aqueduct', 'slug': 'belmont-at-aqueduct', 'group': 'other',
+                            'description': 'Belmont at Aqueduct, New York'},
+}
+
+# Menüdeki grup sırası ve başlıkları
+TRACK_GROUPS = [
+    ('major', '🏇 Major Tracks'),
+    ('regional', '🎯 Regional Tracks'),
+    ('other', '🌎 International & Others'),
+]
+
+# Günlük liste bugün için bu kadar süre geçerli; geçmiş tarihler değişmez
+DAILY_LIST_TTL = 10 * 60
+# Alınamayan / boş liste bu kadar süre tekrar istenmez
+NEGATIVE_TTL = 60
+
+
+class TrackRegistry:
+    """Bilinen pistler + tarih başına cache'lenen günlük aktif pist listesi"""
+
+    def __init__(self, scraper=None, ttl=DAILY_LIST_TTL, negative_ttl=NEGATIVE_TTL):
+        self._scraper = scraper
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._days = {}
+        self._failed = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _get_scraper(self):
+        if self._scraper is None:
+            from hrn_scraper import HorseRacingNationScraper
+            self._scraper = HorseRacingNationScraper()
+        return self._scraper
+
+    # --- Bilinen pistler ---
+
+    def slug_for(self, code):
+        """Pist kodunu HRN entries slug'ına çevirir (bilinmiyorsa kodun kendisi)"""
+        info = KNOWN_TRACKS.get(code)
+        return info['slug'] if info else code
+
+    def name_for(self, code, date_str=None):
+        """Pist kodunun görünen adı; bilinmeyen kodlar için günlük listedeki ad"""
+        info = KNOWN_TRACKS.get(code)
+        if info:
+            return info['name']
+        if date_str:
+            active = self.active_tracks(date_str) or {}
+            if code in active:
+                return active[code]['name']
+        return code
+
+    def is_known(self, code, date_str=None):
+        """Kod bilinen bir pist mi veya o günün listesinde mi?"""
+        if code in KNOWN_TRACKS:
+            return True
+        return bool(date_str and code in (self.active_tracks(date_str) or {}))
+
+    def track_names(self):
+        """{kod: isim} - eski TRACK_MAPPING sözlükleriyle aynı şekil"""
+        return {code: info['name'] for code, info in KNOWN_TRACKS.items()}
+
+    def unique_tracks(self):
+        """Her HRN slug'ı için tek kayıt (CLI menüleri için): [{'slug', 'name', 'description'}]"""
+        tracks = []
+        seen = set()
+        for code, info in KNOWN_TRACKS.items():
+            slug = info['slug']
+            if slug in seen:
+                continue
+            seen.add(slug)
+            # Slug'ın kendi kaydı varsa onun adı kullanılır (belmont-at-aqueduct)
+            own = KNOWN_TRACKS.get(slug, info)
+            tracks.append({'slug': slug, 'name': own['name'],
+                           'description': own.get('description', own['name'])})
+        return tracks
+
+    def codes_for_slug(self, slug):
+        """Aynı slug'a giden tüm kodlar (örn. aqueduct, belmont-park -> belmont-at-aqueduct)"""
+        return [code for code, info in KNOWN_TRACKS.items() if info['slug'] == slug] or [slug]
+
+    # --- Günlük aktif liste ---
+
+    def active_tracks(self, date_str, refresh=False):
+        """
+        O gün yarışı olan pistler: {slug: {'name', 'url', 'time', 'first_post', ...}}
+        Liste alınamazsa None döner (çağıran eski yöntemle kontrol edebilir)
+        """
+        with self._lock:
+            cached = self._days.get(date_str)
+            failed_at = self._failed.get(date_str)
+        if cached and not refresh and not self._expired(date_str, cached[0]):
+            return cached[1]
+        if failed_at is not None and not refresh and time.time() - failed_at < self.negative_ttl:
+            return cached[1] if cached else None
+
+        tracks = self._get_scraper().get_daily_tracks(date_str)
+        if not tracks:
+            # Boş liste ile ağ hatası ayırt edilemez - kısa süreliğine hatırlanır, sonra tekrar denenir
+            logger.warning(f"Daily track list unavailable for {date_str}, retrying in {self.negative_ttl}s")
+            with self._lock:
+                self._failed[date_str] = time.time()
+            return cached[1] if cached else None
+
+        eastern = pytz.timezone('US/Eastern')
+        active = {}
+        for track in tracks:
+            slug = track.get('slug')
+            if not slug:
+                continue
+            first_post = calculate_race_start_datetime(date_str, track.get('time'))
+            active[slug] = dict(track, first_post=eastern.localize(first_post) if first_post else None)
+
+        with self._lock:
+            self._days[date_str] = (time.time(), active)
+            self._failed.pop(date_str, None)
+        logger.info(f"Track registry: {len(active)} active tracks for {date_str}")
+        return active
+
+    def _expired(self, date_str, fetched_at):
+        today = datetime.now(pytz.timezone('US/Eastern')).strftime('%Y-%m-%d')
+        if date_str < today:
+            return False
+        return time.time() - fetched_at > self.ttl
+
+    def cached_tracks(self, date_str):
+        """Ağ isteği yapmadan cache'teki aktif liste (süresi geçmiş olsa da); yoksa None"""
+        with self._lock:
+            cached = self._days.get(date_str)
+        return cached[1] if cached else None
+
+    def refresh_in_background(self, date_str):
+        """Liste yoksa ya da eskidiyse arka planda çeker (tarih başına tek thread); True: başlatıldı"""
+        with self._lock:
+            cached = self._days.get(date_str)
+            failed_at = self._failed.get(date_str)
+            if cached and not self._expired(date_str, cached[0]):
+                return False
+            if failed_at is not None and time.time() - failed_at < self.negative_ttl:
+                return False
+            if date_str in self._refreshing:
+                return False
+            self._refreshing.add(date_str)
+
+        def run():
+            try:
+                self.active_tracks(date_str)
+            except Exception as e:
+                logger.error(f"Günlük pist listesi yenilenemedi ({date_str}): {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(date_str)
+
+        threading.Thread(target=run, name='track-registry-refresh', daemon=True).start()
+        return True
+
+    def is_active(self, code, date_str):
+        """True/False; günlük liste alınamadıysa None"""
+        active = self.active_tracks(date_str)
+        if active is None:
+            return None
+        return self.slug_for(code) in active
+
+    def entries_url(self, code, date_str):
+        """Pistin entries sayfası URL'si (varsa günlük listedeki link)"""
+        with self._lock:
+            cached = self._days.get(date_str)
+        slug = self.slug_for(code)
+        if cached and slug in cached[1]:
+            return cached[1][slug]['url']
+        return f"{self._get_scraper().base_url}entries-results/{slug}/{date_str}"
+
+    def first_post_time(self, code, date_str):
+        """İlk yarışın post time'ı (Eastern, tz-aware) veya None"""
+        track = (self.active_tracks(date_str) or {}).get(self.slug_for(code))
+        return track['first_post'] if track else None
+
+    def tracks_for_display(self, date_str, fetch=False):
+        """
+        Menü için gruplanmış liste: [{'key', 'label', 'tracks': [{code, label, active, first_post}]}]
+        Bilinen pistlere ek olarak listede olup KNOWN_TRACKS'te olmayan aktif pistler 'other' grubuna eklenir
+        fetch=False: sayfa render'ı beklemez - cache'teki liste (yoksa active=None ile statik liste)
+        kullanılır, liste arka planda yenilenir
+        """
+        if fetch:
+            active = self.active_tracks(date_str)
+        else:
+            active = self.cached_tracks(date_str)
+            self.refresh_in_background(date_str)
+        groups = {key: [] for key, _ in TRACK_GROUPS}
+        for code, info in KNOWN_TRACKS.items():
+            # Kendi slug'ının kod hali zaten listedeyse (belmont-at-aqueduct) menüde tekrar gösterme
+            if code == info['slug'] and len(self.codes_for_slug(code)) > 1:
+                continue
+            track = (active or {}).get(info['slug'])
+            groups[info['group']].append({
+                'code': code,
+                'label': info.get('label', info['name']),
+                'active': None if active is None else track is not None,
+                'first_post': track.get('time') if track else None
+            })
+
+        known_slugs = {info['slug'] for info in KNOWN_TRACKS.values()}
+        for slug, track in (active or {}).items():
+            if slug not in known_slugs:
+                groups['other'].append({'code': slug, 'label': track['name'], 'active': True,
+                                        'first_post': track.get('time')})
+
+        return [{'key': key, 'label': label, 'tracks': groups[key]} for key, label in TRACK_GROUPS]
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_track_registry():
+    """Süreç genelinde paylaşılan registry"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = TrackRegistry()
+        return _default_registry
@@ -3,6 +3,9 @@
 Utility functions for Horse Racing Nation scraper
 """
 
+import csv
+import json
+import os
 import re
 from datetime import datetime, timedelta
 from urllib.parse import urlparse, urljoin
@@ -254,6 +257,17 @@ def format_payout(payout_str):
     return None
 
 
+def parse_payout(payout_str):
+    """'$5.40' / '1,234.50' -> float; boş veya sayı değilse None"""
+    if payout_str is None:
+        return None
+    cleaned = re.sub(r'[^\d.]', '', str(payout_str))
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
 def get_date_range(start_date, num_days):
     """Belirli bir tarihten itibaren N gün için tarih listesi"""
     start = datetime.strptime(start_date, '%Y-%m-%d')
@@ -275,6 +289,76 @@ def is_valid_date(date_str):
         return False
 
 
+def fsync_dir(path):
+    """Dizindeki rename/silme işlemlerini diske indirir (dizin açılamayan platformlarda atlanır)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _replace_durable(f, tmp_path, path):
+    """Geçici dosyayı fsync'leyip yerine taşır; rename de fsync'lenir (crash sonrası eski/yarım dosya kalmaz)"""
+    f.flush()
+    os.fsync(f.fileno())
+    f.close()
+    os.replace(tmp_path, path)
+    fsync_dir(path)
+
+
+def write_csv_atomic(path, fieldnames, rows):
+    """CSV'yi geçici dosyaya yazıp yerine taşır; okuyan taraf yarım dosya görmez"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+        _replace_durable(f, tmp_path, path)
+
+
+def write_json_atomic(path, data):
+    """JSON'u geçici dosyaya yazıp yerine taşır"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        _replace_durable(f, tmp_path, path)
+
+
+class JsonObjectStream:
+    """
+    {anahtar: değer} JSON nesnesini değer değer geçici dosyaya yazar, close() ile yerine taşır
+    Çıktı write_json_atomic(path, dict) ile aynıdır; değerler bellekte biriktirilmez
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.count = 0
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        self._file.write('{')
+
+    def add(self, key, value):
+        body = json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+        self._file.write(f"{',' if self.count else ''}\n  {json.dumps(key, ensure_ascii=False)}: {body}")
+        self.count += 1
+
+    def close(self):
+        self._file.write('\n}' if self.count else '}')
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
 if __name__ == "__main__":
     # Test utilities
     print("Testing utility functions...")
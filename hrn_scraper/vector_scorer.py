@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Turkish style skorlamanın numpy ile vektörleştirilmiş hali
+
+process_horses_data_turkish_style ile aynı formül (zemin + mesafe adaptasyonu, sıra cezası),
+ama metin ayrıştırma (süre, mesafe, zemin, son bitiş sırası) prepare() ile bir kez yapılır;
+score() yalnızca dizi işlemidir. Parametre taramasında (param_sweep.py) binlerce parametre
+seti aynı geçmiş veri üzerinde bu şekilde skorlanır.
+
+Kullanım:
+    prepared = prepare(horses)          # process_horses_data_turkish_style ile aynı girdi
+    scores = score(prepared, params)    # geçersiz atlar NaN
+"""
+
+import logging
+import math
+
+import numpy as np
+
+from american_horse_calculator_turkish_style import distance_to_meters, time_to_seconds
+from scoring_config import get_scoring_params
+
+logger = logging.getLogger(__name__)
+
+
+def _finish_position(horse):
+    """Hesaplayıcıdaki gibi: ceza yalnızca 1'den büyük geçerli sıraya uygulanır, diğerleri 0"""
+    value = horse.get('latest_finish_position', '') or horse.get('finish_position', '')
+    if not value or str(value).strip() in ['', '1', 'nan']:
+        return 0
+    try:
+        return int(float(str(value).strip()))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def _profile(horse):
+    """(süre saniye, mesafe metre) - geçersizse NaN"""
+    profile_time = horse.get('profile_time', '') or horse.get('time', '')
+    profile_distance = horse.get('profile_distance', '') or horse.get('distance', '')
+    if not profile_time or not profile_distance:
+        return math.nan, math.nan
+    time_seconds = time_to_seconds(profile_time)
+    distance_meters = distance_to_meters(profile_distance)
+    if time_seconds <= 0 or distance_meters <= 0:
+        return math.nan, math.nan
+    return time_seconds, distance_meters
+
+
+def prepare(horses):
+    """
+    At listesini skorlamaya hazır dizilere çevirir (entry_distance / entry_surface bugünkü yarış)
+    Dönüş: {'time', 'distance', 'target', 'position', 'previous_surface', 'current_surface', 'surfaces'}
+    """
+    surfaces = {}
+
+    def surface_code(value):
+        return surfaces.setdefault(value if isinstance(value, str) else '', len(surfaces))
+
+    times, distances, targets, positions, previous, current = [], [], [], [], [], []
+    for horse in horses:
+        time_seconds, distance_meters = _profile(horse)
+        target = distance_to_meters(horse.get('entry_distance', ''))
+        times.append(time_seconds)
+        distances.append(distance_meters)
+        targets.append(target if target > 0 else 1200)  # Default 6 furlongs
+        positions.append(_finish_position(horse))
+        previous.append(surface_code(horse.get('profile_surface', '') or horse.get('surface', '')))
+        current.append(surface_code(horse.get('entry_surface', '')))
+
+    return {
+        'time': np.array(times, dtype=np.float64),
+        'distance': np.array(distances, dtype=np.float64),
+        'target': np.array(targets, dtype=np.float64),
+        'position': np.array(positions, dtype=np.int64),
+        'previous_surface': np.array(previous, dtype=np.int64),
+        'current_surface': np.array(current, dtype=np.int64),
+        'surfaces': list(surfaces)
+    }
+
+
+def _surface_matrix(surfaces, params):
+    """Zemin kodu çiftleri için çarpan matrisi (tabloda olmayan geçiş 1.0)"""
+    table = params['surface_factors']
+    return np.array([[table.get(previous, {}).get(current, 1.0) for current in surfaces]
+                     for previous in surfaces], dtype=np.float64).reshape(len(surfaces), len(surfaces))
+
+
+def score(prepared, params=None):
+    """Hazırlanmış diziler için performans skorları (saniye / 100 m, düşük daha iyi; geçersiz NaN)"""
+    params = params or get_scoring_params()
+    time_seconds, distance, target = prepared['time'], prepared['distance'], prepared['target']
+
+    base_time_per_100m = time_seconds / (distance / 100)
+    surface_factor = _surface_matrix(prepared['surfaces'], params)[prepared['previous_surface'],
+                                                                    prepared['current_surface']]
+
+    distance_diff = target - distance
+    longer = 1 + (distance_diff / 100) * params['distance_longer_slope'] / params['distance_base']
+    shorter = 1 + (np.abs(distance_diff) / 100) * (-params['distance_shorter_slope']) / params['distance_base']
+    factor = np.maximum(params['distance_factor_min'],
+                        np.minimum(params['distance_factor_max'], np.where(distance_diff > 0, longer, shorter)))
+    distance_factor = np.where(np.abs(distance_diff) < params['distance_threshold'], 1.0, factor)
+
+    distance_adjusted = base_time_per_100m * surface_factor * distance_factor
+    position = prepared['position']
+    penalty = np.where(position > 1, (position - 1) * params['position_penalty'] / (target / 100.0), 0.0)
+    return distance_adjusted + penalty
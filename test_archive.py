@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ARCHIVE TEST
+Günlük CSV'lerin tipli Parquet bölümlerine sıkıştırıldığını, kolon seçimi ve
+filtrelerin okuma sırasında uygulandığını test eder
+"""
+
+import os
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+import pyarrow.parquet as pq
+
+from archive import compact, discover, read, read_table
+from data_store import DataStore
+from pipeline import ENTRIES_FIELDS, ESSENTIAL_FIELDS
+from utils import write_csv_atomic
+
+
+def _write_day(root, track_code, date_str, time_str):
+    base = DataStore(root).base_name(track_code, date_str)
+    write_csv_atomic(f"{base}_entries.csv", ENTRIES_FIELDS,
+                     [{'track_name': track_code, 'race_number': '1', 'post_position': '1', 'program_number': '1A',
+                       'horse_name': 'Tiger Sea', 'speed_figure': '-', 'morning_line': '5/2'}])
+    write_csv_atomic(f"{base}_essential.csv", ESSENTIAL_FIELDS,
+                     [{'race_number': '1', 'program_number': '1A', 'horse_name': 'Tiger Sea', 'latest_surface': 'Dirt',
+                       'latest_distance': '6 f', 'latest_time': time_str, 'latest_finish_position': '2'},
+                      {'race_number': '2', 'program_number': '4', 'horse_name': 'Royal Comet'}])
+    return base
+
+
+def test_compact_daily_files():
+    """Entries/essential/american dosyaları tarih/pist bölümlerine tipli yazılmalı"""
+    print("📦 ARCHIVE TEST")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = os.path.join(work_dir, 'data')
+        archive_dir = os.path.join(work_dir, 'archive')
+        _write_day(data_dir, 'santa-anita', '2025-09-27', '1:10.20')
+        _write_day(data_dir, 'belmont-park', '2025-09-27', '1:11.00')
+        base = _write_day(data_dir, 'santa-anita', '2025-09-28', '1:09.80')
+        # Aynı gün iki hesaplama: en son zaman damgalı dosya arşivlenir
+        for stamp, score in (('20250928_101500', '70.5'), ('20250928_131500', '64.1')):
+            write_csv_atomic(os.path.join(os.path.dirname(base), f"american_santa-anita_2025_09_28_{stamp}.csv"),
+                             ['track', 'date', 'race_number', 'horse_name', 'performance_score', 'calc_total_race_time'],
+                             [{'track': 'santa-anita', 'date': '2025-09-28', 'race_number': '1',
+                               'horse_name': 'Tiger Sea', 'performance_score': score, 'calc_total_race_time': '69.8'}])
+
+        assert len(discover(data_dir)) == 7
+        summary = compact(data_dir, archive_dir, until='2025-09-28')
+        assert summary['partitions'] == 5 and summary['tracks'] == 7 and summary['rows'] == 10
+        assert os.path.exists(os.path.join(archive_dir, 'essential', 'date=2025-09-27', 'part-0.parquet'))
+        assert pq.ParquetFile(os.path.join(archive_dir, 'essential', 'date=2025-09-27',
+                                           'part-0.parquet')).num_row_groups == 2
+
+        schema = read_table('essential', archive_dir=archive_dir).schema
+        assert str(schema.field('race_number').type) == 'int16'
+        assert str(schema.field('latest_time_seconds').type) == 'double'
+        assert str(schema.field('program_number').type) == 'string'
+        entries = read('entries', ['program_number', 'speed_figure'], archive_dir=archive_dir)
+        assert set(entries['program_number']) == {'1A'} and entries['speed_figure'].isna().all()
+
+        scores = read('scores', archive_dir=archive_dir)
+        assert list(scores['performance_score']) == [64.1] and list(scores['track']) == ['santa-anita']
+
+        # Kolon seçimi + bölüm ve değer filtreleri
+        frame = read('essential', ['horse_name', 'latest_time_seconds'],
+                     [('track', '==', 'santa-anita'), ('date', '>=', '2025-09-28'),
+                      ('latest_time_seconds', '<', 75)], archive_dir)
+        assert list(frame.columns) == ['horse_name', 'latest_time_seconds']
+        assert len(frame) == 1 and abs(frame['latest_time_seconds'][0] - 69.8) < 1e-9
+
+
+def test_compact_until_and_remove_sources():
+    """until sonrası günler atlanmalı; kaynaklar silinse de sonradan gelen pist günün diğer pistlerini korumalı"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = os.path.join(work_dir, 'data')
+        archive_dir = os.path.join(work_dir, 'archive')
+        old_base = _write_day(data_dir, 'santa-anita', '2025-09-27', '1:10.20')
+        new_base = _write_day(data_dir, 'santa-anita', '2025-09-28', '1:09.80')
+
+        summary = compact(data_dir, archive_dir, until='2025-09-27', remove_sources=True)
+        assert summary['partitions'] == 2 and summary['removed'] == 2
+        assert not os.path.exists(f"{old_base}_essential.csv") and os.path.exists(f"{new_base}_essential.csv")
+
+        compact(data_dir, archive_dir)
+        compact(data_dir, archive_dir)
+        assert len(read('essential', ['horse_name'], archive_dir=archive_dir)) == 4
+
+        _write_day(data_dir, 'belmont-park', '2025-09-27', '1:11.00')
+        compact(data_dir, archive_dir, until='2025-09-27')
+        day = read('essential', ['track'], [('date', '==', '2025-09-27')], archive_dir)
+        assert sorted(day['track']) == ['belmont-park', 'belmont-park', 'santa-anita', 'santa-anita']
+
+
+if __name__ == "__main__":
+    test_compact_daily_files()
+    test_compact_until_and_remove_sources()
+    print("✅ Archive testleri geçti")
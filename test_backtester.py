@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BACKTESTER TEST
+Arşivdeki geçmiş günlerin skorlanıp resmi bitiş sırası ve ödemelerle
+karşılaştırıldığını (hit rate, ilk 3, ROI, kalibrasyon) test eder
+"""
+
+import os
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from archive import compact
+from backtester import available_days, backtest
+from data_store import DataStore
+from pipeline import ENTRIES_FIELDS, ESSENTIAL_FIELDS
+from results_ingest import RESULTS_FIELDS
+from utils import write_csv_atomic
+
+# (at, son yarış süresi, morning line) - skor sırası: Alpha, Bravo, Charlie; Delta'nın verisi yok
+HORSES = [('Alpha', '1:09.00', '8/1'), ('Bravo', '1:10.00', '5/1'), ('Charlie', '1:11.00', '3/1'),
+          ('Delta', '', '2/1')]
+
+
+def _write_day(root, track_code, date_str, finishers, exacta=''):
+    """finishers: [(at, win, place, show)] bitiş sırasına göre"""
+    base = DataStore(root).base_name(track_code, date_str)
+    write_csv_atomic(f"{base}_entries.csv", ENTRIES_FIELDS,
+                     [{'track_name': track_code, 'race_number': '1', 'program_number': str(i), 'horse_name': name,
+                       'morning_line': ml} for i, (name, _, ml) in enumerate(HORSES, 1)])
+    write_csv_atomic(f"{base}_essential.csv", ESSENTIAL_FIELDS,
+                     [{'race_number': '1', 'program_number': str(i), 'horse_name': name, 'latest_surface': 'Dirt',
+                       'latest_distance': '6 f', 'latest_time': latest_time,
+                       'latest_finish_position': '1' if latest_time else ''}
+                      for i, (name, latest_time, _) in enumerate(HORSES, 1)])
+    write_csv_atomic(f"{base}_results.csv", RESULTS_FIELDS,
+                     [{'race_number': '1', 'horse_name': name, 'finish_position': str(position), 'surface': 'Dirt',
+                       'distance': '6 f', 'time': '1:09.40', 'win_payout': win, 'place_payout': place,
+                       'show_payout': show, 'exacta_payout': exacta}
+                      for position, (name, win, place, show) in enumerate(finishers, 1)])
+
+
+def _build_archive(work_dir):
+    data_dir = os.path.join(work_dir, 'data')
+    _write_day(data_dir, 'belmont-park', '2025-09-20',
+               [('Alpha', '6.40', '4.00', '3.00'), ('Bravo', '', '5.00', '3.60'), ('Delta', '', '', '2.80')],
+               exacta='20.00')
+    _write_day(data_dir, 'santa-anita', '2025-09-21',
+               [('Charlie', '9.00', '5.20', '3.40'), ('Alpha', '', '4.60', '3.20'), ('Bravo', '', '', '2.60')])
+    archive_dir = os.path.join(work_dir, 'archive')
+    compact(data_dir, archive_dir)
+    return archive_dir
+
+
+def test_backtest_report():
+    """Skor sıralaması ve morning line aynı yarışlarda ayrı ayrı değerlendirilmeli"""
+    print("📈 BACKTESTER TEST")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        archive_dir = _build_archive(work_dir)
+        assert available_days(archive_dir, since='2025-09-21') == ['2025-09-21']
+
+        report = backtest(archive_dir, workers=1)
+        assert report['days'] == 2 and report['races'] == 2
+
+        turkish = report['models']['turkish_style']
+        assert turkish['races'] == 2 and turkish['hit_rate'] == 50.0 and turkish['top3_rate'] == 100.0
+        # Win: 6.40 dönüş / 4.00 bahis, place: 4.00 + 4.60, exacta yalnızca ödemesi olan yarışta
+        assert turkish['roi']['win'] == {'bets': 2, 'roi': 60.0}
+        assert turkish['roi']['place'] == {'bets': 2, 'roi': 115.0}
+        assert turkish['roi']['exacta'] == {'bets': 1, 'roi': 900.0}
+        assert turkish['roi']['trifecta']['bets'] == 0
+
+        morning_line = report['models']['morning_line']
+        assert morning_line['hit_rate'] == 0.0 and morning_line['top3_rate'] == 50.0
+        assert morning_line['roi']['show'] == {'bets': 2, 'roi': -30.0}
+        assert morning_line['roi']['exacta'] == {'bets': 1, 'roi': -100.0}
+
+        # Kalibrasyon: her yarışta olasılıklar 1'e toplanır, at sayısı kadar gözlem
+        assert sum(bucket['horses'] for bucket in turkish['calibration']) == 6
+        assert sum(bucket['horses'] for bucket in morning_line['calibration']) == 8
+        assert 0 <= turkish['brier'] <= 1
+
+        assert backtest(archive_dir, track='santa-anita', workers=1)['races'] == 1
+
+
+def test_backtest_process_pool():
+    """Süreç havuzuyla çalıştırma aynı raporu vermeli"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        archive_dir = _build_archive(work_dir)
+        assert backtest(archive_dir, workers=2) == backtest(archive_dir, workers=1)
+
+
+if __name__ == "__main__":
+    test_backtest_report()
+    test_backtest_process_pool()
+    print("✅ Backtester testleri geçti")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+DATA STORE TEST
+Çıktıların data/<tarih>/<pist>/ altına yazıldığını ve manifest'in
+dosya yolu, satır sayısı ve başarı oranını tuttuğunu test eder
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from data_store import DataStore, file_kind
+from essential_journal import EssentialJournal
+from pipeline import ESSENTIAL_FIELDS, output_base_name
+from utils import write_csv_atomic
+
+TEST_DATE = '2025-09-28'
+
+
+def _essential_rows():
+    return [{'race_number': '1', 'program_number': '1', 'horse_name': 'Tiger Sea', 'latest_surface': 'Dirt',
+             'latest_distance': '6 f', 'latest_time': '1:10.00', 'latest_finish_position': '2'},
+            {'race_number': '1', 'program_number': '2', 'horse_name': 'Royal Comet', 'latest_surface': '',
+             'latest_distance': '', 'latest_time': '', 'latest_finish_position': ''}]
+
+
+def test_manifest_records_on_write():
+    """Bölüme yazılan essential dosyası manifest'ten CSV açmadan bulunmalı"""
+    print("🗂️ DATA STORE TEST")
+    print("=" * 50)
+
+    assert file_kind('x_2025_09_28_x_essential.csv') == 'essential'
+    assert file_kind('american_x_2025_09_28_20250928_101500.csv') == 'american'
+    assert file_kind('x_2025_09_28_x_essential.json') is None
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        previous = os.environ.get('HRN_DATA_DIR')
+        os.environ['HRN_DATA_DIR'] = os.path.join(work_dir, 'data')
+        try:
+            base = output_base_name('santa-anita', TEST_DATE)
+            assert base == os.path.join(work_dir, 'data', TEST_DATE, 'santa-anita',
+                                        'santa-anita_2025_09_28_santa-anita')
+            # output_dir verilirse bölüm kullanılmaz
+            assert output_base_name('santa-anita', TEST_DATE, work_dir).startswith(work_dir + os.sep + 'santa-anita_')
+
+            EssentialJournal(base).finalize(_essential_rows(), ESSENTIAL_FIELDS)
+
+            # Yeni bir örnek manifest'i diskten okur
+            entry = DataStore(os.path.join(work_dir, 'data')).lookup('santa-anita', TEST_DATE, 'essential')
+            assert entry['rows'] == 2 and entry['successful'] == 1 and entry['success_rate'] == 50.0
+            assert entry['path'] == f"{base}_essential.csv"
+            assert DataStore(os.path.join(work_dir, 'data')).lookup('santa-anita', TEST_DATE, 'entries') is None
+        finally:
+            if previous is None:
+                os.environ.pop('HRN_DATA_DIR', None)
+            else:
+                os.environ['HRN_DATA_DIR'] = previous
+
+
+def test_migrate_legacy_files():
+    """Çalışma dizinindeki eski adlı dosyalar bölümlerine taşınıp indekslenmeli"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        write_csv_atomic(os.path.join(work_dir, 'belmont-park_2025_09_28_belmont-park_essential.csv'),
+                         ESSENTIAL_FIELDS, _essential_rows())
+        write_csv_atomic(os.path.join(work_dir, 'american_belmont-park_2025_09_28_20250928_101500.csv'),
+                         ['race_number', 'horse_name'], [{'race_number': '1', 'horse_name': 'Tiger Sea'}])
+        write_csv_atomic(os.path.join(work_dir, 'horse_profiles.csv'), ['horse_name'], [])
+
+        store = DataStore(os.path.join(work_dir, 'data'))
+        assert store.migrate(work_dir) == 2
+        assert os.path.exists(os.path.join(work_dir, 'horse_profiles.csv'))
+        assert store.lookup('belmont-park', TEST_DATE, 'essential')['successful'] == 1
+        assert store.lookup('belmont-park', TEST_DATE, 'american')['rows'] == 1
+        assert set(store.tracks(TEST_DATE)['belmont-park']) == {'essential', 'american'}
+
+
+def test_manifest_shared_between_instances():
+    """Aynı kökü paylaşan örnekler birbirinin kaydını görmeli ve silmemeli"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        root = os.path.join(work_dir, 'data')
+        first, second = DataStore(root), DataStore(root)
+        paths = {}
+        for track in ('santa-anita', 'laurel-park', 'gulfstream-park', 'belmont-park'):
+            paths[track] = f"{first.base_name(track, TEST_DATE)}_essential.csv"
+            write_csv_atomic(paths[track], ESSENTIAL_FIELDS, _essential_rows())
+
+        assert first.lookup('santa-anita', TEST_DATE, 'essential') is None
+        second.record_file(paths['santa-anita'])
+        assert first.lookup('santa-anita', TEST_DATE, 'essential')['rows'] == 2
+        first.record_file(paths['laurel-park'])
+        assert set(DataStore(root).tracks(TEST_DATE)) == {'santa-anita', 'laurel-park'}
+
+        # Eşzamanlı yazımlarda (ayrı örnekler, ayrı thread kilitleri) kayıt kaybolmamalı
+        threads = [threading.Thread(target=store.record_file, args=(paths[track],))
+                   for store, track in ((first, 'gulfstream-park'), (second, 'belmont-park'))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert set(DataStore(root).tracks(TEST_DATE)) == set(paths)
+        assert set(first.tracks(TEST_DATE)) == set(second.tracks(TEST_DATE)) == set(paths)
+
+
+if __name__ == "__main__":
+    test_manifest_records_on_write()
+    test_migrate_legacy_files()
+    test_manifest_shared_between_instances()
+    print("✅ Data store testleri geçti")
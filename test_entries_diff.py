@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ENTRIES DIFF TEST
+Scratch / yeni at / program değişikliğinin algılandığını ve yalnızca etkilenen
+yarışların yeniden hesaplandığını test eder
+"""
+
+import csv
+import os
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper
+from horse_profile_scraper import HorseProfileScraper
+from entries_diff import diff_entries, entries_rows_from_races, refresh_track_entries
+from pipeline import ENTRIES_FIELDS, ESSENTIAL_FIELDS
+from race_score_cache import RaceScoreCache, score_races
+from track_registry import TrackRegistry
+from utils import write_csv_atomic
+
+TEST_DATE = '2025-09-28'
+
+
+def test_diff_entries():
+    """Yarış + at ismi ile eşleştirme"""
+    print("🔁 ENTRIES DIFF TEST")
+    print("=" * 50)
+
+    old = [{'race_number': '1', 'program_number': '1', 'horse_name': 'Tiger Sea'},
+           {'race_number': '1', 'program_number': '2', 'horse_name': 'Royal Comet'},
+           {'race_number': '2', 'program_number': '1', 'horse_name': 'Lone Arrow'}]
+    new = [{'race_number': '1', 'program_number': '1', 'horse_name': 'Tiger Sea'},
+           {'race_number': '2', 'program_number': '3', 'horse_name': 'Lone Arrow'},
+           {'race_number': '3', 'program_number': '1', 'horse_name': 'Blue Dream'}]
+    diff = diff_entries(old, new)
+    assert [row['horse_name'] for row in diff['added']] == ['Blue Dream']
+    assert [row['horse_name'] for row in diff['scratched']] == ['Royal Comet']
+    assert diff['changed'][0]['new_program_number'] == '3'
+    assert diff['unchanged'] == 1 and diff['affected_races'] == ['1', '2', '3']
+
+
+def _essential_for_scoring(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row.update(profile_time=row['latest_time'], profile_distance=row['latest_distance'],
+                   profile_surface=row['latest_surface'])
+    return rows
+
+
+def test_refresh_only_scrapes_new_horses():
+    """Yenilemede sadece yeni at için profil çekilmeli, diğer yarışlar cache'ten gelmeli"""
+    server = StandInServer(StandInConfig(tracks=1, races=3, horses=3, variant_miss_rate=0.0)).start()
+    try:
+        entries_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        profile_scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False)
+        registry = TrackRegistry(scraper=entries_scraper)
+        url = registry.entries_url('santa-anita', TEST_DATE)
+        current = entries_rows_from_races('santa-anita', entries_scraper.scrape_track_data(url, 'Santa Anita')['races'])
+
+        # Kayıtlı durum: race 1'den bir at eksik (yeni gelecek), race 2'de fazladan bir at (scratch olacak)
+        stored = [row for row in current if row['horse_name'] != current[0]['horse_name']]
+        stored.append(dict(current[3], program_number='9', horse_name='Scratched Horse'))
+        essential = [{'race_number': row['race_number'], 'program_number': row['program_number'],
+                      'horse_name': row['horse_name'], 'latest_surface': 'Dirt', 'latest_distance': '6 f',
+                      'latest_time': '1:10.00', 'latest_finish_position': '2'} for row in stored]
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            base = os.path.join(work_dir, 'santa-anita_2025_09_28_santa-anita')
+            write_csv_atomic(f"{base}_entries.csv", ENTRIES_FIELDS, stored)
+            write_csv_atomic(f"{base}_essential.csv", ESSENTIAL_FIELDS, essential)
+
+            cache = RaceScoreCache()
+            _, _, recomputed = score_races('santa-anita', TEST_DATE, _essential_for_scoring(f"{base}_essential.csv"), cache)
+            assert recomputed == ['1', '2', '3']
+
+            profiles_before = server.stats['by_route'].get('profile', 0)
+            result = refresh_track_entries('santa-anita', TEST_DATE, output_dir=work_dir, registry=registry,
+                                           entries_scraper=entries_scraper, profile_scraper=profile_scraper,
+                                           score_cache=cache)
+            print(f"Refresh: {result['message']}")
+            assert result['success'] and result['profiles_scraped'] == 1
+            assert server.stats['by_route'].get('profile', 0) - profiles_before == 1
+            assert result['diff']['affected_races'] == ['1', '2']
+
+            rows = _essential_for_scoring(f"{base}_essential.csv")
+            assert len(rows) == len(current) and 'Scratched Horse' not in {row['horse_name'] for row in rows}
+            _, _, recomputed = score_races('santa-anita', TEST_DATE, rows, cache)
+            assert recomputed == ['1', '2']
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_diff_entries()
+    test_refresh_only_scrapes_new_horses()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ESSENTIAL JOURNAL TEST
+Yarıda kalan essential üretiminin günlükten devam ettiğini ve
+tamamlanan atların tekrar çekilmediğini test eder
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper
+from essential_journal import EssentialJournal
+from entries_diff import entries_rows_from_races
+from multi_track_scraper import scrape_horse_profiles_for_track
+from pipeline import ENTRIES_FIELDS
+from utils import write_csv_atomic
+
+TEST_DATE = '2025-09-28'
+
+
+def test_journal_skips_truncated_line():
+    """Crash sırasında yarım yazılmış son satır yüklemeyi bozmamalı"""
+    print("📓 ESSENTIAL JOURNAL TEST")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        journal = EssentialJournal(os.path.join(work_dir, 'santa-anita_2025_09_28_santa-anita'))
+        journal.append({'race_number': '1', 'horse_name': 'Tiger Sea', 'latest_time': '1:10.00'})
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"race_number": "1", "horse_na')
+
+        # load yarım satırı dosyadan keser; sonraki append ona yapışıp kaybolmamalı
+        resumed = EssentialJournal(journal.base_name)
+        assert list(resumed.load()) == ['tiger sea']
+        with open(journal.path, 'rb') as f:
+            assert f.read().endswith(b'1:10.00"}\n')
+        resumed.append({'race_number': '1', 'horse_name': 'Royal Comet', 'latest_time': '1:11.00'})
+        assert sorted(EssentialJournal(journal.base_name).load()) == ['royal comet', 'tiger sea']
+
+        journal.finalize([{'race_number': '1', 'horse_name': 'Tiger Sea', 'latest_time': '1:10.00'}],
+                         ['race_number', 'horse_name', 'latest_time'])
+        assert not os.path.exists(journal.path)
+        with open(journal.json_path, 'r', encoding='utf-8') as f:
+            assert json.load(f)[0]['horse_name'] == 'Tiger Sea'
+
+
+def test_resume_scrapes_only_remaining_horses():
+    """Günlükte olan atlar için profil isteği atılmamalı"""
+    server = StandInServer(StandInConfig(tracks=1, races=2, horses=4, variant_miss_rate=0.0)).start()
+    previous_base_url = os.environ.get('HRN_PROFILE_BASE_URL')
+    os.environ['HRN_PROFILE_BASE_URL'] = server.base_url
+    try:
+        scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        track_data = scraper.scrape_track_data(f"{server.base_url}/entries-results/santa-anita/{TEST_DATE}",
+                                               'Santa Anita')
+        entries = entries_rows_from_races('santa-anita', track_data['races'])
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            base = os.path.join(work_dir, 'santa-anita_2025_09_28_santa-anita')
+            write_csv_atomic(f"{base}_entries.csv", ENTRIES_FIELDS, entries)
+
+            # Önceki çalıştırma 3 at sonra kesilmiş
+            journal = EssentialJournal(base)
+            for row in entries[:3]:
+                journal.append({'race_number': row['race_number'], 'program_number': row['program_number'],
+                                'horse_name': row['horse_name'], 'latest_surface': 'Dirt',
+                                'latest_distance': '6 f', 'latest_time': '1:09.99'})
+
+            successful = scrape_horse_profiles_for_track(f"{base}_entries.csv", verbose=False)
+            assert successful == len(entries)
+            assert server.stats['by_route'].get('profile', 0) == len(entries) - 3
+            assert not os.path.exists(journal.path)
+
+            with open(f"{base}_essential.csv", 'r', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            assert [row['horse_name'] for row in rows] == [row['horse_name'] for row in entries]
+            assert [row['latest_time'] for row in rows[:3]] == ['1:09.99'] * 3
+            assert all(row['latest_time'] for row in rows)
+    finally:
+        if previous_base_url is None:
+            os.environ.pop('HRN_PROFILE_BASE_URL', None)
+        else:
+            os.environ['HRN_PROFILE_BASE_URL'] = previous_base_url
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_journal_skips_truncated_line()
+    test_resume_scrapes_only_remaining_horses()
+    print("✅ Essential journal testleri geçti")
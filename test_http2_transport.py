@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP/2 TRANSPORT TEST
+Eşzamanlı profil isteklerinin tek HTTP/2 bağlantısında çoklandığını ve
+h2c konuşmayan sunucuda HTTP/1.1'e düşüldüğünü test eder
+"""
+
+import sys
+
+# Add hrn_scraper to path
+sys.path.insert(0, 'hrn_scraper')
+
+from hrn_standin_server import StandInConfig, StandInServer, StandInH2Server
+from horse_profile_scraper import HorseProfileScraper
+from parse_cache import ParsedDocumentCache
+
+HORSES = ['Tiger Sea', 'Golden Arrow', 'Silent Dream', 'Royal Flight', 'Lucky Echo',
+          'Midnight Comet', 'Storm Ranger', 'Silver Spirit', 'Wild Promise', 'Brave Thunder']
+
+
+def test_http2_multiplexes_on_one_connection():
+    """h2c sunucusuna giden eşzamanlı istekler tek bağlantı kullanmalı"""
+    print("⚡ HTTP/2 TRANSPORT TEST")
+    print("=" * 50)
+
+    server = StandInH2Server(StandInConfig(latency_ms=20, variant_miss_rate=0.0)).start()
+    try:
+        scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False, http2='h2c',
+                                      parse_cache=ParsedDocumentCache())
+        results = scraper.scrape_multiple_horses_concurrent(HORSES, max_workers=10)
+        counters = scraper.session.get_adapter(server.base_url).counters
+        print(f"Server stats: {server.stats}")
+        print(f"Adapter counters: {counters}")
+
+        assert len(results) == len(HORSES)
+        assert server.stats['connections'] == 1
+        assert counters['http2'] == server.stats['requests']
+        assert results['Tiger Sea']['race_history']
+    finally:
+        server.stop()
+
+
+def test_h2c_falls_back_to_http1():
+    """HTTP/1.1 sunucusunda h2c denemesi HTTP/1.1'e düşmeli"""
+    server = StandInServer(StandInConfig(variant_miss_rate=0.0)).start()
+    try:
+        scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False, http2='h2c',
+                                      parse_cache=ParsedDocumentCache())
+        results = scraper.scrape_multiple_horses_concurrent(HORSES[:4], max_workers=4)
+        counters = scraper.session.get_adapter(server.base_url).counters
+        print(f"Fallback counters: {counters}")
+
+        assert len(results) == 4
+        assert counters['fallbacks'] >= 1
+        assert counters['http2'] == 0 and counters['http1'] == 4
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_http2_multiplexes_on_one_connection()
+    test_h2c_falls_back_to_http1()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP CACHE TEST
+Disk tabanlı HTTP cache'in hit / revalidate / LRU davranışını stand-in sunucusuyla test eder
+"""
+
+import sys
+import tempfile
+import time
+
+# Add hrn_scraper to path
+sys.path.insert(0, 'hrn_scraper')
+
+from hrn_standin_server import StandInConfig, StandInServer
+from http_cache import HttpCache, CachedSession, classify_url
+from horse_profile_scraper import HorseProfileScraper
+
+
+def test_classify_url():
+    """URL sınıfları doğru ayrılmalı"""
+    assert classify_url('https://entries.horseracingnation.com/entries-results/2025-09-28') == 'daily_tracks'
+    assert classify_url('https://entries.horseracingnation.com/entries-results/santa-anita/2025-09-28') == 'entries'
+    assert classify_url('https://www.horseracingnation.com/horse/Tiger_of_the_Sea_1') == 'profile'
+    assert classify_url('https://www.horseracingnation.com/tracks/santa-anita') == 'other'
+
+
+def test_cache_hit_and_revalidate():
+    """Taze kayıt ağa gitmeden dönmeli, bayat kayıt ETag ile 304 almalı"""
+    print("🗄️  HTTP CACHE TEST")
+    print("=" * 50)
+
+    server = StandInServer(StandInConfig(tracks=2, races=2, horses=3)).start()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpCache(cache_dir)
+            session = CachedSession(cache)
+            url = f"{server.base_url}/entries-results/2025-09-28"
+
+            first = session.get(url, timeout=10)
+            second = session.get(url, timeout=10)
+            assert first.text == second.text
+            assert second.from_cache
+            assert server.stats['requests'] == 1
+
+            # Süreyi geçmişe çek -> If-None-Match ile doğrulanmalı
+            cache.set_expiry(url, time.time() - 1)
+            third = session.get(url, timeout=10)
+            assert third.status_code == 200 and third.text == first.text
+            assert server.stats['by_status'].get('304') == 1
+
+            stats = cache.stats()
+            print(f"Cache stats: {stats}")
+            assert stats['hits'] == 1 and stats['misses'] == 1 and stats['revalidated'] == 1
+            cache.close()
+    finally:
+        server.stop()
+
+
+def test_no_store_and_lru_eviction():
+    """no-store saklanmamalı, boyut limiti aşılınca en eski kayıt silinmeli"""
+    server = StandInServer(StandInConfig(cache_control='no-store')).start()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpCache(cache_dir)
+            session = CachedSession(cache)
+            session.get(f"{server.base_url}/entries-results/2025-09-28", timeout=10)
+            assert cache.stats()['entries'] == 0
+            cache.close()
+    finally:
+        server.stop()
+
+    server = StandInServer(StandInConfig(variant_miss_rate=0.0)).start()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpCache(cache_dir, max_bytes=6000)
+            scraper = HorseProfileScraper(base_url=server.base_url, http_cache=cache)
+            for name in ['Tiger Sea', 'Golden Arrow', 'Silent Dream']:
+                assert scraper.scrape_horse_profile(name) is not None
+            stats = cache.stats()
+            print(f"LRU stats: {stats}")
+            assert stats['evictions'] > 0
+            assert stats['bytes'] <= 6000
+            assert cache.lookup(f"{server.base_url}/horse/Tiger_Sea") is None
+            cache.close()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_classify_url()
+    test_cache_hit_and_revalidate()
+    test_no_store_and_lru_eviction()
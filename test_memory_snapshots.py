@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MEMORY PROFILE TEST
+tracemalloc checkpoint'lerinin büyüyen satırları yakaladığını ve toplu çekimin pistleri
+bellekte biriktirmeden JSON'a akıttığını test eder
+"""
+
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper
+from memory_snapshots import MemoryProfiler, memory_profile
+from utils import JsonObjectStream, write_json_atomic
+
+TEST_DATE = '2025-09-28'
+
+
+def test_checkpoints_report_growth():
+    """Checkpoint'ler arası ayrılan bellek büyüme listesinde bu satırla görünmeli"""
+    print("🧠 MEMORY PROFILE TEST")
+    print("=" * 50)
+
+    assert not tracemalloc.is_tracing()
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'reports', 'memory.json')
+        with memory_profile(path, top=5) as profiler:
+            retained = [bytearray(1024) for _ in range(2000)]
+            first = profiler.checkpoint('santa-anita')
+            second = profiler.checkpoint('gulfstream')
+        assert not tracemalloc.is_tracing()
+
+        assert first['growth'] > 2000 * 1024 and first['current'] <= first['peak']
+        assert any('test_memory_snapshots.py' in item['site'] and item['count_diff'] >= 2000
+                   for item in first['top_growth'])
+        assert abs(second['growth']) < first['growth'] / 10
+        assert len(first['top_sites']) <= 5
+
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        assert [record['label'] for record in report['checkpoints']] == ['santa-anita', 'gulfstream', 'total']
+        assert 'santa-anita' in profiler.report()
+        del retained
+
+    # Tracing zaten açıksa profiler onu kapatmaz
+    tracemalloc.start()
+    try:
+        MemoryProfiler().start().stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    with memory_profile(enabled=False) as profiler:
+        assert profiler is None
+
+
+def test_json_stream_matches_dump():
+    """Akıtılan JSON, tek seferde yazılanla aynı dosya olmalı"""
+    data = {'santa-anita': {'races': [{'race_number': 1, 'entries': []}], 'track_info': {'name': 'Şanta'}},
+            'empty': {}}
+    with tempfile.TemporaryDirectory() as work_dir:
+        stream = JsonObjectStream(os.path.join(work_dir, 'stream.json'))
+        for key, value in data.items():
+            stream.add(key, value)
+        assert not os.path.exists(os.path.join(work_dir, 'stream.json'))
+        stream.close()
+        write_json_atomic(os.path.join(work_dir, 'dump.json'), data)
+        with open(os.path.join(work_dir, 'stream.json'), 'rb') as a, open(os.path.join(work_dir, 'dump.json'), 'rb') as b:
+            assert a.read() == b.read()
+
+
+def test_bulk_scrape_streams_tracks():
+    """output_path ile pistler diske akar, dönüşte 'races' tutulmaz; pist başına checkpoint alınır"""
+    server = StandInServer(StandInConfig(tracks=3, races=2, horses=3)).start()
+    try:
+        scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        with tempfile.TemporaryDirectory() as work_dir:
+            output_path = os.path.join(work_dir, 'hrn_data.json')
+            report_path = os.path.join(work_dir, 'memory.json')
+            data = scraper.scrape_all_tracks_for_date(TEST_DATE, parallel=True, max_workers=3,
+                                                      output_path=output_path, memory_profile_file=report_path)
+
+            assert len(data) == 3 and all('races' not in track for track in data.values())
+            with open(output_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            assert set(saved) == set(data)
+            assert all(len(track['races']) == 2 and track['total_races'] == data[slug]['total_races']
+                       for slug, track in saved.items())
+            assert not os.path.exists(f"{output_path}.tmp")
+
+            with open(report_path, 'r', encoding='utf-8') as f:
+                labels = [record['label'] for record in json.load(f)['checkpoints']]
+            assert sorted(labels[:-1]) == sorted(data) and labels[-1] == 'total'
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_checkpoints_report_growth()
+    test_json_stream_matches_dump()
+    test_bulk_scrape_streams_tracks()
+    print("✅ Memory profile testleri geçti")
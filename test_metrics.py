@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+METRICS TEST
+Prometheus text formatını, scraper fetch / parse / slug varyantı metriklerini ve
+Flask /metrics endpoint'ini test eder
+"""
+
+import os
+import sys
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+import metrics
+from horse_profile_scraper import HorseProfileScraper
+from hrn_scraper import HorseRacingNationScraper
+from hrn_standin_server import StandInConfig, StandInServer
+from parse_cache import ParsedDocumentCache
+
+TEST_DATE = '2025-09-28'
+
+
+def test_text_format():
+    """Counter, kümülatif histogram kovaları ve etiket kaçışları"""
+    print("📈 METRICS TEST")
+    print("=" * 50)
+
+    registry = metrics.Registry()
+    requests_total = registry.counter('demo_requests_total', 'Demo requests', ('path',))
+    latency = registry.histogram('demo_seconds', 'Demo latency', buckets=(0.1, 1.0))
+    requests_total.inc(path='/a"b\\c')
+    requests_total.inc(2, path='/a"b\\c')
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value)
+    registry.register_collector('queues', metrics.queue_depth_collector({'jobs': lambda: 4}))
+
+    lines = registry.render().splitlines()
+    assert '# TYPE demo_requests_total counter' in lines
+    assert 'demo_requests_total{path="/a\\"b\\\\c"} 3' in lines
+    assert '# TYPE demo_seconds histogram' in lines
+    assert ['demo_seconds_bucket{le="0.1"} 1', 'demo_seconds_bucket{le="1"} 3',
+            'demo_seconds_bucket{le="+Inf"} 4', 'demo_seconds_sum 4.25', 'demo_seconds_count 4'] == \
+        [line for line in lines if line.startswith('demo_seconds_')]
+    assert 'hrn_queue_depth{queue="jobs"} 4' in lines
+
+    try:
+        requests_total.inc(host='x')
+        assert False, 'ValueError bekleniyordu'
+    except ValueError:
+        pass
+
+    assert metrics.url_labels('http://127.0.0.1:8765/horse/Tiger_Sea_2') == ('127.0.0.1:8765', 'profile', '2')
+    assert metrics.url_labels('http://127.0.0.1:8765/horse/Tiger_Sea') == ('127.0.0.1:8765', 'profile', '0')
+    assert metrics.url_labels(f'https://e.test/entries-results/santa-anita/{TEST_DATE}')[1:] == ('entries', '')
+    assert metrics.url_labels(f'https://e.test/entries-results/{TEST_DATE}')[1:] == ('daily_tracks', '')
+
+
+def test_scraper_and_api_metrics():
+    """Stand-in sunucusundan çekilen sayfalar fetch/parse/varyant metriklerine, API istekleri /metrics'e yansımalı"""
+    import app as web_app
+
+    server = StandInServer(StandInConfig(tracks=2, races=2, horses=5, variant_miss_rate=0.5, seed=7)).start()
+    try:
+        host = server.base_url.split('://', 1)[1]
+        before_fetches = metrics.FETCHES.value(host=host, url_class='entries', variant='', status='200')
+        before_parses = metrics.PARSE_SECONDS.count(page_type='entries')
+        before_depths = sum(metrics.PROFILE_VARIANT_DEPTH.value(depth=depth) for depth in list('012345') + ['none'])
+
+        track_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False,
+                                                 parse_cache=ParsedDocumentCache())
+        tracks = track_scraper.get_daily_tracks(TEST_DATE)
+        track_data = track_scraper.scrape_track_data(tracks[0]['url'], tracks[0]['name'])
+        assert metrics.FETCHES.value(host=host, url_class='entries', variant='', status='200') == before_fetches + 1
+        assert metrics.PARSE_SECONDS.count(page_type='entries') == before_parses + 1
+
+        profile_scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False,
+                                              parse_cache=ParsedDocumentCache())
+        names = [entry['horse_info']['horse_name'] for race in track_data['races'] for entry in race['entries']]
+        for name in names:
+            profile_scraper.scrape_horse_profile(name)
+        depths = sum(metrics.PROFILE_VARIANT_DEPTH.value(depth=depth) for depth in list('012345') + ['none'])
+        assert depths == before_depths + len(names)
+        # variant_miss_rate=0.5: bazı atlar ancak _1.._3 varyantında bulunur, o varyantlar da çekilir
+        assert any(metrics.FETCHES.value(host=host, url_class='profile', variant=variant, status=status) > 0
+                   for variant in '123' for status in ('200', '404'))
+    finally:
+        server.stop()
+
+    client = web_app.app.test_client()
+    assert client.get('/api/scoring_config').status_code == 200
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.content_type.startswith('text/plain; version=0.0.4')
+    body = response.get_data(as_text=True)
+    assert 'hrn_api_requests_total{endpoint="/api/scoring_config",method="GET",status="200"}' in body
+    assert 'hrn_api_request_duration_seconds_bucket{endpoint="/api/scoring_config",le="+Inf"}' in body
+    assert f'hrn_http_fetches_total{{host="{host}",url_class="entries",variant="",status="200"}}' in body
+    assert 'hrn_parse_duration_seconds_count{page_type="profile"}' in body
+    assert 'hrn_profile_variant_depth_total{depth=' in body
+    assert 'hrn_cache_hits_total{cache="parse"}' in body and 'hrn_cache_hit_ratio{cache="race_score"}' in body
+
+
+if __name__ == "__main__":
+    test_text_format()
+    test_scraper_and_api_metrics()
+    print("✅ Metrics testleri geçti")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PARAMETER SWEEP TEST
+Vektörleştirilmiş skorun hesaplayıcıyla aynı sonucu verdiğini, taramanın geçmiş
+sonuçlara göre en iyi sabitleri seçip hesaplayıcının yükleyebildiği dosyaya yazdığını test eder
+"""
+
+import math
+import os
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from american_horse_calculator_turkish_style import (
+    DEFAULT_SCORING_PARAMS, load_scoring_params, process_horses_data_turkish_style
+)
+from archive import compact
+from backtester import backtest
+from data_store import DataStore
+from param_sweep import apply_overrides, evaluate, grid_candidates, load_history, sweep, write_best
+from pipeline import ESSENTIAL_FIELDS
+from results_ingest import RESULTS_FIELDS
+from utils import write_csv_atomic
+import vector_scorer
+
+
+def _write_day(root, track_code, date_str, horses, finishers):
+    """horses: [(at, son süre, son bitiş sırası)], finishers: [(at, win ödemesi)] bitiş sırasına göre"""
+    base = DataStore(root).base_name(track_code, date_str)
+    write_csv_atomic(f"{base}_essential.csv", ESSENTIAL_FIELDS,
+                     [{'race_number': '1', 'program_number': str(i), 'horse_name': name, 'latest_surface': 'Dirt',
+                       'latest_distance': '6 f', 'latest_time': latest_time, 'latest_finish_position': position}
+                      for i, (name, latest_time, position) in enumerate(horses, 1)])
+    write_csv_atomic(f"{base}_results.csv", RESULTS_FIELDS,
+                     [{'race_number': '1', 'horse_name': name, 'finish_position': str(position), 'surface': 'Dirt',
+                       'distance': '6 f', 'time': '1:10.00', 'win_payout': win}
+                      for position, (name, win) in enumerate(finishers, 1)])
+
+
+def _build_archive(work_dir):
+    data_dir = os.path.join(work_dir, 'data')
+    # Hızlı ama son yarışta 5. olan Alpha, ceza > ~0.1 s ise Bravo'nun gerisine düşer
+    _write_day(data_dir, 'belmont-park', '2025-09-20',
+               [('Alpha', '1:10.00', '5'), ('Bravo', '1:10.40', '1')], [('Bravo', '5.00'), ('Alpha', '')])
+    # Son yarışta 2. olan Charlie ancak ceza > ~0.5 s ise Delta'nın gerisine düşer
+    _write_day(data_dir, 'belmont-park', '2025-09-21',
+               [('Charlie', '1:10.00', '2'), ('Delta', '1:10.50', '1')], [('Charlie', '7.00'), ('Delta', '')])
+    archive_dir = os.path.join(work_dir, 'archive')
+    compact(data_dir, archive_dir)
+    return archive_dir
+
+
+def test_vector_scorer_matches_calculator():
+    """Aynı girdi ve parametrelerle process_horses_data_turkish_style ile aynı skorlar"""
+    print("🎛️ PARAMETER SWEEP TEST")
+    print("=" * 50)
+
+    horses = [
+        {'profile_time': '1:10.20', 'profile_distance': '6 f', 'profile_surface': 'Dirt',
+         'latest_finish_position': '3', 'entry_distance': '1 1/16 m', 'entry_surface': 'Turf'},
+        {'profile_time': '1:42.00', 'profile_distance': '1 1/16 m', 'profile_surface': 'Turf',
+         'latest_finish_position': '1', 'entry_distance': '5 1/2 f', 'entry_surface': 'Dirt'},
+        {'profile_time': '57.80', 'profile_distance': '5 f', 'profile_surface': 'Synthetic',
+         'latest_finish_position': '', 'entry_distance': '', 'entry_surface': ''},
+        {'profile_time': '1:10.20', 'profile_distance': '6 f', 'profile_surface': 'Dirt',
+         'latest_finish_position': '7.0', 'entry_distance': '6 1/2 f', 'entry_surface': 'Dirt'},
+        {'profile_time': '', 'profile_distance': '6 f', 'entry_distance': '6 f', 'entry_surface': 'Dirt'},
+    ]
+    prepared = vector_scorer.prepare(horses)
+    tuned = apply_overrides({'position_penalty': 0.5, 'distance_factor_max': 1.05,
+                             'surface_factors.Dirt.Turf': 1.04})
+    for params in (None, tuned):
+        expected = [result['performance_score'] for result in process_horses_data_turkish_style(horses, params)]
+        actual = vector_scorer.score(prepared, params)
+        assert expected[-1] == 'Invalid' and math.isnan(actual[-1])
+        for value, score in zip(expected[:-1], actual[:-1]):
+            assert abs(value - score) < 1e-12
+
+
+def test_sweep_picks_best_penalty():
+    """Grid taraması geçmiş sonuçlara en uygun cezayı seçmeli, dosya hesaplayıcıya yüklenebilmeli"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        archive_dir = _build_archive(work_dir)
+        history = load_history(archive_dir, workers=1)
+        assert history['days'] == 2 and history['races'] == 2
+
+        # Varsayılanlar (0.30) ile her iki yarış da bilinir; backtester ile aynı metrikler
+        baseline = evaluate(history)
+        report = backtest(archive_dir, workers=1)['models']['turkish_style']
+        assert baseline['hit_rate'] == report['hit_rate'] == 100.0
+        assert round(baseline['win_roi'], 1) == report['roi']['win']['roi'] == 200.0
+
+        candidates = grid_candidates({'position_penalty': [0.0, 0.3, 1.0], 'distance_longer_slope': [0.04]})
+        assert len(candidates) == 3
+        single = sweep(history, candidates, 'hit_rate', workers=1)
+        assert single == sweep(history, candidates, 'hit_rate', workers=2)
+        hit_rates = {entry['params'].get('position_penalty'): entry['metrics']['hit_rate'] for entry in single}
+        assert hit_rates == {None: 100.0, 0.0: 50.0, 0.3: 100.0, 1.0: 50.0}
+        assert single[0]['metrics']['hit_rate'] == 100.0 and single[-1]['metrics']['hit_rate'] == 50.0
+
+        path = os.path.join(work_dir, 'best_params.json')
+        write_best(path, single, 'hit_rate', history)
+        params = load_scoring_params(path)
+        assert params['position_penalty'] == 0.3 and params['surface_factors'] == DEFAULT_SCORING_PARAMS['surface_factors']
+        assert backtest(archive_dir, workers=1, params=params)['models']['turkish_style']['hit_rate'] == 100.0
+
+        try:
+            apply_overrides({'penalty': 1})
+            assert False, 'ValueError bekleniyordu'
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_vector_scorer_matches_calculator()
+    test_sweep_picks_best_penalty()
+    print("✅ Parameter sweep testleri geçti")
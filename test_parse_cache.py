@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PARSED DOCUMENT CACHE TEST
+Aynı içerikli sayfalar tekrar çekildiğinde BeautifulSoup'un hiç çalışmadığını test eder
+"""
+
+import sys
+
+# Add hrn_scraper to path
+sys.path.insert(0, 'hrn_scraper')
+
+import hrn_scraper as track_module
+import horse_profile_scraper as profile_module
+from hrn_standin_server import StandInConfig, StandInServer
+from parse_cache import ParsedDocumentCache
+
+
+class SoupCounter:
+    """BeautifulSoup çağrılarını sayan sarmalayıcı"""
+
+    def __init__(self, original):
+        self.original = original
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.original(*args, **kwargs)
+
+
+def test_unchanged_pages_skip_parsing():
+    """İkinci çekimde soup kurulmamalı ve sonuçlar aynı olmalı"""
+    print("🧩 PARSE CACHE TEST")
+    print("=" * 50)
+
+    server = StandInServer(StandInConfig(tracks=1, races=3, horses=4, variant_miss_rate=0.0)).start()
+    track_counter = SoupCounter(track_module.BeautifulSoup)
+    profile_counter = SoupCounter(profile_module.BeautifulSoup)
+    track_module.BeautifulSoup = track_counter
+    profile_module.BeautifulSoup = profile_counter
+    try:
+        cache = ParsedDocumentCache()
+        scraper = track_module.HorseRacingNationScraper(base_url=f"{server.base_url}/", parse_cache=cache)
+        url = f"{server.base_url}/entries-results/santa-anita/2025-09-28"
+
+        first = scraper.scrape_track_data(url, 'Santa Anita')
+        second = scraper.scrape_track_data(url, 'Santa Anita')
+        assert track_counter.calls == 1
+        assert first['races'] == second['races']
+
+        # Çağıranın sonucu değiştirmesi cache'i bozmamalı
+        second['races'][0]['entries'].clear()
+        third = scraper.scrape_track_data(url, 'Santa Anita')
+        assert third['races'] == first['races']
+
+        profile_scraper = profile_module.HorseProfileScraper(base_url=server.base_url, parse_cache=cache)
+        one = profile_scraper.scrape_horse_profile('Tiger Sea')
+        two = profile_scraper.scrape_horse_profile('Tiger Sea')
+        assert profile_counter.calls == 1
+        assert one == two
+
+        stats = cache.stats()
+        print(f"Parse cache stats: {stats}")
+        assert stats['hits'] == 3 and stats['misses'] == 2
+    finally:
+        track_module.BeautifulSoup = track_counter.original
+        profile_module.BeautifulSoup = profile_counter.original
+        server.stop()
+
+
+def test_changed_body_is_reparsed():
+    """Gövde değişince anahtar da değişmeli"""
+    key_a = ParsedDocumentCache.make_key('entries', b'<html>a</html>', 'url')
+    key_b = ParsedDocumentCache.make_key('entries', b'<html>b</html>', 'url')
+    key_c = ParsedDocumentCache.make_key('entries', '<html>a</html>', 'url')
+    assert key_a != key_b
+    assert key_a == key_c
+
+
+if __name__ == "__main__":
+    test_unchanged_pages_skip_parsing()
+    test_changed_body_is_reparsed()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PARSE WORKERS TEST
+Süreç havuzunda parse edilen sayfaların thread içi parse ile aynı kayıtları verdiğini test eder
+"""
+
+import os
+import sys
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper
+from horse_profile_scraper import HorseProfileScraper
+from parse_cache import ParsedDocumentCache
+from parse_workers import ParsePool
+
+TEST_DATE = '2025-09-28'
+
+
+def test_process_pool_matches_inline_parse():
+    """Entries ve profil sayfaları havuzda da aynı sonucu vermeli"""
+    print("🧩 PARSE WORKERS TEST")
+    print("=" * 50)
+
+    server = StandInServer(StandInConfig(tracks=2, races=3, horses=3, variant_miss_rate=0.0)).start()
+    pool = ParsePool(max_workers=2)
+    try:
+        url = f"{server.base_url}/entries-results/santa-anita/{TEST_DATE}"
+        inline = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False,
+                                          parse_cache=ParsedDocumentCache())
+        pooled = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False,
+                                          parse_cache=ParsedDocumentCache(), parse_pool=pool)
+        expected = inline.scrape_track_data(url, 'Santa Anita')
+        actual = pooled.scrape_track_data(url, 'Santa Anita')
+        assert actual['races'] == expected['races'] and actual['track_info'] == expected['track_info']
+        assert pool.counters['entries'] == 1
+
+        horse_name = expected['races'][0]['entries'][0]['horse_info']['horse_name']
+        inline_profile = HorseProfileScraper(base_url=server.base_url, http_cache=False,
+                                             parse_cache=ParsedDocumentCache())
+        pooled_profile = HorseProfileScraper(base_url=server.base_url, http_cache=False,
+                                             parse_cache=ParsedDocumentCache(), parse_pool=pool)
+        assert pooled_profile.scrape_horse_profile(horse_name) == inline_profile.scrape_horse_profile(horse_name)
+        assert pool.counters['profiles'] >= 1
+        print(f"Pool counters: {pool.counters}")
+    finally:
+        pool.shutdown()
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_process_pool_matches_inline_parse()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+STREAMING PIPELINE TEST
+fetch → parse → score → write pipeline'ının sınırlı kuyruklarla uçtan uca çalıştığını test eder
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import threading
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper
+from horse_profile_scraper import HorseProfileScraper
+import pipeline as pipeline_module
+from pipeline import StreamingPipeline
+
+TEST_DATE = '2025-09-28'
+
+
+def _read_csv(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_pipeline_streams_all_tracks():
+    """Tüm pistler işlenmeli, kuyruklar sınırı aşmamalı, dosyalar yarış bazlı sıralı olmalı"""
+    print("🚰 STREAMING PIPELINE TEST")
+    print("=" * 50)
+
+    server = StandInServer(StandInConfig(tracks=4, races=3, horses=4, variant_miss_rate=0.0)).start()
+    try:
+        entries_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        profile_scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False)
+        tracks = entries_scraper.get_daily_tracks(TEST_DATE)
+        tracks.append({'name': 'Ghost Park', 'slug': 'ghost-park',
+                       'url': f"{server.base_url}/entries-results/ghost-park/{TEST_DATE}"})
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            pipeline = StreamingPipeline(TEST_DATE, output_dir=work_dir, profile_workers=4, queue_size=3,
+                                         entries_scraper=entries_scraper, profile_scraper=profile_scraper)
+            summaries = pipeline.run(tracks)
+            print(f"Stats: {pipeline.stats}")
+
+            summary = {s['track']: s for s in summaries}
+            assert len(summaries) == 5
+            assert summary['ghost-park']['status'] == 'failed'
+            assert summary['santa-anita']['status'] == 'ok'
+            assert summary['santa-anita']['races'] == 3 and summary['santa-anita']['horses'] == 12
+            assert pipeline.stats['scored'] == 48 and pipeline.stats['races_written'] == 12
+            assert all(depth <= 3 for depth in pipeline.stats['max_queue_depth'].values())
+
+            base = os.path.join(work_dir, 'santa-anita_2025_09_28_santa-anita')
+            entries = _read_csv(f"{base}_entries.csv")
+            essential = _read_csv(f"{base}_essential.csv")
+            scored = _read_csv(f"{base}_turkish_style.csv")
+            assert len(entries) == len(essential) == len(scored) == 12
+            assert 'latest_finish_position' in essential[0]
+
+            # Her yarış kendi içinde skora göre sıralı (düşük daha iyi)
+            for race_number in {row['race_number'] for row in scored}:
+                scores = [float(row['performance_score']) for row in scored
+                          if row['race_number'] == race_number and row['performance_score'] != 'Invalid']
+                assert scores == sorted(scores)
+    finally:
+        server.stop()
+
+
+def _run_with_timeout(pipeline, tracks, seconds=20):
+    """run()'ı ayrı thread'de çalıştırır; (bitti mi, fırlatılan hata)"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = pipeline.run(tracks)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return not thread.is_alive(), outcome.get('error')
+
+
+def test_pipeline_stage_failure_stops_run():
+    """Bir aşama çökerse run() asılı kalmamalı, ilk hatayı fırlatmalı"""
+    server = StandInServer(StandInConfig(tracks=4, races=3, horses=4, variant_miss_rate=0.0)).start()
+    original_params = pipeline_module.get_scoring_params
+    original_score = pipeline_module.process_horses_data_turkish_style
+    try:
+        entries_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        profile_scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False)
+        tracks = entries_scraper.get_daily_tracks(TEST_DATE)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            # Skor aşaması hiç başlamadan çöker: üreticiler dolu kuyruklarda beklememeli
+            def broken_params():
+                raise TypeError('bad scoring config')
+            pipeline_module.get_scoring_params = broken_params
+            pipeline = StreamingPipeline(TEST_DATE, output_dir=work_dir, profile_workers=2, queue_size=1,
+                                         page_queue_size=1, entries_scraper=entries_scraper,
+                                         profile_scraper=profile_scraper)
+            finished, error = _run_with_timeout(pipeline, tracks)
+            assert finished, 'pipeline asılı kaldı'
+            assert isinstance(error, TypeError) and str(error) == 'bad scoring config'
+            assert all(source.empty() for source in (pipeline._pages, pipeline._horses,
+                                                     pipeline._profiled, pipeline._writes))
+            pipeline_module.get_scoring_params = original_params
+
+            # Akış ortasında çöken skor: yarım kalan pistler 'incomplete' olarak kapanır
+            calls = []
+
+            def flaky_score(horses, params=None):
+                calls.append(1)
+                if len(calls) == 5:
+                    raise RuntimeError('scoring crashed')
+                return original_score(horses, params)
+            pipeline_module.process_horses_data_turkish_style = flaky_score
+            finished, error = _run_with_timeout(pipeline, tracks)
+            assert finished and isinstance(error, RuntimeError)
+            assert any(summary['error'] == 'incomplete' for summary in pipeline.summaries.values())
+            pipeline_module.process_horses_data_turkish_style = original_score
+
+            # Aynı nesne tekrar sorunsuz çalışabilmeli
+            finished, error = _run_with_timeout(pipeline, tracks)
+            assert finished and error is None
+            assert all(summary['status'] == 'ok' for summary in pipeline.summaries.values())
+    finally:
+        pipeline_module.get_scoring_params = original_params
+        pipeline_module.process_horses_data_turkish_style = original_score
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_pipeline_streams_all_tracks()
+    test_pipeline_stage_failure_stops_run()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PREFETCH SCHEDULER TEST
+Yarışların tüm pistler arasında post time sırasıyla hazırlandığını test eder
+"""
+
+import csv
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytz
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper
+from horse_profile_scraper import HorseProfileScraper
+from prefetch_scheduler import PrefetchScheduler
+from track_registry import TrackRegistry
+
+TEST_DATE = '2025-09-28'
+EASTERN = pytz.timezone('US/Eastern')
+
+
+def test_prefetch_runs_races_by_post_time():
+    """Tek worker ile işler pistten bağımsız olarak post time sırasıyla bitmeli"""
+    print("⏰ PREFETCH SCHEDULER TEST")
+    print("=" * 50)
+
+    server = StandInServer(StandInConfig(tracks=3, races=3, horses=2, variant_miss_rate=0.0)).start()
+    try:
+        entries_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        profile_scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False)
+        registry = TrackRegistry(scraper=entries_scraper)
+        morning = EASTERN.localize(datetime(2025, 9, 28, 6, 0))
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            scheduler = PrefetchScheduler(lead_minutes=30, max_workers=1, output_dir=work_dir,
+                                          registry=registry, entries_scraper=entries_scraper,
+                                          profile_scraper=profile_scraper, now_fn=lambda: morning)
+            assert scheduler.plan(TEST_DATE) == 9
+            stats = scheduler.run_pending()
+            print(f"Stats: {stats}")
+
+            assert stats['done'] == 9 and stats['on_time'] == 9 and stats['missed'] == 0
+            posts = [job['post'] for job in scheduler.completed]
+            assert posts == sorted(posts)
+
+            base = os.path.join(work_dir, 'santa-anita_2025_09_28_santa-anita')
+            with open(f"{base}_essential.csv", 'r', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            assert len(rows) == 6 and all(row['latest_time'] for row in rows)
+            assert os.path.exists(f"{base}_entries.csv")
+    finally:
+        server.stop()
+
+
+def test_prefetch_skips_races_already_off():
+    """Post time'ı geçmiş yarışlar missed sayılmalı, profil çekilmemeli"""
+    server = StandInServer(StandInConfig(tracks=1, races=2, horses=2)).start()
+    try:
+        entries_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        late_night = EASTERN.localize(datetime(2025, 9, 28, 23, 30))
+        with tempfile.TemporaryDirectory() as work_dir:
+            scheduler = PrefetchScheduler(max_workers=2, output_dir=work_dir,
+                                          registry=TrackRegistry(scraper=entries_scraper),
+                                          entries_scraper=entries_scraper,
+                                          profile_scraper=HorseProfileScraper(base_url=server.base_url,
+                                                                              http_cache=False),
+                                          now_fn=lambda: late_night)
+            stats = scheduler.run_today(TEST_DATE)
+        assert stats['planned'] == 2 and stats['missed'] == 2 and stats['done'] == 0
+        assert server.stats['by_route'].get('profile', 0) == 0
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_prefetch_runs_races_by_post_time()
+    test_prefetch_skips_races_already_off()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+QUERY ENGINE TEST
+Arşiv üzerindeki hazır sorguların skor sırasını resmi sonuçlarla eşleştirdiğini
+ve /api/query endpoint'inin yalnızca bu sorguları çalıştırdığını test eder
+"""
+
+import os
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from archive import compact
+from data_store import DataStore
+from pipeline import ESSENTIAL_FIELDS
+from query_engine import QueryEngine
+from results_ingest import RESULTS_FIELDS
+from utils import write_csv_atomic
+
+UNTIL = '2025-09-28'
+
+
+def _write_race_day(root, track_code, date_str, surface, distance, scores, finishers):
+    """scores: [(at, skor)], finishers: bitiş sırasına göre at isimleri (ilk 3)"""
+    store = DataStore(root)
+    base = store.base_name(track_code, date_str)
+    write_csv_atomic(f"{base}_essential.csv", ESSENTIAL_FIELDS,
+                     [{'race_number': '1', 'program_number': str(i), 'horse_name': name, 'latest_surface': surface,
+                       'latest_distance': distance, 'latest_time': '1:10.00', 'latest_finish_position': '2'}
+                      for i, (name, _) in enumerate(scores, 1)])
+    write_csv_atomic(os.path.join(os.path.dirname(base), f"american_{track_code}_{date_str.replace('-', '_')}_20250928_120000.csv"),
+                     ['track', 'date', 'race_number', 'horse_name', 'performance_score', 'calculation_status'],
+                     [{'track': track_code, 'date': date_str, 'race_number': '1', 'horse_name': name,
+                       'performance_score': score, 'calculation_status': 'Success'} for name, score in scores])
+    write_csv_atomic(f"{base}_results.csv", RESULTS_FIELDS,
+                     [{'race_number': '1', 'horse_name': name, 'finish_position': str(position),
+                       'surface': surface, 'distance': distance, 'time': '1:09.50'}
+                      for position, name in enumerate(finishers, 1)])
+
+
+def _build_archive(work_dir):
+    data_dir = os.path.join(work_dir, 'data')
+    horses = [('Tiger Sea', '60.1'), ('Royal Comet', '61.0'), ('Storm Arrow', '62.5'), ('Kiss for Lulu', 'Invalid')]
+    # Skoru en iyi at kazanır, ikinci sıradaki at ilk 3'e giremez
+    _write_race_day(data_dir, 'belmont-park', '2025-09-20', 'Dirt', '6 f', horses,
+                    ['Tiger Sea', 'Storm Arrow', 'Kiss for Lulu'])
+    # Aynı gün farklı mesafe - mesafe filtresiyle elenmeli
+    _write_race_day(data_dir, 'santa-anita', '2025-09-20', 'Dirt', '1 m', horses,
+                    ['Royal Comet', 'Tiger Sea', 'Storm Arrow'])
+    # Sonuç tablosunda ismi farklı yazılmış at (ülke eki) eşleşmeli
+    _write_race_day(data_dir, 'belmont-park', '2025-09-27', 'Dirt', '6 f', horses,
+                    ['Storm Arrow', 'Tiger Sea (IRE)', 'Royal Comet'])
+    # Pencere dışı gün
+    _write_race_day(data_dir, 'belmont-park', '2025-06-01', 'Dirt', '6 f', horses,
+                    ['Tiger Sea', 'Royal Comet', 'Storm Arrow'])
+    compact(data_dir, os.path.join(work_dir, 'archive'))
+    return data_dir
+
+
+def test_top_ranked_finish():
+    """Skor sırası 1 olan atların 6 f dirt Belmont sonuçları doğru sayılmalı"""
+    print("🔎 QUERY ENGINE TEST")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        _build_archive(work_dir)
+        engine = QueryEngine(os.path.join(work_dir, 'archive'))
+        result = engine.query('top_ranked_finish', track='belmont-park', distance='6f', surface='dirt',
+                              days='60', until=UNTIL)
+        rows = {row['score_rank']: row for row in result['rows']}
+        assert sorted(rows) == [1, 2, 3]
+        assert rows[1]['horses'] == 2 and rows[1]['wins'] == 1 and rows[1]['top3'] == 2
+        assert rows[2]['top3'] == 1 and rows[3]['wins'] == 1
+        assert rows[1]['win_rate'] == 50.0
+
+        # Pist filtresi olmadan 1 m'lik yarış da sayılır, mesafe filtresi onu eler
+        assert engine.query('top_ranked_finish', days=60, until=UNTIL)['rows'][0]['horses'] == 3
+        assert engine.query('top_ranked_finish', distance='1 m', until=UNTIL)['rows'][0]['wins'] == 0
+
+        form = engine.query('horse_form', horse='tiger sea', until=UNTIL)['rows']
+        assert len(form) == 4 and form[0]['date'] == '2025-09-27'
+        assert form[0]['official_finish'] == 2 and form[0]['performance_score'] == 60.1
+        assert {row['official_finish'] for row in form if row['track'] == 'belmont-park'} == {1, 2}
+
+        assert len(engine.sql("SELECT * FROM scores WHERE track = $track", {'track': 'santa-anita'})) == 4
+        for bad in (lambda: engine.sql("COPY scores TO 'x.csv'"), lambda: engine.query('drop_all'),
+                    lambda: engine.query('track_days', limit=5)):
+            try:
+                bad()
+                assert False, 'ValueError bekleniyordu'
+            except ValueError:
+                pass
+        engine.close()
+
+
+def test_query_endpoint():
+    """/api/query hazır sorguyu çalıştırmalı, arşiv boşken de şema ile cevap vermeli"""
+    import app as web_app
+    with tempfile.TemporaryDirectory() as work_dir:
+        previous = os.environ.get('HRN_ARCHIVE_DIR')
+        os.environ['HRN_ARCHIVE_DIR'] = os.path.join(work_dir, 'archive')
+        try:
+            client = web_app.app.test_client()
+            empty = client.get(f'/api/query?name=track_days&until={UNTIL}').get_json()
+            assert empty['success'] and empty['rows'] == [] and 'success_rate' in empty['columns']
+
+            _build_archive(work_dir)
+            from query_engine import get_default_query_engine
+            get_default_query_engine().load_views()
+            data = client.get(f'/api/query?name=track_days&track=belmont-park&until={UNTIL}').get_json()
+            assert [row['date'] for row in data['rows']] == ['2025-09-27', '2025-09-20']
+            assert 'top_ranked_finish' in client.get('/api/query').get_json()['queries']
+            assert client.get('/api/query?name=track_days&days=abc').status_code == 400
+        finally:
+            if previous is None:
+                os.environ.pop('HRN_ARCHIVE_DIR', None)
+            else:
+                os.environ['HRN_ARCHIVE_DIR'] = previous
+
+
+if __name__ == "__main__":
+    test_top_ranked_finish()
+    test_query_endpoint()
+    print("✅ Query engine testleri geçti")
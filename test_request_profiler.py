@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+REQUEST PROFILER TEST
+Aşama sürelerinin Server-Timing başlığıyla döndüğünü, profil isteğinin yalnızca
+HRN_PROFILING açıkken pist/tarih/endpoint etiketli dosyaya yazıldığını test eder
+"""
+
+import os
+import pstats
+import sys
+import tempfile
+import time
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from data_store import record_output
+from pipeline import ESSENTIAL_FIELDS, output_base_name
+from request_profiler import StackSampler
+from utils import write_csv_atomic
+
+
+def _busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def test_stack_sampler_folded_output():
+    """Örnekleyici, çalışan fonksiyonu collapsed stack satırlarında göstermeli"""
+    print("🔥 REQUEST PROFILER TEST")
+    print("=" * 50)
+
+    sampler = StackSampler(interval_ms=1).start()
+    _busy_wait(0.1)
+    sampler.stop()
+    assert sampler.samples > 0
+    lines = sampler.folded().splitlines()
+    assert any('_busy_wait (test_request_profiler.py:' in line for line in lines)
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0 and stack
+
+
+def test_profiled_endpoint():
+    """calculate_from_saved: Server-Timing her zaman, profil dosyası yalnızca izin varsa"""
+    import app as web_app
+    with tempfile.TemporaryDirectory() as work_dir:
+        profile_dir = os.path.join(work_dir, 'profiles')
+        values = {'HRN_DATA_DIR': os.path.join(work_dir, 'data'), 'HRN_STORAGE_DB': os.path.join(work_dir, 'hrn.sqlite3'),
+                  'HRN_PROFILE_DIR': profile_dir, 'HRN_PROFILE_INTERVAL_MS': '1', 'HRN_PROFILING': '1'}
+        previous = {key: os.environ.get(key) for key in values}
+        os.environ.update(values)
+        try:
+            today = web_app.get_american_date_string()
+            path = f"{output_base_name('santa-anita', today)}_essential.csv"
+            write_csv_atomic(path, ESSENTIAL_FIELDS,
+                             [{'race_number': '1', 'program_number': str(i), 'horse_name': f'Horse {i}',
+                               'latest_surface': 'Dirt', 'latest_distance': '6 f', 'latest_time': f'1:1{i}.00',
+                               'latest_finish_position': str(i)} for i in range(1, 4)])
+            record_output(path)
+            client = web_app.app.test_client()
+
+            response = client.post('/api/calculate_from_saved', json={'city': 'santa-anita'},
+                                   headers={'X-HRN-Profile': 'cprofile'})
+            assert response.get_json()['races']
+            timing = response.headers['Server-Timing']
+            for name in ('lookup', 'load', 'score', 'web', 'total'):
+                assert f"{name};dur=" in timing
+            files = os.listdir(profile_dir)
+            assert len(files) == 1 and files[0].endswith('.prof') and f'profile;desc="{files[0]}"' in timing
+            assert files[0].startswith(f"calculate_from_saved_santa-anita_{today}_")
+            assert pstats.Stats(os.path.join(profile_dir, files[0])).total_calls > 0
+
+            response = client.post('/api/calculate_from_saved?profile=1', json={'city': 'santa-anita'})
+            folded = [name for name in os.listdir(profile_dir) if name.endswith('.folded')]
+            assert len(folded) == 1 and folded[0] in response.headers['Server-Timing']
+
+            # Config kapalıyken başlık yok sayılır, aşama süreleri yine döner
+            os.environ['HRN_PROFILING'] = '0'
+            response = client.post('/api/calculate_from_saved', json={'city': 'santa-anita'},
+                                   headers={'X-HRN-Profile': '1'})
+            assert 'score;dur=' in response.headers['Server-Timing'] and 'profile;' not in response.headers['Server-Timing']
+            assert len(os.listdir(profile_dir)) == 2
+        finally:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+if __name__ == "__main__":
+    test_stack_sampler_folded_output()
+    test_profiled_endpoint()
+    print("✅ Request profiler testleri geçti")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+RESULTS INGEST TEST
+Resmi sonuç tablosundan son yarış kaydının yazıldığını ve aynı gün tekrar
+koşan atlar için profil isteği atılmadığını, arada başka pistte koşan atlar için
+ise profilin çekildiğini test eder
+"""
+
+import csv
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper, get_american_time
+from horse_profile_scraper import HorseProfileScraper
+from results_ingest import ingest_track_results, results_rows_from_races
+from results_store import ResultsStore, normalize_horse_name
+
+
+def test_results_rows_from_card():
+    """Resmi yarışlar bitiş sırası ve final time ile satıra dönüşmeli, diğerleri atlanmalı"""
+    print("🏁 RESULTS INGEST TEST")
+    print("=" * 50)
+
+    server = StandInServer(StandInConfig(tracks=1, races=3, horses=5, official_races=2)).start()
+    try:
+        scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        date_str = get_american_time().strftime('%Y-%m-%d')
+        track_data = scraper.scrape_track_data(f"{server.base_url}/entries-results/santa-anita/{date_str}",
+                                               'Santa Anita')
+    finally:
+        server.stop()
+
+    rows = results_rows_from_races('santa-anita', date_str, track_data['races'])
+    assert {row['race_number'] for row in rows} == {'1', '2'}
+    assert [row['finish_position'] for row in rows if row['race_number'] == '1'] == ['1', '2', '3']
+    for row in rows:
+        assert row['program_number'] and row['time'] and row['surface'] and row['distance']
+    assert normalize_horse_name("Cash's Candy (IRE)") == 'cashs candy'
+
+
+def test_latest_race_skips_profile_fetch():
+    """Depoda güncel kayıt olan at için profil sayfası istenmemeli"""
+    server = StandInServer(StandInConfig(tracks=1, races=2, horses=4, official_races=1,
+                                         variant_miss_rate=0.0)).start()
+    try:
+        entries_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        date_str = get_american_time().strftime('%Y-%m-%d')
+        track_data = entries_scraper.scrape_track_data(
+            f"{server.base_url}/entries-results/santa-anita/{date_str}", 'Santa Anita')
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            store = ResultsStore(os.path.join(work_dir, 'results.sqlite3'))
+            summary = ingest_track_results('santa-anita', date_str, track_data, store, work_dir)
+            assert summary['races'] == [1] and summary['horses'] == 3 and store.count() == 3
+
+            results_file = os.path.join(work_dir, f"santa-anita_{date_str.replace('-', '_')}_santa-anita_results.csv")
+            with open(results_file, 'r', encoding='utf-8') as f:
+                assert len(list(csv.DictReader(f))) == 3
+
+            # Eski tarihli kayıt yenisinin üzerine yazılmamalı
+            winner = track_data['races'][0]['results']['finishing_order'][0]['horse']
+            assert store.upsert([{'horse_name': winner, 'race_date': '2020-01-01', 'time': '9:99.99'}]) == 0
+
+            last_starts = {entry['horse_info']['horse_name']: entry['horse_info']['last_start']
+                           for race in track_data['races'] for entry in race['entries']}
+            assert all(last_starts.values()) and max(last_starts.values()) < date_str
+
+            profile_scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False, results_store=store)
+            latest = profile_scraper.latest_race(winner, last_start=last_starts[winner])
+            assert latest['source'] == 'results' and latest['finish_position'] == '1'
+            assert latest['time'] == track_data['races'][0]['results']['final_time']
+            assert server.stats['by_route'].get('profile', 0) == 0
+
+            # Son koşu tarihi bilinmiyorsa kayıt atın en son koşusu sayılmaz
+            assert profile_scraper.latest_race(winner).get('source') != 'results'
+            assert server.stats['by_route'].get('profile', 0) == 1
+
+            # Sonuç tablosunda olmayan at profil sayfasından gelir
+            unofficial_race = track_data['races'][1]
+            other = unofficial_race['entries'][0]['horse_info']['horse_name']
+            assert profile_scraper.latest_race(other, last_start=last_starts[other]).get('time')
+            assert server.stats['by_route'].get('profile', 0) >= 2
+
+            # At depodaki yarıştan sonra başka pistte koştuysa (last_start daha yeni) profil çekilir
+            stored_day = (datetime.strptime(last_starts[other], '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+            assert store.upsert([{'horse_name': other, 'race_date': stored_day, 'time': '9:99.99'}]) == 1
+            profiles_before = server.stats['by_route']['profile']
+            latest = profile_scraper.latest_race(other, max_age_days=365, last_start=last_starts[other])
+            assert latest.get('source') != 'results' and latest['time'] != '9:99.99'
+            assert server.stats['by_route']['profile'] > profiles_before
+
+            # Aynı gün tarihli kayıt son koşuyu kapsar
+            store.upsert([{'horse_name': other, 'race_date': last_starts[other], 'time': '1:11.11'}])
+            profiles_before = server.stats['by_route']['profile']
+            latest = profile_scraper.latest_race(other, max_age_days=365, last_start=last_starts[other])
+            assert latest['time'] == '1:11.11' and server.stats['by_route']['profile'] == profiles_before
+            store.close()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_results_rows_from_card()
+    test_latest_race_skips_profile_fetch()
+    print("✅ Results ingest testleri geçti")
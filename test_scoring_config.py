@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SCORING CONFIG TEST
+Skorlama sabitlerinin sürümlü dosyadan yüklendiğini, değişince yeniden başlatmadan
+alındığını ve yarış skor cache'inin yalnızca ilgili sürüm için geçersiz olduğunu test eder
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from race_score_cache import RaceScoreCache, score_races
+from scoring_config import BUILTIN_VERSION, DEFAULT_SCORING_PARAMS, ScoringConfig, get_scoring_config
+
+HORSES = [
+    {'race_number': '1', 'program_number': '1', 'horse_name': 'Tiger Sea', 'profile_time': '1:10.00',
+     'profile_distance': '6 f', 'profile_surface': 'Dirt', 'latest_finish_position': '4',
+     'entry_distance': '6 f', 'entry_surface': 'Dirt'},
+    {'race_number': '1', 'program_number': '2', 'horse_name': 'Royal Comet', 'profile_time': '1:11.00',
+     'profile_distance': '6 f', 'profile_surface': 'Dirt', 'latest_finish_position': '1',
+     'entry_distance': '6 f', 'entry_surface': 'Dirt'},
+]
+
+
+def _write_config(path, version, penalty, stamp):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'params': {'position_penalty': penalty}}, f)
+    # Aynı saniyede yazılan dosyalar da farklı görünsün
+    os.utime(path, ns=(stamp, stamp))
+
+
+def test_config_reload():
+    """Dosya yokken yerleşik değerler; yeni dosya / değişiklik yüklenmeli, hatalı dosya önceki sürümü korumalı"""
+    print("🎚️ SCORING CONFIG TEST")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'scoring_config.json')
+        config = ScoringConfig(path, check_interval=3600)
+        builtin = config.version
+        assert builtin.startswith(f"{BUILTIN_VERSION}+") and config.params == DEFAULT_SCORING_PARAMS
+
+        _write_config(path, '2025-10-01', 0.45, 1_000_000_000_000)
+        # Kontrol aralığı dolmadan dosyaya bakılmaz
+        assert config.snapshot()[1] == builtin
+        assert config.refresh(force=True)
+        params, version = config.snapshot()
+        assert version.startswith('2025-10-01+') and params['position_penalty'] == 0.45
+        assert params['surface_factors'] == DEFAULT_SCORING_PARAMS['surface_factors']
+        assert not config.refresh(force=True)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"params": {"penalty": 1}}')
+        assert not config.refresh(force=True) and config.errors == 1 and config.version == version
+
+        # Geçerli JSON ama hatalı tür: null sayı ve liste zemin çarpanı önceki sürümü bozmamalı
+        for stamp, body in ((2_000_000_000_000, '{"params": {"position_penalty": null}}'),
+                            (3_000_000_000_000, '{"params": {"surface_factors": [1]}}'),
+                            (4_000_000_000_000, '{"params": {"surface_factors": {"Dirt": {"Turf": "x"}}}}')):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(body)
+            os.utime(path, ns=(stamp, stamp))
+            assert not config.refresh(force=True)
+            assert config.snapshot() == (params, version)
+        assert config.errors == 4
+
+        # Dosya düzeltilince yeniden yüklenir
+        _write_config(path, '2025-10-02', 0.5, 5_000_000_000_000)
+        assert config.refresh(force=True) and config.params['position_penalty'] == 0.5
+        version = config.version
+
+        os.remove(path)
+        assert config.refresh(force=True) and config.version == builtin and config.reloads == 3
+
+
+def test_race_cache_keys_include_version():
+    """Sürüm değişince yarış yeniden hesaplanmalı, eski sürüme dönünce cache'teki sonuç kullanılmalı"""
+    import app as web_app
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'scoring_config.json')
+        previous = os.environ.get('HRN_SCORING_CONFIG')
+        os.environ['HRN_SCORING_CONFIG'] = path
+        try:
+            cache = RaceScoreCache()
+            _write_config(path, 'v1', 0.30, 1_000_000_000_000)
+            get_scoring_config().refresh(force=True)
+            grouped, results, recomputed = score_races('belmont-park', '2025-09-28', HORSES, cache)
+            assert recomputed == ['1'] and results[0]['horse_name'] == 'Tiger Sea'
+            assert score_races('belmont-park', '2025-09-28', HORSES, cache)[2] == []
+
+            # Büyük ceza sıralamayı değiştirir; v1 sonuçları cache'te kalır
+            _write_config(path, 'v2', 1.5, 2_000_000_000_000)
+            get_scoring_config().refresh(force=True)
+            _, results, recomputed = score_races('belmont-park', '2025-09-28', HORSES, cache)
+            assert recomputed == ['1'] and results[0]['horse_name'] == 'Royal Comet'
+            assert cache.stats()['races'] == 2
+
+            _write_config(path, 'v1', 0.30, 3_000_000_000_000)
+            get_scoring_config().refresh(force=True)
+            _, results, recomputed = score_races('belmont-park', '2025-09-28', HORSES, cache)
+            assert recomputed == [] and results[0]['horse_name'] == 'Tiger Sea'
+
+            status = web_app.app.test_client().get('/api/scoring_config').get_json()
+            assert status['success'] and status['version'].startswith('v1+') and status['source'] == path
+            assert status['params']['position_penalty'] == 0.3
+        finally:
+            if previous is None:
+                os.environ.pop('HRN_SCORING_CONFIG', None)
+            else:
+                os.environ['HRN_SCORING_CONFIG'] = previous
+
+
+if __name__ == "__main__":
+    test_config_reload()
+    test_race_cache_keys_include_version()
+    print("✅ Scoring config testleri geçti")
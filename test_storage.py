@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+STORAGE TEST
+Çıktı dosyalarının SQLite deposuna da yazıldığını, günler arası at geçmişinin
+tek sorguyla alındığını ve CSV export'un dosyayla aynı satırları verdiğini test eder
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper
+from essential_journal import EssentialJournal
+from pipeline import ENTRIES_FIELDS, ESSENTIAL_FIELDS, output_base_name
+from data_store import record_output
+from storage import Storage
+from utils import write_csv_atomic
+
+
+def _set_env(values):
+    previous = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    return previous
+
+
+def _restore_env(previous):
+    for key, value in previous.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+def _essential(date_index):
+    return [{'race_number': '1', 'program_number': '3', 'horse_name': 'Tiger Sea', 'latest_surface': 'Dirt',
+             'latest_distance': '6 f', 'latest_time': f'1:1{date_index}.00', 'latest_finish_position': '2'},
+            {'race_number': '1', 'program_number': '1', 'horse_name': 'Royal Comet', 'latest_surface': '',
+             'latest_distance': '', 'latest_time': '', 'latest_finish_position': ''}]
+
+
+def test_outputs_ingested_into_storage():
+    """record_output ile yazılan entries/essential/skor satırları depodan okunmalı"""
+    print("🗄️ STORAGE TEST")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_path = os.path.join(work_dir, 'data', 'hrn.sqlite3')
+        previous = _set_env({'HRN_DATA_DIR': os.path.join(work_dir, 'data'), 'HRN_STORAGE_DB': db_path})
+        try:
+            for index, date_str in enumerate(['2025-09-27', '2025-09-28']):
+                base = output_base_name('santa-anita', date_str)
+                entries = [{'track_name': 'santa-anita', 'race_number': '1', 'post_position': row['program_number'],
+                            'program_number': row['program_number'], 'horse_name': row['horse_name'],
+                            'morning_line': '5/2'} for row in _essential(index)]
+                write_csv_atomic(f"{base}_entries.csv", ENTRIES_FIELDS, entries)
+                record_output(f"{base}_entries.csv")
+                EssentialJournal(base).finalize(_essential(index), ESSENTIAL_FIELDS)
+
+            # Dosya dışında yazılan satırlar (örn. hesaplama sonuçları) doğrudan ingest edilir
+            storage = Storage(db_path)
+            storage.ingest('santa-anita', '2025-09-28', 'scores',
+                           [{'race_number': 1, 'program_number': '3', 'horse_name': 'Tiger Sea',
+                             'performance_score': 61.2, 'calculation_status': 'Success'},
+                            {'race_number': 1, 'program_number': '1', 'horse_name': 'Royal Comet',
+                             'performance_score': float('nan'), 'calculation_status': 'Failed'}])
+
+            assert [row['program_number'] for row in storage.entries('2025-09-28', 'santa-anita')] == ['1', '3']
+            history = storage.horse_history('tiger sea')
+            assert [card['date'] for card in history['cards']] == ['2025-09-28', '2025-09-27']
+            assert history['cards'][0]['latest_time'] == '1:11.00' and history['cards'][0]['performance_score'] == 61.2
+            assert history['cards'][1]['performance_score'] is None
+            assert storage.scores('2025-09-28', 'santa-anita')[0]['horse_name'] == 'Tiger Sea'
+
+            # Export, pipeline'ın yazdığı essential dosyasıyla aynı satırları vermeli
+            export_path = os.path.join(work_dir, 'export.csv')
+            assert storage.export_csv('2025-09-28', 'santa-anita', 'essential', export_path) == 2
+            with open(export_path, 'r', encoding='utf-8') as f:
+                exported = list(csv.DictReader(f))
+            with open(f"{output_base_name('santa-anita', '2025-09-28')}_essential.csv", 'r', encoding='utf-8') as f:
+                written = list(csv.DictReader(f))
+            assert sorted(exported, key=lambda row: row['program_number']) == \
+                sorted(written, key=lambda row: row['program_number'])
+
+            # WAL: ikinci bağlantı okurken yazma bloklanmaz
+            reader = sqlite3.connect(db_path)
+            reader.execute('BEGIN')
+            assert reader.execute('SELECT COUNT(*) FROM horse_profiles').fetchone()[0] == 4
+            storage.ingest('santa-anita', '2025-09-29', 'essential', _essential(2))
+            assert reader.execute('SELECT COUNT(*) FROM horse_profiles').fetchone()[0] == 4
+            reader.rollback()
+            assert reader.execute('SELECT COUNT(*) FROM horse_profiles').fetchone()[0] == 6
+            reader.close()
+            storage.close()
+        finally:
+            _restore_env(previous)
+
+
+def test_save_card_from_entries_page():
+    """Parse edilmiş kart yarış bilgisi ve entries ile depoya yazılmalı"""
+    server = StandInServer(StandInConfig(tracks=1, races=3, horses=5)).start()
+    try:
+        scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        track_data = scraper.scrape_track_data(f"{server.base_url}/entries-results/santa-anita/2025-09-28",
+                                               'Santa Anita')
+    finally:
+        server.stop()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        storage = Storage(os.path.join(work_dir, 'hrn.sqlite3'))
+        assert storage.save_card('santa-anita', '2025-09-28', track_data) == 15
+        races = storage.races('2025-09-28', 'santa-anita')
+        assert [race['race_number'] for race in races] == [1, 2, 3]
+        assert races[0]['distance'] == track_data['races'][0]['race_info']['distance']
+        assert len(storage.entries('2025-09-28', 'santa-anita', race_number='2')) == 5
+        assert storage.counts()['tracks'] == 1
+        storage.close()
+
+
+def test_reingest_replaces_partition():
+    """Yeniden yazılan çıktıdan düşen at depodan da silinmeli; diğer bölümler etkilenmemeli"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        storage = Storage(os.path.join(work_dir, 'hrn.sqlite3'))
+        for date_str in ('2025-09-28', '2025-09-29'):
+            storage.ingest('santa-anita', date_str, 'essential', _essential(1))
+            storage.ingest('santa-anita', date_str, 'entries', _essential(1))
+            storage.ingest('santa-anita', date_str, 'results',
+                           [dict(row, finish_position='1') for row in _essential(1)])
+        storage.ingest('laurel-park', '2025-09-28', 'entries', _essential(1))
+
+        # Royal Comet çekildi (refresh_track_entries) - dosyalar tek atla yeniden yazılır
+        remaining = [row for row in _essential(1) if row['horse_name'] != 'Royal Comet']
+        for kind in ('essential', 'entries', 'results'):
+            assert storage.ingest('santa-anita', '2025-09-28', kind, remaining) == 1
+
+        assert [row['horse_name'] for row in storage.essential_rows('2025-09-28', 'santa-anita')] == ['Tiger Sea']
+        assert [row['horse_name'] for row in storage.entries('2025-09-28', 'santa-anita')] == ['Tiger Sea']
+        history = storage.horse_history('ROYAL COMET')
+        assert [(card['date'], card['track']) for card in history['cards']] == \
+            [('2025-09-29', 'santa-anita'), ('2025-09-28', 'laurel-park')]
+        assert [result['race_date'] for result in history['results']] == ['2025-09-29']
+        assert len(storage.entries('2025-09-28', 'laurel-park')) == 2
+
+        # At sorgusu büyük/küçük harf duyarsız indeksi kullanmalı (tam tarama değil)
+        for table in ('entries', 'horse_profiles', 'scores', 'past_races'):
+            plan = ' '.join(row[3] for row in storage._conn.execute(
+                f'EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE horse_name = ? COLLATE NOCASE', ('x',)))
+            assert 'USING INDEX' in plan and 'nocase' in plan, plan
+        storage.close()
+
+
+if __name__ == "__main__":
+    test_outputs_ingested_into_storage()
+    test_save_card_from_entries_page()
+    test_reingest_replaces_partition()
+    print("✅ Storage testleri geçti")
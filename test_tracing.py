@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TRACING TEST
+Pipeline run'ının fetch / parse / profile / score / serialise span'lerini OTLP JSON olarak
+yazdığını ve özet CLI'ının kritik yolu, en yavaş atları ve URL varyantlarını çıkardığını test eder
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# Add hrn_scraper to path
+sys.path.insert(0, os.path.abspath('hrn_scraper'))
+
+import tracing
+from horse_profile_scraper import HorseProfileScraper
+from hrn_scraper import HorseRacingNationScraper
+from hrn_standin_server import StandInConfig, StandInServer
+from pipeline import StreamingPipeline
+
+TEST_DATE = '2025-09-28'
+
+
+def test_noop_without_tracer():
+    """Tracer yokken span() NOOP_SPAN verir, hiçbir şey kaydedilmez"""
+    print("🧵 TRACING TEST")
+    print("=" * 50)
+
+    assert tracing.current_tracer() is None
+    with tracing.span('score', track='santa-anita') as item:
+        item.set(horses=3)
+        assert item is tracing.NOOP_SPAN
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'traces.jsonl')
+        try:
+            with tracing.trace('request', path, endpoint='/api/x') as root:
+                with tracing.span('score', race='1') as child:
+                    raise ValueError('boom')
+        except ValueError:
+            pass
+        assert tracing.current_tracer() is None
+        spans = tracing.load_traces(path)[0]
+        by_name = {item['name']: item for item in spans}
+        assert by_name['score']['parent_id'] == root.span_id == by_name['request']['span_id']
+        assert by_name['score']['status'] == tracing.STATUS_ERROR and child.message == 'boom'
+        assert by_name['request']['attributes'] == {'endpoint': '/api/x'}
+
+
+def test_pipeline_trace_and_summary():
+    """Pipeline run'ı tek trace; tüm adımlar pist/yarış/at öznitelikleriyle yazılmalı"""
+    server = StandInServer(StandInConfig(tracks=2, races=2, horses=3, variant_miss_rate=0.5, seed=3)).start()
+    try:
+        entries_scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        profile_scraper = HorseProfileScraper(base_url=server.base_url, http_cache=False)
+        tracks = entries_scraper.get_daily_tracks(TEST_DATE)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = os.path.join(work_dir, 'traces', 'run.jsonl')
+            pipeline = StreamingPipeline(TEST_DATE, output_dir=work_dir, profile_workers=3, queue_size=2,
+                                         entries_scraper=entries_scraper, profile_scraper=profile_scraper,
+                                         trace_file=path)
+            pipeline.run(tracks)
+            assert tracing.current_tracer() is None
+
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            assert len(lines) == 1
+            request = json.loads(lines[0])
+            resource = request['resourceSpans'][0]
+            assert resource['resource']['attributes'][0]['value']['stringValue'] == tracing.SERVICE_NAME
+            raw_spans = resource['scopeSpans'][0]['spans']
+            assert len({item['traceId'] for item in raw_spans}) == 1
+            assert all(len(item['spanId']) == 16 and int(item['endTimeUnixNano']) >= int(item['startTimeUnixNano'])
+                       for item in raw_spans)
+
+            spans = tracing.load_traces(path)[0]
+            names = {item['name'] for item in spans}
+            assert {'pipeline.run', 'fetch', 'parse', 'profile', 'score', 'serialise'} <= names
+            ids = {item['span_id'] for item in spans}
+            assert all(item['parent_id'] in ids for item in spans if item['name'] != 'pipeline.run')
+
+            profiles = [item for item in spans if item['name'] == 'profile']
+            assert len(profiles) == 12
+            assert all(item['attributes'].get('track') and item['attributes'].get('race') and
+                       item['attributes'].get('horse') for item in profiles)
+            fetches = [item for item in spans if item['name'] == 'fetch']
+            assert any(item['attributes'].get('url_class') == 'entries' and
+                       item['attributes'].get('status_code') == 200 for item in fetches)
+            assert any(item['attributes'].get('url_class') == 'profile' and item['attributes'].get('variant')
+                       for item in fetches)
+            assert any(item['attributes'].get('page_type') == 'entries' for item in spans if item['name'] == 'parse')
+
+            summary = tracing.summarize(spans, top=5)
+            assert summary['critical_path'][0][1]['name'] == 'pipeline.run'
+            assert [depth for depth, _ in summary['critical_path']] == list(range(len(summary['critical_path'])))
+            assert len(summary['slowest_horses']) == 5 and all(entry['track'] for entry in summary['slowest_horses'])
+            assert 'profile' in summary['slowest_horses'][0]['steps']
+            classes = {entry['url_class'] for entry in summary['url_variants']}
+            assert {'entries', 'profile'} <= classes
+            tracing.print_summary(summary)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_noop_without_tracer()
+    test_pipeline_trace_and_summary()
+    print("✅ Tracing testleri geçti")
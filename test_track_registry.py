@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TRACK REGISTRY TEST
+Günlük pist listesinin tarih başına bir kez çekildiğini ve yarışı olmayan
+pistler için istek atılmadığını stand-in sunucusuyla test eder
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add hrn_scraper to path
+sys.path.insert(0, 'hrn_scraper')
+
+from hrn_standin_server import StandInConfig, StandInServer
+from hrn_scraper import HorseRacingNationScraper
+from track_registry import TrackRegistry, KNOWN_TRACKS
+
+TEST_DATE = '2025-09-28'
+
+
+def test_registry_caches_daily_list():
+    """Aktif liste tek istekle alınmalı, alias'lar aynı slug'a çözülmeli"""
+    print("🗂️  TRACK REGISTRY TEST")
+    print("=" * 50)
+
+    server = StandInServer(StandInConfig(tracks=3, races=3, horses=4)).start()
+    try:
+        scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        registry = TrackRegistry(scraper=scraper)
+
+        active = registry.active_tracks(TEST_DATE)
+        print(f"Active tracks: {sorted(active)}")
+        assert set(active) == {'santa-anita', 'belmont-at-aqueduct', 'laurel-park'}
+
+        # aqueduct ve belmont-park aynı slug'a gider
+        assert registry.is_active('aqueduct', TEST_DATE) is True
+        assert registry.is_active('belmont-park', TEST_DATE) is True
+        assert registry.is_active('keeneland', TEST_DATE) is False
+        assert registry.entries_url('belmont-park', TEST_DATE).endswith(
+            f"/entries-results/belmont-at-aqueduct/{TEST_DATE}")
+        assert registry.first_post_time('santa-anita', TEST_DATE).tzinfo is not None
+
+        # Tüm sorgular tek günlük liste isteğinden cevaplanmalı
+        assert server.stats['requests'] == 1
+
+        groups = registry.tracks_for_display(TEST_DATE)
+        codes = [track['code'] for group in groups for track in group['tracks']]
+        assert 'belmont-at-aqueduct' not in codes  # alias'ı olan slug menüde tekrar edilmez
+        assert len(codes) == len(KNOWN_TRACKS) - 1
+    finally:
+        server.stop()
+
+
+def test_app_skips_inactive_track_without_request():
+    """app.scrape_single_track_data yarışı olmayan pist için istek atmamalı"""
+    had_cache_dir = 'HRN_HTTP_CACHE_DIR' in os.environ
+    import app as web_app
+    if not had_cache_dir:
+        os.environ.pop('HRN_HTTP_CACHE_DIR', None)
+
+    server = StandInServer(StandInConfig(tracks=3, races=3, horses=4)).start()
+    original_registry = web_app.track_registry
+    try:
+        scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+        web_app.track_registry = TrackRegistry(scraper=scraper)
+
+        assert web_app.scrape_single_track_data('keeneland', TEST_DATE) is False
+        assert server.stats['by_route'] == {'daily_tracks': 1}
+
+        response = web_app.app.test_client().get(f'/api/tracks?date={TEST_DATE}')
+        data = response.get_json()
+        assert data['success'] and data['daily_list_available']
+        active_codes = [t['code'] for g in data['groups'] for t in g['tracks'] if t['active']]
+        print(f"Active codes: {active_codes}")
+        assert 'santa-anita' in active_codes and 'keeneland' not in active_codes
+    finally:
+        web_app.track_registry = original_registry
+        server.stop()
+
+
+def test_failed_daily_list_cached_briefly():
+    """Alınamayan liste NEGATIVE_TTL boyunca tekrar istenmemeli; menü render'ı fetch'i beklememeli"""
+    server = StandInServer(StandInConfig(tracks=3, races=3, horses=4)).start()
+    scraper = HorseRacingNationScraper(base_url=f"{server.base_url}/", http_cache=False)
+    server.stop()
+
+    calls = []
+    release = threading.Event()
+    fetch = scraper.get_daily_tracks
+
+    def slow_fetch(date_str):
+        calls.append(date_str)
+        release.wait(5)
+        return fetch(date_str)
+
+    scraper.get_daily_tracks = slow_fetch
+    registry = TrackRegistry(scraper=scraper, negative_ttl=60)
+
+    # Liste cache'te yok: statik menü hemen dönmeli, çekim arka planda
+    started = time.time()
+    groups = registry.tracks_for_display(TEST_DATE)
+    assert time.time() - started < 1
+    assert all(track['active'] is None for group in groups for track in group['tracks'])
+    registry.tracks_for_display(TEST_DATE)
+    release.set()
+    for _ in range(100):
+        if registry._failed.get(TEST_DATE) and not registry._refreshing:
+            break
+        time.sleep(0.05)
+    assert calls == [TEST_DATE]  # arka plan yenilemesi tarih başına tek
+
+    # Hata hatırlanır: sonraki çağrılar ağa gitmez
+    assert registry.active_tracks(TEST_DATE) is None
+    assert registry.is_active('santa-anita', TEST_DATE) is None
+    registry.tracks_for_display(TEST_DATE)
+    assert calls == [TEST_DATE]
+
+    # Süre dolunca tekrar denenir
+    registry._failed[TEST_DATE] -= 61
+    assert registry.active_tracks(TEST_DATE) is None
+    assert calls == [TEST_DATE, TEST_DATE]
+
+
+if __name__ == "__main__":
+    test_registry_caches_daily_list()
+    test_app_skips_inactive_track_without_request()
+    test_failed_daily_list_cached_briefly()